@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Benchmark the Compression Codecs on Sample Payloads of Each Topic
+
+    Steps:
+        - Load sample payloads for each topic (a file with one payload per line
+            or a directory with one payload per file)
+        - Compress the payloads in batches with each codec (none, gzip, snappy,
+            lz4 and zstd)
+        - Print the compression ratio and compress/decompress CPU cost
+        - Pick the codec with the lowest cost per message for each topic
+        - Save the results and the codec of each topic as JSON (the codecs can
+            be passed to get_topic_compression_producer)
+
+    example script call:
+        python3 run_compression_benchmarks.py --payloads="orders=orders.jsonl" \
+            --payloads="clicks=samples/clicks/" --output="compression.json"
+"""
+
+# Python Library Imports
+import logging
+import os
+import sys
+from argparse import ArgumentParser
+
+# Local Library Imports
+from kafka_helpers import kafka_benchmark_helpers, kafka_compression_helpers
+
+
+def main():
+    """
+    Purpose:
+        Benchmark the Compression Codecs on Sample Payloads of Each Topic
+    """
+    logging.info("Starting Compression Benchmarks")
+
+    opts = get_options()
+
+    compression_levels = {}
+    for compression_level_arg in opts.compression_levels or []:
+        compression_type, compression_level = parse_key_value(compression_level_arg)
+        compression_levels[compression_type] = int(compression_level)
+
+    network_bytes_per_sec = opts.network_mb_per_sec * 1000000
+
+    results = kafka_benchmark_helpers.get_benchmark_results([])
+    results["batch_size"] = opts.batch_size
+    results["network_bytes_per_sec"] = network_bytes_per_sec
+    results["topics"] = {}
+    results["topic_compression_types"] = {}
+    for payloads_arg in opts.payloads:
+        kafka_topic, payloads_path = parse_key_value(payloads_arg)
+        payloads = load_payloads(payloads_path)
+        logging.info(f"Benchmarking {len(payloads)} Payloads of Topic {kafka_topic}")
+
+        compression_results = kafka_compression_helpers.measure_compression(
+            payloads,
+            compression_types=opts.compression_types,
+            compression_levels=compression_levels,
+            batch_size=opts.batch_size,
+            iterations=opts.iterations,
+        )
+        for compression_result in compression_results.values():
+            compression_result["cost_us_per_msg"] = (
+                kafka_compression_helpers.get_compression_cost(
+                    compression_result, network_bytes_per_sec
+                )
+            )
+        best_compression_type = kafka_compression_helpers.get_best_compression_type(
+            compression_results, network_bytes_per_sec
+        )
+
+        results["topics"][kafka_topic] = compression_results
+        results["topic_compression_types"][kafka_topic] = best_compression_type
+        print_compression_results(kafka_topic, compression_results, best_compression_type)
+
+    kafka_benchmark_helpers.save_benchmark_results(results, opts.output_filename)
+
+    logging.info("Compression Benchmarks Complete")
+
+
+###
+# General/Helper Methods
+###
+
+
+def parse_key_value(key_value_arg):
+    """
+    Purpose:
+        Split a KEY=VALUE argument
+    """
+
+    key, separator, value = key_value_arg.partition("=")
+    if not separator or not key or not value:
+        raise ValueError(f"Expected KEY=VALUE, got {key_value_arg}")
+
+    return key, value
+
+
+def load_payloads(payloads_path):
+    """
+    Purpose:
+        Load sample payloads from a directory (one payload per file) or a file
+        (one payload per line)
+    """
+
+    if os.path.isdir(payloads_path):
+        payloads = []
+        for payload_filename in sorted(os.listdir(payloads_path)):
+            payload_path = os.path.join(payloads_path, payload_filename)
+            if os.path.isfile(payload_path):
+                with open(payload_path, "rb") as payload_file:
+                    payloads.append(payload_file.read())
+    else:
+        with open(payloads_path, "rb") as payloads_file:
+            payloads = [
+                payload.rstrip(b"\r\n") for payload in payloads_file if payload.strip()
+            ]
+
+    if not payloads:
+        raise ValueError(f"No payloads found in {payloads_path}")
+
+    return payloads
+
+
+def print_compression_results(kafka_topic, compression_results, best_compression_type):
+    """
+    Purpose:
+        Print a table of compression results for a topic
+    """
+
+    print(f"Topic {kafka_topic} (best: {best_compression_type})")
+    print(
+        f"{'codec':<10}{'ratio':>8}{'bytes/msg':>12}{'comp us/msg':>14}"
+        f"{'decomp us/msg':>16}{'comp MB/s':>12}{'cost us/msg':>14}"
+    )
+    for compression_type, compression_result in compression_results.items():
+        print(
+            f"{compression_type:<10}"
+            f"{compression_result['ratio']:>8.2f}"
+            f"{compression_result['compressed_bytes'] / compression_result['messages']:>12.1f}"
+            f"{compression_result['compress_us_per_msg']:>14.3f}"
+            f"{compression_result['decompress_us_per_msg']:>16.3f}"
+            f"{compression_result['compress_mb_per_sec']:>12.1f}"
+            f"{compression_result['cost_us_per_msg']:>14.3f}"
+        )
+
+
+def get_options():
+    """
+    Purpose:
+        Parse CLI arguments for script
+    Args:
+        N/A
+    Return:
+        N/A
+    """
+
+    parser = ArgumentParser(description="Benchmark Compression Codecs per Topic")
+    required = parser.add_argument_group("Required Arguments")
+    optional = parser.add_argument_group("Optional Arguments")
+
+    # Required Arguments
+    required.add_argument(
+        "-p", "--payloads",
+        action="append",
+        dest="payloads",
+        help=(
+            "TOPIC=PATH of sample payloads (repeatable). PATH is a file with one "
+            "payload per line or a directory with one payload per file"
+        ),
+        required=True,
+        type=str,
+    )
+
+    # Optional Arguments
+    optional.add_argument(
+        "-c", "--compression-type",
+        action="append",
+        dest="compression_types",
+        help=(
+            "Codec to benchmark (repeatable). Default runs all: "
+            f"{', '.join(kafka_compression_helpers.COMPRESSION_TYPES)}"
+        ),
+        type=str,
+    )
+    optional.add_argument(
+        "--compression-level",
+        action="append",
+        dest="compression_levels",
+        help="CODEC=LEVEL compression level of a codec (repeatable)",
+        type=str,
+    )
+    optional.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        default=100,
+        help="Payloads per compressed batch (close to the producer batch size)",
+        type=int,
+    )
+    optional.add_argument(
+        "--iterations",
+        dest="iterations",
+        default=3,
+        help="Times each codec compresses the payloads (fastest is reported)",
+        type=int,
+    )
+    optional.add_argument(
+        "--network-mb-per-sec",
+        dest="network_mb_per_sec",
+        default=125,
+        help="Network throughput in MB/s used to weigh bytes saved against CPU",
+        type=float,
+    )
+    optional.add_argument(
+        "-o", "--output",
+        dest="output_filename",
+        default="compression_benchmarks.json",
+        help="JSON file to save the results to",
+        type=str,
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    log_level = logging.INFO
+    logging.getLogger().setLevel(log_level)
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=log_level,
+        format="[run_compression_benchmarks] %(asctime)s.%(msecs)03d %(levelname)s %(message)s",
+        datefmt="%a, %d %b %Y %H:%M:%S"
+    )
+
+    try:
+        main()
+    except Exception as err:
+        logging.exception(
+            "{0} failed due to error: {1}".format(os.path.basename(__file__), err)
+        )
+        raise err
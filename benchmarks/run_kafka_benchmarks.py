@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Benchmark the Producer and Consumer Hot Paths
+
+    Steps:
+        - Create an in-memory fake broker (no Kafka cluster is needed)
+        - Run each benchmark (produce, bulk produce, consume, batch consume,
+            serialization and the statistics callbacks)
+        - Print msgs/sec, p50/p99 per-message overhead and allocations
+        - Save the results as JSON
+        - Compare with a baseline results file, if passed
+
+    example script call:
+        python3 run_kafka_benchmarks.py --messages=100000 \
+            --output="kafka_benchmarks.json" --baseline="previous.json"
+"""
+
+# Python Library Imports
+import logging
+import os
+import struct
+import sys
+import tempfile
+import simplejson as json
+from argparse import ArgumentParser
+
+# Local Library Imports
+from kafka_helpers import (
+    kafka_avro_helpers,
+    kafka_benchmark_helpers,
+    kafka_columnar_helpers,
+    kafka_consumer_helpers,
+    kafka_fake_broker,
+    kafka_message_helpers,
+    kafka_pipeline_helpers,
+    kafka_producer_helpers,
+    kafka_serde_helpers,
+)
+
+
+def main():
+    """
+    Purpose:
+        Benchmark the Producer and Consumer Hot Paths
+    """
+    logging.info("Starting Kafka Benchmarks")
+
+    opts = get_options()
+
+    benchmark_names = opts.benchmarks or list(BENCHMARKS)
+    unknown_benchmarks = set(benchmark_names) - set(BENCHMARKS)
+    if unknown_benchmarks:
+        raise ValueError(
+            f"Unknown benchmarks {', '.join(sorted(unknown_benchmarks))}, must be "
+            f"in: {', '.join(BENCHMARKS)}"
+        )
+
+    benchmark_results = []
+    for benchmark_name in benchmark_names:
+        try:
+            benchmark_function, batch_size = BENCHMARKS[benchmark_name](opts)
+        except ImportError as err:
+            logging.warning(f"Skipping Benchmark {benchmark_name}: {err}")
+            continue
+        benchmark_results.append(kafka_benchmark_helpers.run_benchmark(
+            benchmark_name,
+            benchmark_function,
+            opts.num_messages,
+            batch_size=batch_size,
+            warmup_messages=opts.warmup_messages,
+            allocation_messages=opts.allocation_messages,
+        ))
+
+    results = kafka_benchmark_helpers.get_benchmark_results(
+        benchmark_results, version=get_version()
+    )
+    results["json_backend"] = kafka_serde_helpers.get_json_backend()
+    print_benchmark_results(results)
+    kafka_benchmark_helpers.save_benchmark_results(results, opts.output_filename)
+
+    regressions = []
+    if opts.baseline_filename:
+        comparison = kafka_benchmark_helpers.compare_benchmark_results(
+            kafka_benchmark_helpers.load_benchmark_results(opts.baseline_filename),
+            results,
+            threshold=opts.threshold,
+        )
+        print_benchmark_comparison(comparison)
+        regressions = [
+            benchmark_name
+            for benchmark_name, benchmark_comparison in comparison.items()
+            if benchmark_comparison["regression"]
+        ]
+
+    logging.info("Kafka Benchmarks Complete")
+
+    if regressions and opts.fail_on_regression:
+        raise Exception(f"Benchmarks Regressed: {', '.join(regressions)}")
+
+
+###
+# Benchmarks
+###
+
+
+def get_produce_message_benchmark(opts):
+    """
+    Purpose:
+        Produce one message per call with produce_message
+    """
+
+    kafka_producer = get_fake_producer(kafka_fake_broker.FakeKafkaBroker())
+    payload = get_payload(opts.message_size)
+
+    def produce_message_benchmark(batch_index):
+        kafka_producer_helpers.produce_message(kafka_producer, "benchmark", payload)
+
+    return produce_message_benchmark, 1
+
+
+def get_produce_messages_benchmark(opts):
+    """
+    Purpose:
+        Produce batches of messages with the bulk produce_messages path
+    """
+
+    kafka_producer = get_fake_producer(kafka_fake_broker.FakeKafkaBroker())
+    payloads = [get_payload(opts.message_size)] * opts.batch_size
+
+    def produce_messages_benchmark(batch_index):
+        kafka_producer_helpers.produce_messages(kafka_producer, "benchmark", payloads)
+
+    return produce_messages_benchmark, opts.batch_size
+
+
+def get_consume_topic_benchmark(opts):
+    """
+    Purpose:
+        Consume one message per call from the consume_topic generator
+    """
+
+    fake_broker = get_loaded_fake_broker(opts)
+    msgs = kafka_consumer_helpers.consume_topic(
+        get_fake_consumer(fake_broker), ["benchmark"]
+    )
+
+    def consume_topic_benchmark(batch_index):
+        next(msgs)
+
+    return consume_topic_benchmark, 1
+
+
+def get_consume_topic_batches_benchmark(opts):
+    """
+    Purpose:
+        Consume a batch of messages per call from consume_topic_batches
+    """
+
+    fake_broker = get_loaded_fake_broker(opts)
+    msg_batches = kafka_consumer_helpers.consume_topic_batches(
+        get_fake_consumer(fake_broker), ["benchmark"], batch_size=opts.batch_size
+    )
+
+    def consume_topic_batches_benchmark(batch_index):
+        next(msg_batches)
+
+    return consume_topic_batches_benchmark, opts.batch_size
+
+
+def get_serialize_benchmark(opts):
+    """
+    Purpose:
+        Serialize a batch of message values to JSON
+    """
+
+    values = [get_value(opts.message_size)] * opts.batch_size
+    json_serializer = kafka_serde_helpers.json_serializer
+
+    def serialize_benchmark(batch_index):
+        for value in values:
+            json_serializer(value)
+
+    return serialize_benchmark, opts.batch_size
+
+
+def get_deserialize_pipeline_benchmark(opts):
+    """
+    Purpose:
+        Deserialize a batch of JSON messages into records with a pipeline
+    """
+
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_pipeline_helpers.get_deserializer_stage(
+            value_deserializer=kafka_serde_helpers.json_deserializer,
+            key_deserializer=kafka_pipeline_helpers.utf8_deserializer,
+        ),
+    )
+    msgs = [
+        kafka_fake_broker.FakeMessage(
+            "benchmark", 0, offset, b"key", get_payload(opts.message_size)
+        )
+        for offset in range(opts.batch_size)
+    ]
+
+    def deserialize_pipeline_benchmark(batch_index):
+        kafka_pipeline_helpers.run_message_pipeline(message_pipeline, msgs)
+
+    return deserialize_pipeline_benchmark, opts.batch_size
+
+
+def get_decode_message_batch_benchmark(opts):
+    """
+    Purpose:
+        Decode a batch of JSON messages in a single pass
+    """
+
+    msgs = [
+        kafka_fake_broker.FakeMessage(
+            "benchmark", 0, offset, None, get_payload(opts.message_size)
+        )
+        for offset in range(opts.batch_size)
+    ]
+
+    def decode_message_batch_benchmark(batch_index):
+        kafka_serde_helpers.decode_message_batch(msgs)
+
+    return decode_message_batch_benchmark, opts.batch_size
+
+
+def get_message_views_benchmark(opts):
+    """
+    Purpose:
+        Wrap a batch of messages in zero-copy message views
+    """
+
+    msgs = [
+        kafka_fake_broker.FakeMessage(
+            "benchmark", 0, offset, b"key", get_payload(opts.message_size)
+        )
+        for offset in range(opts.batch_size)
+    ]
+
+    def message_views_benchmark(batch_index):
+        kafka_message_helpers.get_message_views(msgs)
+
+    return message_views_benchmark, opts.batch_size
+
+
+def get_columnar_batch_benchmark(opts):
+    """
+    Purpose:
+        Decode a batch of fixed-width records into column buffers
+    """
+
+    record_struct = struct.Struct(">qd")
+    msgs = [
+        kafka_fake_broker.FakeMessage(
+            "benchmark", 0, offset, b"key", record_struct.pack(offset, offset * 0.5)
+        )
+        for offset in range(opts.batch_size)
+    ]
+    columnar_batch_decoder = kafka_columnar_helpers.get_columnar_batch_decoder(
+        [("id", "q"), ("price", "d")]
+    )
+
+    def columnar_batch_benchmark(batch_index):
+        columnar_batch_decoder(msgs)
+
+    return columnar_batch_benchmark, opts.batch_size
+
+
+def get_avro_serialize_benchmark(opts):
+    """
+    Purpose:
+        Serialize a batch of records to Avro in the wire format
+    """
+
+    avro_serializer = kafka_avro_helpers.AvroSerializer(
+        get_schema_registry_client(), "benchmark-value", BENCHMARK_SCHEMA
+    )
+    values = [get_value(opts.message_size)] * opts.batch_size
+
+    def avro_serialize_benchmark(batch_index):
+        for value in values:
+            avro_serializer(value)
+
+    return avro_serialize_benchmark, opts.batch_size
+
+
+def get_avro_deserialize_benchmark(opts):
+    """
+    Purpose:
+        Deserialize a batch of Avro wire format records
+    """
+
+    schema_registry_client = get_schema_registry_client()
+    avro_serializer = kafka_avro_helpers.AvroSerializer(
+        schema_registry_client, "benchmark-value", BENCHMARK_SCHEMA
+    )
+    avro_deserializer = kafka_avro_helpers.AvroDeserializer(schema_registry_client)
+    payloads = [avro_serializer(get_value(opts.message_size))] * opts.batch_size
+
+    def avro_deserialize_benchmark(batch_index):
+        for payload in payloads:
+            avro_deserializer(payload)
+
+    return avro_deserialize_benchmark, opts.batch_size
+
+
+def get_producer_statistic_callback_benchmark(opts):
+    """
+    Purpose:
+        Parse and record one librdkafka producer statistics message per call
+    """
+
+    stats_json_str = json.dumps(get_statistics("producer", opts.stats_partitions))
+
+    def producer_statistic_callback_benchmark(batch_index):
+        kafka_producer_helpers.producer_statistic_callback(stats_json_str)
+
+    return producer_statistic_callback_benchmark, 1
+
+
+def get_consumer_statistic_callback_benchmark(opts):
+    """
+    Purpose:
+        Parse and record one librdkafka consumer statistics message per call
+    """
+
+    stats_json_str = json.dumps(get_statistics("consumer", opts.stats_partitions))
+
+    def consumer_statistic_callback_benchmark(batch_index):
+        kafka_consumer_helpers.consumer_statistic_callback(stats_json_str)
+
+    return consumer_statistic_callback_benchmark, 1
+
+
+BENCHMARKS = {
+    "produce_message": get_produce_message_benchmark,
+    "produce_messages": get_produce_messages_benchmark,
+    "consume_topic": get_consume_topic_benchmark,
+    "consume_topic_batches": get_consume_topic_batches_benchmark,
+    "serialize_json": get_serialize_benchmark,
+    "deserialize_pipeline": get_deserialize_pipeline_benchmark,
+    "decode_message_batch": get_decode_message_batch_benchmark,
+    "message_views": get_message_views_benchmark,
+    "columnar_batch": get_columnar_batch_benchmark,
+    "avro_serialize": get_avro_serialize_benchmark,
+    "avro_deserialize": get_avro_deserialize_benchmark,
+    "producer_statistic_callback": get_producer_statistic_callback_benchmark,
+    "consumer_statistic_callback": get_consumer_statistic_callback_benchmark,
+}
+
+
+###
+# General/Helper Methods
+###
+
+
+def get_fake_producer(fake_broker):
+    """
+    Purpose:
+        Get a producer on the fake broker
+    """
+
+    return kafka_producer_helpers.get_kafka_producer(
+        ["fake-broker:9092"], get_stats=False, producer_class=fake_broker.Producer
+    )
+
+
+def get_fake_consumer(fake_broker):
+    """
+    Purpose:
+        Get a consumer on the fake broker reading from the start of the topics
+    """
+
+    return kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"],
+        "benchmark",
+        offset_start="earliest",
+        get_stats=False,
+        consumer_class=fake_broker.Consumer,
+    )
+
+
+def get_loaded_fake_broker(opts):
+    """
+    Purpose:
+        Get a fake broker with enough messages in the "benchmark" topic for
+        every consume call of a benchmark
+    """
+
+    fake_broker = kafka_fake_broker.FakeKafkaBroker()
+    fake_broker.create_topic("benchmark")
+
+    payload = get_payload(opts.message_size)
+    total_messages = (
+        opts.num_messages + opts.warmup_messages + opts.allocation_messages
+        + 2 * opts.batch_size
+    )
+    for _ in range(total_messages):
+        fake_broker.append_message("benchmark", 0, None, payload)
+
+    return fake_broker
+
+
+BENCHMARK_SCHEMA = {
+    "type": "record",
+    "name": "Benchmark",
+    "fields": [
+        {"name": "id", "type": "long"},
+        {"name": "name", "type": "string"},
+        {"name": "data", "type": "string"},
+    ],
+}
+
+
+def get_schema_registry_client():
+    """
+    Purpose:
+        Get a file based schema registry in a temporary directory
+    """
+
+    return kafka_avro_helpers.FileSchemaRegistryClient(tempfile.mkdtemp())
+
+
+def get_value(message_size):
+    """
+    Purpose:
+        Get a message value that serializes to about message_size bytes of JSON
+    """
+
+    return {"id": 1, "name": "benchmark", "data": "x" * max(message_size - 40, 0)}
+
+
+def get_payload(message_size):
+    """
+    Purpose:
+        Get a JSON encoded message payload of about message_size bytes
+    """
+
+    return json.dumps(get_value(message_size)).encode("utf-8")
+
+
+def get_statistics(client_type, num_partitions):
+    """
+    Purpose:
+        Build librdkafka statistics for a client with three brokers and one
+        topic with num_partitions partitions
+    """
+
+    return {
+        "name": f"rdkafka#{client_type}-1",
+        "type": client_type,
+        "ts": 1000000,
+        "msg_cnt": 10,
+        "msg_size": 1000,
+        "replyq": 0,
+        "txmsgs": 1000,
+        "txmsg_bytes": 100000,
+        "rxmsgs": 1000,
+        "rxmsg_bytes": 100000,
+        "brokers": {
+            f"broker-{broker_id}:9092/{broker_id}": {
+                "nodeid": broker_id,
+                "outbuf_cnt": 1,
+                "waitresp_cnt": 1,
+                "rtt": {"avg": 1500, "p99": 4000},
+            }
+            for broker_id in range(1, 4)
+        },
+        "topics": {
+            "benchmark": {
+                "partitions": {
+                    str(partition_id): {
+                        "consumer_lag": 10,
+                        "msgq_cnt": 1,
+                        "xmit_msgq_cnt": 1,
+                        "fetchq_cnt": 1,
+                    }
+                    for partition_id in range(-1, num_partitions)
+                },
+            },
+        },
+    }
+
+
+def get_version():
+    """
+    Purpose:
+        Get the version of the library from the VERSION file
+    """
+
+    version_filename = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "VERSION"
+    )
+    if not os.path.exists(version_filename):
+        return None
+
+    with open(version_filename) as version_file:
+        return version_file.readline().strip()
+
+
+def print_benchmark_results(results):
+    """
+    Purpose:
+        Print a table of benchmark results
+    """
+
+    print(
+        f"Kafka Benchmarks (version={results['version']}, "
+        f"python={results['python']}, json={results['json_backend']})"
+    )
+    print(
+        f"{'benchmark':<30}{'msgs/sec':>14}{'p50 us':>10}{'p99 us':>10}"
+        f"{'alloc B/msg':>14}{'retained/msg':>14}"
+    )
+    for benchmark_name, benchmark_result in results["benchmarks"].items():
+        print(
+            f"{benchmark_name:<30}"
+            f"{benchmark_result['msgs_per_sec']:>14,.0f}"
+            f"{benchmark_result['p50_us']:>10.2f}"
+            f"{benchmark_result['p99_us']:>10.2f}"
+            f"{benchmark_result['alloc_bytes_per_msg']:>14.1f}"
+            f"{benchmark_result['retained_blocks_per_msg']:>14.3f}"
+        )
+
+
+def print_benchmark_comparison(comparison):
+    """
+    Purpose:
+        Print a table comparing benchmark results to the baseline
+    """
+
+    print("Compared to Baseline")
+    print(f"{'benchmark':<30}{'msgs/sec':>12}{'p99 us':>12}{'alloc B':>12}")
+    for benchmark_name, benchmark_comparison in comparison.items():
+        print(
+            f"{benchmark_name:<30}"
+            f"{benchmark_comparison['msgs_per_sec_change']:>+12.1%}"
+            f"{benchmark_comparison['p99_us_change']:>+12.1%}"
+            f"{benchmark_comparison['alloc_bytes_per_msg_change']:>+12.1%}"
+            f"{'  REGRESSION' if benchmark_comparison['regression'] else ''}"
+        )
+
+
+def get_options():
+    """
+    Purpose:
+        Parse CLI arguments for script
+    Args:
+        N/A
+    Return:
+        N/A
+    """
+
+    parser = ArgumentParser(description="Benchmark Kafka Producer/Consumer Hot Paths")
+    optional = parser.add_argument_group("Optional Arguments")
+
+    # Optional Arguments
+    optional.add_argument(
+        "-b", "--benchmark",
+        action="append",
+        dest="benchmarks",
+        help=f"Benchmark to run (repeatable). Default runs all: {', '.join(BENCHMARKS)}",
+        type=str,
+    )
+    optional.add_argument(
+        "-m", "--messages",
+        dest="num_messages",
+        default=100000,
+        help="Number of messages to time per benchmark",
+        type=int,
+    )
+    optional.add_argument(
+        "--warmup-messages",
+        dest="warmup_messages",
+        default=1000,
+        help="Number of messages to process before timing",
+        type=int,
+    )
+    optional.add_argument(
+        "--allocation-messages",
+        dest="allocation_messages",
+        default=1000,
+        help="Number of messages to trace allocations for",
+        type=int,
+    )
+    optional.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        default=500,
+        help="Messages per call for the bulk benchmarks",
+        type=int,
+    )
+    optional.add_argument(
+        "--message-size",
+        dest="message_size",
+        default=100,
+        help="Approximate size of each message in bytes",
+        type=int,
+    )
+    optional.add_argument(
+        "--stats-partitions",
+        dest="stats_partitions",
+        default=50,
+        help="Partitions in the statistics messages of the callback benchmarks",
+        type=int,
+    )
+    optional.add_argument(
+        "-o", "--output",
+        dest="output_filename",
+        default="kafka_benchmarks.json",
+        help="JSON file to save the results to",
+        type=str,
+    )
+    optional.add_argument(
+        "--baseline",
+        dest="baseline_filename",
+        default=None,
+        help="JSON results of a previous run to compare with",
+        type=str,
+    )
+    optional.add_argument(
+        "--threshold",
+        dest="threshold",
+        default=0.1,
+        help="Relative change in msgs/sec or p99 that counts as a regression",
+        type=float,
+    )
+    optional.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        dest="fail_on_regression",
+        help="Exit with an error if any benchmark regressed",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    # Library INFO logs (once per batch) would dominate the timings
+    log_level = logging.WARNING
+    logging.getLogger().setLevel(log_level)
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=log_level,
+        format="[run_kafka_benchmarks] %(asctime)s.%(msecs)03d %(levelname)s %(message)s",
+        datefmt="%a, %d %b %Y %H:%M:%S"
+    )
+
+    try:
+        main()
+    except Exception as err:
+        logging.exception(
+            "{0} failed due to error: {1}".format(os.path.basename(__file__), err)
+        )
+        raise err
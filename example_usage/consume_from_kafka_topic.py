@@ -9,10 +9,12 @@
         - Poll Topic
         - Parse Message
         - Print Message
+        - Commit Offsets (With the --commit-strategy)
 
     example script call:
         python3 consume_from_kafka_topic.py --topic="test-env-topic" \
-            --broker="0.0.0.0:9092" --consumer-group="test-env-consumer"
+            --broker="0.0.0.0:9092" --consumer-group="test-env-consumer" \
+            --commit-strategy="async"
 """
 
 # Python Library Imports
@@ -22,7 +24,11 @@ import sys
 from argparse import ArgumentParser
 
 # Local Library Imports
-from kafka_helpers import kafka_consumer_helpers
+from kafka_helpers import (
+    kafka_consumer_helpers,
+    kafka_offset_helpers,
+    kafka_pipeline_helpers,
+)
 
 
 def main():
@@ -34,10 +40,26 @@ def main():
 
     opts = get_options()
 
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(
+        opts.commit_strategy
+    )
     kafka_consumer = kafka_consumer_helpers.get_kafka_consumer(
-        opts.kafka_brokers, opts.consumer_group
+        opts.kafka_brokers, opts.consumer_group, offset_committer=offset_committer
+    )
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_pipeline_helpers.get_deserializer_stage(
+            value_deserializer=kafka_pipeline_helpers.int_deserializer
+        ),
+        kafka_pipeline_helpers.get_sink_stage(print_record),
     )
-    kafka_consumer_helpers.consume_topic(kafka_consumer, opts.kafka_topics)
+    kafka_pipeline_helpers.run_message_pipeline(
+        message_pipeline,
+        kafka_consumer_helpers.consume_topic(
+            kafka_consumer, opts.kafka_topics, offset_committer=offset_committer
+        ),
+    )
+
+    logging.info(f"Offset Commits: {offset_committer.get_commit_summary()}")
 
     logging.info("Kafka Topic Consuming Complete")
 
@@ -47,6 +69,19 @@ def main():
 ###
 
 
+def print_record(record):
+    """
+    Purpose:
+        Print a consumed record to stdout
+    Args:
+        record (KafkaRecord): Decoded record from the topic
+    Return:
+        N/A
+    """
+
+    print(f"Key {record.key} Returned {record.value}")
+
+
 def get_options():
     """
     Purpose:
@@ -62,7 +97,15 @@ def get_options():
     optional = parser.add_argument_group("Optional Arguments")
 
     # Optional Arguments
-    # N/A
+    optional.add_argument(
+        "--commit-strategy",
+        choices=kafka_offset_helpers.COMMIT_STRATEGIES,
+        dest="commit_strategy",
+        help="How consumed offsets are committed",
+        required=False,
+        default="auto",
+        type=str,
+    )
 
     # Required Arguments
     required.add_argument(
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """
     Purpose:
-        Create a Kafka Topic. Takes in replication and parition information
+        Create a Kafka Topic. Takes in replication and parition information,
+        or the target throughput and consumers to size the partitions for
 
     Steps:
         - Connect to Kafka
         - Create Kafka Admin Client
+        - Size Partitions (if no partition count is passed)
         - Create Topic In Kafka
 
     function call:
@@ -14,6 +16,9 @@
         python3 create_kafka_topic.py --topic-name="test-env-topic" \
             --topic-replication=3 --topic-partitions=4 \
             --broker="localhost:9092"
+        python3 create_kafka_topic.py --topic-name="test-env-topic" \
+            --target-throughput=50000 --partition-throughput=5000 \
+            --consumer-count=4 --broker="localhost:9092"
 """
 
 # Python Library Imports
@@ -23,7 +28,11 @@ import sys
 from argparse import ArgumentParser
 
 # Local Library Imports
-from kafka_helpers import kafka_admin_helpers, kafka_topic_helpers
+from kafka_helpers import (
+    kafka_admin_helpers,
+    kafka_partition_helpers,
+    kafka_topic_helpers,
+)
 
 
 def main():
@@ -36,18 +45,28 @@ def main():
     opts = get_options()
 
     kafka_admin_client = kafka_admin_helpers.get_kafka_admin_client(opts.kafka_brokers)
-    kafka_topics = kafka_topic_helpers.get_topics(kafka_admin_client)
 
-    if opts.topic_name in kafka_topics:
+    # Only fetch the metadata of the topic, not the whole cluster
+    if kafka_topic_helpers.topic_exists(kafka_admin_client, opts.topic_name):
         error_msg = f"Topic name already exists: {opts.topic_name}"
         raise Exception(error_msg)
 
-    kafka_topic_helpers.create_kafka_topic(
+    topic_partitions = opts.topic_partitions
+    if topic_partitions is None:
+        topic_partitions = kafka_partition_helpers.get_recommended_partitions(
+            target_throughput=opts.target_throughput,
+            partition_throughput=opts.partition_throughput,
+            consumer_count=opts.consumer_count,
+        )
+        logging.info(f"Sized Topic {opts.topic_name} to {topic_partitions} Partitions")
+
+    topic_futures = kafka_topic_helpers.create_kafka_topic(
         kafka_admin_client,
         opts.topic_name,
         topic_replication=opts.topic_replication,
-        topic_partitions=opts.topic_partitions
+        topic_partitions=topic_partitions
     )
+    topic_futures[opts.topic_name].result()
 
     logging.info("Kafka Topic Creation Complete")
 
@@ -113,9 +132,36 @@ def get_options():
     optional.add_argument(
         "-P", "--partitions", "--topic-partitions",
         dest="topic_partitions",
-        help="Number of partitions of the topic to create",
+        help=(
+            "Number of partitions of the topic to create. Default sizes the "
+            "topic for the target throughput and consumer count (1 without them)"
+        ),
         required=False,
-        default=1,
+        default=None,
+        type=int,
+    )
+    optional.add_argument(
+        "--target-throughput",
+        dest="target_throughput",
+        help="Throughput the topic must handle (e.g. messages per second)",
+        required=False,
+        default=None,
+        type=float,
+    )
+    optional.add_argument(
+        "--partition-throughput",
+        dest="partition_throughput",
+        help="Throughput one partition sustains (same unit as --target-throughput)",
+        required=False,
+        default=None,
+        type=float,
+    )
+    optional.add_argument(
+        "--consumer-count",
+        dest="consumer_count",
+        help="Consumers that will consume the topic in parallel",
+        required=False,
+        default=None,
         type=int,
     )
 
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Reconcile Kafka Topics With a Spec File (JSON or YAML). Missing topics
+        are created, partitions added and differing configs set; topics that
+        already match are skipped
+
+    Steps:
+        - Connect to Kafka
+        - Create Kafka Admin Client
+        - Load the Topic Spec
+        - Diff the Spec Against the Cluster
+        - Apply (or Validate With --dry-run) the Changes
+
+    function call:
+        ---
+    example script call:
+        python3 reconcile_kafka_topics.py --spec="topics.yaml" \
+            --broker="localhost:9092" --dry-run
+"""
+
+# Python Library Imports
+import logging
+import os
+import sys
+from argparse import ArgumentParser
+
+# Local Library Imports
+from kafka_helpers import kafka_admin_helpers, kafka_topic_helpers
+
+
+def main():
+    """
+    Purpose:
+        Reconcile Kafka Topics With a Spec File
+    """
+    logging.info("Starting Kafka Topic Reconciliation")
+
+    opts = get_options()
+
+    kafka_admin_client = kafka_admin_helpers.get_kafka_admin_client(opts.kafka_brokers)
+    topic_outcomes = kafka_topic_helpers.reconcile_topics(
+        kafka_admin_client,
+        opts.spec_filename,
+        dry_run=opts.dry_run,
+        timeout=opts.timeout,
+    )
+
+    for topic_name, topic_outcome in sorted(topic_outcomes.items()):
+        if topic_outcome["status"] == "unchanged":
+            continue
+        logging.info(
+            f"{topic_name}: {topic_outcome['status']} "
+            f"({', '.join(topic_outcome['actions']) or 'no actions'})"
+            + (f" {'; '.join(topic_outcome['errors'])}" if topic_outcome["errors"] else "")
+        )
+
+    failed_topics = [
+        topic_name
+        for topic_name, topic_outcome in topic_outcomes.items()
+        if topic_outcome["status"] == "failed"
+    ]
+    if failed_topics:
+        error_msg = f"Failed to reconcile topics: {', '.join(sorted(failed_topics))}"
+        raise Exception(error_msg)
+
+    logging.info("Kafka Topic Reconciliation Complete")
+
+
+###
+# General/Helper Methods
+###
+
+
+def get_options():
+    """
+    Purpose:
+        Parse CLI arguments for script
+    Args:
+        N/A
+    Return:
+        N/A
+    """
+
+    parser = ArgumentParser(description="Reconcile Kafka Topics With a Spec")
+    required = parser.add_argument_group("Required Arguments")
+    optional = parser.add_argument_group("Optional Arguments")
+
+    # Optional Arguments
+    optional.add_argument(
+        "--dry-run",
+        action="store_true",
+        dest="dry_run",
+        help="Only validate the changes with the brokers",
+        required=False,
+        default=False,
+    )
+    optional.add_argument(
+        "--timeout",
+        dest="timeout",
+        help="Max seconds to wait for the changes",
+        required=False,
+        default=60,
+        type=float,
+    )
+
+    # Required Arguments
+    required.add_argument(
+        "-B", "--broker", "--brokers", "--kafka-broker", "--kafka-brokers",
+        action="append",
+        dest="kafka_brokers",
+        help="Kafka Brokers",
+        required=True,
+        type=str,
+    )
+    required.add_argument(
+        "-S", "--spec", "--spec-filename",
+        dest="spec_filename",
+        help="JSON or YAML file with the desired topics",
+        required=True,
+        type=str,
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    log_level = logging.INFO
+    logging.getLogger().setLevel(log_level)
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=log_level,
+        format="[reconcile_kafka_topics] %(asctime)s.%(msecs)03d %(levelname)s %(message)s",
+        datefmt="%a, %d %b %Y %H:%M:%S"
+    )
+
+    try:
+        main()
+    except Exception as err:
+        logging.exception(
+            "{0} failed due to error: {1}".format(os.path.basename(__file__), err)
+        )
+        raise err
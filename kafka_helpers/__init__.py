@@ -4,8 +4,27 @@
 """
 
 from .kafka_admin_helpers import *
+from .kafka_async_helpers import *
+from .kafka_avro_helpers import *
+from .kafka_benchmark_helpers import *
+from .kafka_client_pool_helpers import *
+from .kafka_columnar_helpers import *
+from .kafka_compression_helpers import *
+from .kafka_concurrent_helpers import *
 from .kafka_consumer_helpers import *
 from .kafka_exceptions import *
+from .kafka_fake_broker import *
 from .kafka_general_helpers import *
+from .kafka_lag_helpers import *
+from .kafka_message_helpers import *
+from .kafka_multiprocess_helpers import *
+from .kafka_offset_helpers import *
+from .kafka_partition_helpers import *
+from .kafka_partitioner_helpers import *
+from .kafka_pipeline_helpers import *
 from .kafka_producer_helpers import *
+from .kafka_serde_helpers import *
+from .kafka_sink_helpers import *
+from .kafka_statistics_helpers import *
 from .kafka_topic_helpers import *
+from .kafka_transaction_helpers import *
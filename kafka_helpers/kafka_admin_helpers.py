@@ -11,13 +11,18 @@
 import logging
 from confluent_kafka.admin import AdminClient
 
+# Local Library Imports
+from kafka_helpers.kafka_client_pool_helpers import CLIENT_POOL
+
 
 ###
 # Admin Helpers
 ###
 
 
-def get_kafka_admin_client(kafka_brokers):
+def get_kafka_admin_client(
+    kafka_brokers, admin_client_class=None, pooled=False, config_overrides=None
+):
     """
     Purpose:
         Get a Kafka Admin Client Object. Allows for polling information about Kafka
@@ -25,6 +30,15 @@ def get_kafka_admin_client(kafka_brokers):
     Args:
         kafka_brokers (List of Strings): List of host:port combinations for kakfa
             brokers
+        admin_client_class (Class): Admin Client class to create. Default is the
+            confluent_kafka AdminClient (pass FakeKafkaBroker.AdminClient to
+            administer the in-memory fake broker)
+        pooled (Bool): Whether to reuse the admin client of an earlier call
+            for the same brokers from the process-wide
+            kafka_client_pool_helpers.CLIENT_POOL. Default is False (a new
+            admin client per call)
+        config_overrides (Dict): librdkafka configuration applied on top of the
+            admin configuration (e.g. security settings). Default is None
     Return:
         kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
             brokers
@@ -35,4 +49,14 @@ def get_kafka_admin_client(kafka_brokers):
         "bootstrap.servers": ",".join(kafka_brokers),
     }
 
-    return AdminClient(kafka_configuration)
+    if config_overrides:
+        kafka_configuration.update(config_overrides)
+
+    admin_client_class = admin_client_class or AdminClient
+
+    if pooled:
+        return CLIENT_POOL.get_client(
+            "admin", kafka_configuration, admin_client_class
+        )
+
+    return admin_client_class(kafka_configuration)
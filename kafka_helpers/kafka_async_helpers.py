@@ -0,0 +1,453 @@
+"""
+    Purpose:
+        Kafka Async Helpers.
+
+        This library is used to produce and consume from asyncio applications.
+        librdkafka polling runs on a background thread so the event loop is
+        never blocked; delivery reports resolve asyncio futures and consumed
+        messages are handed to the loop through a bounded queue.
+"""
+
+# Python Library Imports
+import asyncio
+import logging
+import threading
+from confluent_kafka import KafkaException
+
+# Local Library Imports
+from kafka_helpers.kafka_consumer_helpers import (
+    consumer_assignment_callback,
+    has_manual_offset_store,
+    split_message_batch,
+    store_next_offsets,
+)
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy
+from kafka_helpers.kafka_producer_helpers import produce_results_callback
+
+
+###
+# Async Producer
+###
+
+
+class AsyncProducer(object):
+    """
+    Purpose:
+        asyncio wrapper around a Kafka Producer (see get_kafka_producer). A
+        background thread polls the producer for delivery reports, which
+        resolve the futures returned by produce()
+    """
+
+    def __init__(self, kafka_producer, poll_timeout=0.1, buffer_full_timeout=0.01):
+        """
+        Purpose:
+            Initialize the AsyncProducer and start the polling thread
+        Args:
+            kafka_producer (Kafka Producer Obj): Kafka Producer Object
+            poll_timeout (Float): Seconds each background poll() waits for
+                delivery reports. Default is 0.1
+            buffer_full_timeout (Float): Seconds to yield to the event loop
+                before retrying when the local producer queue is full. Default
+                is 0.01
+        Return:
+            N/A
+        """
+
+        self.kafka_producer = kafka_producer
+        self.poll_timeout = poll_timeout
+        self.buffer_full_timeout = buffer_full_timeout
+        self.stop_event = threading.Event()
+        self.poll_thread = threading.Thread(
+            target=self.poll_producer, name="kafka-async-producer", daemon=True
+        )
+        self.poll_thread.start()
+
+    def poll_producer(self):
+        """
+        Purpose:
+            Serve delivery reports until the producer is closed. Runs on the
+            background thread
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        while not self.stop_event.is_set():
+            self.kafka_producer.poll(self.poll_timeout)
+
+    async def produce(self, kafka_topic, value, key=None):
+        """
+        Purpose:
+            Produce a message. Waits (without blocking the event loop) while the
+            local producer queue is full, then returns a future for the delivery
+        Args:
+            kafka_topic (String): Kafka Topic to Produce message to.
+            value (String/Bytes): Message value to produce to Kafka
+            key (String/Bytes): Message key. Default is None
+        Return:
+            delivery_future (asyncio Future): Resolves to the delivered message
+                or raises KafkaException if delivery failed
+        """
+
+        loop = asyncio.get_running_loop()
+        delivery_future = loop.create_future()
+
+        def set_delivery_result(err, msg):
+            if delivery_future.cancelled():
+                return
+            if err:
+                delivery_future.set_exception(KafkaException(err))
+            else:
+                delivery_future.set_result(msg)
+
+        def delivery_callback(err, msg):
+            produce_results_callback(err, msg)
+            loop.call_soon_threadsafe(set_delivery_result, err, msg)
+
+        while True:
+            try:
+                self.kafka_producer.produce(
+                    kafka_topic, value, key=key, callback=delivery_callback
+                )
+                return delivery_future
+            except BufferError:
+                await asyncio.sleep(self.buffer_full_timeout)
+
+    async def send(self, kafka_topic, value, key=None):
+        """
+        Purpose:
+            Produce a message and wait for it to be delivered
+        Args:
+            kafka_topic (String): Kafka Topic to Produce message to.
+            value (String/Bytes): Message value to produce to Kafka
+            key (String/Bytes): Message key. Default is None
+        Return:
+            msg (Kafka Message Obj): The delivered message
+        """
+
+        return await (await self.produce(kafka_topic, value, key=key))
+
+    async def flush(self, timeout=None):
+        """
+        Purpose:
+            Wait for all queued messages to be delivered, in an executor so the
+            event loop is not blocked
+        Args:
+            timeout (Float): Max seconds to wait. Default waits for every message
+        Return:
+            pending (Int): Number of messages still in the queue
+        """
+
+        loop = asyncio.get_running_loop()
+        if timeout is None:
+            return await loop.run_in_executor(None, self.kafka_producer.flush)
+        return await loop.run_in_executor(None, self.kafka_producer.flush, timeout)
+
+    async def close(self, timeout=None):
+        """
+        Purpose:
+            Flush the producer and stop the polling thread
+        Args:
+            timeout (Float): Max seconds to wait for the flush. Default waits for
+                every message
+        Return:
+            N/A
+        """
+
+        await self.flush(timeout)
+        self.stop_event.set()
+        await asyncio.get_running_loop().run_in_executor(None, self.poll_thread.join)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+###
+# Async Consumer
+###
+
+
+class AsyncConsumer(object):
+    """
+    Purpose:
+        asyncio wrapper around a Kafka Consumer (see get_kafka_consumer).
+        Iterate with "async for msg in async_consumer". A background thread
+        consumes batches and hands them to the event loop through a bounded
+        queue. While the queue is full the assigned partitions are paused and
+        the thread keeps polling, so the consumer stays in its group. The
+        consumer must be created with {"enable.auto.offset.store": False}:
+        offsets are only stored for messages handed to the caller, so batches
+        still queued when the consumer is closed are not committed. An error
+        of the background thread is raised by the iteration after the batches
+        queued before it
+    """
+
+    def __init__(
+        self,
+        kafka_consumer,
+        kafka_topics,
+        batch_size=500,
+        batch_timeout=1000,
+        max_queued_batches=10,
+    ):
+        """
+        Purpose:
+            Initialize the AsyncConsumer. Consuming starts on first iteration
+        Args:
+            kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object created
+                with {"enable.auto.offset.store": False}
+            kafka_topics (List of Strings): List of Kafka Topics to Consume.
+            batch_size (Int): Max number of messages per batch. Default is 500
+            batch_timeout (Int): Max time in ms to wait for a full batch.
+                Default is 1000
+            max_queued_batches (Int): Max number of batches waiting for the
+                event loop. Default is 10
+        Return:
+            N/A
+        Raises:
+            InvalidCommitStrategy: If the consumer stores offsets
+                automatically, which commits queued batches
+        """
+
+        if not has_manual_offset_store(kafka_consumer):
+            raise InvalidCommitStrategy(
+                "AsyncConsumer needs a consumer created with "
+                "enable.auto.offset.store set to False"
+            )
+
+        self.kafka_consumer = kafka_consumer
+        self.kafka_topics = kafka_topics
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.max_queued_batches = max_queued_batches
+        self.stop_event = threading.Event()
+        self.queue_slots = threading.Semaphore(max_queued_batches)
+        self.consume_thread = None
+        self.loop = None
+        self.batch_queue = None
+        self.paused = False
+        self.current_batch = []
+        self.current_index = 0
+
+    def start(self):
+        """
+        Purpose:
+            Start the background consume thread on the running event loop
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        if self.consume_thread is not None:
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.batch_queue = asyncio.Queue()
+        self.consume_thread = threading.Thread(
+            target=self.consume_batches, name="kafka-async-consumer", daemon=True
+        )
+        self.consume_thread.start()
+
+    def consume_batches(self):
+        """
+        Purpose:
+            Consume batches and put them on the event loop queue until stopped.
+            Runs on the background thread. When consuming ends the exception
+            that ended it is queued, or None if it was stopped
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        logging.info(f"Consuming Topics {', '.join(self.kafka_topics)} Async")
+        self.kafka_consumer.subscribe(
+            self.kafka_topics, on_assign=consumer_assignment_callback
+        )
+
+        pending_batch = []
+        pending_error = None
+        consume_error = None
+        try:
+            while not self.stop_event.is_set():
+                if not pending_batch:
+                    if pending_error is not None:
+                        raise KafkaException(pending_error)
+                    pending_batch, pending_error = self.consume_batch()
+                    continue
+
+                if self.queue_slots.acquire(blocking=False):
+                    self.set_paused(False)
+                    self.loop.call_soon_threadsafe(
+                        self.batch_queue.put_nowait, pending_batch
+                    )
+                    pending_batch = []
+                    continue
+
+                # Queue is full: keep polling with the partitions paused, adding
+                # messages fetched before the pause or from new assignments
+                self.set_paused(True)
+                msg_batch, msg_error = self.consume_batch()
+                pending_batch.extend(msg_batch)
+                pending_error = pending_error or msg_error
+                if msg_batch:
+                    self.set_paused(True, force=True)
+        except Exception as err:
+            logging.exception(f"Async Consumer Failed: {err}")
+            consume_error = err
+        finally:
+            self.kafka_consumer.close()
+            if not self.loop.is_closed():
+                self.loop.call_soon_threadsafe(
+                    self.batch_queue.put_nowait, consume_error
+                )
+
+    def consume_batch(self):
+        """
+        Purpose:
+            Consume a batch of messages. Runs on the background thread
+        Args:
+            N/A
+        Return:
+            msg_batch (List of Kafka Message Objs): Valid messages
+            msg_error (KafkaError): First non-EOF error of the batch, or None
+        """
+
+        return split_message_batch(
+            self.kafka_consumer.consume(
+                num_messages=self.batch_size, timeout=self.batch_timeout / 1000.0
+            )
+        )
+
+    def set_paused(self, paused, force=False):
+        """
+        Purpose:
+            Pause or resume the assigned partitions. Runs on the background
+            thread
+        Args:
+            paused (Bool): Whether the partitions should be paused
+            force (Bool): Pause the assignment again even if already paused
+                (e.g. after a rebalance). Default is False
+        Return:
+            N/A
+        """
+
+        if paused == self.paused and not force:
+            return
+
+        assignment = self.kafka_consumer.assignment()
+        if paused:
+            self.kafka_consumer.pause(assignment)
+        else:
+            self.kafka_consumer.resume(assignment)
+        self.paused = paused
+
+    def store_handed_offsets(self):
+        """
+        Purpose:
+            Store the offsets of the messages of the current batch that were
+            handed to the caller, so the consumer commits them. Offsets of
+            partitions revoked since the batch was consumed are dropped
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        handed_msgs = self.current_batch[:self.current_index]
+        self.current_batch = []
+        self.current_index = 0
+        if not handed_msgs:
+            return
+
+        next_offsets = {}
+        for msg in handed_msgs:
+            next_offsets[(msg.topic(), msg.partition())] = msg.offset() + 1
+
+        try:
+            store_next_offsets(self.kafka_consumer, next_offsets)
+        except RuntimeError as err:
+            # The consume thread already closed the consumer
+            logging.warning(f"Failed to Store Offsets: {err}")
+
+    async def get_batch(self):
+        """
+        Purpose:
+            Get the next batch of messages. The offsets of the previous batch
+            are stored, as it has been handed out
+        Args:
+            N/A
+        Return:
+            msg_batch (List of Kafka Message Objs): Next batch, or None once
+                consuming has ended
+        Raises:
+            Exception: The exception that ended consuming on the background
+                thread (e.g. a KafkaException)
+        """
+
+        self.start()
+        self.store_handed_offsets()
+        if self.stop_event.is_set() and self.batch_queue.empty():
+            return None
+
+        msg_batch = await self.batch_queue.get()
+        if msg_batch is None or isinstance(msg_batch, Exception):
+            self.stop_event.set()
+            if msg_batch is not None:
+                raise msg_batch
+            return None
+
+        self.queue_slots.release()
+        self.current_batch = msg_batch
+        self.current_index = len(msg_batch)
+
+        return msg_batch
+
+    async def close(self):
+        """
+        Purpose:
+            Store the offsets of the messages handed out, stop consuming and
+            wait for the consumer to be closed. Queued batches are dropped
+            without their offsets being stored
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        if self.consume_thread is None:
+            self.stop_event.set()
+            self.kafka_consumer.close()
+            return
+
+        self.store_handed_offsets()
+        self.stop_event.set()
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.consume_thread.join
+        )
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.current_index >= len(self.current_batch):
+            msg_batch = await self.get_batch()
+            if msg_batch is None:
+                raise StopAsyncIteration
+            self.current_index = 0
+
+        msg = self.current_batch[self.current_index]
+        self.current_index += 1
+
+        return msg
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
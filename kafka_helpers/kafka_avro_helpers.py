@@ -0,0 +1,648 @@
+"""
+    Purpose:
+        Kafka Avro Helpers.
+
+        This library is used to serialize and deserialize Avro records in the
+        Confluent wire format (a zero magic byte, the 4 byte big-endian schema
+        ID, then the Avro binary encoding). Schemas are fetched from a schema
+        registry through a bounded LRU cache and compiled once per schema ID,
+        so no registry request or schema parsing happens per message.
+
+        Avro encoding requires the optional fastavro package.
+"""
+
+# Python Library Imports
+import io
+import logging
+import os
+import struct
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import simplejson as json
+from collections import OrderedDict
+
+# Local Library Imports
+from kafka_helpers.kafka_exceptions import (
+    SchemaNotFound,
+    SchemaRegistryError,
+    SerializationError,
+)
+
+
+# Confluent wire format header: magic byte and schema ID
+MAGIC_BYTE = 0
+WIRE_FORMAT_HEADER = struct.Struct(">bI")
+
+
+###
+# Caching
+###
+
+
+class LRUCache(object):
+    """
+    Purpose:
+        Thread-safe bounded cache that evicts the least recently used entry
+        when full
+    """
+
+    def __init__(self, max_size=1000):
+        """
+        Purpose:
+            Initialize the LRUCache
+        Args:
+            max_size (Int): Max number of entries. Default is 1000
+        Return:
+            N/A
+        """
+
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Purpose:
+            Get an entry and mark it as recently used
+        Args:
+            key (Hashable): Key of the entry
+            default (Any): Value returned if the key is not cached. Default is
+                None
+        Return:
+            value (Any): Cached value, or default
+        """
+
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self.entries[key]
+
+    def put(self, key, value):
+        """
+        Purpose:
+            Add or replace an entry, evicting the least recently used entry if
+            the cache is full
+        Args:
+            key (Hashable): Key of the entry
+            value (Any): Value to cache
+        Return:
+            N/A
+        """
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+###
+# Schema Registry Clients
+###
+
+
+class SchemaRegistryClient(object):
+    """
+    Purpose:
+        Confluent Schema Registry client. Schema lookups by ID and schema
+        registrations are cached in bounded LRU caches, so each schema is only
+        requested once while it stays in use
+    """
+
+    def __init__(self, url, cache_size=1000, timeout=10):
+        """
+        Purpose:
+            Initialize the SchemaRegistryClient
+        Args:
+            url (String): Base URL of the schema registry
+            cache_size (Int): Max number of schemas and registrations to cache.
+                Default is 1000
+            timeout (Float): Timeout in seconds for registry requests. Default
+                is 10
+        Return:
+            N/A
+        """
+
+        self.url = url.rstrip("/") if url else url
+        self.timeout = timeout
+        self.schema_cache = LRUCache(cache_size)
+        self.schema_id_cache = LRUCache(cache_size)
+
+    def get_schema(self, schema_id):
+        """
+        Purpose:
+            Get a schema by ID
+        Args:
+            schema_id (Int): ID of the schema
+        Return:
+            schema_str (String): Schema JSON
+        Raises:
+            SchemaNotFound: If the schema does not exist
+        """
+
+        schema_str = self.schema_cache.get(schema_id)
+        if schema_str is None:
+            schema_str = self.fetch_schema(schema_id)
+            self.schema_cache.put(schema_id, schema_str)
+
+        return schema_str
+
+    def register_schema(self, subject, schema):
+        """
+        Purpose:
+            Register a schema under a subject (registering an existing schema
+            returns its ID)
+        Args:
+            subject (String): Subject to register the schema under (see
+                get_subject_name)
+            schema (String/Dict): Schema JSON or parsed schema
+        Return:
+            schema_id (Int): ID of the schema
+        """
+
+        schema_str = get_schema_str(schema)
+        schema_id = self.schema_id_cache.get((subject, schema_str))
+        if schema_id is None:
+            schema_id = self.fetch_register_schema(subject, schema_str)
+            self.schema_id_cache.put((subject, schema_str), schema_id)
+            self.schema_cache.put(schema_id, schema_str)
+
+        return schema_id
+
+    def lookup_schema(self, subject, schema):
+        """
+        Purpose:
+            Get the ID of a schema already registered under a subject, in any
+            version, without registering it
+        Args:
+            subject (String): Subject the schema is registered under (see
+                get_subject_name)
+            schema (String/Dict): Schema JSON or parsed schema
+        Return:
+            schema_id (Int): ID of the schema
+        Raises:
+            SchemaNotFound: If the subject does not exist or the schema is not
+                registered under it
+        """
+
+        schema_str = get_schema_str(schema)
+        schema_id = self.schema_id_cache.get((subject, schema_str))
+        if schema_id is None:
+            schema_id = self.fetch_lookup_schema(subject, schema_str)
+            self.schema_id_cache.put((subject, schema_str), schema_id)
+            self.schema_cache.put(schema_id, schema_str)
+
+        return schema_id
+
+    def get_latest_schema(self, subject):
+        """
+        Purpose:
+            Get the latest schema registered under a subject
+        Args:
+            subject (String): Subject of the schema
+        Return:
+            latest_schema (Tuple): (schema_id, schema_str)
+        Raises:
+            SchemaNotFound: If the subject does not exist
+        """
+
+        schema_id, schema_str = self.fetch_latest_schema(subject)
+        self.schema_cache.put(schema_id, schema_str)
+
+        return schema_id, schema_str
+
+    def fetch_schema(self, schema_id):
+        """
+        Purpose:
+            Request a schema by ID from the registry
+        """
+
+        return self.request("GET", f"/schemas/ids/{schema_id}")["schema"]
+
+    def fetch_register_schema(self, subject, schema_str):
+        """
+        Purpose:
+            Request the registration of a schema under a subject
+        """
+        logging.info(f"Registering Schema for Subject {subject}")
+
+        return self.request(
+            "POST",
+            f"/subjects/{urllib.parse.quote(subject, safe='')}/versions",
+            {"schema": schema_str},
+        )["id"]
+
+    def fetch_lookup_schema(self, subject, schema_str):
+        """
+        Purpose:
+            Request the ID of a schema registered under a subject. The registry
+            normalizes the schema and matches it against every version
+        """
+
+        return self.request(
+            "POST",
+            f"/subjects/{urllib.parse.quote(subject, safe='')}",
+            {"schema": schema_str},
+        )["id"]
+
+    def fetch_latest_schema(self, subject):
+        """
+        Purpose:
+            Request the latest schema of a subject from the registry
+        """
+
+        response = self.request(
+            "GET", f"/subjects/{urllib.parse.quote(subject, safe='')}/versions/latest"
+        )
+
+        return response["id"], response["schema"]
+
+    def request(self, method, path, body=None):
+        """
+        Purpose:
+            Make a request to the schema registry
+        Args:
+            method (String): HTTP method
+            path (String): Path of the endpoint
+            body (Dict): JSON body of the request. Default is None
+        Return:
+            response (Dict): JSON response
+        Raises:
+            SchemaNotFound: If the registry responds with 404
+            SchemaRegistryError: If the request fails for any other reason
+        """
+
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=json.dumps(body).encode("utf-8") if body is not None else None,
+            headers={
+                "Accept": "application/vnd.schemaregistry.v1+json",
+                "Content-Type": "application/vnd.schemaregistry.v1+json",
+            },
+            method=method,
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as err:
+            if err.code == 404:
+                raise SchemaNotFound(f"Schema Registry {method} {path} Not Found")
+            raise SchemaRegistryError(
+                f"Schema Registry {method} {path} Failed: {err.code} {err.reason}"
+            )
+        except urllib.error.URLError as err:
+            raise SchemaRegistryError(
+                f"Schema Registry {method} {path} Failed: {err.reason}"
+            )
+
+
+class FileSchemaRegistryClient(SchemaRegistryClient):
+    """
+    Purpose:
+        Local stand-in for the schema registry, for development and tests.
+        Schemas are stored as <schema_id>.avsc files in a directory and the
+        schema IDs registered under each subject in subjects.json
+    """
+
+    def __init__(self, schema_directory, cache_size=1000):
+        """
+        Purpose:
+            Initialize the FileSchemaRegistryClient
+        Args:
+            schema_directory (String): Directory holding the schemas. Created if
+                it does not exist
+            cache_size (Int): Max number of schemas and registrations to cache.
+                Default is 1000
+        Return:
+            N/A
+        """
+
+        super().__init__(None, cache_size=cache_size)
+        self.schema_directory = schema_directory
+        self.subjects_filename = os.path.join(schema_directory, "subjects.json")
+        self.lock = threading.Lock()
+        os.makedirs(schema_directory, exist_ok=True)
+
+    def fetch_schema(self, schema_id):
+        """
+        Purpose:
+            Read a schema file by ID
+        """
+
+        schema_filename = os.path.join(self.schema_directory, f"{schema_id}.avsc")
+        try:
+            with open(schema_filename) as schema_file:
+                return get_schema_str(schema_file.read())
+        except FileNotFoundError:
+            raise SchemaNotFound(f"Schema {schema_id} Not Found")
+
+    def fetch_register_schema(self, subject, schema_str):
+        """
+        Purpose:
+            Register a schema under a subject, writing a new schema file if the
+            schema has not been registered under any subject
+        """
+
+        with self.lock:
+            schema_ids = self.get_schema_ids()
+            for schema_id in schema_ids:
+                if self.fetch_schema(schema_id) == schema_str:
+                    break
+            else:
+                schema_id = max(schema_ids, default=0) + 1
+                schema_filename = os.path.join(
+                    self.schema_directory, f"{schema_id}.avsc"
+                )
+                with open(schema_filename, "w") as schema_file:
+                    schema_file.write(schema_str)
+
+            subjects = self.get_subjects()
+            subject_schema_ids = subjects.setdefault(subject, [])
+            if schema_id not in subject_schema_ids:
+                subject_schema_ids.append(schema_id)
+                with open(self.subjects_filename, "w") as subjects_file:
+                    json.dump(subjects, subjects_file, indent=2, sort_keys=True)
+
+        return schema_id
+
+    def fetch_lookup_schema(self, subject, schema_str):
+        """
+        Purpose:
+            Find the ID of a schema among the schemas registered under a subject
+        """
+
+        for schema_id in self.get_subjects().get(subject, []):
+            if self.fetch_schema(schema_id) == schema_str:
+                return schema_id
+
+        raise SchemaNotFound(f"Schema Not Registered for Subject {subject}")
+
+    def fetch_latest_schema(self, subject):
+        """
+        Purpose:
+            Get the last schema registered under a subject
+        """
+
+        subject_schema_ids = self.get_subjects().get(subject)
+        if not subject_schema_ids:
+            raise SchemaNotFound(f"Subject {subject} Not Found")
+
+        return subject_schema_ids[-1], self.fetch_schema(subject_schema_ids[-1])
+
+    def get_schema_ids(self):
+        """
+        Purpose:
+            Get the IDs of the schema files in the directory
+        """
+
+        return [
+            int(filename[:-len(".avsc")])
+            for filename in os.listdir(self.schema_directory)
+            if filename.endswith(".avsc") and filename[:-len(".avsc")].isdigit()
+        ]
+
+    def get_subjects(self):
+        """
+        Purpose:
+            Read the schema IDs registered under each subject
+        """
+
+        if not os.path.exists(self.subjects_filename):
+            return {}
+
+        with open(self.subjects_filename) as subjects_file:
+            return json.load(subjects_file)
+
+
+###
+# Serializers
+###
+
+
+class AvroSerializer(object):
+    """
+    Purpose:
+        Serialize records to Avro in the Confluent wire format. The schema is
+        registered (or looked up) and compiled once, when the serializer is
+        created. Instances are callables, so they can be used wherever the
+        helpers take a serializer
+    """
+
+    def __init__(
+        self, schema_registry_client, subject, schema=None, auto_register=True
+    ):
+        """
+        Purpose:
+            Initialize the AvroSerializer
+        Args:
+            schema_registry_client (SchemaRegistryClient Obj): Registry client
+            subject (String): Subject of the schema (see get_subject_name)
+            schema (String/Dict): Schema to serialize with. Default is None
+                (use the latest schema of the subject)
+            auto_register (Bool): Whether to register the schema under the
+                subject. When False, the schema must already be registered
+                under the subject (in any version). Default is True
+        Return:
+            N/A
+        """
+        fastavro = import_fastavro()
+
+        if schema is None:
+            self.schema_id, schema_str = schema_registry_client.get_latest_schema(
+                subject
+            )
+        elif auto_register:
+            schema_str = get_schema_str(schema)
+            self.schema_id = schema_registry_client.register_schema(
+                subject, schema_str
+            )
+        else:
+            schema_str = get_schema_str(schema)
+            self.schema_id = schema_registry_client.lookup_schema(
+                subject, schema_str
+            )
+
+        self.parsed_schema = fastavro.parse_schema(json.loads(schema_str))
+        self.header = WIRE_FORMAT_HEADER.pack(MAGIC_BYTE, self.schema_id)
+        self.schemaless_writer = fastavro.schemaless_writer
+
+    def __call__(self, record):
+        """
+        Purpose:
+            Serialize a record
+        Args:
+            record (Dict): Record matching the schema
+        Return:
+            data (Bytes): Wire format encoded record
+        """
+
+        buffer = io.BytesIO()
+        buffer.write(self.header)
+        self.schemaless_writer(buffer, self.parsed_schema, record)
+
+        return buffer.getvalue()
+
+
+class AvroDeserializer(object):
+    """
+    Purpose:
+        Deserialize Avro records in the Confluent wire format. Writer schemas
+        are fetched from the registry and compiled once per schema ID. Instances
+        are callables, so they can be used as pipeline deserializers (see
+        kafka_pipeline_helpers.get_deserializer_stage)
+    """
+
+    def __init__(self, schema_registry_client, reader_schema=None, cache_size=1000):
+        """
+        Purpose:
+            Initialize the AvroDeserializer
+        Args:
+            schema_registry_client (SchemaRegistryClient Obj): Registry client
+            reader_schema (String/Dict): Schema to resolve records to. Default
+                is None (records are read with the schema they were written with)
+            cache_size (Int): Max number of compiled writer schemas to cache.
+                Default is 1000
+        Return:
+            N/A
+        """
+        fastavro = import_fastavro()
+
+        self.schema_registry_client = schema_registry_client
+        self.parsed_schemas = LRUCache(cache_size)
+        self.parse_schema = fastavro.parse_schema
+        self.schemaless_reader = fastavro.schemaless_reader
+        self.reader_schema = None
+        if reader_schema is not None:
+            self.reader_schema = self.parse_schema(
+                json.loads(get_schema_str(reader_schema))
+            )
+
+    def get_parsed_schema(self, schema_id):
+        """
+        Purpose:
+            Get the compiled writer schema for a schema ID
+        Args:
+            schema_id (Int): ID of the schema
+        Return:
+            parsed_schema (Dict): fastavro parsed schema
+        """
+
+        parsed_schema = self.parsed_schemas.get(schema_id)
+        if parsed_schema is None:
+            parsed_schema = self.parse_schema(
+                json.loads(self.schema_registry_client.get_schema(schema_id))
+            )
+            self.parsed_schemas.put(schema_id, parsed_schema)
+
+        return parsed_schema
+
+    def __call__(self, data):
+        """
+        Purpose:
+            Deserialize a record
+        Args:
+            data (Bytes): Wire format encoded record
+        Return:
+            record (Dict): Decoded record
+        Raises:
+            SerializationError: If the data is not in the wire format
+        """
+
+        schema_id = get_schema_id(data)
+        buffer = io.BytesIO(data)
+        buffer.seek(WIRE_FORMAT_HEADER.size)
+
+        if self.reader_schema is None:
+            return self.schemaless_reader(buffer, self.get_parsed_schema(schema_id))
+        return self.schemaless_reader(
+            buffer, self.get_parsed_schema(schema_id), self.reader_schema
+        )
+
+
+###
+# Helpers
+###
+
+
+def get_subject_name(kafka_topic, is_key=False):
+    """
+    Purpose:
+        Get the subject of a topic's key or value schema (the registry's
+        default topic name strategy)
+    Args:
+        kafka_topic (String): Kafka Topic
+        is_key (Bool): Whether the subject is for the message key. Default is
+            False
+    Return:
+        subject (String): "<topic>-key" or "<topic>-value"
+    """
+
+    return f"{kafka_topic}-{'key' if is_key else 'value'}"
+
+
+def get_schema_id(data):
+    """
+    Purpose:
+        Get the schema ID from the header of a wire format message
+    Args:
+        data (Bytes): Wire format encoded record
+    Return:
+        schema_id (Int): ID of the schema the record was written with
+    Raises:
+        SerializationError: If the data is not in the wire format
+    """
+
+    if data is None or len(data) < WIRE_FORMAT_HEADER.size:
+        raise SerializationError("Message Too Short for the Wire Format Header")
+
+    magic_byte, schema_id = WIRE_FORMAT_HEADER.unpack_from(data)
+    if magic_byte != MAGIC_BYTE:
+        raise SerializationError(f"Unknown Magic Byte {magic_byte}")
+
+    return schema_id
+
+
+def get_schema_str(schema):
+    """
+    Purpose:
+        Get the normalized JSON of a schema, so equal schemas compare equal
+        regardless of formatting
+    Args:
+        schema (String/Dict): Schema JSON or parsed schema
+    Return:
+        schema_str (String): Compact schema JSON
+    """
+
+    if isinstance(schema, str):
+        schema = json.loads(schema)
+
+    return json.dumps(schema, separators=(",", ":"))
+
+
+def import_fastavro():
+    """
+    Purpose:
+        Import the optional fastavro package
+    Args:
+        N/A
+    Return:
+        fastavro (Module): fastavro
+    Raises:
+        ImportError: If fastavro is not installed
+    """
+
+    try:
+        import fastavro
+    except ImportError:
+        raise ImportError(
+            "fastavro is required for Avro serialization (pip install fastavro)"
+        )
+
+    return fastavro
@@ -0,0 +1,295 @@
+"""
+    Purpose:
+        Kafka Benchmark Helpers.
+
+        This library is used to measure the hot paths of the helpers (see the
+        benchmarks/ scripts). Each benchmark reports throughput, p50/p99
+        per-message overhead and memory allocated per message, and results are
+        saved as JSON so runs can be compared across versions to catch
+        regressions.
+"""
+
+# Python Library Imports
+import gc
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+import simplejson as json
+
+
+###
+# Running Benchmarks
+###
+
+
+def run_benchmark(
+    benchmark_name,
+    benchmark_function,
+    num_messages,
+    batch_size=1,
+    warmup_messages=1000,
+    allocation_messages=1000,
+):
+    """
+    Purpose:
+        Benchmark a function that processes messages. The function is called
+        with the index of the batch and must process batch_size messages per
+        call, so both per-message paths (batch_size=1) and bulk paths can be
+        measured. Per-message overhead is the call duration divided by the
+        batch size
+    Args:
+        benchmark_name (String): Name of the benchmark
+        benchmark_function (Function): Function processing one batch per call
+        num_messages (Int): Number of messages to time
+        batch_size (Int): Number of messages processed per call. Default is 1
+        warmup_messages (Int): Messages processed before timing starts. Default
+            is 1000
+        allocation_messages (Int): Messages processed with allocation tracing
+            after timing (tracing slows calls down, so it is not timed). Default
+            is 1000
+    Return:
+        benchmark_result (Dict): "name", "messages", "batch_size", "seconds",
+            "msgs_per_sec", "p50_us" and "p99_us" (per-message overhead in
+            microseconds), "alloc_bytes_per_msg" (peak memory allocated while
+            processing a message) and "retained_blocks_per_msg" (memory blocks
+            still allocated after processing, a leak indicator)
+    """
+    logging.info(f"Running Benchmark {benchmark_name} ({num_messages} Messages)")
+
+    num_batches = max(num_messages // batch_size, 1)
+    batch_index = 0
+    for _ in range(warmup_messages // batch_size):
+        benchmark_function(batch_index)
+        batch_index += 1
+
+    gc.collect()
+    latencies = []
+    perf_counter = time.perf_counter
+    start_time = perf_counter()
+    for _ in range(num_batches):
+        call_start_time = perf_counter()
+        benchmark_function(batch_index)
+        latencies.append((perf_counter() - call_start_time) / batch_size)
+        batch_index += 1
+    total_time = perf_counter() - start_time
+
+    alloc_bytes_per_msg, retained_blocks_per_msg = measure_allocations(
+        benchmark_function,
+        max(allocation_messages // batch_size, 1),
+        batch_size,
+        first_batch_index=batch_index,
+    )
+
+    latencies.sort()
+    timed_messages = num_batches * batch_size
+
+    return {
+        "name": benchmark_name,
+        "messages": timed_messages,
+        "batch_size": batch_size,
+        "seconds": total_time,
+        "msgs_per_sec": timed_messages / total_time if total_time > 0 else 0,
+        "p50_us": get_percentile(latencies, 50) * 1000000,
+        "p99_us": get_percentile(latencies, 99) * 1000000,
+        "alloc_bytes_per_msg": alloc_bytes_per_msg,
+        "retained_blocks_per_msg": retained_blocks_per_msg,
+    }
+
+
+def measure_allocations(
+    benchmark_function, num_batches, batch_size=1, first_batch_index=0
+):
+    """
+    Purpose:
+        Measure the memory a benchmark function allocates per message with
+        tracemalloc
+    Args:
+        benchmark_function (Function): Function processing one batch per call
+        num_batches (Int): Number of calls to trace
+        batch_size (Int): Number of messages processed per call. Default is 1
+        first_batch_index (Int): Batch index passed to the first call. Default
+            is 0
+    Return:
+        allocations (Tuple): (alloc_bytes_per_msg, retained_blocks_per_msg).
+            alloc_bytes_per_msg is the mean peak of traced memory above the
+            memory in use before each call, divided by the batch size
+    """
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    gc.collect()
+    peak_bytes = 0
+    start_blocks = sys.getallocatedblocks()
+    try:
+        for batch_index in range(first_batch_index, first_batch_index + num_batches):
+            current_bytes = reset_traced_memory_peak()
+            benchmark_function(batch_index)
+            peak_bytes += max(tracemalloc.get_traced_memory()[1] - current_bytes, 0)
+    finally:
+        retained_blocks = sys.getallocatedblocks() - start_blocks
+        if not was_tracing:
+            tracemalloc.stop()
+
+    num_messages = num_batches * batch_size
+
+    return peak_bytes / num_messages, max(retained_blocks, 0) / num_messages
+
+
+def reset_traced_memory_peak():
+    """
+    Purpose:
+        Reset the tracemalloc peak to the memory currently traced
+        (tracemalloc.reset_peak is only available from python 3.9, older
+        versions restart tracing)
+    Args:
+        N/A
+    Return:
+        current_bytes (Int): Memory currently traced in bytes
+    """
+
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.stop()
+        tracemalloc.start()
+
+    return tracemalloc.get_traced_memory()[0]
+
+
+def get_percentile(sorted_values, percentile):
+    """
+    Purpose:
+        Get a percentile of sorted values (nearest rank)
+    Args:
+        sorted_values (List of Numbers): Values sorted in ascending order
+        percentile (Number): Percentile to get (0-100)
+    Return:
+        value (Number): Value at the percentile, or 0 if there are no values
+    """
+
+    if not sorted_values:
+        return 0
+
+    rank = int(round(percentile / 100.0 * (len(sorted_values) - 1)))
+
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+###
+# Benchmark Results
+###
+
+
+def get_benchmark_results(benchmark_results, version=None):
+    """
+    Purpose:
+        Wrap benchmark results with details of the run, ready to be saved
+    Args:
+        benchmark_results (List of Dicts): Output of run_benchmark
+        version (String): Version of the library benchmarked. Default is None
+    Return:
+        results (Dict): "version", "python", "platform", "timestamp" and
+            "benchmarks" (benchmark results keyed by name)
+    """
+
+    return {
+        "version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "benchmarks": {
+            benchmark_result["name"]: benchmark_result
+            for benchmark_result in benchmark_results
+        },
+    }
+
+
+def save_benchmark_results(results, results_filename):
+    """
+    Purpose:
+        Save benchmark results as JSON
+    Args:
+        results (Dict): Output of get_benchmark_results
+        results_filename (String): Path of the JSON file to write
+    Return:
+        N/A
+    """
+    logging.info(f"Saving Benchmark Results to {results_filename}")
+
+    with open(results_filename, "w") as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+
+
+def load_benchmark_results(results_filename):
+    """
+    Purpose:
+        Load benchmark results saved by save_benchmark_results
+    Args:
+        results_filename (String): Path of the JSON file to read
+    Return:
+        results (Dict): Benchmark results
+    """
+
+    with open(results_filename) as results_file:
+        return json.load(results_file)
+
+
+def compare_benchmark_results(baseline_results, results, threshold=0.1):
+    """
+    Purpose:
+        Compare benchmark results to a baseline run. A benchmark regressed when
+        its throughput dropped or its p99 overhead grew by more than the
+        threshold
+    Args:
+        baseline_results (Dict): Results of the baseline run
+        results (Dict): Results of the run to compare
+        threshold (Float): Allowed relative change before a benchmark counts as
+            regressed. Default is 0.1 (10%)
+    Return:
+        comparison (Dict): Keyed by the name of each benchmark in both runs,
+            with the relative "msgs_per_sec_change", "p99_us_change" and
+            "alloc_bytes_per_msg_change" and whether it is a "regression"
+    """
+
+    comparison = {}
+    baseline_benchmarks = baseline_results.get("benchmarks", {})
+    for benchmark_name, benchmark_result in results.get("benchmarks", {}).items():
+        baseline_result = baseline_benchmarks.get(benchmark_name)
+        if baseline_result is None:
+            continue
+
+        benchmark_comparison = {
+            f"{metric}_change": get_relative_change(
+                baseline_result.get(metric, 0), benchmark_result.get(metric, 0)
+            )
+            for metric in ("msgs_per_sec", "p99_us", "alloc_bytes_per_msg")
+        }
+        benchmark_comparison["regression"] = (
+            benchmark_comparison["msgs_per_sec_change"] < -threshold
+            or benchmark_comparison["p99_us_change"] > threshold
+        )
+        comparison[benchmark_name] = benchmark_comparison
+
+    return comparison
+
+
+def get_relative_change(baseline_value, value):
+    """
+    Purpose:
+        Get the relative change from a baseline value
+    Args:
+        baseline_value (Number): Baseline value
+        value (Number): New value
+    Return:
+        relative_change (Float): (value - baseline_value) / baseline_value, or
+            0 when the baseline is 0
+    """
+
+    if not baseline_value:
+        return 0.0
+
+    return (value - baseline_value) / float(baseline_value)
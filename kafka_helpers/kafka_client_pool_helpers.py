@@ -0,0 +1,264 @@
+"""
+    Purpose:
+        Kafka Client Pool Helpers.
+
+        This library is used to reuse librdkafka clients across calls. Each
+        new client opens its own broker connections, bootstraps metadata and
+        starts its own threads, so code that builds a client per request (e.g.
+        request handlers) should take pooled clients instead. Clients are kept
+        in a process-wide pool keyed by their normalized configuration, closed
+        at process exit and dropped in forked children (librdkafka handles do
+        not survive a fork).
+"""
+
+# Python Library Imports
+import atexit
+import logging
+import os
+import threading
+
+
+###
+# Client Pool
+###
+
+
+class KafkaClientPool(object):
+    """
+    Purpose:
+        Process-wide pool of Kafka clients keyed by client type, client class
+        and normalized configuration. Producers and admin clients are thread
+        safe and can be shared freely; a pooled consumer is shared by every
+        caller with the same configuration (including group.id), so it must
+        only be used by one caller at a time. Closed consumers are replaced
+    """
+
+    def __init__(self):
+        """
+        Purpose:
+            Initialize the KafkaClientPool
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def __len__(self):
+        return len(self.clients)
+
+    def get_client(self, client_type, configuration, client_class, **client_kwargs):
+        """
+        Purpose:
+            Get the pooled client for a configuration, creating it on first use
+        Args:
+            client_type (String): "producer", "consumer" or "admin"
+            configuration (Dict): librdkafka configuration of the client
+            client_class (Class): Class to create the client with
+            client_kwargs (Kwargs): Arguments passed to client_class (e.g. a
+                consumer logger); part of the pool key
+        Return:
+            kafka_client (Kafka Client Obj): Pooled client
+        """
+
+        client_key = get_client_key(
+            client_type, configuration, client_class, client_kwargs
+        )
+
+        with self.lock:
+            self.check_fork()
+            kafka_client = self.clients.get(client_key)
+            if kafka_client is not None:
+                if is_client_usable(client_type, kafka_client):
+                    return kafka_client
+                logging.info(f"Replacing Closed Pooled Kafka {client_type.title()}")
+
+            logging.info(f"Creating Pooled Kafka {client_type.title()} Client")
+            kafka_client = client_class(configuration, **client_kwargs)
+            self.clients[client_key] = kafka_client
+
+        return kafka_client
+
+    def remove_client(self, kafka_client):
+        """
+        Purpose:
+            Remove a client from the pool (it is not closed)
+        Args:
+            kafka_client (Kafka Client Obj): Pooled client
+        Return:
+            removed (Bool): Whether the client was in the pool
+        """
+
+        with self.lock:
+            for client_key, pooled_client in list(self.clients.items()):
+                if pooled_client is kafka_client:
+                    del self.clients[client_key]
+                    return True
+
+        return False
+
+    def close(self, timeout=10):
+        """
+        Purpose:
+            Flush the pooled producers, close the pooled consumers and empty the
+            pool (registered to run at process exit)
+        Args:
+            timeout (Float): Max seconds to wait for each producer to flush.
+                Default is 10
+        Return:
+            N/A
+        """
+
+        with self.lock:
+            self.check_fork()
+            clients, self.clients = self.clients, {}
+
+        for (client_type, _, _), kafka_client in clients.items():
+            try:
+                if client_type == "producer":
+                    pending = kafka_client.flush(timeout)
+                    if pending:
+                        logging.warning(
+                            f"Pooled Producer Closed With {pending} Undelivered Messages"
+                        )
+                elif client_type == "consumer":
+                    kafka_client.close()
+            except Exception as err:
+                logging.warning(f"Failed to Close Pooled Kafka Client: {err}")
+
+    def check_fork(self):
+        """
+        Purpose:
+            Drop the clients inherited from the parent process if the process
+            forked since the pool was last used (callers hold the lock)
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        if self.pid != os.getpid():
+            self.clients = {}
+            self.pid = os.getpid()
+
+    def reset_after_fork(self):
+        """
+        Purpose:
+            Drop the clients inherited from the parent process without touching
+            them (registered to run in forked children)
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        # The lock may have been held by another thread of the parent
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.pid = os.getpid()
+
+
+# Process-wide pool used by the client helpers (pooled=True)
+CLIENT_POOL = KafkaClientPool()
+atexit.register(CLIENT_POOL.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=CLIENT_POOL.reset_after_fork)
+
+
+###
+# Helpers
+###
+
+
+def get_client_key(client_type, configuration, client_class, client_kwargs=None):
+    """
+    Purpose:
+        Get the pool key of a client. Configuration values are normalized so
+        equivalent configurations share a client (brokers in any order,
+        True/"true", 100/"100", etc.)
+    Args:
+        client_type (String): "producer", "consumer" or "admin"
+        configuration (Dict): librdkafka configuration of the client
+        client_class (Class): Class the client is created with
+        client_kwargs (Dict): Other arguments the client is created with.
+            Default is None
+    Return:
+        client_key (Tuple): Hashable pool key
+    """
+
+    normalized_configuration = []
+    for config_key, config_value in list(configuration.items()) + [
+        (f"kwarg:{kwarg}", kwarg_value)
+        for kwarg, kwarg_value in (client_kwargs or {}).items()
+    ]:
+        config_key = config_key.strip()
+        if config_key == "bootstrap.servers":
+            config_value = ",".join(sorted({
+                kafka_broker.strip()
+                for kafka_broker in str(config_value).split(",")
+                if kafka_broker.strip()
+            }))
+        normalized_configuration.append(
+            (config_key, normalize_config_value(config_value))
+        )
+
+    return (
+        client_type,
+        client_class,
+        tuple(sorted(normalized_configuration, key=lambda item: item[0])),
+    )
+
+
+def normalize_config_value(config_value):
+    """
+    Purpose:
+        Normalize a librdkafka configuration value for the pool key
+    Args:
+        config_value (Any): Configuration value
+    Return:
+        normalized_value (Any): Hashable normalized value (strings for
+            scalars, the object itself for callbacks and loggers)
+    """
+
+    if isinstance(config_value, bool):
+        return "true" if config_value else "false"
+    if isinstance(config_value, (int, float)):
+        return str(config_value)
+    if isinstance(config_value, str):
+        config_value = config_value.strip()
+        if config_value.lower() in ("true", "false"):
+            return config_value.lower()
+        return config_value
+
+    try:
+        hash(config_value)
+    except TypeError:
+        return repr(config_value)
+
+    return config_value
+
+
+def is_client_usable(client_type, kafka_client):
+    """
+    Purpose:
+        Check that a pooled client can still be used (consumers are closed by
+        the consume helpers when they finish)
+    Args:
+        client_type (String): "producer", "consumer" or "admin"
+        kafka_client (Kafka Client Obj): Pooled client
+    Return:
+        is_usable (Bool): Whether the client can be reused
+    """
+
+    if client_type != "consumer":
+        return True
+
+    try:
+        kafka_client.assignment()
+    except RuntimeError:
+        return False
+
+    return True
@@ -0,0 +1,272 @@
+"""
+    Purpose:
+        Kafka Columnar Helpers.
+
+        This library is used to consume batches of messages straight into
+        column buffers (partitions, offsets, timestamps, keys and the fields of
+        fixed-width values) for vectorized processing, instead of building a
+        dict per message. With NumPy installed the values of a batch are joined
+        and viewed as a structured array with a single call; without NumPy the
+        columns are standard library arrays.
+"""
+
+# Python Library Imports
+import struct
+from array import array
+
+# Local Library Imports
+from kafka_helpers.kafka_consumer_helpers import consume_topic_batches
+from kafka_helpers.kafka_exceptions import SerializationError
+
+
+# struct codes (standard sizes) and the NumPy types with the same layout
+NUMPY_TYPES = {
+    "b": "i1", "B": "u1", "?": "?", "h": "i2", "H": "u2", "i": "i4", "I": "u4",
+    "l": "i4", "L": "u4", "q": "i8", "Q": "u8", "e": "f2", "f": "f4", "d": "f8",
+}
+
+# struct codes and the array typecodes able to hold their values
+ARRAY_TYPECODES = {
+    "b": "b", "B": "B", "?": "B", "h": "h", "H": "H", "i": "l", "I": "L",
+    "l": "l", "L": "L", "q": "q", "Q": "Q", "e": "f", "f": "f", "d": "d",
+}
+
+# struct byte orders with standard sizes and no padding
+BYTEORDERS = {">": ">", "!": ">", "<": "<", "=": "="}
+
+
+###
+# Column Batches
+###
+
+
+class KafkaColumnBatch(object):
+    """
+    Purpose:
+        Batch of messages stored as columns. partitions, offsets and timestamps
+        are int arrays, keys is a list and values holds one array per field of
+        the value schema (NumPy arrays when NumPy is used, array.arrays
+        otherwise)
+    """
+
+    __slots__ = ("topics", "partitions", "offsets", "timestamps", "keys", "values")
+
+    def __init__(self, topics, partitions, offsets, timestamps, keys, values):
+        """
+        Purpose:
+            Initialize the KafkaColumnBatch
+        Args:
+            topics (List of Strings): Topic of each message
+            partitions (Array of Ints): Partition of each message
+            offsets (Array of Ints): Offset of each message
+            timestamps (Array of Ints): Timestamp of each message in ms
+            keys (List of Bytes): Key of each message
+            values (Dict): Key is the field name and value is the column of the
+                field
+        Return:
+            N/A
+        """
+
+        self.topics = topics
+        self.partitions = partitions
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.keys = keys
+        self.values = values
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get_columns(self):
+        """
+        Purpose:
+            Get every column of the batch
+        Args:
+            N/A
+        Return:
+            columns (Dict): "topic", "partition", "offset", "timestamp", "key"
+                and one entry per value field
+        """
+
+        columns = {
+            "topic": self.topics,
+            "partition": self.partitions,
+            "offset": self.offsets,
+            "timestamp": self.timestamps,
+            "key": self.keys,
+        }
+        columns.update(self.values)
+
+        return columns
+
+
+###
+# Columnar Decoding
+###
+
+
+def get_columnar_batch_decoder(value_fields, byteorder=">", use_numpy=None):
+    """
+    Purpose:
+        Get a batch decoder that turns a list of messages into a
+        KafkaColumnBatch. Every message value must hold exactly one fixed-width
+        record of the value fields
+    Args:
+        value_fields (List of Tuples): (field_name, struct_code) for each field
+            of the value in order, e.g. [("id", "q"), ("price", "d")]
+        byteorder (String): struct byte order of the values (one of ">", "!",
+            "<" or "="). Default is ">" (big-endian)
+        use_numpy (Bool): Whether to build NumPy columns. Default is None (use
+            NumPy if it is installed)
+    Return:
+        columnar_batch_decoder (Function): Function that takes a list of
+            messages and returns a KafkaColumnBatch (usable as the
+            batch_decoder of kafka_consumer_helpers.consume_topic_batches)
+    Raises:
+        ImportError: If use_numpy is True and NumPy is not installed
+        ValueError: If the byte order or a struct code is not supported
+    """
+
+    if byteorder not in BYTEORDERS:
+        raise ValueError(
+            f"Byte order {byteorder} is not supported, must be one of: "
+            f"{', '.join(BYTEORDERS)}"
+        )
+    for field_name, struct_code in value_fields:
+        if struct_code not in NUMPY_TYPES:
+            raise ValueError(
+                f"struct code {struct_code} of field {field_name} is not supported, "
+                f"must be one of: {''.join(NUMPY_TYPES)}"
+            )
+
+    record_struct = struct.Struct(
+        byteorder + "".join(struct_code for _, struct_code in value_fields)
+    )
+    field_names = [field_name for field_name, _ in value_fields]
+
+    numpy = None
+    if use_numpy or use_numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            if use_numpy:
+                raise ImportError(
+                    "numpy is required for NumPy columns (pip install numpy)"
+                )
+
+    if numpy is not None:
+        values_dtype = numpy.dtype([
+            (field_name, BYTEORDERS[byteorder] + NUMPY_TYPES[struct_code])
+            for field_name, struct_code in value_fields
+        ])
+
+        def decode_values(joined_values):
+            records = numpy.frombuffer(joined_values, dtype=values_dtype)
+            return {field_name: records[field_name] for field_name in field_names}
+
+        def get_int_column(ints):
+            return numpy.array(ints, dtype=numpy.int64)
+    else:
+        field_typecodes = [
+            ARRAY_TYPECODES[struct_code] for _, struct_code in value_fields
+        ]
+
+        def decode_values(joined_values):
+            field_columns = [array(typecode) for typecode in field_typecodes]
+            field_appends = [field_column.append for field_column in field_columns]
+            for record in record_struct.iter_unpack(joined_values):
+                for field_append, field_value in zip(field_appends, record):
+                    field_append(field_value)
+            return dict(zip(field_names, field_columns))
+
+        def get_int_column(ints):
+            return array("q", ints)
+
+    record_size = record_struct.size
+
+    def columnar_batch_decoder(msg_batch):
+        topics = []
+        partitions = []
+        offsets = []
+        timestamps = []
+        keys = []
+        values = []
+        for msg in msg_batch:
+            value = msg.value()
+            if value is None or len(value) != record_size:
+                raise SerializationError(
+                    f"Message value at {msg.topic()}/{msg.partition()}/"
+                    f"{msg.offset()} is not a {record_size} byte record"
+                )
+            topics.append(msg.topic())
+            partitions.append(msg.partition())
+            offsets.append(msg.offset())
+            timestamps.append(msg.timestamp()[1])
+            keys.append(msg.key())
+            values.append(value)
+
+        return KafkaColumnBatch(
+            topics,
+            get_int_column(partitions),
+            get_int_column(offsets),
+            get_int_column(timestamps),
+            keys,
+            decode_values(b"".join(values)),
+        )
+
+    return columnar_batch_decoder
+
+
+def consume_topic_columns(
+    kafka_consumer,
+    kafka_topics,
+    value_fields,
+    byteorder=">",
+    batch_size=500,
+    batch_timeout=1000,
+    stop_event=None,
+    use_numpy=None,
+    offset_committer=None,
+):
+    """
+    Purpose:
+        Consume Kafka Topics in batches of columns (see
+        get_columnar_batch_decoder). A batch that fails to decode stops
+        consuming and is not committed, so it is consumed again on restart.
+        The consumer must be created with {"enable.auto.offset.store": False}
+        or with an offset_committer that does not auto commit (see
+        kafka_consumer_helpers.consume_topic_batches)
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        value_fields (List of Tuples): (field_name, struct_code) for each field
+            of the fixed-width values
+        byteorder (String): struct byte order of the values. Default is ">"
+        batch_size (Int): Max number of messages per batch. Default is 500
+        batch_timeout (Int): Max time in ms to wait for a full batch. Default
+            is 1000
+        stop_event (Event Obj): Optional threading/multiprocessing Event. When
+            set, consuming stops and the consumer is closed
+        use_numpy (Bool): Whether to build NumPy columns. Default is None (use
+            NumPy if it is installed)
+        offset_committer (KafkaOffsetCommitter): Optional committer the
+            consumer was created with
+    Yields:
+        column_batch (KafkaColumnBatch): Columns of each batch of messages
+    Raises:
+        InvalidCommitStrategy: If the consumer would auto commit a batch that
+            failed to decode when it is closed
+        SerializationError: If a value of a batch is not valid
+    """
+
+    yield from consume_topic_batches(
+        kafka_consumer,
+        kafka_topics,
+        batch_size=batch_size,
+        batch_timeout=batch_timeout,
+        stop_event=stop_event,
+        batch_decoder=get_columnar_batch_decoder(
+            value_fields, byteorder=byteorder, use_numpy=use_numpy
+        ),
+        offset_committer=offset_committer,
+    )
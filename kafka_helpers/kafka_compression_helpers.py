@@ -0,0 +1,369 @@
+"""
+    Purpose:
+        Kafka Compression Helpers.
+
+        This library is used to configure producer compression (gzip, snappy,
+        lz4 and zstd) and to measure the codecs on sample payloads. Kafka
+        compresses whole record batches, so payloads are compressed in batches
+        and each codec is reported with its compression ratio and CPU cost,
+        allowing a codec to be picked per topic from measurements.
+"""
+
+# Python Library Imports
+import gzip
+import importlib
+import logging
+import time
+
+# Local Library Imports
+from kafka_helpers.kafka_exceptions import InvalidCompressionType
+
+
+# Codecs supported by Kafka (compression.type)
+COMPRESSION_TYPES = ("none", "gzip", "snappy", "lz4", "zstd")
+
+# Range of compression.level for each codec (librdkafka, -1 is the codec default)
+COMPRESSION_LEVELS = {
+    "none": (0, 0),
+    "gzip": (0, 9),
+    "snappy": (0, 0),
+    "lz4": (0, 12),
+    "zstd": (0, 12),
+}
+
+# Default network throughput when picking a codec (1 Gbit/s in bytes)
+DEFAULT_NETWORK_BYTES_PER_SEC = 125000000
+
+
+###
+# Producer Configuration
+###
+
+
+def get_compression_configuration(compression_type, compression_level=None):
+    """
+    Purpose:
+        Get the librdkafka producer configuration for a codec
+    Args:
+        compression_type (String): Codec to compress with (one of
+            COMPRESSION_TYPES)
+        compression_level (Int): Codec compression level (see
+            COMPRESSION_LEVELS). Default is None (the codec default)
+    Return:
+        compression_configuration (Dict): "compression.type" and, if passed,
+            "compression.level"
+    Raises:
+        InvalidCompressionType: If the codec or level is not supported
+    """
+
+    validate_compression_type(compression_type, compression_level)
+
+    compression_configuration = {"compression.type": compression_type}
+    if compression_level is not None:
+        compression_configuration["compression.level"] = compression_level
+
+    return compression_configuration
+
+
+def validate_compression_type(compression_type, compression_level=None):
+    """
+    Purpose:
+        Validate a codec and compression level
+    Args:
+        compression_type (String): Codec to validate
+        compression_level (Int): Compression level to validate. Default is None
+            (the codec default)
+    Return:
+        N/A
+    Raises:
+        InvalidCompressionType: If the codec or level is not supported
+    """
+
+    if compression_type not in COMPRESSION_TYPES:
+        raise InvalidCompressionType(
+            f"Compression type {compression_type} is not supported, must be one "
+            f"of: {', '.join(COMPRESSION_TYPES)}"
+        )
+
+    if compression_level is None or compression_level == -1:
+        return
+
+    min_level, max_level = COMPRESSION_LEVELS[compression_type]
+    if not min_level <= compression_level <= max_level:
+        raise InvalidCompressionType(
+            f"Compression level {compression_level} is not supported for "
+            f"{compression_type}, must be -1 or between {min_level} and {max_level}"
+        )
+
+
+###
+# Codecs
+###
+
+
+def get_compression_codec(compression_type, compression_level=None):
+    """
+    Purpose:
+        Get Python compress/decompress functions equivalent to a Kafka codec,
+        for measuring codecs on sample payloads. snappy, lz4 and zstd use the
+        optional python-snappy, lz4 and zstandard packages, falling back to
+        cramjam
+    Args:
+        compression_type (String): Codec (one of COMPRESSION_TYPES)
+        compression_level (Int): Codec compression level. Default is None (the
+            codec default)
+    Return:
+        compress (Function): Function that takes bytes and returns compressed
+            bytes
+        decompress (Function): Function that takes compressed bytes and returns
+            the original bytes
+    Raises:
+        InvalidCompressionType: If the codec or level is not supported
+        ImportError: If no package implementing the codec is installed
+    """
+
+    validate_compression_type(compression_type, compression_level)
+    if compression_level == -1:
+        compression_level = None
+
+    if compression_type == "none":
+        def identity(data):
+            return data
+
+        return identity, identity
+
+    if compression_type == "gzip":
+        gzip_level = 6 if compression_level is None else compression_level
+
+        def gzip_compress(data):
+            return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+        return gzip_compress, gzip.decompress
+
+    try:
+        if compression_type == "snappy":
+            snappy = importlib.import_module("snappy")
+            return snappy.compress, snappy.decompress
+
+        if compression_type == "lz4":
+            lz4_frame = importlib.import_module("lz4.frame")
+            lz4_level = 0 if compression_level is None else compression_level
+
+            def lz4_compress(data):
+                return lz4_frame.compress(data, compression_level=lz4_level)
+
+            return lz4_compress, lz4_frame.decompress
+
+        zstandard = importlib.import_module("zstandard")
+        zstd_compressor = zstandard.ZstdCompressor(
+            level=3 if compression_level is None else compression_level
+        )
+        zstd_decompressor = zstandard.ZstdDecompressor()
+
+        return zstd_compressor.compress, zstd_decompressor.decompress
+    except ImportError:
+        pass
+
+    try:
+        cramjam = importlib.import_module("cramjam")
+    except ImportError:
+        package_name = {
+            "snappy": "python-snappy", "lz4": "lz4", "zstd": "zstandard"
+        }[compression_type]
+        raise ImportError(
+            f"{package_name} or cramjam is required for {compression_type} "
+            f"compression (pip install {package_name})"
+        )
+
+    if compression_type == "snappy":
+        return cramjam.snappy.compress_raw, cramjam.snappy.decompress_raw
+
+    cramjam_codec = getattr(cramjam, compression_type)
+
+    def cramjam_compress(data):
+        if compression_level is None:
+            return cramjam_codec.compress(data)
+        return cramjam_codec.compress(data, level=compression_level)
+
+    return cramjam_compress, cramjam_codec.decompress
+
+
+###
+# Measuring Codecs
+###
+
+
+def measure_compression(
+    payloads,
+    compression_types=None,
+    compression_levels=None,
+    batch_size=100,
+    iterations=3,
+):
+    """
+    Purpose:
+        Measure the compression ratio and CPU cost of codecs on sample
+        payloads. Payloads are joined into batches of batch_size before being
+        compressed, as the producer compresses record batches and not single
+        messages. Codecs without an installed package are skipped
+    Args:
+        payloads (List of Bytes): Sample message payloads
+        compression_types (List of Strings): Codecs to measure. Default is every
+            codec in COMPRESSION_TYPES
+        compression_levels (Dict): Key is the codec and value is the
+            compression level to measure it with. Default is None (the codec
+            defaults)
+        batch_size (Int): Number of payloads per compressed batch (should be
+            close to the batch.num.messages the producer achieves). Default
+            is 100
+        iterations (Int): Times each codec compresses the payloads; the fastest
+            iteration is reported. Default is 3
+    Return:
+        compression_results (Dict of Dicts): Key is the codec and value has
+            "messages", "raw_bytes", "compressed_bytes", "ratio"
+            (raw/compressed), "compress_us_per_msg", "decompress_us_per_msg",
+            "compress_mb_per_sec" and "decompress_mb_per_sec"
+    Raises:
+        InvalidCompressionType: If a codec or level is not supported
+        ValueError: If there are no payloads
+    """
+
+    if not payloads:
+        raise ValueError("At least one payload is required to measure compression")
+
+    batches = [
+        b"".join(payloads[batch_start:batch_start + batch_size])
+        for batch_start in range(0, len(payloads), batch_size)
+    ]
+    raw_bytes = sum(len(batch) for batch in batches)
+    num_messages = len(payloads)
+
+    compression_levels = compression_levels or {}
+    compression_results = {}
+    for compression_type in compression_types or COMPRESSION_TYPES:
+        try:
+            compress, decompress = get_compression_codec(
+                compression_type, compression_levels.get(compression_type)
+            )
+        except ImportError as err:
+            logging.warning(f"Skipping Compression Type {compression_type}: {err}")
+            continue
+
+        compressed_batches = [compress(batch) for batch in batches]
+        compressed_bytes = sum(len(batch) for batch in compressed_batches)
+        compress_seconds = get_fastest_time(compress, batches, iterations)
+        decompress_seconds = get_fastest_time(
+            decompress, compressed_batches, iterations
+        )
+
+        compression_results[compression_type] = {
+            "messages": num_messages,
+            "raw_bytes": raw_bytes,
+            "compressed_bytes": compressed_bytes,
+            "ratio": raw_bytes / compressed_bytes if compressed_bytes else 0,
+            "compress_us_per_msg": compress_seconds / num_messages * 1000000,
+            "decompress_us_per_msg": decompress_seconds / num_messages * 1000000,
+            "compress_mb_per_sec": get_mb_per_sec(raw_bytes, compress_seconds),
+            "decompress_mb_per_sec": get_mb_per_sec(raw_bytes, decompress_seconds),
+        }
+
+    return compression_results
+
+
+def get_best_compression_type(
+    compression_results, network_bytes_per_sec=DEFAULT_NETWORK_BYTES_PER_SEC
+):
+    """
+    Purpose:
+        Pick the codec with the lowest total cost per message from the results
+        of measure_compression. The cost is the CPU time to compress and
+        decompress a message plus the time to send its compressed bytes over
+        the network, so slower codecs only win when the bytes they save are
+        worth more than the CPU they spend
+    Args:
+        compression_results (Dict of Dicts): Results of measure_compression
+        network_bytes_per_sec (Int): Network throughput available to the
+            producer in bytes per second. Default is 1 Gbit/s
+    Return:
+        compression_type (String): Codec with the lowest cost (None if there are
+            no results)
+    """
+
+    best_compression_type = None
+    best_cost = None
+    for compression_type, compression_result in compression_results.items():
+        cost = get_compression_cost(compression_result, network_bytes_per_sec)
+        if best_cost is None or cost < best_cost:
+            best_compression_type, best_cost = compression_type, cost
+
+    return best_compression_type
+
+
+def get_compression_cost(
+    compression_result, network_bytes_per_sec=DEFAULT_NETWORK_BYTES_PER_SEC
+):
+    """
+    Purpose:
+        Get the cost of a codec per message in microseconds (CPU time to
+        compress and decompress plus network time of the compressed bytes)
+    Args:
+        compression_result (Dict): Result of a codec from measure_compression
+        network_bytes_per_sec (Int): Network throughput in bytes per second.
+            Default is 1 Gbit/s
+    Return:
+        cost_us_per_msg (Float): Cost per message in microseconds
+    """
+
+    compressed_bytes_per_msg = (
+        compression_result["compressed_bytes"] / compression_result["messages"]
+    )
+
+    return (
+        compression_result["compress_us_per_msg"]
+        + compression_result["decompress_us_per_msg"]
+        + compressed_bytes_per_msg / network_bytes_per_sec * 1000000
+    )
+
+
+###
+# Helpers
+###
+
+
+def get_fastest_time(function, batches, iterations):
+    """
+    Purpose:
+        Get the fastest time in seconds to call a function on every batch
+    Args:
+        function (Function): Function to time
+        batches (List of Bytes): Batches to call the function with
+        iterations (Int): Number of times to call the function on every batch
+    Return:
+        fastest_seconds (Float): Fastest time over the iterations
+    """
+
+    perf_counter = time.perf_counter
+    fastest_seconds = None
+    for _ in range(max(iterations, 1)):
+        start_time = perf_counter()
+        for batch in batches:
+            function(batch)
+        seconds = perf_counter() - start_time
+        if fastest_seconds is None or seconds < fastest_seconds:
+            fastest_seconds = seconds
+
+    return fastest_seconds
+
+
+def get_mb_per_sec(num_bytes, seconds):
+    """
+    Purpose:
+        Get throughput in MB (1000000 bytes) per second
+    Args:
+        num_bytes (Int): Bytes processed
+        seconds (Float): Time taken in seconds
+    Return:
+        mb_per_sec (Float): Throughput (0 if no time was measured)
+    """
+
+    return num_bytes / seconds / 1000000 if seconds > 0 else 0
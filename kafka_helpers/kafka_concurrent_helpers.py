@@ -0,0 +1,334 @@
+"""
+    Purpose:
+        Kafka Concurrent Helpers.
+
+        This library is used to run message handlers concurrently on a bounded
+        pool of threads (for I/O-bound handlers such as HTTP calls and database
+        writes). Messages of a partition are always handled in order by the
+        same thread while different partitions are handled in parallel, and
+        offsets are committed manually only once every earlier message of the
+        partition has been handled (at-least-once delivery).
+"""
+
+# Python Library Imports
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from confluent_kafka import KafkaException, TopicPartition
+
+# Local Library Imports
+from kafka_helpers.kafka_consumer_helpers import (
+    consumer_assignment_callback,
+    filter_message_batch,
+    has_manual_offset_store,
+)
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy
+
+
+###
+# Offset Tracking
+###
+
+
+class PartitionOffsetTracker(object):
+    """
+    Purpose:
+        Track the offsets handed to handlers and the offsets that have finished
+        for each partition. The offset that is safe to commit for a partition is
+        one past the highest offset for which every earlier dispatched offset
+        has also finished
+    """
+
+    def __init__(self):
+        """
+        Purpose:
+            Initialize the PartitionOffsetTracker
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        self.dispatched_offsets = {}
+        self.completed_offsets = {}
+        self.commit_offsets = {}
+        self.committed_offsets = {}
+        self.lock = threading.Lock()
+
+    def dispatch(self, topic, partition, offset):
+        """
+        Purpose:
+            Record that an offset has been handed to a handler
+        Args:
+            topic (String): Topic of the message
+            partition (Int): Partition of the message
+            offset (Int): Offset of the message
+        Return:
+            N/A
+        """
+
+        with self.lock:
+            partition_key = (topic, partition)
+            dispatched_offsets = self.dispatched_offsets.get(partition_key)
+            if dispatched_offsets is None:
+                dispatched_offsets = self.dispatched_offsets[partition_key] = deque()
+                self.completed_offsets[partition_key] = set()
+            dispatched_offsets.append(offset)
+
+    def complete(self, topic, partition, offset):
+        """
+        Purpose:
+            Record that a handler finished with an offset and advance the commit
+            offset of the partition past any contiguous finished offsets
+        Args:
+            topic (String): Topic of the message
+            partition (Int): Partition of the message
+            offset (Int): Offset of the message
+        Return:
+            N/A
+        """
+
+        with self.lock:
+            partition_key = (topic, partition)
+            dispatched_offsets = self.dispatched_offsets.get(partition_key)
+            if dispatched_offsets is None:
+                # Partition was revoked while the message was being handled
+                return
+
+            completed_offsets = self.completed_offsets[partition_key]
+            completed_offsets.add(offset)
+            while dispatched_offsets and dispatched_offsets[0] in completed_offsets:
+                completed_offset = dispatched_offsets.popleft()
+                completed_offsets.discard(completed_offset)
+                self.commit_offsets[partition_key] = completed_offset + 1
+
+    def get_commit_offsets(self, partitions=None):
+        """
+        Purpose:
+            Get the offsets that have advanced since the last commit and mark
+            them as committed
+        Args:
+            partitions (List of TopicPartitions): Only return offsets for these
+                partitions. Default is None (all partitions)
+        Return:
+            commit_offsets (List of TopicPartitions): Offsets to commit
+        """
+
+        partition_keys = None
+        if partitions is not None:
+            partition_keys = {
+                (partition.topic, partition.partition) for partition in partitions
+            }
+
+        commit_offsets = []
+        with self.lock:
+            for partition_key, offset in self.commit_offsets.items():
+                if partition_keys is not None and partition_key not in partition_keys:
+                    continue
+                if self.committed_offsets.get(partition_key) == offset:
+                    continue
+                self.committed_offsets[partition_key] = offset
+                commit_offsets.append(TopicPartition(*partition_key, offset))
+
+        return commit_offsets
+
+    def get_in_flight(self, partitions=None):
+        """
+        Purpose:
+            Get the number of dispatched offsets that have not finished
+        Args:
+            partitions (List of TopicPartitions): Only count these partitions.
+                Default is None (all partitions)
+        Return:
+            in_flight (Int): Number of unfinished offsets
+        """
+
+        with self.lock:
+            if partitions is None:
+                return sum(
+                    len(dispatched_offsets)
+                    for dispatched_offsets in self.dispatched_offsets.values()
+                )
+            return sum(
+                len(self.dispatched_offsets.get(
+                    (partition.topic, partition.partition), ()
+                ))
+                for partition in partitions
+            )
+
+    def remove_partitions(self, partitions):
+        """
+        Purpose:
+            Stop tracking partitions (after they have been revoked)
+        Args:
+            partitions (List of TopicPartitions): Partitions to remove
+        Return:
+            N/A
+        """
+
+        with self.lock:
+            for partition in partitions:
+                partition_key = (partition.topic, partition.partition)
+                for offsets in (
+                    self.dispatched_offsets,
+                    self.completed_offsets,
+                    self.commit_offsets,
+                    self.committed_offsets,
+                ):
+                    offsets.pop(partition_key, None)
+
+
+###
+# Concurrent Consuming
+###
+
+
+def consume_topic_concurrently(
+    kafka_consumer,
+    kafka_topics,
+    message_handler,
+    max_workers=8,
+    max_in_flight=1000,
+    batch_size=500,
+    batch_timeout=1000,
+    commit_interval=5,
+    stop_event=None,
+):
+    """
+    Purpose:
+        Consume Kafka Topics and run the handler for each message on a bounded
+        pool of threads. Each partition is mapped to one thread so messages of
+        a partition are handled in order, and offsets are committed every
+        commit_interval seconds up to the last contiguous handled message. The
+        consumer must be created with {"enable.auto.offset.store": False} (see
+        get_kafka_consumer config_overrides), so an automatic commit never
+        commits messages that are still being handled. If a handler raises,
+        consuming stops, the offsets handled before the failure are committed
+        and the error is raised
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        message_handler (Function): Function called with each message
+        max_workers (Int): Number of handler threads. Default is 8
+        max_in_flight (Int): Max number of messages dispatched to handlers but
+            not finished. When reached, the assigned partitions are paused and
+            the consumer keeps polling (so it is not evicted from the group
+            for exceeding max.poll.interval.ms) until handlers catch up.
+            Default is 1000
+        batch_size (Int): Max number of messages to consume per call. Default
+            is 500
+        batch_timeout (Int): Max time in ms to wait for a batch. Default is 1000
+        commit_interval (Float): Seconds between offset commits. Default is 5
+        stop_event (Event Obj): Optional threading Event. When set, consuming
+            stops, in-flight messages finish and offsets are committed
+    Return:
+        consume_stats (Dict): "dispatched", "completed" and "failed" message
+            counts and the number of "commits"
+    Raises:
+        InvalidCommitStrategy: If the consumer stores offsets automatically,
+            which commits messages before they are handled
+        Exception: The first exception raised by the message handler
+    """
+    logging.info(
+        f"Consuming Topics {', '.join(kafka_topics)} with {max_workers} Workers"
+    )
+
+    if not has_manual_offset_store(kafka_consumer):
+        raise InvalidCommitStrategy(
+            "consume_topic_concurrently needs a consumer created with "
+            "enable.auto.offset.store set to False"
+        )
+
+    offset_tracker = PartitionOffsetTracker()
+    executors = [
+        ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"kafka-handler-{index}")
+        for index in range(max_workers)
+    ]
+    consume_stats = {"dispatched": 0, "completed": 0, "failed": 0, "commits": 0}
+    consume_stats_lock = threading.Lock()
+    handler_errors = []
+
+    def commit_offsets(partitions=None):
+        commit_offsets = offset_tracker.get_commit_offsets(partitions)
+        if commit_offsets:
+            kafka_consumer.commit(offsets=commit_offsets, asynchronous=False)
+            consume_stats["commits"] += 1
+
+    def handle_message(msg, topic, partition, offset):
+        try:
+            if not handler_errors:
+                message_handler(msg)
+                offset_tracker.complete(topic, partition, offset)
+                with consume_stats_lock:
+                    consume_stats["completed"] += 1
+        except Exception as err:
+            logging.exception(
+                f"Message Handler Failed: topic={topic}, partition={partition}, "
+                f"offset={offset}: {err}"
+            )
+            with consume_stats_lock:
+                consume_stats["failed"] += 1
+            handler_errors.append(err)
+
+    def on_revoke(consumer, partitions):
+        # Let revoked partitions finish so their offsets are committed before
+        # another consumer in the group takes them over
+        while offset_tracker.get_in_flight(partitions) and not handler_errors:
+            time.sleep(0.01)
+        try:
+            commit_offsets(partitions)
+        except KafkaException as err:
+            logging.error(f"Failed to Commit Revoked Partitions: {err}")
+        offset_tracker.remove_partitions(partitions)
+
+    kafka_consumer.subscribe(
+        kafka_topics, on_assign=consumer_assignment_callback, on_revoke=on_revoke
+    )
+
+    next_commit_time = time.time() + commit_interval
+    paused = False
+    try:
+        while not handler_errors and (stop_event is None or not stop_event.is_set()):
+            in_flight = offset_tracker.get_in_flight()
+            if in_flight >= max_in_flight:
+                # Pause the assignment on every pass, as a rebalance can hand
+                # out new (unpaused) partitions
+                kafka_consumer.pause(kafka_consumer.assignment())
+                paused = True
+            elif paused:
+                kafka_consumer.resume(kafka_consumer.assignment())
+                paused = False
+
+            msg_batch = kafka_consumer.consume(
+                num_messages=max(min(batch_size, max_in_flight - in_flight), 1),
+                timeout=min(batch_timeout / 1000.0, 0.1) if paused
+                else batch_timeout / 1000.0,
+            )
+            # Messages fetched before the pause are still dispatched
+            for msg in filter_message_batch(msg_batch):
+                topic, partition, offset = msg.topic(), msg.partition(), msg.offset()
+                offset_tracker.dispatch(topic, partition, offset)
+                executors[hash((topic, partition)) % max_workers].submit(
+                    handle_message, msg, topic, partition, offset
+                )
+                consume_stats["dispatched"] += 1
+
+            if time.time() >= next_commit_time:
+                commit_offsets()
+                next_commit_time = time.time() + commit_interval
+    except KeyboardInterrupt:
+        logging.info('Consume Ended By User')
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+        try:
+            commit_offsets()
+        finally:
+            kafka_consumer.close()
+
+    if handler_errors:
+        raise handler_errors[0]
+
+    return consume_stats
@@ -7,8 +7,14 @@
 
 # Python Library Imports
 import logging
-import simplejson as json
-from confluent_kafka import Consumer, KafkaException, KafkaError
+from collections import deque
+from confluent_kafka import Consumer, KafkaException, KafkaError, TopicPartition
+
+# Local Library Imports
+from kafka_helpers.kafka_client_pool_helpers import CLIENT_POOL
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy, UnknownRecordOffset
+from kafka_helpers.kafka_serde_helpers import json_loads
+from kafka_helpers.kafka_statistics_helpers import STATISTICS_REGISTRY
 
 
 def get_kafka_consumer(
@@ -16,7 +22,12 @@ def get_kafka_consumer(
     consumer_group="default",
     timeout=6000,
     offset_start="latest",
-    get_stats=True
+    get_stats=True,
+    stats_interval_ms=100000,
+    config_overrides=None,
+    consumer_class=None,
+    pooled=False,
+    offset_committer=None,
 ):
     """
     Purpose:
@@ -29,7 +40,25 @@ def get_kafka_consumer(
         offset_start (String): Where to start consuming with respect to the consumer
             group/topic offset. Default is "latest", which ignores any messages in the
             topic before the consumer begins consuming
-        get_stats (Bool): Whether or not to print statistics. Default is True
+        get_stats (Bool): Whether or not to collect statistics into the
+            kafka_statistics_helpers.STATISTICS_REGISTRY. Default is True
+        stats_interval_ms (Int): How often librdkafka emits statistics in ms.
+            Default is 100000
+        config_overrides (Dict): librdkafka configuration applied on top of the
+            consumer configuration (e.g. {"enable.auto.commit": False}).
+            Default is None
+        consumer_class (Class): Consumer class to create. Default is the
+            confluent_kafka Consumer (pass FakeKafkaBroker.Consumer to consume
+            from the in-memory fake broker)
+        pooled (Bool): Whether to reuse the open consumer of an earlier call
+            with the same configuration from the process-wide
+            kafka_client_pool_helpers.CLIENT_POOL (the consumer must only be
+            used by one caller at a time). Default is False (a new consumer per
+            call)
+        offset_committer (KafkaOffsetCommitter): Optional
+            kafka_offset_helpers.KafkaOffsetCommitter whose commit strategy
+            configures offset commits (pass the same committer to the consume
+            helpers). Default keeps the librdkafka auto commit
     Return:
         kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
     """
@@ -43,32 +72,170 @@ def get_kafka_consumer(
     }
 
     if get_stats:
-        consumer_configuration["statistics.interval.ms"] = 100000
+        consumer_configuration["statistics.interval.ms"] = stats_interval_ms
         consumer_configuration["stats_cb"] = consumer_statistic_callback
 
+    if offset_committer is not None:
+        consumer_configuration.update(offset_committer.get_consumer_configuration())
+
+    if config_overrides:
+        consumer_configuration.update(config_overrides)
+
     consumer_logger = get_consumer_logger(consumer_group)
 
-    return Consumer(consumer_configuration, logger=consumer_logger)
+    consumer_class = consumer_class or Consumer
+
+    if pooled:
+        return CLIENT_POOL.get_client(
+            "consumer", consumer_configuration, consumer_class, logger=consumer_logger
+        )
+
+    return consumer_class(consumer_configuration, logger=consumer_logger)
 
 
-def consume_topic(kafka_consumer, kafka_topics):
+def consume_topic(
+    kafka_consumer,
+    kafka_topics,
+    message_pipeline=None,
+    stop_event=None,
+    offset_committer=None,
+):
     """
     Purpose:
         Consume Kafka Topics
     Args:
         kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
         kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        message_pipeline (Function): Optional pipeline (see
+            kafka_pipeline_helpers.build_message_pipeline) to run the messages
+            through. Default yields the raw messages
+        stop_event (Event Obj): Optional threading/multiprocessing Event. When
+            set, consuming stops and the consumer is closed
+        offset_committer (KafkaOffsetCommitter): Optional committer the
+            consumer was created with (see poll_topic). With a
+            message_pipeline, messages count as processed once the next
+            pipeline output is requested, up to the offset of the last output
+            on its partition. Messages a stage read ahead or buffered are not
+            reported until an output past them is consumed
+    Yields:
+        msg (Kafka Message Obj): Message Obj returned from the topic, or the
+            output of the message_pipeline if one is passed
+    Raises:
+        UnknownRecordOffset: If offsets are committed for a message_pipeline
+            whose output is not a Kafka Message or KafkaRecord
+    """
+
+    if message_pipeline is None or offset_committer is None:
+        msgs = poll_topic(
+            kafka_consumer,
+            kafka_topics,
+            stop_event=stop_event,
+            offset_committer=offset_committer,
+        )
+        if message_pipeline is not None:
+            msgs = message_pipeline(msgs)
+
+        yield from msgs
+        return
+
+    # Report messages after the pipeline output they lead to is consumed, so
+    # stages that buffer or read ahead do not get them committed early
+    polled_msgs = {}
+
+    def track_polled_messages(msgs):
+        for msg in msgs:
+            polled_msgs.setdefault((msg.topic(), msg.partition()), deque()).append(
+                msg
+            )
+            yield msg
+
+    msgs = poll_topic(
+        kafka_consumer,
+        kafka_topics,
+        stop_event=stop_event,
+        offset_committer=offset_committer,
+        report_processed=False,
+    )
+    try:
+        for output in message_pipeline(track_polled_messages(msgs)):
+            yield output
+            offset_committer.commit_processed(
+                kafka_consumer, pop_processed_messages(polled_msgs, output)
+            )
+    finally:
+        msgs.close()
+
+
+def pop_processed_messages(polled_msgs, output):
+    """
+    Purpose:
+        Pop the polled messages of the partition of a pipeline output, up to
+        and including the offset of the output
+    Args:
+        polled_msgs (Dict): Key is (topic, partition) and value is a deque of
+            the messages polled but not yet reported as processed
+        output (Kafka Message Obj/KafkaRecord): Output of a message pipeline
+    Return:
+        processed_msgs (List of Kafka Message Objs): Processed messages
+    Raises:
+        UnknownRecordOffset: If the output has no topic, partition and offset
+    """
+
+    try:
+        if callable(output.offset):
+            topic, partition, offset = (
+                output.topic(), output.partition(), output.offset()
+            )
+        else:
+            topic, partition, offset = output.topic, output.partition, output.offset
+    except AttributeError:
+        raise UnknownRecordOffset(
+            f"Cannot commit offsets for pipeline output {output!r}, outputs "
+            "must be Kafka Messages or KafkaRecords"
+        )
+
+    partition_msgs = polled_msgs.get((topic, partition), ())
+    processed_msgs = []
+    while partition_msgs and partition_msgs[0].offset() <= offset:
+        processed_msgs.append(partition_msgs.popleft())
+
+    return processed_msgs
+
+
+def poll_topic(
+    kafka_consumer,
+    kafka_topics,
+    stop_event=None,
+    offset_committer=None,
+    report_processed=True,
+):
+    """
+    Purpose:
+        Poll Kafka Topics for messages one at a time. Partition EOF events are
+        skipped and no per-message logging is done
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        stop_event (Event Obj): Optional threading/multiprocessing Event. When
+            set, consuming stops and the consumer is closed
+        offset_committer (KafkaOffsetCommitter): Optional committer the
+            consumer was created with. A message counts as processed once the
+            next message is requested, and pending offsets are committed
+            before partitions are revoked and before the consumer is closed
+        report_processed (Bool): Whether to report messages to the
+            offset_committer. consume_topic reports them itself after its
+            message_pipeline. Default is True
     Yields:
         msg (Kafka Message Obj): Message Obj returned from the topic
     """
     logging.info(f"Consuming Topics {', '.join(kafka_topics)}")
 
     # Subscribe to topics
-    kafka_consumer.subscribe(kafka_topics, on_assign=consumer_assignment_callback)
+    subscribe_topics(kafka_consumer, kafka_topics, offset_committer=offset_committer)
 
-    # Read messages from Kafka, print to stdout
+    # Read messages from Kafka
     try:
-        while True:
+        while stop_event is None or not stop_event.is_set():
             msg = kafka_consumer.poll(timeout=1.0)
             if msg is None:
                 continue
@@ -85,25 +252,218 @@ def consume_topic(kafka_consumer, kafka_topics):
                 else:
                     raise KafkaException(msg.error())
             else:
-                logging.info(
-                    'Got Message from Topic: topic={0}, partition={1}, '
-                    'offset={2}, key={3}, value={4}'.format(
-                        msg.topic(), msg.partition(),
-                        msg.offset(), msg.key(), msg.value()
-                    )
-                )
-                print(
-                    'Key {0} Returned {1}'.format(
-                        msg.key(),
-                        int.from_bytes(msg.value(), byteorder='big')
-                    )
-                )
+                yield msg
+                if offset_committer is not None and report_processed:
+                    offset_committer.commit_processed(kafka_consumer, [msg])
     except KeyboardInterrupt:
         logging.info('Consume Ended By User')
     except KafkaException as err:
         logging.error('KafkaException Raise: {0}'.format(err))
     finally:
-        kafka_consumer.close()
+        close_consumer(kafka_consumer, offset_committer=offset_committer)
+
+
+def consume_topic_batches(
+    kafka_consumer,
+    kafka_topics,
+    batch_size=500,
+    batch_timeout=1000,
+    stop_event=None,
+    batch_decoder=None,
+    offset_committer=None,
+):
+    """
+    Purpose:
+        Consume Kafka Topics in batches. Pulls up to batch_size messages (or waits
+        up to batch_timeout ms) per call into librdkafka instead of polling for a
+        single message at a time
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        batch_size (Int): Max number of messages to return per batch. Default
+            is 500
+        batch_timeout (Int): Max time in ms to wait for a full batch. Default
+            is 1000
+        stop_event (Event Obj): Optional threading/multiprocessing Event. When
+            set, consuming stops and the consumer is closed
+        batch_decoder (Function): Optional function called with each list of
+            messages to decode them in one call (e.g.
+            kafka_serde_helpers.decode_message_batch). Default yields the
+            messages. A batch that fails to decode stops consuming and is not
+            committed, so the consumer must not auto commit the offsets
+            librdkafka stores on consume: create it with
+            {"enable.auto.offset.store": False} (the offsets of handed-out
+            batches are then stored here) or with an offset_committer that
+            does not auto commit
+        offset_committer (KafkaOffsetCommitter): Optional committer the
+            consumer was created with. A batch counts as processed once the
+            next batch is requested, and pending offsets are committed before
+            partitions are revoked and before the consumer is closed
+    Yields:
+        msg_batch (List of Kafka Message Objs): Messages returned from the topic,
+            with partition EOF events removed, or the output of the
+            batch_decoder if one is passed. Empty batches are not yielded
+    Raises:
+        InvalidCommitStrategy: If a batch_decoder is passed and the consumer
+            would auto commit batches that failed to decode
+    """
+    logging.info(
+        f"Consuming Topics {', '.join(kafka_topics)} in Batches of {batch_size}"
+    )
+
+    # Without a committer that turns off auto commit, decoded batches are only
+    # committed once their offsets are stored after they were handed out
+    store_processed = batch_decoder is not None and (
+        offset_committer is None or offset_committer.commit_strategy == "auto"
+    )
+    if store_processed and not has_manual_offset_store(kafka_consumer):
+        raise InvalidCommitStrategy(
+            "Decoded batches need a consumer created with "
+            "enable.auto.offset.store set to False or with an offset_committer "
+            "that does not auto commit"
+        )
+
+    # Subscribe to topics
+    subscribe_topics(kafka_consumer, kafka_topics, offset_committer=offset_committer)
+
+    # Read batches of messages from Kafka
+    try:
+        while stop_event is None or not stop_event.is_set():
+            msg_batch = kafka_consumer.consume(
+                num_messages=batch_size, timeout=batch_timeout / 1000.0
+            )
+            if not msg_batch:
+                continue
+
+            # Hand out the valid messages of the batch before raising its
+            # error, librdkafka has already stored their offsets
+            msg_batch, msg_error = split_message_batch(msg_batch)
+            if msg_batch:
+                if batch_decoder is not None:
+                    yield batch_decoder(msg_batch)
+                else:
+                    yield msg_batch
+                if store_processed:
+                    next_offsets = {}
+                    for msg in msg_batch:
+                        next_offsets[(msg.topic(), msg.partition())] = msg.offset() + 1
+                    store_next_offsets(kafka_consumer, next_offsets)
+                if offset_committer is not None:
+                    offset_committer.commit_processed(kafka_consumer, msg_batch)
+            if msg_error is not None:
+                raise KafkaException(msg_error)
+    except KeyboardInterrupt:
+        logging.info('Consume Ended By User')
+    except KafkaException as err:
+        logging.error('KafkaException Raise: {0}'.format(err))
+    finally:
+        close_consumer(kafka_consumer, offset_committer=offset_committer)
+
+
+def handle_topic_batches(
+    kafka_consumer,
+    kafka_topics,
+    batch_handler,
+    batch_size=500,
+    batch_timeout=1000,
+    stop_event=None,
+    batch_decoder=None,
+    offset_committer=None,
+):
+    """
+    Purpose:
+        Consume Kafka Topics in batches and pass each batch to a handler, so a
+        whole batch is processed with a single Python call
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        batch_handler (Function): Function called with each list of messages
+        batch_size (Int): Max number of messages to return per batch. Default
+            is 500
+        batch_timeout (Int): Max time in ms to wait for a full batch. Default
+            is 1000
+        stop_event (Event Obj): Optional threading/multiprocessing Event. When
+            set, consuming stops and the consumer is closed
+        batch_decoder (Function): Optional function to decode each list of
+            messages before it is passed to the handler (see
+            consume_topic_batches for the consumer configuration it needs)
+        offset_committer (KafkaOffsetCommitter): Optional committer the
+            consumer was created with. Offsets of a batch are committed after
+            the handler returned
+    Return:
+        total_messages (Int): Number of messages passed to the handler
+    Raises:
+        InvalidCommitStrategy: If a batch_decoder is passed and the consumer
+            would auto commit batches that failed to decode
+    """
+
+    total_messages = 0
+    for msg_batch in consume_topic_batches(
+        kafka_consumer,
+        kafka_topics,
+        batch_size=batch_size,
+        batch_timeout=batch_timeout,
+        stop_event=stop_event,
+        batch_decoder=batch_decoder,
+        offset_committer=offset_committer,
+    ):
+        batch_handler(msg_batch)
+        total_messages += len(msg_batch)
+
+    return total_messages
+
+
+def filter_message_batch(msg_batch):
+    """
+    Purpose:
+        Remove error events from a batch of messages. Partition EOF events are
+        dropped, any other error is raised (use split_message_batch to keep
+        the valid messages of a batch holding an error)
+    Args:
+        msg_batch (List of Kafka Message Objs): Messages returned from consume()
+    Return:
+        valid_msgs (List of Kafka Message Objs): Messages without errors
+    Raises:
+        KafkaException: If a message in the batch holds a non-EOF error
+    """
+
+    valid_msgs, msg_error = split_message_batch(msg_batch)
+    if msg_error is not None:
+        raise KafkaException(msg_error)
+
+    return valid_msgs
+
+
+def split_message_batch(msg_batch):
+    """
+    Purpose:
+        Separate the valid messages of a batch from its error events. Partition
+        EOF events are dropped
+    Args:
+        msg_batch (List of Kafka Message Objs): Messages returned from consume()
+    Return:
+        valid_msgs (List of Kafka Message Objs): Every message without an error
+            (including the messages after an error event)
+        msg_error (KafkaError): First non-EOF error of the batch, or None
+    """
+
+    valid_msgs = []
+    first_error = None
+    for msg in msg_batch:
+        msg_error = msg.error()
+        if msg_error is None:
+            valid_msgs.append(msg)
+        elif msg_error.code() == KafkaError._PARTITION_EOF:
+            logging.info(
+                'Reached End of Offset: topic={0}, '
+                'partition={1}, offset={2}'.format(
+                    msg.topic(), msg.partition(), msg.offset()
+                )
+            )
+        elif first_error is None:
+            first_error = msg_error
+
+    return valid_msgs, first_error
 
 
 ###
@@ -111,6 +471,113 @@ def consume_topic(kafka_consumer, kafka_topics):
 ###
 
 
+def subscribe_topics(kafka_consumer, kafka_topics, offset_committer=None):
+    """
+    Purpose:
+        Subscribe to Kafka Topics, committing the pending offsets of an offset
+        committer before partitions are revoked
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        offset_committer (KafkaOffsetCommitter): Optional committer the
+            consumer was created with
+    Return:
+        N/A
+    """
+
+    if offset_committer is None:
+        kafka_consumer.subscribe(kafka_topics, on_assign=consumer_assignment_callback)
+    else:
+        kafka_consumer.subscribe(
+            kafka_topics,
+            on_assign=consumer_assignment_callback,
+            on_revoke=offset_committer.revoke_callback,
+        )
+
+
+def has_manual_offset_store(kafka_consumer):
+    """
+    Purpose:
+        Check if a consumer was created with enable.auto.offset.store set to
+        False, so it only commits offsets stored with store_offsets
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+    Return:
+        has_manual_offset_store (Bool): Whether offsets are stored manually
+    """
+
+    # librdkafka refuses store_offsets when offsets are stored automatically
+    try:
+        kafka_consumer.store_offsets(offsets=[])
+    except KafkaException:
+        return False
+
+    return True
+
+
+def store_next_offsets(kafka_consumer, next_offsets):
+    """
+    Purpose:
+        Store offsets to be committed by the next commit. Offsets of
+        partitions revoked since their messages were consumed are skipped, the
+        new owner of the partition consumes the messages again
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Consumer created with
+            enable.auto.offset.store set to False
+        next_offsets (Dict): Key is (topic, partition) and value is the offset
+            to store
+    Return:
+        N/A
+    Raises:
+        KafkaException: If the offsets cannot be stored for another reason
+    """
+
+    try:
+        kafka_consumer.store_offsets(offsets=[
+            TopicPartition(kafka_topic, partition, offset)
+            for (kafka_topic, partition), offset in next_offsets.items()
+        ])
+    except KafkaException as err:
+        if err.args[0].code() != KafkaError._STATE:
+            raise
+
+        assigned_partitions = {
+            (partition.topic, partition.partition)
+            for partition in kafka_consumer.assignment()
+        }
+        logging.info(
+            "Skipping Offsets of Revoked Partitions: "
+            f"{sorted(set(next_offsets) - assigned_partitions)}"
+        )
+        owned_offsets = [
+            TopicPartition(kafka_topic, partition, offset)
+            for (kafka_topic, partition), offset in next_offsets.items()
+            if (kafka_topic, partition) in assigned_partitions
+        ]
+        if owned_offsets:
+            kafka_consumer.store_offsets(offsets=owned_offsets)
+
+
+def close_consumer(kafka_consumer, offset_committer=None):
+    """
+    Purpose:
+        Commit the pending offsets of an offset committer and close the
+        consumer
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        offset_committer (KafkaOffsetCommitter): Optional committer the
+            consumer was created with
+    Return:
+        N/A
+    """
+
+    try:
+        if offset_committer is not None:
+            offset_committer.commit_pending(kafka_consumer)
+    finally:
+        kafka_consumer.close()
+
+
 def consumer_assignment_callback(consumer, partitions):
     """
 
@@ -122,17 +589,18 @@ def consumer_assignment_callback(consumer, partitions):
 def consumer_statistic_callback(stats_json_str):
     """
     Purpose:
-        Parse CLI arguments for script
+        Consumer stats_cb. Parse the librdkafka statistics and record them in
+        the kafka_statistics_helpers.STATISTICS_REGISTRY
     Args:
-        brokers (List of Strings): List of host:port combinations for kakfa topics
-        consumer_group (String): Something
-        timeout (String): Something
-        offset_start (String): Something
+        stats_json_str (String): librdkafka statistics JSON
     Return:
-        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        stats (Dict): Parsed librdkafka statistics
     """
 
-    return json.loads(stats_json_str)
+    stats = json_loads(stats_json_str)
+    STATISTICS_REGISTRY.record_statistics(stats)
+
+    return stats
 
 
 def get_consumer_logger(logger_name="consumer", log_level=logging.INFO):
@@ -151,10 +619,12 @@ def get_consumer_logger(logger_name="consumer", log_level=logging.INFO):
     # Create logger for consumer (logs will be emitted when poll() is called)
     logger = logging.getLogger(logger_name)
     logger.setLevel(log_level)
-    handler = logging.StreamHandler()
-    handler.setFormatter(
-        logging.Formatter("%(asctime)-15s %(levelname)-8s %(message)s")
-    )
-    logger.addHandler(handler)
+    if not logger.handlers:
+        # Loggers are shared by name, only add the handler once
+        handler = logging.StreamHandler()
+        handler.setFormatter(
+            logging.Formatter("%(asctime)-15s %(levelname)-8s %(message)s")
+        )
+        logger.addHandler(handler)
 
     return logger
@@ -20,9 +20,117 @@ class TopicNotFound(Exception):
     pass
 
 
+class InvalidCommitStrategy(Exception):
+    """
+    Purpose:
+        The InvalidCommitStrategy will be raised when an offset commit strategy
+        is not one of the supported strategies
+    """
+
+    pass
+
+
+class UnknownRecordOffset(Exception):
+    """
+    Purpose:
+        The UnknownRecordOffset will be raised when offsets are committed for a
+        message pipeline whose output does not have the topic, partition and
+        offset of the message it came from
+    """
+
+    pass
+
+
+class SinkFlushError(Exception):
+    """
+    Purpose:
+        The SinkFlushError will be raised when a sink cannot write its buffered
+        records after retrying; the offsets of the records are not committed
+    """
+
+    pass
+
+
 ###
 # Producer Exceptions
 ###
 
+class InvalidProducerProfile(Exception):
+    """
+    Purpose:
+        The InvalidProducerProfile will be raised when attempting to build a
+        producer with a configuration profile that does not exist
+    """
+
+    pass
+
+
+class InvalidCompressionType(Exception):
+    """
+    Purpose:
+        The InvalidCompressionType will be raised when attempting to use a
+        compression codec or level that Kafka does not support
+    """
+
+    pass
+
+
+class InvalidPartitioner(Exception):
+    """
+    Purpose:
+        The InvalidPartitioner will be raised when attempting to produce with a
+        partitioner that does not exist
+    """
+
+    pass
+
+
+###
+# Topic Exceptions
+###
+
 
+class InvalidTopicSpec(Exception):
+    """
+    Purpose:
+        The InvalidTopicSpec will be raised when a desired topic layout is
+        malformed (e.g. a topic without a name or with a non-integer partition
+        count)
+    """
+
+    pass
 
+
+###
+# Serialization Exceptions
+###
+
+
+class SerializationError(Exception):
+    """
+    Purpose:
+        The SerializationError will be raised when a message cannot be
+        serialized or deserialized (e.g. it is not in the expected wire format)
+    """
+
+    pass
+
+
+class SchemaNotFound(Exception):
+    """
+    Purpose:
+        The SchemaNotFound will be raised when a schema or subject does not
+        exist in the schema registry
+    """
+
+    pass
+
+
+class SchemaRegistryError(Exception):
+    """
+    Purpose:
+        The SchemaRegistryError will be raised when a request to the schema
+        registry fails
+    """
+
+    pass
@@ -0,0 +1,1467 @@
+"""
+    Purpose:
+        Kafka Fake Broker.
+
+        This library is an in-memory stand-in for a Kafka cluster, used to
+        benchmark and test the helpers without a live cluster or network. It
+        fakes the Producer, Consumer and AdminClient surface the helpers use:
+        partitioned logs, watermarks, consumer groups with committed offsets
+        and rebalancing, and topic administration.
+
+        Inject it with the client class arguments of the helpers, e.g.
+            fake_broker = FakeKafkaBroker()
+            get_kafka_producer(brokers, producer_class=fake_broker.Producer)
+            get_kafka_consumer(brokers, consumer_class=fake_broker.Consumer)
+            get_kafka_admin_client(brokers, admin_client_class=fake_broker.AdminClient)
+"""
+
+# Python Library Imports
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from confluent_kafka import (
+    KafkaError,
+    KafkaException,
+    OFFSET_BEGINNING,
+    OFFSET_END,
+    OFFSET_INVALID,
+    TIMESTAMP_CREATE_TIME,
+    TIMESTAMP_NOT_AVAILABLE,
+    TopicPartition,
+)
+from confluent_kafka.admin import (
+    BrokerMetadata,
+    ClusterMetadata,
+    ConfigEntry,
+    ListOffsetsResultInfo,
+    PartitionMetadata,
+    TopicMetadata,
+)
+
+
+###
+# Fake Broker
+###
+
+
+class FakeKafkaBroker(object):
+    """
+    Purpose:
+        In-memory Kafka cluster. Holds the topic logs and consumer group state
+        shared by every fake client created from it
+    """
+
+    def __init__(self, num_brokers=1, default_partitions=1, auto_create_topics=True):
+        """
+        Purpose:
+            Initialize the FakeKafkaBroker
+        Args:
+            num_brokers (Int): Number of brokers to report in metadata. Partition
+                leaders and replicas are spread over them. Default is 1
+            default_partitions (Int): Partitions of auto-created topics and of
+                topics created without a partition count. Default is 1
+            auto_create_topics (Bool): Whether producing to or fetching metadata
+                of a missing topic creates it. Default is True
+        Return:
+            N/A
+        """
+
+        self.num_brokers = num_brokers
+        self.default_partitions = default_partitions
+        self.auto_create_topics = auto_create_topics
+        self.topics = {}
+        self.committed_offsets = {}
+        self.group_members = {}
+        self.condition = threading.Condition(threading.RLock())
+
+    ###
+    # Client Factories
+    ###
+
+    def Producer(self, config, **kwargs):
+        """
+        Purpose:
+            Create a FakeProducer on this broker (drop-in for Producer)
+        """
+
+        return FakeProducer(self, config, **kwargs)
+
+    def Consumer(self, config, **kwargs):
+        """
+        Purpose:
+            Create a FakeConsumer on this broker (drop-in for Consumer)
+        """
+
+        return FakeConsumer(self, config, **kwargs)
+
+    def AdminClient(self, config, **kwargs):
+        """
+        Purpose:
+            Create a FakeAdminClient on this broker (drop-in for AdminClient)
+        """
+
+        return FakeAdminClient(self, config, **kwargs)
+
+    ###
+    # Topics
+    ###
+
+    def create_topic(
+        self, topic, num_partitions=None, replication_factor=1, config=None
+    ):
+        """
+        Purpose:
+            Create a topic
+        Args:
+            topic (String): Name of the topic
+            num_partitions (Int): Number of partitions. Default is the broker
+                default_partitions
+            replication_factor (Int): Replication factor. Default is 1
+            config (Dict): Topic configuration. Default is None
+        Return:
+            N/A
+        Raises:
+            KafkaException: If the topic already exists
+        """
+
+        if num_partitions is None or num_partitions < 1:
+            num_partitions = self.default_partitions
+        if replication_factor is None or replication_factor < 1:
+            replication_factor = 1
+
+        with self.condition:
+            if topic in self.topics:
+                raise KafkaException(
+                    KafkaError(
+                        KafkaError.TOPIC_ALREADY_EXISTS,
+                        f"Topic '{topic}' already exists.",
+                    )
+                )
+            self.topics[topic] = {
+                "replication_factor": replication_factor,
+                "config": {key: str(value) for key, value in (config or {}).items()},
+                "partitions": [],
+            }
+            self.add_partitions(topic, num_partitions)
+
+    def add_partitions(self, topic, new_total_count):
+        """
+        Purpose:
+            Grow a topic to new_total_count partitions
+        Args:
+            topic (String): Name of the topic
+            new_total_count (Int): Number of partitions after the change
+        Return:
+            N/A
+        Raises:
+            KafkaException: If the topic does not exist or would shrink
+        """
+
+        with self.condition:
+            topic_state = self.get_topic_state(topic)
+            partitions = topic_state["partitions"]
+            if new_total_count <= len(partitions) and partitions:
+                raise KafkaException(
+                    KafkaError(
+                        KafkaError.INVALID_PARTITIONS,
+                        f"Topic currently has {len(partitions)} partitions, "
+                        f"which is higher than the requested {new_total_count}.",
+                    )
+                )
+
+            replication_factor = min(
+                topic_state["replication_factor"], self.num_brokers
+            )
+            for partition_id in range(len(partitions), new_total_count):
+                replicas = [
+                    (partition_id + replica) % self.num_brokers + 1
+                    for replica in range(replication_factor)
+                ]
+                partitions.append({
+                    "messages": [],
+                    "leader": replicas[0],
+                    "replicas": replicas,
+                    "isrs": list(replicas),
+                })
+
+    def delete_topic(self, topic):
+        """
+        Purpose:
+            Delete a topic and its messages
+        Args:
+            topic (String): Name of the topic
+        Return:
+            N/A
+        Raises:
+            KafkaException: If the topic does not exist
+        """
+
+        with self.condition:
+            self.get_topic_state(topic)
+            del self.topics[topic]
+
+    def get_topic_state(self, topic, create=False):
+        """
+        Purpose:
+            Get the internal state of a topic
+        Args:
+            topic (String): Name of the topic
+            create (Bool): Whether to create the topic if it does not exist and
+                auto_create_topics is enabled. Default is False
+        Return:
+            topic_state (Dict): "replication_factor", "config" and "partitions"
+                (list of dicts with "messages", "leader", "replicas", "isrs")
+        Raises:
+            KafkaException: If the topic does not exist
+        """
+
+        with self.condition:
+            if topic not in self.topics and create and self.auto_create_topics:
+                self.create_topic(topic)
+            if topic not in self.topics:
+                raise KafkaException(
+                    KafkaError(
+                        KafkaError.UNKNOWN_TOPIC_OR_PART,
+                        "Broker: Unknown topic or partition",
+                    )
+                )
+            return self.topics[topic]
+
+    def get_partition_count(self, topic):
+        """
+        Purpose:
+            Get the number of partitions of a topic
+        Args:
+            topic (String): Name of the topic
+        Return:
+            partition_count (Int): Number of partitions
+        """
+
+        return len(self.get_topic_state(topic)["partitions"])
+
+    def append_message(
+        self, topic, partition, key, value, headers=None, timestamp=None
+    ):
+        """
+        Purpose:
+            Append a message to the log of a partition and wake waiting
+            consumers
+        Args:
+            topic (String): Name of the topic
+            partition (Int): Partition to append to
+            key (Bytes): Message key
+            value (Bytes): Message value
+            headers (List of Tuples): Message headers. Default is None
+            timestamp (Int): Message timestamp in ms. Default is now
+        Return:
+            msg (FakeMessage): The appended message
+        """
+
+        with self.condition:
+            messages = self.get_topic_state(topic)["partitions"][partition]["messages"]
+            msg = FakeMessage(
+                topic,
+                partition,
+                len(messages),
+                key,
+                value,
+                headers=headers,
+                timestamp=timestamp or int(time.time() * 1000),
+            )
+            messages.append(msg)
+            self.condition.notify_all()
+
+        return msg
+
+    def get_messages(self, topic, partition=None):
+        """
+        Purpose:
+            Get the messages in a topic (for assertions in tests)
+        Args:
+            topic (String): Name of the topic
+            partition (Int): Only return messages of this partition. Default is
+                None (every partition, in partition order)
+        Return:
+            msgs (List of FakeMessages): Messages in the topic
+        """
+
+        with self.condition:
+            partitions = self.get_topic_state(topic)["partitions"]
+            if partition is not None:
+                return list(partitions[partition]["messages"])
+            return [msg for partition in partitions for msg in partition["messages"]]
+
+    def get_watermark_offsets(self, topic, partition):
+        """
+        Purpose:
+            Get the low and high watermarks of a partition
+        Args:
+            topic (String): Name of the topic
+            partition (Int): Partition of the topic
+        Return:
+            watermarks (Tuple of Ints): (low_watermark, high_watermark)
+        """
+
+        with self.condition:
+            partitions = self.get_topic_state(topic)["partitions"]
+            if partition >= len(partitions):
+                raise KafkaException(KafkaError(KafkaError._UNKNOWN_PARTITION))
+            return 0, len(partitions[partition]["messages"])
+
+    def get_cluster_metadata(self, topic=None):
+        """
+        Purpose:
+            Build confluent_kafka ClusterMetadata for the cluster or one topic
+        Args:
+            topic (String): Only include this topic. Default is None (every
+                topic)
+        Return:
+            cluster_metadata (ClusterMetadata Obj): Cluster metadata
+        """
+
+        cluster_metadata = ClusterMetadata()
+        cluster_metadata.cluster_id = "fake-kafka-cluster"
+        cluster_metadata.controller_id = 1
+        cluster_metadata.orig_broker_id = 1
+        cluster_metadata.orig_broker_name = "fake-broker-1:9092/1"
+        for broker_id in range(1, self.num_brokers + 1):
+            broker_metadata = BrokerMetadata()
+            broker_metadata.id = broker_id
+            broker_metadata.host = f"fake-broker-{broker_id}"
+            broker_metadata.port = 9092
+            cluster_metadata.brokers[broker_id] = broker_metadata
+
+        with self.condition:
+            if topic is None:
+                topic_names = list(self.topics)
+            else:
+                topic_names = [topic]
+                try:
+                    self.get_topic_state(topic, create=True)
+                except KafkaException:
+                    pass
+
+            for topic_name in topic_names:
+                topic_metadata = TopicMetadata()
+                topic_metadata.topic = topic_name
+                topic_state = self.topics.get(topic_name)
+                if topic_state is None:
+                    topic_metadata.error = KafkaError(KafkaError.UNKNOWN_TOPIC_OR_PART)
+                    cluster_metadata.topics[topic_name] = topic_metadata
+                    continue
+                for partition_id, partition_state in enumerate(
+                    topic_state["partitions"]
+                ):
+                    partition_metadata = PartitionMetadata()
+                    partition_metadata.id = partition_id
+                    partition_metadata.leader = partition_state["leader"]
+                    partition_metadata.replicas = list(partition_state["replicas"])
+                    partition_metadata.isrs = list(partition_state["isrs"])
+                    topic_metadata.partitions[partition_id] = partition_metadata
+                cluster_metadata.topics[topic_name] = topic_metadata
+
+        return cluster_metadata
+
+    ###
+    # Consumer Groups
+    ###
+
+    def commit_offsets(self, consumer_group, offsets):
+        """
+        Purpose:
+            Commit offsets for a consumer group
+        Args:
+            consumer_group (String): Consumer group
+            offsets (Dict): Key is (topic, partition) and value is the offset
+        Return:
+            N/A
+        """
+
+        with self.condition:
+            self.committed_offsets.setdefault(consumer_group, {}).update(offsets)
+
+    def get_committed_offset(self, consumer_group, topic, partition):
+        """
+        Purpose:
+            Get the committed offset of a consumer group for a partition
+        Args:
+            consumer_group (String): Consumer group
+            topic (String): Name of the topic
+            partition (Int): Partition of the topic
+        Return:
+            offset (Int): Committed offset, or OFFSET_INVALID if none
+        """
+
+        with self.condition:
+            return self.committed_offsets.get(consumer_group, {}).get(
+                (topic, partition), OFFSET_INVALID
+            )
+
+    def join_group(self, consumer_group, consumer):
+        """
+        Purpose:
+            Add a consumer to a group and rebalance the group
+        Args:
+            consumer_group (String): Consumer group
+            consumer (FakeConsumer): Consumer joining the group
+        Return:
+            N/A
+        """
+
+        with self.condition:
+            members = self.group_members.setdefault(consumer_group, [])
+            if consumer not in members:
+                members.append(consumer)
+            self.rebalance_group(consumer_group)
+
+    def leave_group(self, consumer_group, consumer):
+        """
+        Purpose:
+            Remove a consumer from a group and rebalance the group
+        Args:
+            consumer_group (String): Consumer group
+            consumer (FakeConsumer): Consumer leaving the group
+        Return:
+            N/A
+        """
+
+        with self.condition:
+            members = self.group_members.get(consumer_group, [])
+            if consumer in members:
+                members.remove(consumer)
+            self.rebalance_group(consumer_group)
+
+    def rebalance_group(self, consumer_group):
+        """
+        Purpose:
+            Spread the partitions of the subscribed topics over the members of
+            a group (round robin). Members apply their new assignment on their
+            next poll/consume
+        Args:
+            consumer_group (String): Consumer group
+        Return:
+            N/A
+        """
+
+        with self.condition:
+            members = self.group_members.get(consumer_group, [])
+            assignments = {id(member): [] for member in members}
+
+            subscribed_topics = sorted({
+                topic for member in members for topic in member.subscription
+            })
+            for topic in subscribed_topics:
+                topic_members = [
+                    member for member in members if topic in member.subscription
+                ]
+                try:
+                    partition_count = len(
+                        self.get_topic_state(topic, create=True)["partitions"]
+                    )
+                except KafkaException:
+                    continue
+                for partition_id in range(partition_count):
+                    member = topic_members[partition_id % len(topic_members)]
+                    assignments[id(member)].append((topic, partition_id))
+
+            for member in members:
+                member.pending_assignment = assignments[id(member)]
+            self.condition.notify_all()
+
+
+###
+# Fake Messages
+###
+
+
+class FakeMessage(object):
+    """
+    Purpose:
+        In-memory Kafka Message with the same accessors as confluent_kafka
+        Message
+    """
+
+    __slots__ = (
+        "_topic", "_partition", "_offset", "_key", "_value", "_headers",
+        "_timestamp", "_error",
+    )
+
+    def __init__(
+        self,
+        topic,
+        partition,
+        offset,
+        key,
+        value,
+        headers=None,
+        timestamp=None,
+        error=None,
+    ):
+        self._topic = topic
+        self._partition = partition
+        self._offset = offset
+        self._key = key
+        self._value = value
+        self._headers = headers
+        self._timestamp = timestamp
+        self._error = error
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def key(self):
+        return self._key
+
+    def value(self):
+        return self._value
+
+    def headers(self):
+        return self._headers
+
+    def timestamp(self):
+        if self._timestamp is None:
+            return TIMESTAMP_NOT_AVAILABLE, -1
+        return TIMESTAMP_CREATE_TIME, self._timestamp
+
+    def error(self):
+        return self._error
+
+    def __len__(self):
+        return len(self._value) if self._value is not None else 0
+
+
+###
+# Fake Producer
+###
+
+
+class FakeProducer(object):
+    """
+    Purpose:
+        In-memory Producer. Messages are queued by produce() (raising
+        BufferError when queue.buffering.max.messages is reached) and appended
+        to the broker logs when poll() or flush() serves delivery reports.
+        With a transactional.id, messages produced in a transaction are only
+        appended (and their delivery reports served) when the transaction is
+        committed, together with the offsets sent to the transaction
+    """
+
+    def __init__(self, broker, config, **kwargs):
+        """
+        Purpose:
+            Initialize the FakeProducer
+        Args:
+            broker (FakeKafkaBroker): Broker to produce to
+            config (Dict): Producer configuration
+        Return:
+            N/A
+        """
+
+        self.broker = broker
+        self.config = dict(config)
+        self.max_queued_messages = int(
+            self.config.get("queue.buffering.max.messages", 100000)
+        )
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.round_robin_counter = 0
+
+        self.transactional_id = self.config.get("transactional.id")
+        self.transactions_initialized = False
+        self.in_transaction = False
+        self.transaction_messages = []
+        self.transaction_offsets = {}
+
+    def __len__(self):
+        return len(self.queue) + len(self.transaction_messages)
+
+    def produce(
+        self,
+        topic,
+        value=None,
+        key=None,
+        partition=-1,
+        on_delivery=None,
+        callback=None,
+        timestamp=0,
+        headers=None,
+    ):
+        """
+        Purpose:
+            Queue a message for delivery
+        """
+
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+
+        with self.condition:
+            if len(self.queue) >= self.max_queued_messages:
+                raise BufferError("Local: Queue full")
+            self.queue.append((
+                topic, value, key, partition, callback or on_delivery,
+                timestamp, headers,
+            ))
+            self.condition.notify_all()
+
+    def poll(self, timeout=None):
+        """
+        Purpose:
+            Deliver the queued messages and serve their delivery reports,
+            waiting up to timeout seconds for a message to be queued
+        Return:
+            served (Int): Number of delivery reports served
+        """
+
+        with self.condition:
+            if not self.queue and timeout:
+                self.condition.wait(None if timeout < 0 else timeout)
+            queued_messages, self.queue = self.queue, deque()
+            if self.in_transaction:
+                # Delivered when the transaction commits
+                self.transaction_messages.extend(queued_messages)
+                return 0
+
+        for queued_message in queued_messages:
+            self.deliver(*queued_message)
+
+        return len(queued_messages)
+
+    def flush(self, timeout=None):
+        """
+        Purpose:
+            Deliver every queued message
+        Return:
+            pending (Int): Number of messages still queued (always 0)
+        """
+
+        self.poll(0)
+        return len(self)
+
+    def deliver(self, topic, value, key, partition, callback, timestamp, headers):
+        """
+        Purpose:
+            Append a queued message to the broker and call its delivery callback
+        """
+
+        err = None
+        try:
+            partition_count = len(
+                self.broker.get_topic_state(topic, create=True)["partitions"]
+            )
+            if partition is None or partition < 0:
+                partition = self.get_partition(key, partition_count)
+            if partition >= partition_count:
+                raise KafkaException(KafkaError(KafkaError._UNKNOWN_PARTITION))
+            msg = self.append(topic, partition, key, value, headers, timestamp)
+        except KafkaException as kafka_err:
+            err = kafka_err.args[0]
+            msg = FakeMessage(topic, partition, OFFSET_INVALID, key, value, error=err)
+
+        if callback is not None:
+            callback(err, msg)
+
+    def append(self, topic, partition, key, value, headers, timestamp):
+        """
+        Purpose:
+            Append a delivered message to the broker log
+        """
+
+        return self.broker.append_message(
+            topic, partition, key, value, headers=headers, timestamp=timestamp
+        )
+
+    def get_partition(self, key, partition_count):
+        """
+        Purpose:
+            Pick a partition for a message without an explicit partition. Keyed
+            messages are hashed, unkeyed messages are spread round robin
+        """
+
+        if key is not None:
+            return zlib.crc32(key) % partition_count
+
+        self.round_robin_counter += 1
+        return self.round_robin_counter % partition_count
+
+    def list_topics(self, topic=None, timeout=-1):
+        """
+        Purpose:
+            Get cluster metadata (see FakeKafkaBroker.get_cluster_metadata)
+        """
+
+        return self.broker.get_cluster_metadata(topic)
+
+    ###
+    # Transactions
+    ###
+
+    def init_transactions(self, timeout=None):
+        """
+        Purpose:
+            Initialize transactions (requires a transactional.id)
+        """
+
+        self.check_transaction_state(True)
+        self.transactions_initialized = True
+
+    def begin_transaction(self):
+        """
+        Purpose:
+            Begin a transaction
+        """
+
+        self.check_transaction_state(
+            self.transactions_initialized and not self.in_transaction
+        )
+        self.flush()
+        self.in_transaction = True
+
+    def send_offsets_to_transaction(self, positions, group_metadata, timeout=None):
+        """
+        Purpose:
+            Add consumer offsets to the transaction, committed with it
+        """
+
+        self.check_transaction_state(self.in_transaction)
+        self.transaction_offsets.setdefault(group_metadata, {}).update({
+            (position.topic, position.partition): position.offset
+            for position in positions
+        })
+
+    def commit_transaction(self, timeout=None):
+        """
+        Purpose:
+            Append the messages of the transaction to the broker, serve their
+            delivery reports and commit the offsets of the transaction
+        """
+
+        self.check_transaction_state(self.in_transaction)
+        with self.condition:
+            queued_messages, self.queue = self.queue, deque()
+            transaction_messages = self.transaction_messages + list(queued_messages)
+            transaction_offsets = self.transaction_offsets
+            self.transaction_messages, self.transaction_offsets = [], {}
+            self.in_transaction = False
+
+        for transaction_message in transaction_messages:
+            self.deliver(*transaction_message)
+        for consumer_group, offsets in transaction_offsets.items():
+            self.broker.commit_offsets(consumer_group, offsets)
+
+    def abort_transaction(self, timeout=None):
+        """
+        Purpose:
+            Discard the messages and offsets of the transaction. Delivery
+            reports of the messages are served with a purge error
+        """
+
+        self.check_transaction_state(self.in_transaction)
+        with self.condition:
+            queued_messages, self.queue = self.queue, deque()
+            transaction_messages = self.transaction_messages + list(queued_messages)
+            self.transaction_messages, self.transaction_offsets = [], {}
+            self.in_transaction = False
+
+        err = KafkaError(KafkaError._PURGE_QUEUE)
+        for topic, value, key, partition, callback, _, _ in transaction_messages:
+            if callback is not None:
+                callback(err, FakeMessage(
+                    topic, partition, OFFSET_INVALID, key, value, error=err
+                ))
+
+    def check_transaction_state(self, valid_state):
+        """
+        Purpose:
+            Raise the same errors as confluent_kafka for a transactional call
+            without a transactional.id or in the wrong state
+        """
+
+        if self.transactional_id is None:
+            raise KafkaException(KafkaError(
+                KafkaError._NOT_CONFIGURED,
+                "The Transactional API requires transactional.id to be configured",
+            ))
+        if not valid_state:
+            raise KafkaException(KafkaError(
+                KafkaError._STATE, "Operation not valid in the current state"
+            ))
+
+
+###
+# Fake Consumer
+###
+
+
+def get_config_bool(config, key, default):
+    """
+    Purpose:
+        Read a boolean librdkafka setting that may be a bool or a string
+    """
+
+    value = config.get(key, default)
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+class FakeConsumer(object):
+    """
+    Purpose:
+        In-memory Consumer. Supports subscribe (with group rebalancing and
+        on_assign/on_revoke callbacks) and assign, poll/consume, partition EOF
+        events, auto and manual commits, offset storage, committed offsets,
+        positions, seeking and watermarks
+    """
+
+    def __init__(self, broker, config, logger=None, **kwargs):
+        """
+        Purpose:
+            Initialize the FakeConsumer
+        Args:
+            broker (FakeKafkaBroker): Broker to consume from
+            config (Dict): Consumer configuration
+            logger (Logger Obj): Ignored, accepted for compatibility
+        Return:
+            N/A
+        """
+
+        self.broker = broker
+        self.config = dict(config)
+        self.consumer_group = self.config.get("group.id")
+        self.auto_offset_reset = self.config.get("auto.offset.reset", "latest")
+        self.enable_auto_commit = get_config_bool(
+            self.config, "enable.auto.commit", True
+        )
+        self.enable_auto_offset_store = get_config_bool(
+            self.config, "enable.auto.offset.store", True
+        )
+        self.enable_partition_eof = get_config_bool(
+            self.config, "enable.partition.eof", False
+        )
+        self.on_commit = self.config.get("on_commit")
+
+        self.subscription = []
+        self.on_assign = None
+        self.on_revoke = None
+        self.pending_assignment = None
+        self.positions = {}
+        self.stored_offsets = {}
+        self.paused = set()
+        self.eof_reported = set()
+        self.closed = False
+
+    ###
+    # Assignment
+    ###
+
+    def subscribe(self, topics, on_assign=None, on_revoke=None, on_lost=None):
+        """
+        Purpose:
+            Subscribe to topics and join the consumer group
+        """
+
+        self.check_open()
+        self.subscription = list(topics)
+        self.on_assign = on_assign
+        self.on_revoke = on_revoke
+        self.broker.join_group(self.consumer_group, self)
+
+    def unsubscribe(self):
+        """
+        Purpose:
+            Leave the consumer group
+        """
+
+        self.subscription = []
+        self.broker.leave_group(self.consumer_group, self)
+        self.apply_rebalance()
+
+    def assign(self, partitions):
+        """
+        Purpose:
+            Manually assign partitions (offsets on the partitions are used as
+            the starting positions when set)
+        """
+
+        self.check_open()
+        with self.broker.condition:
+            self.positions = {}
+            for partition in partitions:
+                partition_key = (partition.topic, partition.partition)
+                self.positions[partition_key] = self.get_start_offset(
+                    partition_key, partition.offset
+                )
+
+    def unassign(self):
+        """
+        Purpose:
+            Remove the current assignment
+        """
+
+        self.positions = {}
+
+    def assignment(self):
+        """
+        Purpose:
+            Get the current assignment
+        """
+
+        self.check_open()
+        return [TopicPartition(*partition_key) for partition_key in self.positions]
+
+    def apply_rebalance(self):
+        """
+        Purpose:
+            Apply an assignment computed by the broker, calling the on_revoke
+            and on_assign callbacks
+        """
+
+        with self.broker.condition:
+            if self.pending_assignment is None:
+                return
+            new_assignment = self.pending_assignment
+            self.pending_assignment = None
+
+        if self.positions and self.on_revoke is not None:
+            self.on_revoke(self, self.assignment())
+        if self.enable_auto_commit:
+            self.commit_stored_offsets()
+
+        with self.broker.condition:
+            self.positions = {
+                partition_key: self.get_start_offset(partition_key)
+                for partition_key in new_assignment
+            }
+            self.stored_offsets = {}
+            self.eof_reported = set()
+
+        if self.on_assign is not None:
+            self.on_assign(self, self.assignment())
+
+    def get_start_offset(self, partition_key, offset=OFFSET_INVALID):
+        """
+        Purpose:
+            Resolve where to start consuming a partition from an explicit
+            offset, the committed offset or auto.offset.reset
+        """
+
+        low_watermark, high_watermark = self.broker.get_watermark_offsets(
+            *partition_key
+        )
+        if offset == OFFSET_BEGINNING:
+            return low_watermark
+        if offset == OFFSET_END:
+            return high_watermark
+        if offset is not None and offset >= 0:
+            return offset
+
+        committed_offset = self.broker.get_committed_offset(
+            self.consumer_group, *partition_key
+        )
+        if committed_offset >= 0:
+            return committed_offset
+        if self.auto_offset_reset in ("earliest", "smallest", "beginning"):
+            return low_watermark
+        return high_watermark
+
+    ###
+    # Consuming
+    ###
+
+    def poll(self, timeout=None):
+        """
+        Purpose:
+            Consume a single message, waiting up to timeout seconds
+        """
+
+        msgs = self.consume(num_messages=1, timeout=-1 if timeout is None else timeout)
+        return msgs[0] if msgs else None
+
+    def consume(self, num_messages=1, timeout=-1):
+        """
+        Purpose:
+            Consume up to num_messages messages, waiting up to timeout seconds
+            for the first message
+        """
+
+        self.check_open()
+        deadline = None if timeout is None or timeout < 0 else time.time() + timeout
+
+        while True:
+            self.apply_rebalance()
+            with self.broker.condition:
+                msgs = self.fetch(num_messages)
+                if not msgs:
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        return []
+                    self.broker.condition.wait(remaining)
+                    continue
+
+            if self.enable_auto_commit:
+                self.commit_stored_offsets()
+            return msgs
+
+    def fetch(self, num_messages):
+        """
+        Purpose:
+            Read messages from the assigned partitions at their positions
+        """
+
+        msgs = []
+        for partition_key, position in list(self.positions.items()):
+            if partition_key in self.paused:
+                continue
+            try:
+                partition_messages = self.broker.get_topic_state(
+                    partition_key[0]
+                )["partitions"][partition_key[1]]["messages"]
+            except (KafkaException, IndexError):
+                continue
+
+            new_messages = partition_messages[position:position + num_messages - len(msgs)]
+            if new_messages:
+                msgs.extend(new_messages)
+                position = new_messages[-1].offset() + 1
+                self.positions[partition_key] = position
+                if self.enable_auto_offset_store:
+                    self.stored_offsets[partition_key] = position
+                self.eof_reported.discard(partition_key)
+
+            if (
+                self.enable_partition_eof
+                and position >= len(partition_messages)
+                and partition_key not in self.eof_reported
+                and len(msgs) < num_messages
+            ):
+                self.eof_reported.add(partition_key)
+                msgs.append(FakeMessage(
+                    partition_key[0],
+                    partition_key[1],
+                    position,
+                    None,
+                    None,
+                    error=KafkaError(KafkaError._PARTITION_EOF),
+                ))
+
+            if len(msgs) >= num_messages:
+                break
+
+        return msgs
+
+    def pause(self, partitions):
+        """
+        Purpose:
+            Pause fetching from partitions
+        """
+
+        self.paused.update(
+            (partition.topic, partition.partition) for partition in partitions
+        )
+
+    def resume(self, partitions):
+        """
+        Purpose:
+            Resume fetching from partitions
+        """
+
+        self.paused.difference_update(
+            (partition.topic, partition.partition) for partition in partitions
+        )
+
+    def seek(self, partition):
+        """
+        Purpose:
+            Move the position of an assigned partition
+        """
+
+        partition_key = (partition.topic, partition.partition)
+        with self.broker.condition:
+            self.positions[partition_key] = self.get_start_offset(
+                partition_key, partition.offset
+            )
+            self.eof_reported.discard(partition_key)
+
+    ###
+    # Offsets
+    ###
+
+    def commit(self, message=None, offsets=None, asynchronous=True):
+        """
+        Purpose:
+            Commit a message, a list of offsets or the stored offsets
+        """
+
+        self.check_open()
+        if message is not None:
+            commit_offsets = {
+                (message.topic(), message.partition()): message.offset() + 1
+            }
+        elif offsets is not None:
+            commit_offsets = {
+                (offset.topic, offset.partition): offset.offset for offset in offsets
+            }
+        else:
+            commit_offsets = dict(self.stored_offsets)
+            if not commit_offsets:
+                raise KafkaException(KafkaError(KafkaError._NO_OFFSET))
+
+        self.broker.commit_offsets(self.consumer_group, commit_offsets)
+
+        committed_partitions = [
+            TopicPartition(topic, partition, offset)
+            for (topic, partition), offset in commit_offsets.items()
+        ]
+        if self.on_commit is not None:
+            self.on_commit(None, committed_partitions)
+
+        return None if asynchronous else committed_partitions
+
+    def commit_stored_offsets(self):
+        """
+        Purpose:
+            Commit stored offsets that have not been committed (auto commit)
+        """
+
+        uncommitted_offsets = {
+            partition_key: offset
+            for partition_key, offset in self.stored_offsets.items()
+            if self.broker.get_committed_offset(self.consumer_group, *partition_key)
+            != offset
+        }
+        if uncommitted_offsets:
+            self.broker.commit_offsets(self.consumer_group, uncommitted_offsets)
+
+    def store_offsets(self, message=None, offsets=None):
+        """
+        Purpose:
+            Store offsets to be committed by the next commit (requires
+            enable.auto.offset.store=false)
+        """
+
+        if self.enable_auto_offset_store:
+            raise KafkaException(KafkaError(
+                KafkaError._INVALID_ARG,
+                "Operation not allowed when enable.auto.offset.store=true",
+            ))
+
+        store_offsets = {
+            (offset.topic, offset.partition): offset.offset for offset in offsets or ()
+        }
+        if message is not None:
+            store_offsets[(message.topic(), message.partition())] = message.offset() + 1
+
+        # Like librdkafka, offsets of unassigned partitions are not stored and
+        # the call fails when none of the offsets could be stored
+        assigned_offsets = {
+            partition_key: offset
+            for partition_key, offset in store_offsets.items()
+            if partition_key in self.positions
+        }
+        if store_offsets and not assigned_offsets:
+            raise KafkaException(KafkaError(
+                KafkaError._STATE, "Partitions are not assigned"
+            ))
+        self.stored_offsets.update(assigned_offsets)
+
+    def committed(self, partitions, timeout=None):
+        """
+        Purpose:
+            Get the committed offsets of the group for partitions
+        """
+
+        self.check_open()
+        return [
+            TopicPartition(
+                partition.topic,
+                partition.partition,
+                self.broker.get_committed_offset(
+                    self.consumer_group, partition.topic, partition.partition
+                ),
+            )
+            for partition in partitions
+        ]
+
+    def position(self, partitions):
+        """
+        Purpose:
+            Get the current positions of partitions
+        """
+
+        return [
+            TopicPartition(
+                partition.topic,
+                partition.partition,
+                self.positions.get(
+                    (partition.topic, partition.partition), OFFSET_INVALID
+                ),
+            )
+            for partition in partitions
+        ]
+
+    def get_watermark_offsets(self, partition, timeout=None, cached=False):
+        """
+        Purpose:
+            Get the low and high watermarks of a partition
+        """
+
+        return self.broker.get_watermark_offsets(partition.topic, partition.partition)
+
+    def list_topics(self, topic=None, timeout=-1):
+        """
+        Purpose:
+            Get cluster metadata (see FakeKafkaBroker.get_cluster_metadata)
+        """
+
+        return self.broker.get_cluster_metadata(topic)
+
+    def memberid(self):
+        """
+        Purpose:
+            Get the group member id of the consumer
+        """
+
+        return f"{self.consumer_group}-{id(self)}"
+
+    def consumer_group_metadata(self):
+        """
+        Purpose:
+            Get the group metadata passed to send_offsets_to_transaction (the
+            consumer group, opaque to callers)
+        """
+
+        self.check_open()
+        return self.consumer_group
+
+    def close(self):
+        """
+        Purpose:
+            Commit stored offsets (if auto committing) and leave the group
+        """
+
+        if self.closed:
+            return
+        if self.enable_auto_commit:
+            self.commit_stored_offsets()
+        if self.subscription:
+            self.broker.leave_group(self.consumer_group, self)
+        self.closed = True
+
+    def check_open(self):
+        """
+        Purpose:
+            Raise the same error as confluent_kafka when the consumer is closed
+        """
+
+        if self.closed:
+            raise RuntimeError("Consumer closed")
+
+
+###
+# Fake Admin Client
+###
+
+
+class FakeAdminClient(object):
+    """
+    Purpose:
+        In-memory AdminClient. Operations are applied immediately and return
+        resolved futures, like the confluent_kafka AdminClient
+    """
+
+    def __init__(self, broker, config, **kwargs):
+        """
+        Purpose:
+            Initialize the FakeAdminClient
+        Args:
+            broker (FakeKafkaBroker): Broker to administer
+            config (Dict): Admin client configuration
+        Return:
+            N/A
+        """
+
+        self.broker = broker
+        self.config = dict(config)
+
+    def list_topics(self, topic=None, timeout=-1):
+        """
+        Purpose:
+            Get cluster metadata (see FakeKafkaBroker.get_cluster_metadata)
+        """
+
+        return self.broker.get_cluster_metadata(topic)
+
+    def create_topics(self, new_topics, validate_only=False, **kwargs):
+        """
+        Purpose:
+            Create topics from NewTopic objects
+        """
+
+        def create_topic(new_topic):
+            if validate_only:
+                if new_topic.topic in self.broker.topics:
+                    raise KafkaException(KafkaError(KafkaError.TOPIC_ALREADY_EXISTS))
+                return None
+            self.broker.create_topic(
+                new_topic.topic,
+                num_partitions=new_topic.num_partitions,
+                replication_factor=new_topic.replication_factor,
+                config=new_topic.config,
+            )
+
+        return {
+            new_topic.topic: get_resolved_future(create_topic, new_topic)
+            for new_topic in new_topics
+        }
+
+    def delete_topics(self, topics, **kwargs):
+        """
+        Purpose:
+            Delete topics by name
+        """
+
+        return {
+            topic: get_resolved_future(self.broker.delete_topic, topic)
+            for topic in topics
+        }
+
+    def create_partitions(self, new_partitions, validate_only=False, **kwargs):
+        """
+        Purpose:
+            Grow topics from NewPartitions objects
+        """
+
+        def create_partitions(new_partition):
+            if validate_only:
+                return None
+            self.broker.add_partitions(
+                new_partition.topic, new_partition.new_total_count
+            )
+
+        return {
+            new_partition.topic: get_resolved_future(create_partitions, new_partition)
+            for new_partition in new_partitions
+        }
+
+    def describe_configs(self, resources, **kwargs):
+        """
+        Purpose:
+            Describe topic configurations (only explicitly set configs are
+            reported)
+        """
+
+        def describe_config(resource):
+            topic_config = self.broker.get_topic_state(resource.name)["config"]
+            return {
+                name: ConfigEntry(name, value) for name, value in topic_config.items()
+            }
+
+        return {
+            resource: get_resolved_future(describe_config, resource)
+            for resource in resources
+        }
+
+    def alter_configs(self, resources, validate_only=False, **kwargs):
+        """
+        Purpose:
+            Replace topic configurations with the resources set_config
+        """
+
+        def alter_config(resource):
+            topic_state = self.broker.get_topic_state(resource.name)
+            if not validate_only:
+                topic_state["config"] = {
+                    name: str(value)
+                    for name, value in resource.set_config_dict.items()
+                }
+
+        return {
+            resource: get_resolved_future(alter_config, resource)
+            for resource in resources
+        }
+
+    def incremental_alter_configs(self, resources, validate_only=False, **kwargs):
+        """
+        Purpose:
+            Apply SET and DELETE operations to topic configurations
+        """
+        from confluent_kafka.admin import AlterConfigOpType
+
+        def incremental_alter_config(resource):
+            topic_state = self.broker.get_topic_state(resource.name)
+            if validate_only:
+                return
+            for config_entry in resource.incremental_configs:
+                if config_entry.incremental_operation == AlterConfigOpType.DELETE:
+                    topic_state["config"].pop(config_entry.name, None)
+                else:
+                    topic_state["config"][config_entry.name] = str(config_entry.value)
+
+        return {
+            resource: get_resolved_future(incremental_alter_config, resource)
+            for resource in resources
+        }
+
+    def list_offsets(self, topic_partition_offsets, **kwargs):
+        """
+        Purpose:
+            Get the earliest or latest offsets of partitions
+        """
+        from confluent_kafka.admin import OffsetSpec
+
+        earliest_spec = type(OffsetSpec.earliest())
+
+        def list_offset(topic_partition, offset_spec):
+            low_watermark, high_watermark = self.broker.get_watermark_offsets(
+                topic_partition.topic, topic_partition.partition
+            )
+            offset = (
+                low_watermark if isinstance(offset_spec, earliest_spec)
+                else high_watermark
+            )
+            return ListOffsetsResultInfo(offset, -1, -1)
+
+        return {
+            topic_partition: get_resolved_future(
+                list_offset, topic_partition, offset_spec
+            )
+            for topic_partition, offset_spec in topic_partition_offsets.items()
+        }
+
+    def poll(self, timeout=None):
+        """
+        Purpose:
+            Serve callbacks (no-op, operations complete immediately)
+        """
+
+        return 0
+
+
+def get_resolved_future(function, *args):
+    """
+    Purpose:
+        Run a function and return a future holding its result or exception
+    Args:
+        function (Function): Function to run
+        args (Any): Arguments for the function
+    Return:
+        future (Future Obj): Resolved future
+    """
+
+    future = Future()
+    try:
+        future.set_result(function(*args))
+    except Exception as err:
+        future.set_exception(err)
+
+    return future
@@ -0,0 +1,237 @@
+"""
+    Purpose:
+        Kafka Lag Helpers.
+
+        This library is used to measure how far a consumer group is behind the
+        topics it consumes. Committed offsets and watermarks are fetched for
+        every partition in bulk requests and compared to get per-partition,
+        per-topic and total lag, either once or as a periodic sample.
+"""
+
+# Python Library Imports
+import logging
+import time
+from confluent_kafka import TopicPartition
+from confluent_kafka.admin import OffsetSpec
+
+
+###
+# Lag Helpers
+###
+
+
+def get_consumer_group_lag(kafka_consumer, kafka_topics, kafka_admin_client, timeout=10):
+    """
+    Purpose:
+        Get the lag of a consumer group for a set of topics. The consumer does
+        not need to be subscribed, it only needs to be created with the group.id
+        of the group to measure (see kafka_consumer_helpers.get_kafka_consumer)
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object in the group
+        kafka_topics (List of Strings): List of Kafka Topics to get lag for
+        kafka_admin_client (Kafka Admin Client Obj): Admin Client used to fetch
+            the watermarks of all partitions with two bulk list_offsets requests
+            (see kafka_admin_helpers.get_kafka_admin_client)
+        timeout (Float): Timeout in seconds for each request. Default is 10
+    Return:
+        consumer_group_lag (Dict): "partitions" keyed by (topic, partition) with
+            the "committed_offset", "low_watermark", "high_watermark" and "lag"
+            of each partition, "topics" keyed by topic with the topic lag, and
+            "total_lag". Partitions with no committed offset count the whole
+            retained log as lag
+    """
+
+    topic_partitions = get_topic_partitions(kafka_consumer, kafka_topics, timeout)
+
+    committed_offsets = {
+        (topic_partition.topic, topic_partition.partition): topic_partition.offset
+        for topic_partition in kafka_consumer.committed(
+            topic_partitions, timeout=timeout
+        )
+    }
+
+    watermarks = get_watermarks_bulk(kafka_admin_client, topic_partitions, timeout)
+
+    consumer_group_lag = {
+        "partitions": {},
+        "topics": {kafka_topic: 0 for kafka_topic in kafka_topics},
+        "total_lag": 0,
+    }
+    for partition_key, (low_watermark, high_watermark) in watermarks.items():
+        committed_offset = committed_offsets.get(partition_key, -1)
+        if committed_offset >= 0:
+            lag = max(high_watermark - committed_offset, 0)
+        else:
+            lag = max(high_watermark - low_watermark, 0)
+
+        consumer_group_lag["partitions"][partition_key] = {
+            "committed_offset": committed_offset,
+            "low_watermark": low_watermark,
+            "high_watermark": high_watermark,
+            "lag": lag,
+        }
+        consumer_group_lag["topics"][partition_key[0]] += lag
+        consumer_group_lag["total_lag"] += lag
+
+    return consumer_group_lag
+
+
+def monitor_consumer_group_lag(
+    kafka_consumer,
+    kafka_topics,
+    kafka_admin_client,
+    sample_interval=30,
+    max_samples=None,
+    timeout=10,
+):
+    """
+    Purpose:
+        Periodically sample the lag of a consumer group. Each sample includes
+        the rate the total lag is changing at, which is positive when the group
+        is falling behind (useful for autoscaling decisions)
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object in the group
+        kafka_topics (List of Strings): List of Kafka Topics to get lag for
+        kafka_admin_client (Kafka Admin Client Obj): Admin Client used to fetch
+            watermarks in bulk (see get_consumer_group_lag)
+        sample_interval (Float): Seconds between samples. Default is 30
+        max_samples (Int): Number of samples to take before stopping. Default
+            is None (sample until the generator is closed)
+        timeout (Float): Timeout in seconds for each request. Default is 10
+    Yields:
+        consumer_group_lag (Dict): Output of get_consumer_group_lag with the
+            sample "timestamp" and "lag_rate" (change in total lag per second,
+            None for the first sample)
+    """
+    logging.info(f"Monitoring Consumer Lag for Topics {', '.join(kafka_topics)}")
+
+    previous_lag = None
+    samples = 0
+    while max_samples is None or samples < max_samples:
+        if samples:
+            time.sleep(sample_interval)
+
+        consumer_group_lag = get_consumer_group_lag(
+            kafka_consumer,
+            kafka_topics,
+            kafka_admin_client=kafka_admin_client,
+            timeout=timeout,
+        )
+        consumer_group_lag["timestamp"] = time.time()
+        consumer_group_lag["lag_rate"] = None
+        if previous_lag is not None:
+            elapsed = consumer_group_lag["timestamp"] - previous_lag["timestamp"]
+            if elapsed > 0:
+                consumer_group_lag["lag_rate"] = (
+                    consumer_group_lag["total_lag"] - previous_lag["total_lag"]
+                ) / elapsed
+
+        previous_lag = consumer_group_lag
+        samples += 1
+        yield consumer_group_lag
+
+
+###
+# Offset Helpers
+###
+
+
+def get_topic_partitions(kafka_client, kafka_topics, timeout=10):
+    """
+    Purpose:
+        Get every partition of a set of topics from a single metadata request
+    Args:
+        kafka_client (Kafka Consumer/Admin Client Obj): Client to fetch
+            metadata with
+        kafka_topics (List of Strings): List of Kafka Topics
+        timeout (Float): Timeout in seconds for the request. Default is 10
+    Return:
+        topic_partitions (List of TopicPartitions): Partitions of the topics
+    """
+
+    if len(kafka_topics) == 1:
+        cluster_metadata = kafka_client.list_topics(
+            topic=kafka_topics[0], timeout=timeout
+        )
+    else:
+        cluster_metadata = kafka_client.list_topics(timeout=timeout)
+
+    topic_partitions = []
+    for kafka_topic in kafka_topics:
+        topic_metadata = cluster_metadata.topics.get(kafka_topic)
+        if topic_metadata is None:
+            logging.warning(f"Topic {kafka_topic} Not Found, Skipping Lag")
+            continue
+        for partition_id in sorted(topic_metadata.partitions):
+            topic_partitions.append(TopicPartition(kafka_topic, partition_id))
+
+    return topic_partitions
+
+
+def get_watermarks(kafka_consumer, topic_partitions, timeout=10):
+    """
+    Purpose:
+        Get the low and high watermarks of partitions with a consumer. This
+        makes one request per partition, get_consumer_group_lag uses
+        get_watermarks_bulk instead
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+        topic_partitions (List of TopicPartitions): Partitions to query
+        timeout (Float): Timeout in seconds for each request. Default is 10
+    Return:
+        watermarks (Dict): Key is (topic, partition) and value is a tuple of
+            (low_watermark, high_watermark)
+    """
+
+    return {
+        (topic_partition.topic, topic_partition.partition):
+            kafka_consumer.get_watermark_offsets(topic_partition, timeout=timeout)
+        for topic_partition in topic_partitions
+    }
+
+
+def get_watermarks_bulk(kafka_admin_client, topic_partitions, timeout=10):
+    """
+    Purpose:
+        Get the low and high watermarks of partitions with two bulk
+        list_offsets requests (earliest and latest) and wait on the results
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj
+        topic_partitions (List of TopicPartitions): Partitions to query
+        timeout (Float): Timeout in seconds for each request. Default is 10
+    Return:
+        watermarks (Dict): Key is (topic, partition) and value is a tuple of
+            (low_watermark, high_watermark)
+    """
+
+    if not topic_partitions:
+        return {}
+
+    earliest_futures = kafka_admin_client.list_offsets(
+        {
+            topic_partition: OffsetSpec.earliest()
+            for topic_partition in topic_partitions
+        },
+        request_timeout=timeout,
+    )
+    latest_futures = kafka_admin_client.list_offsets(
+        {
+            topic_partition: OffsetSpec.latest()
+            for topic_partition in topic_partitions
+        },
+        request_timeout=timeout,
+    )
+
+    low_watermarks = {
+        (topic_partition.topic, topic_partition.partition):
+            future.result(timeout=timeout).offset
+        for topic_partition, future in earliest_futures.items()
+    }
+
+    return {
+        (topic_partition.topic, topic_partition.partition): (
+            low_watermarks[(topic_partition.topic, topic_partition.partition)],
+            future.result(timeout=timeout).offset,
+        )
+        for topic_partition, future in latest_futures.items()
+    }
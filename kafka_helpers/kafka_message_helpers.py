@@ -0,0 +1,234 @@
+"""
+    Purpose:
+        Kafka Message Helpers.
+
+        This library is used to access consumed messages without copying their
+        payloads. Messages are turned into slotted KafkaMessageViews that hold
+        the key and value as memoryviews over the message buffers, so decoders
+        (struct, NumPy frombuffer, etc.) can parse fixed-width records in place
+        and slicing a payload never copies it.
+"""
+
+# Python Library Imports
+import struct
+
+
+###
+# Message Views
+###
+
+
+class KafkaMessageView(object):
+    """
+    Purpose:
+        Lightweight view of a Kafka Message. The key and value are memoryviews
+        over the buffers of the message (None when the message has no key or
+        value) and the location of the message is held as plain ints, so they
+        can be batched into arrays
+    """
+
+    __slots__ = ("topic", "partition", "offset", "timestamp", "key", "value")
+
+    def __init__(self, topic, partition, offset, timestamp, key, value):
+        """
+        Purpose:
+            Initialize the KafkaMessageView
+        Args:
+            topic (String): Topic the message was consumed from
+            partition (Int): Partition the message was consumed from
+            offset (Int): Offset of the message in the partition
+            timestamp (Int): Timestamp of the message in ms (-1 if unavailable)
+            key (memoryview): Message key, or None
+            value (memoryview): Message value, or None
+        Return:
+            N/A
+        """
+
+        self.topic = topic
+        self.partition = partition
+        self.offset = offset
+        self.timestamp = timestamp
+        self.key = key
+        self.value = value
+
+    def __repr__(self):
+        """
+        Purpose:
+            Representation of the view for debugging (buffers are shown by
+            size only)
+        """
+
+        return (
+            f"KafkaMessageView(topic={self.topic!r}, partition={self.partition}, "
+            f"offset={self.offset}, timestamp={self.timestamp}, "
+            f"key={get_payload_repr(self.key)}, value={get_payload_repr(self.value)})"
+        )
+
+
+def get_message_view(msg):
+    """
+    Purpose:
+        Get a KafkaMessageView of a Kafka Message. The key and value are read
+        from the message once and wrapped in memoryviews, nothing is copied
+    Args:
+        msg (Kafka Message Obj): Message returned from the topic
+    Return:
+        message_view (KafkaMessageView): View of the message
+    """
+
+    key = msg.key()
+    value = msg.value()
+
+    return KafkaMessageView(
+        msg.topic(),
+        msg.partition(),
+        msg.offset(),
+        msg.timestamp()[1],
+        None if key is None else memoryview(key),
+        None if value is None else memoryview(value),
+    )
+
+
+def get_message_views(msg_batch):
+    """
+    Purpose:
+        Get KafkaMessageViews of a batch of messages (usable as the
+        batch_decoder of kafka_consumer_helpers.consume_topic_batches)
+    Args:
+        msg_batch (List of Kafka Message Objs): Messages returned from the topic
+    Return:
+        message_views (List of KafkaMessageViews): Views of the messages
+    """
+
+    return [get_message_view(msg) for msg in msg_batch]
+
+
+def get_message_view_stage(value_deserializer=None, key_deserializer=None):
+    """
+    Purpose:
+        Get a pipeline stage (see kafka_pipeline_helpers) that turns Kafka
+        messages into KafkaMessageViews. Deserializers are passed the
+        memoryview of the key/value, so they can parse in place
+    Args:
+        value_deserializer (Function): Function that takes the value memoryview
+            and returns the decoded value. Default leaves the memoryview
+        key_deserializer (Function): Function that takes the key memoryview
+            and returns the decoded key. Default leaves the memoryview
+    Return:
+        message_view_stage (Function): Pipeline stage
+    """
+
+    def message_view_stage(messages):
+        for msg in messages:
+            message_view = get_message_view(msg)
+            if key_deserializer is not None and message_view.key is not None:
+                message_view.key = key_deserializer(message_view.key)
+            if value_deserializer is not None and message_view.value is not None:
+                message_view.value = value_deserializer(message_view.value)
+
+            yield message_view
+
+    return message_view_stage
+
+
+###
+# In Place Deserializers
+###
+
+
+def get_struct_deserializer(struct_format, offset=0):
+    """
+    Purpose:
+        Get a deserializer that unpacks one fixed-width record from a buffer
+        without copying it
+    Args:
+        struct_format (String): struct format of the record (e.g. ">qd")
+        offset (Int): Byte offset of the record in the buffer. Default is 0
+    Return:
+        struct_deserializer (Function): Function that takes a buffer and
+            returns the tuple of unpacked fields
+    """
+
+    unpack_from = struct.Struct(struct_format).unpack_from
+
+    def struct_deserializer(data):
+        return unpack_from(data, offset)
+
+    return struct_deserializer
+
+
+def get_struct_array_deserializer(struct_format):
+    """
+    Purpose:
+        Get a deserializer that unpacks a buffer holding back to back
+        fixed-width records without copying it
+    Args:
+        struct_format (String): struct format of each record (e.g. ">qd")
+    Return:
+        struct_array_deserializer (Function): Function that takes a buffer (its
+            size must be a multiple of the record size) and returns a list of
+            tuples of unpacked fields
+    """
+
+    iter_unpack = struct.Struct(struct_format).iter_unpack
+
+    def struct_array_deserializer(data):
+        return list(iter_unpack(data))
+
+    return struct_array_deserializer
+
+
+def get_numpy_deserializer(dtype, offset=0, count=-1):
+    """
+    Purpose:
+        Get a deserializer that returns a NumPy array sharing the memory of the
+        buffer (numpy.frombuffer, no copy). The array is read-only as message
+        buffers are immutable. Requires the optional numpy package
+    Args:
+        dtype (NumPy dtype/String): dtype of the array (e.g. ">f8" or a
+            structured dtype for fixed-width records)
+        offset (Int): Byte offset of the array in the buffer. Default is 0
+        count (Int): Number of items to read. Default is -1 (all items)
+    Return:
+        numpy_deserializer (Function): Function that takes a buffer and returns
+            the array
+    Raises:
+        ImportError: If numpy is not installed
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "numpy is required for NumPy deserialization (pip install numpy)"
+        )
+
+    dtype = numpy.dtype(dtype)
+    frombuffer = numpy.frombuffer
+
+    def numpy_deserializer(data):
+        return frombuffer(data, dtype=dtype, count=count, offset=offset)
+
+    return numpy_deserializer
+
+
+###
+# Helpers
+###
+
+
+def get_payload_repr(payload):
+    """
+    Purpose:
+        Get a short representation of a key or value. Buffers are represented
+        by their size so large payloads are not rendered
+    Args:
+        payload (memoryview/Any): Buffer or decoded payload
+    Return:
+        payload_repr (String): Representation of the payload
+    """
+
+    if isinstance(payload, memoryview):
+        return f"<{payload.nbytes} bytes>"
+
+    return repr(payload)
@@ -0,0 +1,435 @@
+"""
+    Purpose:
+        Kafka Multiprocess Helpers.
+
+        This library is used to scale consuming across the cores of a machine.
+        A parent process forks a number of consumer processes in the same
+        consumer group (each with its own consumer from get_kafka_consumer),
+        restarts workers that exit unexpectedly, handles graceful shutdown, and
+        aggregates throughput (and optionally lag) reported by the workers.
+"""
+
+# Python Library Imports
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+# Local Library Imports
+from kafka_helpers import (
+    kafka_admin_helpers,
+    kafka_consumer_helpers,
+    kafka_lag_helpers,
+)
+
+
+###
+# Consumer Group Runner
+###
+
+
+def run_consumer_group_processes(
+    kafka_brokers,
+    kafka_topics,
+    consumer_group,
+    batch_handler,
+    num_processes=None,
+    consumer_kwargs=None,
+    batch_size=500,
+    batch_timeout=1000,
+    restart_workers=True,
+    restart_backoff=1,
+    max_restart_backoff=60,
+    report_interval=10,
+    lag_interval=None,
+    lag_timeout=1,
+    admin_client_class=None,
+    run_time=None,
+    shutdown_timeout=30,
+):
+    """
+    Purpose:
+        Consume Kafka Topics with a group of worker processes. Runs until
+        interrupted (SIGINT/SIGTERM) or run_time has passed, then stops the
+        workers gracefully so each closes its consumer and leaves the group
+    Args:
+        kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        consumer_group (String): Consumer group every worker consumes as
+        batch_handler (Function): Function called in the worker process with
+            each list of messages (see kafka_consumer_helpers.handle_topic_batches)
+        num_processes (Int): Number of worker processes. Default is the number
+            of cores
+        consumer_kwargs (Dict): Extra keyword arguments for get_kafka_consumer
+        batch_size (Int): Max number of messages per batch. Default is 500
+        batch_timeout (Int): Max time in ms to wait for a full batch. Default
+            is 1000
+        restart_workers (Bool): Whether to restart workers that exit while the
+            group is still running. Default is True
+        restart_backoff (Float): Seconds to wait before restarting a worker
+            that exited, doubled for each further exit of the same worker.
+            Default is 1
+        max_restart_backoff (Float): Max seconds to wait before a restart. A
+            worker that ran this long before exiting is restarted after
+            restart_backoff again. Default is 60
+        report_interval (Float): Seconds between worker stats reports (and
+            parent throughput logs). Default is 10
+        lag_interval (Float): Seconds between consumer group lag samples taken
+            by the parent with the consumer_kwargs. Default is None (lag is not
+            sampled)
+        lag_timeout (Float): Timeout in seconds for each lag request. Lag is
+            sampled on the supervision loop, so workers are not restarted
+            while a sample is taken. Default is 1
+        admin_client_class (Class): Admin Client class the lag is sampled with
+            (see kafka_admin_helpers.get_kafka_admin_client). Default is the
+            confluent_kafka AdminClient
+        run_time (Float): Seconds to run before stopping. Default is None (run
+            until interrupted)
+        shutdown_timeout (Float): Seconds to wait for each worker to stop before
+            it is terminated. Default is 30
+    Return:
+        consumer_group_stats (Dict): "messages" and "batches" handled, "restarts"
+            of workers, "run_time" in seconds, "msgs_per_sec" over the run,
+            "workers" (per worker index "messages", "batches" and "pid") and
+            "lag" (the last lag sample or None)
+    """
+    num_processes = num_processes or os.cpu_count() or 1
+    logging.info(
+        f"Starting {num_processes} Consumer Processes ({consumer_group}) for "
+        f"Topics {', '.join(kafka_topics)}"
+    )
+
+    stop_event = multiprocessing.Event()
+    stats_queue = multiprocessing.Queue()
+    worker_kwargs = {
+        "kafka_brokers": kafka_brokers,
+        "kafka_topics": kafka_topics,
+        "consumer_group": consumer_group,
+        "batch_handler": batch_handler,
+        "consumer_kwargs": consumer_kwargs or {},
+        "batch_size": batch_size,
+        "batch_timeout": batch_timeout,
+        "report_interval": report_interval,
+        "stop_event": stop_event,
+        "stats_queue": stats_queue,
+    }
+
+    consumer_group_stats = {
+        "messages": 0,
+        "batches": 0,
+        "restarts": 0,
+        "run_time": 0,
+        "msgs_per_sec": 0,
+        "workers": {
+            worker_index: {"messages": 0, "batches": 0, "pid": None}
+            for worker_index in range(num_processes)
+        },
+        "lag": None,
+    }
+
+    previous_sigterm_handler = signal.signal(
+        signal.SIGTERM, lambda signum, frame: stop_event.set()
+    )
+
+    start_time = time.time()
+    next_report_time = start_time + report_interval
+    next_lag_time = start_time
+    reported_messages = 0
+
+    workers = {}
+    worker_start_times = {}
+    worker_exits = {}
+    pending_restarts = {}
+    try:
+        for worker_index in range(num_processes):
+            workers[worker_index] = start_consumer_worker(worker_index, worker_kwargs)
+            worker_start_times[worker_index] = time.time()
+
+        while not stop_event.is_set():
+            now = time.time()
+            if run_time is not None and now - start_time >= run_time:
+                break
+
+            collect_worker_stats(stats_queue, consumer_group_stats, timeout=0.5)
+
+            now = time.time()
+            for worker_index, worker in list(workers.items()):
+                if worker.is_alive() or stop_event.is_set():
+                    continue
+                del workers[worker_index]
+                if now - worker_start_times[worker_index] >= max_restart_backoff:
+                    worker_exits[worker_index] = 0
+                backoff = min(
+                    restart_backoff * 2 ** worker_exits.get(worker_index, 0),
+                    max_restart_backoff,
+                )
+                worker_exits[worker_index] = worker_exits.get(worker_index, 0) + 1
+                logging.warning(
+                    f"Consumer Process {worker_index} (pid={worker.pid}) Exited "
+                    f"With Code {worker.exitcode}"
+                    + (f", Restarting in {backoff}s" if restart_workers else "")
+                )
+                if restart_workers:
+                    pending_restarts[worker_index] = now + backoff
+
+            for worker_index, restart_time in list(pending_restarts.items()):
+                if now < restart_time or stop_event.is_set():
+                    continue
+                del pending_restarts[worker_index]
+                workers[worker_index] = start_consumer_worker(
+                    worker_index, worker_kwargs
+                )
+                worker_start_times[worker_index] = now
+                consumer_group_stats["restarts"] += 1
+
+            if not workers and not pending_restarts:
+                logging.error("All Consumer Processes Have Exited")
+                break
+
+            now = time.time()
+            if now >= next_report_time:
+                logging.info(
+                    f"Consumer Processes ({consumer_group}) Handled "
+                    f"{consumer_group_stats['messages'] - reported_messages} "
+                    f"Messages in the Last {report_interval}s"
+                )
+                reported_messages = consumer_group_stats["messages"]
+                next_report_time = now + report_interval
+
+            if lag_interval is not None and now >= next_lag_time:
+                consumer_group_stats["lag"] = sample_consumer_group_lag(
+                    kafka_brokers,
+                    kafka_topics,
+                    consumer_group,
+                    consumer_kwargs=consumer_kwargs,
+                    admin_client_class=admin_client_class,
+                    timeout=lag_timeout,
+                )
+                next_lag_time = time.time() + lag_interval
+    except KeyboardInterrupt:
+        logging.info("Consumer Processes Ended By User")
+    finally:
+        stop_event.set()
+        stop_consumer_workers(
+            workers, stats_queue, consumer_group_stats, shutdown_timeout
+        )
+        collect_worker_stats(stats_queue, consumer_group_stats)
+        signal.signal(signal.SIGTERM, previous_sigterm_handler)
+
+    consumer_group_stats["run_time"] = time.time() - start_time
+    if consumer_group_stats["run_time"] > 0:
+        consumer_group_stats["msgs_per_sec"] = (
+            consumer_group_stats["messages"] / consumer_group_stats["run_time"]
+        )
+
+    logging.info(f"Consumer Processes ({consumer_group}) Complete")
+
+    return consumer_group_stats
+
+
+###
+# Worker Management
+###
+
+
+def start_consumer_worker(worker_index, worker_kwargs):
+    """
+    Purpose:
+        Start a consumer worker process
+    Args:
+        worker_index (Int): Index of the worker in the group
+        worker_kwargs (Dict): Keyword arguments for consumer_worker
+    Return:
+        worker (Process Obj): Started worker process
+    """
+
+    worker = multiprocessing.Process(
+        target=consumer_worker,
+        args=(worker_index,),
+        kwargs=worker_kwargs,
+        name=f"kafka-consumer-{worker_index}",
+        daemon=True,
+    )
+    worker.start()
+
+    return worker
+
+
+def stop_consumer_workers(
+    workers, stats_queue, consumer_group_stats, shutdown_timeout=30
+):
+    """
+    Purpose:
+        Wait for worker processes to stop after the stop event has been set,
+        terminating any that do not stop within the timeout
+    Args:
+        workers (Dict): Key is the worker index and value is the Process Obj
+        stats_queue (Queue Obj): Queue the workers report stats on. Drained
+            into consumer_group_stats while waiting, as a worker only exits
+            once its queued reports have been read
+        consumer_group_stats (Dict): Aggregated stats to update in place
+        shutdown_timeout (Float): Seconds to wait for each worker to stop
+    Return:
+        N/A
+    """
+
+    deadline = time.time() + shutdown_timeout
+    for worker_index, worker in workers.items():
+        while worker.is_alive() and time.time() < deadline:
+            collect_worker_stats(stats_queue, consumer_group_stats)
+            worker.join(timeout=0.1)
+        if worker.is_alive():
+            logging.warning(
+                f"Consumer Process {worker_index} (pid={worker.pid}) Did Not "
+                "Stop, Terminating"
+            )
+            worker.terminate()
+            worker.join()
+
+
+def consumer_worker(
+    worker_index,
+    kafka_brokers,
+    kafka_topics,
+    consumer_group,
+    batch_handler,
+    consumer_kwargs,
+    batch_size,
+    batch_timeout,
+    report_interval,
+    stop_event,
+    stats_queue,
+):
+    """
+    Purpose:
+        Entry point of a consumer worker process. Creates a consumer in the
+        group and hands batches to the handler until the stop event is set,
+        reporting stats to the parent every report_interval seconds
+    Args:
+        worker_index (Int): Index of the worker in the group
+        kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        consumer_group (String): Consumer group to consume as
+        batch_handler (Function): Function called with each list of messages
+        consumer_kwargs (Dict): Extra keyword arguments for get_kafka_consumer
+        batch_size (Int): Max number of messages per batch
+        batch_timeout (Int): Max time in ms to wait for a full batch
+        report_interval (Float): Seconds between stats reports
+        stop_event (Event Obj): Multiprocessing Event set by the parent to stop
+        stats_queue (Queue Obj): Multiprocessing Queue to report stats on
+    Return:
+        N/A
+    """
+
+    # The parent handles interrupts and sets the stop event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    worker_stats = {"messages": 0, "batches": 0}
+    next_report_time = time.time() + report_interval
+
+    def report_stats():
+        stats_queue.put((worker_index, os.getpid(), dict(worker_stats)))
+        worker_stats["messages"] = 0
+        worker_stats["batches"] = 0
+
+    kafka_consumer = kafka_consumer_helpers.get_kafka_consumer(
+        kafka_brokers, consumer_group, **consumer_kwargs
+    )
+    try:
+        for msg_batch in kafka_consumer_helpers.consume_topic_batches(
+            kafka_consumer,
+            kafka_topics,
+            batch_size=batch_size,
+            batch_timeout=batch_timeout,
+            stop_event=stop_event,
+        ):
+            batch_handler(msg_batch)
+            worker_stats["messages"] += len(msg_batch)
+            worker_stats["batches"] += 1
+
+            if time.time() >= next_report_time:
+                report_stats()
+                next_report_time = time.time() + report_interval
+    finally:
+        report_stats()
+
+
+def collect_worker_stats(stats_queue, consumer_group_stats, timeout=None):
+    """
+    Purpose:
+        Drain worker stats reports into the aggregated consumer group stats
+    Args:
+        stats_queue (Queue Obj): Queue the workers report stats on
+        consumer_group_stats (Dict): Aggregated stats to update in place
+        timeout (Float): Seconds to wait for the first report. Default is None
+            (only drain reports that are already queued)
+    Return:
+        N/A
+    """
+
+    block = timeout is not None
+    while True:
+        try:
+            worker_index, worker_pid, worker_stats = stats_queue.get(
+                block=block, timeout=timeout
+            )
+        except queue.Empty:
+            return
+        block = False
+
+        aggregated_worker_stats = consumer_group_stats["workers"][worker_index]
+        aggregated_worker_stats["pid"] = worker_pid
+        for stat_name in ("messages", "batches"):
+            aggregated_worker_stats[stat_name] += worker_stats[stat_name]
+            consumer_group_stats[stat_name] += worker_stats[stat_name]
+
+
+def sample_consumer_group_lag(
+    kafka_brokers,
+    kafka_topics,
+    consumer_group,
+    consumer_kwargs=None,
+    admin_client_class=None,
+    timeout=1,
+):
+    """
+    Purpose:
+        Sample the lag of the consumer group from the parent process. The
+        consumer is closed and the admin client released after the sample, so
+        no librdkafka handle is alive in the parent when a worker is forked
+    Args:
+        kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
+        kafka_topics (List of Strings): List of Kafka Topics to get lag for
+        consumer_group (String): Consumer group to get lag for
+        consumer_kwargs (Dict): Extra keyword arguments for get_kafka_consumer
+            (the same the workers use). Their config_overrides also configure
+            the admin client. Default is None
+        admin_client_class (Class): Admin Client class to create. Default is
+            the confluent_kafka AdminClient
+        timeout (Float): Timeout in seconds for each request. Default is 1
+    Return:
+        consumer_group_lag (Dict): Output of
+            kafka_lag_helpers.get_consumer_group_lag, or None if sampling failed
+    """
+
+    consumer_kwargs = dict(consumer_kwargs or {}, get_stats=False, pooled=False)
+    kafka_consumer = kafka_consumer_helpers.get_kafka_consumer(
+        kafka_brokers, consumer_group, **consumer_kwargs
+    )
+    try:
+        kafka_admin_client = kafka_admin_helpers.get_kafka_admin_client(
+            kafka_brokers,
+            admin_client_class=admin_client_class,
+            config_overrides=consumer_kwargs.get("config_overrides"),
+        )
+        return kafka_lag_helpers.get_consumer_group_lag(
+            kafka_consumer, kafka_topics, kafka_admin_client, timeout=timeout
+        )
+    except Exception as err:
+        logging.exception(f"Failed to Sample Consumer Group Lag: {err}")
+        return None
+    finally:
+        kafka_consumer.close()
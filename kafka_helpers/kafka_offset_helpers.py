@@ -0,0 +1,396 @@
+"""
+    Purpose:
+        Kafka Offset Helpers.
+
+        This library is used to commit consumer offsets explicitly. A
+        KafkaOffsetCommitter is passed to get_kafka_consumer (which applies
+        the configuration its strategy needs) and to the consume helpers
+        (which report processed messages to it):
+
+            - "auto": librdkafka commits the offsets of delivered messages
+                every commit_interval_ms (at-most-once if processing fails)
+            - "sync": offsets are committed synchronously every
+                commit_every processed messages or commit_interval_ms, before
+                the next message or batch is consumed
+            - "async": offsets are committed asynchronously every
+                commit_every processed messages or commit_interval_ms
+            - "store": offsets of processed messages are stored locally and
+                the stored offsets are committed asynchronously every
+                commit_every messages or commit_interval_ms
+
+        Synchronous commits block consuming for a broker round trip each, so
+        "async" and "store" are the cheap at-least-once options. Pending
+        offsets are committed synchronously before partitions are revoked and
+        before the consumer is closed. Commit counts, failures and latencies
+        are reported by get_commit_summary.
+"""
+
+# Python Library Imports
+import logging
+import threading
+import time
+from collections import deque
+from confluent_kafka import KafkaError, KafkaException, TopicPartition
+
+# Local Library Imports
+from kafka_helpers.kafka_consumer_helpers import store_next_offsets
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy
+
+
+###
+# Commit Strategies
+###
+
+
+COMMIT_STRATEGIES = ("auto", "sync", "async", "store")
+
+
+###
+# Offset Committer
+###
+
+
+class KafkaOffsetCommitter(object):
+    """
+    Purpose:
+        Commit the offsets of processed messages with one of the
+        COMMIT_STRATEGIES and report commit latency and failures. Latency of
+        asynchronous commits is measured until their on_commit callback is
+        served, which happens in a later poll/consume call
+    """
+
+    def __init__(
+        self, commit_strategy="auto", commit_every=1000, commit_interval_ms=5000
+    ):
+        """
+        Purpose:
+            Initialize the KafkaOffsetCommitter
+        Args:
+            commit_strategy (String): One of COMMIT_STRATEGIES. Default is
+                "auto"
+            commit_every (Int): Processed messages that trigger a "sync",
+                "async" or "store" commit. Default is 1000
+            commit_interval_ms (Int): Max ms between commits. Default is 5000
+        Return:
+            N/A
+        Raises:
+            InvalidCommitStrategy: If commit_strategy is not one of
+                COMMIT_STRATEGIES
+        """
+
+        if commit_strategy not in COMMIT_STRATEGIES:
+            raise InvalidCommitStrategy(
+                f"Commit strategy {commit_strategy} is not one of "
+                f"{', '.join(COMMIT_STRATEGIES)}"
+            )
+
+        self.commit_strategy = commit_strategy
+        self.commit_every = commit_every
+        self.commit_interval_ms = commit_interval_ms
+
+        self.lock = threading.Lock()
+        self.pending_offsets = {}
+        self.pending_messages = 0
+        self.last_commit_time = time.monotonic()
+        self.commit_send_times = deque()
+
+        self.commit_summary = {
+            "commits": 0,
+            "commit_failures": 0,
+            "committed_messages": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+            "timed_commits": 0,
+            "last_error": None,
+        }
+
+    def get_consumer_configuration(self):
+        """
+        Purpose:
+            Get the consumer configuration the commit strategy needs
+        Args:
+            N/A
+        Return:
+            consumer_configuration (Dict): librdkafka configuration to apply
+                to the consumer
+        """
+
+        consumer_configuration = {
+            "enable.auto.commit": self.commit_strategy == "auto",
+        }
+        if self.commit_strategy == "auto":
+            consumer_configuration["auto.commit.interval.ms"] = self.commit_interval_ms
+        if self.commit_strategy == "store":
+            consumer_configuration["enable.auto.offset.store"] = False
+        if self.commit_strategy != "sync":
+            # Sync commit results are read from commit(); the callback would
+            # report them twice
+            consumer_configuration["on_commit"] = self.commit_callback
+
+        return consumer_configuration
+
+    def commit_processed(self, kafka_consumer, msgs):
+        """
+        Purpose:
+            Report messages as processed, committing their offsets as the
+            commit strategy requires. Offsets of partitions revoked since the
+            messages were consumed are not stored, the new owner of the
+            partition consumes them again
+        Args:
+            kafka_consumer (Kafka Consumer Obj): Consumer the messages were
+                consumed with
+            msgs (List of Kafka Message Objs): Processed messages
+        Return:
+            N/A
+        """
+
+        if self.commit_strategy == "auto" or not msgs:
+            return
+
+        next_offsets = {}
+        for msg in msgs:
+            next_offsets[(msg.topic(), msg.partition())] = msg.offset() + 1
+
+        if self.commit_strategy == "store":
+            store_next_offsets(kafka_consumer, next_offsets)
+        self.pending_offsets.update(next_offsets)
+        self.pending_messages += len(msgs)
+
+        if self.is_commit_due():
+            self.commit_pending(
+                kafka_consumer, asynchronous=self.commit_strategy != "sync"
+            )
+
+    def is_commit_due(self):
+        """
+        Purpose:
+            Check if enough messages or time passed since the last commit
+        Args:
+            N/A
+        Return:
+            is_commit_due (Bool): Whether pending offsets should be committed
+        """
+
+        return self.pending_messages >= self.commit_every or (
+            time.monotonic() - self.last_commit_time
+            >= self.commit_interval_ms / 1000.0
+        )
+
+    def commit_pending(self, kafka_consumer, asynchronous=False):
+        """
+        Purpose:
+            Commit pending offsets. Synchronous commits are used before
+            partitions are revoked or the consumer is closed
+        Args:
+            kafka_consumer (Kafka Consumer Obj): Consumer to commit with
+            asynchronous (Bool): Whether to commit without waiting for the
+                result. Default is False
+        Return:
+            N/A
+        """
+
+        if not self.pending_messages:
+            return
+
+        pending_offsets = self.pending_offsets
+        pending_messages = self.pending_messages
+        self.pending_offsets = {}
+        self.pending_messages = 0
+
+        self.commit_offsets(
+            kafka_consumer,
+            None if self.commit_strategy == "store" else pending_offsets,
+            pending_messages,
+            asynchronous=asynchronous,
+        )
+
+    def revoke_callback(self, kafka_consumer, partitions):
+        """
+        Purpose:
+            Consumer on_revoke callback. Commit pending offsets while the
+            partitions are still owned
+        Args:
+            kafka_consumer (Kafka Consumer Obj): Consumer losing partitions
+            partitions (List of TopicPartitions): Revoked partitions
+        Return:
+            N/A
+        """
+
+        self.commit_pending(kafka_consumer)
+
+    def commit_offsets(
+        self, kafka_consumer, next_offsets, num_messages, asynchronous=False
+    ):
+        """
+        Purpose:
+            Commit offsets and record the result and latency. Results of
+            "sync" commits are read from commit(), all others are recorded by
+            commit_callback
+        Args:
+            kafka_consumer (Kafka Consumer Obj): Consumer to commit with
+            next_offsets (Dict): Key is (topic, partition) and value is the
+                offset to commit, or None to commit the stored offsets
+            num_messages (Int): Messages covered by the commit
+            asynchronous (Bool): Whether to commit without waiting for the
+                result. Default is False
+        Return:
+            committed_partitions (List of TopicPartitions): Result of a
+                synchronous commit (None for asynchronous commits or if the
+                commit failed)
+        """
+
+        commit_start = time.monotonic()
+        self.last_commit_time = commit_start
+        commit_send_time = (commit_start, num_messages)
+        uses_callback = self.commit_strategy != "sync"
+
+        if uses_callback:
+            with self.lock:
+                self.commit_send_times.append(commit_send_time)
+
+        commit_kwargs = {"asynchronous": asynchronous}
+        if next_offsets is not None:
+            commit_kwargs["offsets"] = get_topic_partitions(next_offsets)
+
+        try:
+            committed_partitions = kafka_consumer.commit(**commit_kwargs)
+        except KafkaException as err:
+            if uses_callback:
+                with self.lock:
+                    if commit_send_time in self.commit_send_times:
+                        self.commit_send_times.remove(commit_send_time)
+            self.record_commit(err.args[0], None, num_messages)
+            return None
+
+        if not uses_callback:
+            self.record_commit(
+                get_partitions_error(committed_partitions),
+                (time.monotonic() - commit_start) * 1000,
+                num_messages,
+            )
+
+        return committed_partitions
+
+    def commit_callback(self, err, partitions):
+        """
+        Purpose:
+            Consumer on_commit callback. Record the result of an asynchronous
+            or automatic commit
+        Args:
+            err (KafkaError): Error of the commit, or None
+            partitions (List of TopicPartitions): Committed partitions
+        Return:
+            N/A
+        """
+
+        commit_latency_ms = None
+        num_messages = 0
+        with self.lock:
+            if self.commit_send_times:
+                commit_send_time, num_messages = self.commit_send_times.popleft()
+                commit_latency_ms = (time.monotonic() - commit_send_time) * 1000
+
+        self.record_commit(
+            err or get_partitions_error(partitions), commit_latency_ms, num_messages
+        )
+
+    def record_commit(self, err, commit_latency_ms, num_messages):
+        """
+        Purpose:
+            Record the result and latency of a commit
+        Args:
+            err (KafkaError): Error of the commit, or None
+            commit_latency_ms (Float): Latency of the commit, or None if
+                unknown
+            num_messages (Int): Messages covered by the commit
+        Return:
+            N/A
+        """
+
+        if err is not None and err.code() == KafkaError._NO_OFFSET:
+            # Nothing new to commit (e.g. auto commit without new messages)
+            return
+
+        with self.lock:
+            if err is not None:
+                self.commit_summary["commit_failures"] += 1
+                self.commit_summary["last_error"] = str(err)
+            else:
+                self.commit_summary["commits"] += 1
+                self.commit_summary["committed_messages"] += num_messages
+
+            if commit_latency_ms is not None:
+                self.commit_summary["timed_commits"] += 1
+                self.commit_summary["total_latency_ms"] += commit_latency_ms
+                self.commit_summary["max_latency_ms"] = max(
+                    self.commit_summary["max_latency_ms"], commit_latency_ms
+                )
+
+        if err is not None:
+            logging.warning(f"Failed to Commit Offsets ({self.commit_strategy}): {err}")
+
+    def get_commit_summary(self):
+        """
+        Purpose:
+            Get the commit counts, failures and latencies
+        Args:
+            N/A
+        Return:
+            commit_summary (Dict): "commit_strategy", "commits",
+                "commit_failures", "committed_messages", "pending_messages",
+                "avg_latency_ms", "max_latency_ms" and "last_error"
+        """
+
+        with self.lock:
+            timed_commits = self.commit_summary["timed_commits"]
+            return {
+                "commit_strategy": self.commit_strategy,
+                "commits": self.commit_summary["commits"],
+                "commit_failures": self.commit_summary["commit_failures"],
+                "committed_messages": self.commit_summary["committed_messages"],
+                "pending_messages": self.pending_messages,
+                "avg_latency_ms": (
+                    self.commit_summary["total_latency_ms"] / timed_commits
+                    if timed_commits else None
+                ),
+                "max_latency_ms": self.commit_summary["max_latency_ms"],
+                "last_error": self.commit_summary["last_error"],
+            }
+
+
+###
+# General/Helper Methods
+###
+
+
+def get_topic_partitions(next_offsets):
+    """
+    Purpose:
+        Build the TopicPartitions to commit from next offsets
+    Args:
+        next_offsets (Dict): Key is (topic, partition) and value is the offset
+    Return:
+        topic_partitions (List of TopicPartitions): Partitions with offsets
+    """
+
+    return [
+        TopicPartition(kafka_topic, partition, offset)
+        for (kafka_topic, partition), offset in next_offsets.items()
+    ]
+
+
+def get_partitions_error(partitions):
+    """
+    Purpose:
+        Get the first per-partition error of a commit result
+    Args:
+        partitions (List of TopicPartitions): Committed partitions
+    Return:
+        err (KafkaError): First partition error, or None
+    """
+
+    for partition in partitions or []:
+        if getattr(partition, "error", None):
+            return partition.error
+
+    return None
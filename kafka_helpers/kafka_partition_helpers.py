@@ -0,0 +1,400 @@
+"""
+    Purpose:
+        Kafka Partition Helpers.
+
+        This library is used to plan the partitions of topics. Topic metadata
+        (and optionally observed per-partition rates) is analyzed for leader
+        skew across brokers, shrunk ISRs and hot partitions, and a partition
+        count is recommended for a target throughput and number of consumers.
+        Recommendations can be turned into topic specs for reconcile_topics or
+        passed to create_kafka_topic.
+"""
+
+# Python Library Imports
+import logging
+import math
+import time
+
+# Local Library Imports
+from kafka_helpers.kafka_lag_helpers import get_topic_partitions, get_watermarks_bulk
+
+
+###
+# Partition Analysis
+###
+
+
+def analyze_topic_partitions(
+    kafka_admin_client,
+    kafka_topics=None,
+    partition_rates=None,
+    target_throughputs=None,
+    partition_throughput=None,
+    consumer_count=None,
+    skew_threshold=1.5,
+    timeout=10,
+):
+    """
+    Purpose:
+        Analyze the partitions of topics from one metadata request: how leaders
+        are spread over brokers, which partitions have shrunk ISRs or no
+        leader, how evenly traffic is spread (when rates are passed) and how
+        many partitions each topic should have
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        kafka_topics (List of Strings): Topics to analyze. Default is every
+            topic that is not a system topic
+        partition_rates (Dict): Observed rate of each partition keyed by
+            (topic, partition), e.g. from measure_partition_rates. Default is
+            None (no traffic analysis)
+        target_throughputs (Dict or Number): Throughput each topic must handle
+            (same unit as partition_rates), as a number for every topic or a
+            dict keyed by topic. Default is None (the observed throughput)
+        partition_throughput (Number): Throughput one partition can sustain
+            for the slowest of its producers and consumers (same unit).
+            Default is None (partitions are only recommended for consumers)
+        consumer_count (Int): Consumers that will consume each topic in
+            parallel. Default is None
+        skew_threshold (Float): Leader or traffic skew above which a warning
+            is reported. Default is 1.5
+        timeout (Float): Timeout in seconds for the metadata request. Default
+            is 10
+    Return:
+        partition_analysis (Dict): "brokers" keyed by broker id with the
+            "leaders" and "replicas" hosted by each broker, "leader_skew"
+            across the cluster and "topics" keyed by topic (see
+            analyze_topic_metadata)
+    """
+
+    cluster_metadata = kafka_admin_client.list_topics(timeout=timeout)
+    broker_ids = sorted(cluster_metadata.brokers)
+    if kafka_topics is None:
+        kafka_topics = sorted(
+            topic_name
+            for topic_name in cluster_metadata.topics
+            if not topic_name.startswith("_")
+        )
+
+    partition_analysis = {
+        "brokers": {
+            broker_id: {"leaders": 0, "replicas": 0} for broker_id in broker_ids
+        },
+        "leader_skew": 0,
+        "topics": {},
+    }
+    for kafka_topic in kafka_topics:
+        topic_metadata = cluster_metadata.topics.get(kafka_topic)
+        if topic_metadata is None or topic_metadata.error is not None:
+            logging.warning(f"Topic {kafka_topic} Not Found, Skipping Analysis")
+            continue
+
+        if isinstance(target_throughputs, dict):
+            target_throughput = target_throughputs.get(kafka_topic)
+        else:
+            target_throughput = target_throughputs
+
+        topic_analysis = analyze_topic_metadata(
+            topic_metadata,
+            broker_ids,
+            partition_rates=partition_rates,
+            target_throughput=target_throughput,
+            partition_throughput=partition_throughput,
+            consumer_count=consumer_count,
+            skew_threshold=skew_threshold,
+        )
+        partition_analysis["topics"][kafka_topic] = topic_analysis
+
+        for broker_id, leaders in topic_analysis["leaders"].items():
+            partition_analysis["brokers"].setdefault(
+                broker_id, {"leaders": 0, "replicas": 0}
+            )["leaders"] += leaders
+        for partition_metadata in topic_metadata.partitions.values():
+            for broker_id in partition_metadata.replicas:
+                partition_analysis["brokers"].setdefault(
+                    broker_id, {"leaders": 0, "replicas": 0}
+                )["replicas"] += 1
+
+    partition_analysis["leader_skew"] = get_skew([
+        broker_stats["leaders"]
+        for broker_stats in partition_analysis["brokers"].values()
+    ])
+
+    return partition_analysis
+
+
+def analyze_topic_metadata(
+    topic_metadata,
+    broker_ids,
+    partition_rates=None,
+    target_throughput=None,
+    partition_throughput=None,
+    consumer_count=None,
+    skew_threshold=1.5,
+):
+    """
+    Purpose:
+        Analyze the partitions of one topic (see analyze_topic_partitions)
+    Args:
+        topic_metadata (TopicMetadata Obj): Metadata of the topic
+        broker_ids (List of Ints): Brokers of the cluster
+        partition_rates (Dict): Observed rate of each partition keyed by
+            (topic, partition). Default is None
+        target_throughput (Number): Throughput the topic must handle. Default
+            is None (the observed throughput)
+        partition_throughput (Number): Throughput one partition can sustain.
+            Default is None
+        consumer_count (Int): Consumers of the topic. Default is None
+        skew_threshold (Float): Skew above which a warning is reported.
+            Default is 1.5
+    Return:
+        topic_analysis (Dict): "partitions", "replication_factor", "leaders"
+            (partitions led by each broker), "leader_skew" (most leaders on a
+            broker over the fewest possible, 1.0 is balanced),
+            "under_replicated" and "offline" (partition ids with shrunk ISRs or
+            no leader), "throughput" and "rate_skew" (busiest partition over
+            the mean, None without rates), "recommended_partitions" and
+            "warnings" (list of Strings)
+    """
+
+    kafka_topic = topic_metadata.topic
+    partitions = [
+        topic_metadata.partitions[partition_id]
+        for partition_id in sorted(topic_metadata.partitions)
+    ]
+    num_partitions = len(partitions)
+
+    leaders = {broker_id: 0 for broker_id in broker_ids}
+    under_replicated = []
+    offline = []
+    for partition_metadata in partitions:
+        if partition_metadata.leader < 0:
+            offline.append(partition_metadata.id)
+        else:
+            leaders[partition_metadata.leader] = (
+                leaders.get(partition_metadata.leader, 0) + 1
+            )
+        if len(partition_metadata.isrs) < len(partition_metadata.replicas):
+            under_replicated.append(partition_metadata.id)
+
+    throughput = None
+    rate_skew = None
+    if partition_rates is not None:
+        rates = [
+            partition_rates.get((kafka_topic, partition_metadata.id), 0)
+            for partition_metadata in partitions
+        ]
+        throughput = sum(rates)
+        rate_skew = get_skew(rates, balanced=False)
+
+    if target_throughput is None:
+        target_throughput = throughput
+
+    topic_analysis = {
+        "partitions": num_partitions,
+        "replication_factor": max(
+            (len(partition_metadata.replicas) for partition_metadata in partitions),
+            default=0,
+        ),
+        "leaders": leaders,
+        "leader_skew": get_skew(list(leaders.values())),
+        "under_replicated": under_replicated,
+        "offline": offline,
+        "throughput": throughput,
+        "rate_skew": rate_skew,
+        "recommended_partitions": get_recommended_partitions(
+            target_throughput=target_throughput,
+            partition_throughput=partition_throughput,
+            consumer_count=consumer_count,
+            current_partitions=num_partitions,
+        ),
+        "warnings": [],
+    }
+
+    warnings = topic_analysis["warnings"]
+    if offline:
+        warnings.append(f"{len(offline)} partitions have no leader")
+    if under_replicated:
+        warnings.append(f"{len(under_replicated)} partitions have shrunk ISRs")
+    if topic_analysis["leader_skew"] > skew_threshold:
+        warnings.append(
+            f"Leaders are skewed across brokers ({topic_analysis['leader_skew']:.2f}x)"
+        )
+    if rate_skew is not None and rate_skew > skew_threshold:
+        warnings.append(
+            f"Traffic is skewed across partitions ({rate_skew:.2f}x the mean), "
+            "more partitions will not help a hot key"
+        )
+    if consumer_count and num_partitions < consumer_count:
+        warnings.append(
+            f"{consumer_count - num_partitions} of {consumer_count} consumers "
+            "will be idle"
+        )
+    if topic_analysis["recommended_partitions"] > num_partitions:
+        warnings.append(
+            f"Recommend {topic_analysis['recommended_partitions']} partitions "
+            f"(has {num_partitions})"
+        )
+
+    return topic_analysis
+
+
+###
+# Partition Planning
+###
+
+
+def get_recommended_partitions(
+    target_throughput=None,
+    partition_throughput=None,
+    consumer_count=None,
+    current_partitions=0,
+):
+    """
+    Purpose:
+        Get the partition count for a topic: enough partitions for the target
+        throughput and at least one per consumer, rounded up to a multiple of
+        the consumer count so partitions are spread evenly over consumers.
+        Never less than the current count (partitions cannot be removed)
+    Args:
+        target_throughput (Number): Throughput the topic must handle. Default
+            is None
+        partition_throughput (Number): Throughput one partition can sustain
+            (same unit as target_throughput). Default is None
+        consumer_count (Int): Consumers that will consume the topic in
+            parallel. Default is None
+        current_partitions (Int): Current partition count (0 for a new
+            topic). Default is 0
+    Return:
+        recommended_partitions (Int): Recommended partition count (at least 1)
+    Raises:
+        ValueError: If partition_throughput is not positive
+    """
+
+    recommended_partitions = 1
+    if target_throughput and partition_throughput is not None:
+        if partition_throughput <= 0:
+            raise ValueError("partition_throughput must be positive")
+        recommended_partitions = math.ceil(target_throughput / partition_throughput)
+
+    if consumer_count:
+        recommended_partitions = (
+            math.ceil(recommended_partitions / consumer_count) * consumer_count
+        )
+
+    return max(recommended_partitions, current_partitions, 1)
+
+
+def get_recommended_topic_specs(partition_analysis):
+    """
+    Purpose:
+        Get topic specs that grow topics to their recommended partition count,
+        for kafka_topic_helpers.reconcile_topics. Topics that already have
+        enough partitions are left out
+    Args:
+        partition_analysis (Dict): Output of analyze_topic_partitions
+    Return:
+        topic_specs (Dict of Dicts): Key is the topic name and value is its
+            spec with "partitions"
+    """
+
+    return {
+        kafka_topic: {"partitions": topic_analysis["recommended_partitions"]}
+        for kafka_topic, topic_analysis in partition_analysis["topics"].items()
+        if topic_analysis["recommended_partitions"] > topic_analysis["partitions"]
+    }
+
+
+###
+# Partition Rates
+###
+
+
+def measure_partition_rates(
+    kafka_admin_client, kafka_topics, sample_interval=10, timeout=10
+):
+    """
+    Purpose:
+        Measure the rate messages are produced to each partition of topics
+        from two samples of the high watermarks (bulk list_offsets requests)
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        kafka_topics (List of Strings): Topics to measure
+        sample_interval (Float): Seconds between the samples. Default is 10
+        timeout (Float): Timeout in seconds for each request. Default is 10
+    Return:
+        partition_rates (Dict): Key is (topic, partition) and value is the
+            messages per second produced to the partition
+    """
+    logging.info(f"Measuring Partition Rates for Topics {', '.join(kafka_topics)}")
+
+    topic_partitions = get_topic_partitions(kafka_admin_client, kafka_topics, timeout)
+
+    start_watermarks = get_watermarks_bulk(kafka_admin_client, topic_partitions, timeout)
+    start_time = time.monotonic()
+    time.sleep(sample_interval)
+    end_watermarks = get_watermarks_bulk(kafka_admin_client, topic_partitions, timeout)
+    elapsed = time.monotonic() - start_time
+
+    return get_partition_rates(start_watermarks, end_watermarks, elapsed)
+
+
+def get_partition_rates(start_watermarks, end_watermarks, elapsed):
+    """
+    Purpose:
+        Get the produce rate of partitions from two watermark samples
+    Args:
+        start_watermarks (Dict): Key is (topic, partition) and value is
+            (low_watermark, high_watermark), e.g. from get_watermarks_bulk
+        end_watermarks (Dict): Later sample of the same partitions
+        elapsed (Float): Seconds between the samples
+    Return:
+        partition_rates (Dict): Key is (topic, partition) and value is the
+            messages per second produced to the partition
+    """
+
+    if elapsed <= 0:
+        return {partition_key: 0 for partition_key in end_watermarks}
+
+    partition_rates = {}
+    for partition_key, (_, end_high_watermark) in end_watermarks.items():
+        start_high_watermark = start_watermarks.get(
+            partition_key, (0, end_high_watermark)
+        )[1]
+        partition_rates[partition_key] = (
+            max(end_high_watermark - start_high_watermark, 0) / elapsed
+        )
+
+    return partition_rates
+
+
+###
+# Helpers
+###
+
+
+def get_skew(counts, balanced=True):
+    """
+    Purpose:
+        Get how unevenly a quantity is spread. With balanced, the largest count
+        is compared to the smallest largest count possible (ceil of the mean),
+        so 1.0 means as even as the total allows; otherwise it is compared to
+        the mean
+    Args:
+        counts (List of Numbers): Quantity per broker or partition
+        balanced (Bool): Compare to the best integer spread. Default is True
+    Return:
+        skew (Float): Largest count over the ideal (0 if there is nothing to
+            spread)
+    """
+
+    total = sum(counts)
+    if not counts or total <= 0:
+        return 0
+
+    ideal = total / len(counts)
+    if balanced:
+        ideal = math.ceil(ideal)
+
+    return max(counts) / ideal
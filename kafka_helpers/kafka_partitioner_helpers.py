@@ -0,0 +1,463 @@
+"""
+    Purpose:
+        Kafka Partitioner Helpers.
+
+        This library is used to choose the partition of produced messages.
+        librdkafka partitions keyed messages itself (set the "partitioner"
+        configuration, e.g. "murmur2_random" to match the Java client), which
+        costs nothing in Python and should be preferred. The partitioners here
+        are for placement librdkafka cannot do (round-robin, sticky batches,
+        custom functions) or when the partition must be known in Python. The
+        partition of each key is cached, so a key is only hashed once while
+        the partition count of its topic is unchanged.
+"""
+
+# Python Library Imports
+import itertools
+import random
+import struct
+import threading
+import time
+
+# Local Library Imports
+from kafka_helpers.kafka_exceptions import InvalidPartitioner
+
+
+# Partitioners built into librdkafka (the "partitioner" configuration)
+NATIVE_PARTITIONERS = (
+    "random",
+    "consistent",
+    "consistent_random",
+    "murmur2",
+    "murmur2_random",
+    "fnv1a",
+    "fnv1a_random",
+)
+
+# Partitioners implemented in Python (see get_partitioner)
+PYTHON_PARTITIONERS = ("murmur2", "round_robin", "sticky")
+
+
+###
+# Partitioners
+###
+
+
+class KafkaPartitioner(object):
+    """
+    Purpose:
+        Base partitioner. Partition counts are read from the producer metadata
+        and cached for metadata_ttl seconds; the partition of each key is
+        cached per topic until the partition count of the topic changes, so
+        keys are re-partitioned when partitions are added. A lookup is a plain
+        dict access (no lock or LRU bookkeeping on the produce path), and the
+        keys of a topic are dropped once max_cached_keys is reached. Subclasses
+        implement partition_key and optionally partition_keyless
+    """
+
+    def __init__(self, max_cached_keys=100000, metadata_ttl=60, timeout=10):
+        """
+        Purpose:
+            Initialize the KafkaPartitioner
+        Args:
+            max_cached_keys (Int): Max number of key partitions to cache per
+                topic. Default is 100000
+            metadata_ttl (Float): Seconds a topic partition count is cached.
+                Default is 60
+            timeout (Float): Max seconds to wait for topic metadata. Default
+                is 10
+        Return:
+            N/A
+        """
+
+        self.max_cached_keys = max_cached_keys
+        self.key_partitions = {}
+        self.metadata_ttl = metadata_ttl
+        self.timeout = timeout
+        self.partition_counts = {}
+
+    def partition(self, kafka_producer, kafka_topic, key):
+        """
+        Purpose:
+            Get the partition to produce a message to
+        Args:
+            kafka_producer (Kafka Producer Obj): Producer the message is
+                produced with (used to fetch topic metadata)
+            kafka_topic (String): Kafka Topic of the message
+            key (String/Bytes): Message key, or None
+        Return:
+            partition (Int): Partition of the message, or None to let
+                librdkafka choose (e.g. the topic is not known yet)
+        """
+
+        num_partitions = self.get_partition_count(kafka_producer, kafka_topic)
+        if not num_partitions:
+            return None
+
+        if key is None:
+            return self.partition_keyless(kafka_topic, num_partitions)
+
+        topic_key_partitions = self.key_partitions.get(kafka_topic)
+        if topic_key_partitions is None or topic_key_partitions[0] != num_partitions:
+            topic_key_partitions = (num_partitions, {})
+            self.key_partitions[kafka_topic] = topic_key_partitions
+
+        partition = topic_key_partitions[1].get(key)
+        if partition is None:
+            partition = self.partition_key(kafka_topic, key, num_partitions)
+            if len(topic_key_partitions[1]) >= self.max_cached_keys:
+                topic_key_partitions[1].clear()
+            topic_key_partitions[1][key] = partition
+
+        return partition
+
+    def partition_key(self, kafka_topic, key, num_partitions):
+        """
+        Purpose:
+            Choose the partition of a keyed message (the result is cached)
+        Args:
+            kafka_topic (String): Kafka Topic of the message
+            key (String/Bytes): Message key
+            num_partitions (Int): Number of partitions of the topic
+        Return:
+            partition (Int): Partition of the message
+        """
+
+        raise NotImplementedError("Partitioners must implement partition_key")
+
+    def partition_keyless(self, kafka_topic, num_partitions):
+        """
+        Purpose:
+            Choose the partition of a message without a key. Default lets
+            librdkafka choose
+        Args:
+            kafka_topic (String): Kafka Topic of the message
+            num_partitions (Int): Number of partitions of the topic
+        Return:
+            partition (Int): Partition of the message, or None
+        """
+
+        return None
+
+    def get_partition_count(self, kafka_producer, kafka_topic):
+        """
+        Purpose:
+            Get the partition count of a topic, from the cache when fresh
+        Args:
+            kafka_producer (Kafka Producer Obj): Producer to fetch metadata with
+            kafka_topic (String): Kafka Topic
+        Return:
+            num_partitions (Int): Number of partitions (0 if the topic does not
+                exist)
+        """
+
+        partition_count = self.partition_counts.get(kafka_topic)
+        now = time.monotonic()
+        if partition_count is not None and now < partition_count[0]:
+            return partition_count[1]
+
+        topic_metadata = kafka_producer.list_topics(
+            topic=kafka_topic, timeout=self.timeout
+        ).topics.get(kafka_topic)
+        if topic_metadata is None or topic_metadata.error is not None:
+            num_partitions = 0
+        else:
+            num_partitions = len(topic_metadata.partitions)
+
+        self.partition_counts[kafka_topic] = (now + self.metadata_ttl, num_partitions)
+
+        return num_partitions
+
+
+class Murmur2Partitioner(KafkaPartitioner):
+    """
+    Purpose:
+        Partitions keyed messages like the Java client's default partitioner
+        (murmur2 of the key), so keys land on the same partitions as messages
+        produced by Java producers. Messages without a key are left to
+        librdkafka
+    """
+
+    def partition_key(self, kafka_topic, key, num_partitions):
+        """
+        Purpose:
+            Choose the partition of a keyed message (see KafkaPartitioner)
+        """
+
+        return get_murmur2_partition(key, num_partitions)
+
+
+class StickyPartitioner(Murmur2Partitioner):
+    """
+    Purpose:
+        Sends messages without a key to one partition until sticky_messages
+        have been sent, then moves to another random partition, so keyless
+        messages fill large batches instead of many small ones. Keyed messages
+        use murmur2 (see Murmur2Partitioner) to keep their ordering
+    """
+
+    def __init__(self, sticky_messages=1000, **partitioner_kwargs):
+        """
+        Purpose:
+            Initialize the StickyPartitioner
+        Args:
+            sticky_messages (Int): Keyless messages sent to a partition before
+                moving to another. Default is 1000
+            partitioner_kwargs (Kwargs): Arguments for KafkaPartitioner
+        Return:
+            N/A
+        """
+
+        super().__init__(**partitioner_kwargs)
+        self.sticky_messages = sticky_messages
+        self.sticky_partitions = {}
+        self.lock = threading.Lock()
+
+    def partition_keyless(self, kafka_topic, num_partitions):
+        """
+        Purpose:
+            Choose the partition of a message without a key (see
+            KafkaPartitioner)
+        """
+
+        with self.lock:
+            partition, remaining = self.sticky_partitions.get(kafka_topic, (None, 0))
+            if partition is None or remaining <= 0 or partition >= num_partitions:
+                previous_partition = partition
+                partition = random.randrange(num_partitions)
+                if partition == previous_partition and num_partitions > 1:
+                    partition = (partition + 1) % num_partitions
+                remaining = self.sticky_messages
+            self.sticky_partitions[kafka_topic] = (partition, remaining - 1)
+
+        return partition
+
+
+class RoundRobinPartitioner(KafkaPartitioner):
+    """
+    Purpose:
+        Spreads messages evenly over the partitions of a topic in turn,
+        ignoring keys (keys do not keep their ordering)
+    """
+
+    def __init__(self, **partitioner_kwargs):
+        """
+        Purpose:
+            Initialize the RoundRobinPartitioner
+        Args:
+            partitioner_kwargs (Kwargs): Arguments for KafkaPartitioner
+        Return:
+            N/A
+        """
+
+        super().__init__(**partitioner_kwargs)
+        self.counters = {}
+
+    def partition(self, kafka_producer, kafka_topic, key):
+        """
+        Purpose:
+            Get the partition to produce a message to (see KafkaPartitioner)
+        """
+
+        num_partitions = self.get_partition_count(kafka_producer, kafka_topic)
+        if not num_partitions:
+            return None
+
+        counter = self.counters.get(kafka_topic)
+        if counter is None:
+            counter = self.counters.setdefault(kafka_topic, itertools.count())
+
+        return next(counter) % num_partitions
+
+
+class CustomPartitioner(KafkaPartitioner):
+    """
+    Purpose:
+        Partitions messages with a user function called with the key (None
+        for keyless messages) and the partition count of the topic. Results
+        for keys are cached, so the function must return the same partition
+        for the same key and partition count
+    """
+
+    def __init__(self, partition_function, **partitioner_kwargs):
+        """
+        Purpose:
+            Initialize the CustomPartitioner
+        Args:
+            partition_function (Function): Function called with (key,
+                num_partitions) that returns the partition
+            partitioner_kwargs (Kwargs): Arguments for KafkaPartitioner
+        Return:
+            N/A
+        """
+
+        super().__init__(**partitioner_kwargs)
+        self.partition_function = partition_function
+
+    def partition_key(self, kafka_topic, key, num_partitions):
+        """
+        Purpose:
+            Choose the partition of a keyed message (see KafkaPartitioner)
+        """
+
+        return self.partition_function(key, num_partitions)
+
+    def partition_keyless(self, kafka_topic, num_partitions):
+        """
+        Purpose:
+            Choose the partition of a message without a key (see
+            KafkaPartitioner)
+        """
+
+        return self.partition_function(None, num_partitions)
+
+
+def get_partitioner(partitioner, **partitioner_kwargs):
+    """
+    Purpose:
+        Get a partitioner from a name, a function or a partitioner object.
+        Without partitioner_kwargs, one partitioner per name or function is
+        shared by the process, so produce helpers called with a name keep
+        their key and metadata caches between calls
+    Args:
+        partitioner (String/Function/KafkaPartitioner): One of
+            PYTHON_PARTITIONERS, a function called with (key, num_partitions)
+            (see CustomPartitioner) or a partitioner object (returned as is)
+        partitioner_kwargs (Kwargs): Arguments for a new partitioner (see
+            create_partitioner)
+    Return:
+        kafka_partitioner (KafkaPartitioner): Partitioner
+    Raises:
+        InvalidPartitioner: If the partitioner is not supported
+    """
+
+    if isinstance(partitioner, KafkaPartitioner):
+        return partitioner
+    if partitioner_kwargs:
+        return create_partitioner(partitioner, **partitioner_kwargs)
+
+    kafka_partitioner = SHARED_PARTITIONERS.get(partitioner)
+    if kafka_partitioner is None:
+        kafka_partitioner = SHARED_PARTITIONERS.setdefault(
+            partitioner, create_partitioner(partitioner)
+        )
+
+    return kafka_partitioner
+
+
+def create_partitioner(partitioner, **partitioner_kwargs):
+    """
+    Purpose:
+        Create a new partitioner from a name or a function
+    Args:
+        partitioner (String/Function): One of PYTHON_PARTITIONERS or a function
+            called with (key, num_partitions) (see CustomPartitioner)
+        partitioner_kwargs (Kwargs): Arguments for the partitioner class
+            (max_cached_keys, metadata_ttl, sticky_messages, etc.)
+    Return:
+        kafka_partitioner (KafkaPartitioner): Partitioner
+    Raises:
+        InvalidPartitioner: If the partitioner is not supported
+    """
+
+    if callable(partitioner):
+        return CustomPartitioner(partitioner, **partitioner_kwargs)
+
+    partitioner_classes = {
+        "murmur2": Murmur2Partitioner,
+        "round_robin": RoundRobinPartitioner,
+        "sticky": StickyPartitioner,
+    }
+    if partitioner not in partitioner_classes:
+        raise InvalidPartitioner(
+            f"Partitioner {partitioner} is not supported, must be a function or "
+            f"one of: {', '.join(PYTHON_PARTITIONERS)}"
+        )
+
+    return partitioner_classes[partitioner](**partitioner_kwargs)
+
+
+# Process-wide partitioners by name or function (see get_partitioner)
+SHARED_PARTITIONERS = {}
+
+
+def validate_native_partitioner(partitioner):
+    """
+    Purpose:
+        Validate a librdkafka "partitioner" configuration value
+    Args:
+        partitioner (String): librdkafka partitioner name
+    Return:
+        N/A
+    Raises:
+        InvalidPartitioner: If librdkafka has no such partitioner
+    """
+
+    if partitioner not in NATIVE_PARTITIONERS:
+        raise InvalidPartitioner(
+            f"librdkafka partitioner {partitioner} does not exist, must be one "
+            f"of: {', '.join(NATIVE_PARTITIONERS)}"
+        )
+
+
+###
+# Hashing
+###
+
+
+def murmur2(data):
+    """
+    Purpose:
+        32 bit murmur2 hash with the seed and byte handling of the Java client
+        (org.apache.kafka.common.utils.Utils.murmur2)
+    Args:
+        data (Bytes): Data to hash
+    Return:
+        murmur2_hash (Int): Unsigned 32 bit hash
+    """
+
+    length = len(data)
+    seed = 0x9747B28C
+    m = 0x5BD1E995
+    mask = 0xFFFFFFFF
+
+    h = (seed ^ length) & mask
+    length4 = length // 4
+    for k in struct.unpack_from(f"<{length4}I", data):
+        k = (k * m) & mask
+        k ^= k >> 24
+        k = (k * m) & mask
+        h = ((h * m) & mask) ^ k
+
+    tail = length4 * 4
+    extra = length - tail
+    if extra == 3:
+        h ^= data[tail + 2] << 16
+    if extra >= 2:
+        h ^= data[tail + 1] << 8
+    if extra >= 1:
+        h ^= data[tail]
+        h = (h * m) & mask
+
+    h ^= h >> 13
+    h = (h * m) & mask
+    h ^= h >> 15
+
+    return h
+
+
+def get_murmur2_partition(key, num_partitions):
+    """
+    Purpose:
+        Get the partition of a key like the Java client's default partitioner
+    Args:
+        key (String/Bytes): Message key (strings are UTF-8 encoded)
+        num_partitions (Int): Number of partitions of the topic
+    Return:
+        partition (Int): Partition of the key
+    """
+
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+
+    return (murmur2(key) & 0x7FFFFFFF) % num_partitions
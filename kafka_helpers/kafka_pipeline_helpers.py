@@ -0,0 +1,226 @@
+"""
+    Purpose:
+        Kafka Pipeline Helpers.
+
+        This library is used to build message handling pipelines for consumers.
+        A pipeline is a chain of stages (deserialize, filter, sink, etc.) where
+        each stage takes an iterable and lazily yields results, so records flow
+        through the pipeline one at a time without per-message I/O unless a
+        stage asks for it.
+"""
+
+# Python Library Imports
+import logging
+
+
+###
+# Records
+###
+
+
+class KafkaRecord(object):
+    """
+    Purpose:
+        Decoded Kafka Message. Holds the location of the message in the topic
+        along with the deserialized key and value
+    """
+
+    __slots__ = ("topic", "partition", "offset", "key", "value")
+
+    def __init__(self, topic, partition, offset, key, value):
+        """
+        Purpose:
+            Initialize the KafkaRecord
+        Args:
+            topic (String): Topic the message was consumed from
+            partition (Int): Partition the message was consumed from
+            offset (Int): Offset of the message in the partition
+            key (Any): Deserialized message key
+            value (Any): Deserialized message value
+        Return:
+            N/A
+        """
+
+        self.topic = topic
+        self.partition = partition
+        self.offset = offset
+        self.key = key
+        self.value = value
+
+    def __repr__(self):
+        """
+        Purpose:
+            Representation of the record for debugging
+        """
+
+        return (
+            f"KafkaRecord(topic={self.topic!r}, partition={self.partition}, "
+            f"offset={self.offset}, key={self.key!r}, value={self.value!r})"
+        )
+
+
+###
+# Pipeline Construction
+###
+
+
+def build_message_pipeline(*stages):
+    """
+    Purpose:
+        Compose pipeline stages into a single pipeline. Stages are applied in
+        the order they are passed
+    Args:
+        stages (Functions): Functions that take an iterable and return an
+            iterable (see the get_*_stage helpers)
+    Return:
+        message_pipeline (Function): Function that takes an iterable of Kafka
+            messages and returns a lazy iterable of the pipeline output
+    """
+
+    def message_pipeline(messages):
+        for stage in stages:
+            messages = stage(messages)
+        return messages
+
+    return message_pipeline
+
+
+###
+# Pipeline Stages
+###
+
+
+def get_deserializer_stage(value_deserializer=None, key_deserializer=None):
+    """
+    Purpose:
+        Get a stage that turns Kafka messages into KafkaRecords
+    Args:
+        value_deserializer (Function): Function that takes the raw value bytes
+            and returns the decoded value. Default leaves the value as bytes
+        key_deserializer (Function): Function that takes the raw key bytes
+            and returns the decoded key. Default leaves the key as bytes
+    Return:
+        deserializer_stage (Function): Pipeline stage
+    """
+
+    def deserializer_stage(messages):
+        for msg in messages:
+            key = msg.key()
+            value = msg.value()
+            if key_deserializer is not None and key is not None:
+                key = key_deserializer(key)
+            if value_deserializer is not None and value is not None:
+                value = value_deserializer(value)
+
+            yield KafkaRecord(
+                msg.topic(), msg.partition(), msg.offset(), key, value
+            )
+
+    return deserializer_stage
+
+
+def get_filter_stage(record_filter):
+    """
+    Purpose:
+        Get a stage that drops records the filter does not accept
+    Args:
+        record_filter (Function): Function that takes a record and returns True
+            if the record should continue through the pipeline
+    Return:
+        filter_stage (Function): Pipeline stage
+    """
+
+    def filter_stage(records):
+        return filter(record_filter, records)
+
+    return filter_stage
+
+
+def get_sink_stage(record_sink):
+    """
+    Purpose:
+        Get a stage that passes each record to a sink. Records are yielded
+        after the sink has handled them so further stages can be chained
+    Args:
+        record_sink (Function): Function called with each record
+    Return:
+        sink_stage (Function): Pipeline stage
+    """
+
+    def sink_stage(records):
+        for record in records:
+            record_sink(record)
+            yield record
+
+    return sink_stage
+
+
+def get_logging_stage(log_level=logging.INFO):
+    """
+    Purpose:
+        Get a stage that logs each record. Only add this stage when per-message
+        logging is wanted; the message is not formatted if the level is disabled
+    Args:
+        log_level (Int): Logging level to log records at. Default is INFO
+    Return:
+        logging_stage (Function): Pipeline stage
+    """
+
+    def logging_stage(records):
+        for record in records:
+            logging.log(log_level, "Got Record from Topic: %r", record)
+            yield record
+
+    return logging_stage
+
+
+def run_message_pipeline(message_pipeline, messages):
+    """
+    Purpose:
+        Drive a pipeline to completion, for pipelines that end in a sink and
+        whose output is not needed
+    Args:
+        message_pipeline (Function): Pipeline from build_message_pipeline
+        messages (Iterable of Kafka Message Objs): Messages to run through the
+            pipeline
+    Return:
+        total_records (Int): Number of records that reached the end of the
+            pipeline
+    """
+
+    total_records = 0
+    for _ in message_pipeline(messages):
+        total_records += 1
+
+    return total_records
+
+
+###
+# Deserializers
+###
+
+
+def utf8_deserializer(data):
+    """
+    Purpose:
+        Decode bytes as a UTF-8 string
+    Args:
+        data (Bytes): Raw key or value
+    Return:
+        decoded_data (String): Decoded string
+    """
+
+    return str(data, "utf-8")
+
+
+def int_deserializer(data):
+    """
+    Purpose:
+        Decode bytes as a big-endian integer
+    Args:
+        data (Bytes): Raw key or value
+    Return:
+        decoded_data (Int): Decoded integer
+    """
+
+    return int.from_bytes(data, byteorder="big")
@@ -7,56 +7,600 @@
 
 # Python Library Imports
 import logging
+import threading
+import time
 from confluent_kafka import Producer, KafkaException, KafkaError
 
+# Local Library Imports
+from kafka_helpers.kafka_client_pool_helpers import CLIENT_POOL
+from kafka_helpers.kafka_compression_helpers import (
+    get_compression_configuration,
+    validate_compression_type,
+)
+from kafka_helpers.kafka_exceptions import InvalidProducerProfile
+from kafka_helpers.kafka_partitioner_helpers import (
+    get_partitioner,
+    validate_native_partitioner,
+)
+from kafka_helpers.kafka_serde_helpers import json_loads
+from kafka_helpers.kafka_statistics_helpers import STATISTICS_REGISTRY
 
-def get_kafka_producer(kafka_brokers, get_stats=True):
+
+###
+# Producer Configuration Profiles
+###
+
+
+# Coherent sets of librdkafka producer settings, applied before any overrides
+PRODUCER_CONFIGURATION_PROFILES = {
+    "default": {},
+    "throughput": {
+        "linger.ms": 50,
+        "batch.num.messages": 10000,
+        "queue.buffering.max.messages": 1000000,
+        "queue.buffering.max.kbytes": 1048576,
+        "compression.type": "lz4",
+        "acks": 1,
+    },
+    "low-latency": {
+        "linger.ms": 0,
+        "batch.num.messages": 1000,
+        "queue.buffering.max.messages": 100000,
+        "queue.buffering.max.kbytes": 65536,
+        "compression.type": "none",
+        "acks": 1,
+        "socket.nagle.disable": True,
+    },
+    "exactly-once": {
+        "enable.idempotence": True,
+        "acks": "all",
+        "max.in.flight.requests.per.connection": 5,
+        "linger.ms": 10,
+        "batch.num.messages": 10000,
+        "queue.buffering.max.messages": 500000,
+        "queue.buffering.max.kbytes": 1048576,
+        "compression.type": "lz4",
+    },
+}
+
+
+###
+# Delivery Report State
+###
+
+
+# Delivery counts keyed by (topic, partition), value is [delivered, failed]
+DELIVERY_REPORT_COUNTS = {}
+DELIVERY_REPORT_LOCK = threading.Lock()
+
+# Log 1 in N successful deliveries (0 disables success logging)
+DELIVERY_LOG_SAMPLE_RATE = 0
+DELIVERY_LOG_COUNTER = 0
+
+
+def get_kafka_producer(
+    kafka_brokers,
+    get_stats=True,
+    profile="default",
+    config_overrides=None,
+    stats_interval_ms=100000,
+    producer_class=None,
+    compression_type=None,
+    compression_level=None,
+    pooled=False,
+    partitioner=None,
+):
     """
     Purpose:
         Get a Kafka Producer Object (not yet connected to a topic)
     Args:
         kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
-        get_stats (Bool): Whether or not to print statistics. Default is True
+        get_stats (Bool): Whether or not to collect statistics into the
+            kafka_statistics_helpers.STATISTICS_REGISTRY. Default is True
+        profile (String): Name of the configuration profile to build the producer
+            with (see PRODUCER_CONFIGURATION_PROFILES). Default is "default"
+        config_overrides (Dict): librdkafka configuration applied on top of the
+            profile. Default is None
+        stats_interval_ms (Int): How often librdkafka emits statistics in ms.
+            Default is 100000
+        producer_class (Class): Producer class to create. Default is the
+            confluent_kafka Producer (pass FakeKafkaBroker.Producer to produce
+            to the in-memory fake broker)
+        compression_type (String): Codec to compress batches with (one of
+            kafka_compression_helpers.COMPRESSION_TYPES), applied on top of the
+            profile. Default is None (the profile codec)
+        compression_level (Int): Codec compression level. Default is None (the
+            codec default)
+        pooled (Bool): Whether to reuse the producer of an earlier call with the
+            same configuration from the process-wide
+            kafka_client_pool_helpers.CLIENT_POOL. Default is False (a new
+            producer per call)
+        partitioner (String): librdkafka partitioner for keyed messages (one
+            of kafka_partitioner_helpers.NATIVE_PARTITIONERS, e.g.
+            "murmur2_random" to match the Java client). Default is None (the
+            profile partitioner)
     Return:
         kafka_producer (Kafka Producer Obj): Kafka Producer Object
     """
-    logging.info(f"Creating Producer for {','.join(kafka_brokers)}")
+    logging.info(f"Creating Producer ({profile}) for {','.join(kafka_brokers)}")
+
+    producer_configuration = get_producer_configuration(
+        kafka_brokers,
+        profile=profile,
+        config_overrides=config_overrides,
+        compression_type=compression_type,
+        compression_level=compression_level,
+        partitioner=partitioner,
+    )
+
+    if get_stats:
+        producer_configuration["statistics.interval.ms"] = stats_interval_ms
+        producer_configuration["stats_cb"] = producer_statistic_callback
+
+    producer_class = producer_class or Producer
+
+    if pooled:
+        return CLIENT_POOL.get_client(
+            "producer", producer_configuration, producer_class
+        )
+
+    return producer_class(producer_configuration)
+
+
+def get_producer_configuration(
+    kafka_brokers,
+    profile="default",
+    config_overrides=None,
+    compression_type=None,
+    compression_level=None,
+    partitioner=None,
+):
+    """
+    Purpose:
+        Build the librdkafka configuration for a producer from a profile and
+        overrides
+    Args:
+        kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
+        profile (String): Name of the configuration profile to build the producer
+            with (see PRODUCER_CONFIGURATION_PROFILES). Default is "default"
+        config_overrides (Dict): librdkafka configuration applied on top of the
+            profile. Default is None
+        compression_type (String): Codec to compress batches with (one of
+            kafka_compression_helpers.COMPRESSION_TYPES), applied on top of the
+            profile. Default is None (the profile codec)
+        compression_level (Int): Codec compression level. Default is None (the
+            codec default)
+        partitioner (String): librdkafka partitioner for keyed messages (one
+            of kafka_partitioner_helpers.NATIVE_PARTITIONERS). Default is None
+            (the profile partitioner)
+    Return:
+        producer_configuration (Dict): librdkafka producer configuration
+    Raises:
+        InvalidProducerProfile: If the profile does not exist
+        InvalidCompressionType: If the codec or level is not supported
+        InvalidPartitioner: If librdkafka has no such partitioner
+    """
+
+    if profile not in PRODUCER_CONFIGURATION_PROFILES:
+        raise InvalidProducerProfile(
+            f"Producer profile {profile} does not exist, must be one of: "
+            f"{', '.join(PRODUCER_CONFIGURATION_PROFILES)}"
+        )
 
     producer_configuration = {
         "bootstrap.servers": ",".join(kafka_brokers),
     }
+    producer_configuration.update(PRODUCER_CONFIGURATION_PROFILES[profile])
+    if compression_type is not None:
+        producer_configuration.update(
+            get_compression_configuration(compression_type, compression_level)
+        )
+    if partitioner is not None:
+        validate_native_partitioner(partitioner)
+        producer_configuration["partitioner"] = partitioner
+    if config_overrides:
+        producer_configuration.update(config_overrides)
+
+    return producer_configuration
+
+
+###
+# Per-Topic Compression
+###
+
+
+class TopicCompressionProducer(object):
+    """
+    Purpose:
+        Producer that compresses each topic with its own codec. librdkafka sets
+        the codec per producer, so one producer is created per distinct codec
+        and messages are routed to the producer of their topic. Has the
+        produce/poll/flush/list_topics/len interface of a producer, so it can
+        be passed to produce_message and produce_messages (with or without a
+        Python partitioner)
+    """
+
+    def __init__(
+        self, kafka_producers, topic_compression_types, default_compression_type
+    ):
+        """
+        Purpose:
+            Initialize the TopicCompressionProducer
+        Args:
+            kafka_producers (Dict): Key is the codec and value is the Kafka
+                Producer Object compressing with it
+            topic_compression_types (Dict): Key is the topic and value is the
+                codec of the topic
+            default_compression_type (String): Codec of topics not in
+                topic_compression_types
+        Return:
+            N/A
+        """
+
+        self.kafka_producers = kafka_producers
+        self.topic_compression_types = topic_compression_types
+        self.default_compression_type = default_compression_type
+
+    def __len__(self):
+        return sum(
+            len(kafka_producer) for kafka_producer in self.kafka_producers.values()
+        )
+
+    def get_producer(self, kafka_topic):
+        """
+        Purpose:
+            Get the producer compressing a topic
+        Args:
+            kafka_topic (String): Kafka Topic
+        Return:
+            kafka_producer (Kafka Producer Obj): Producer for the topic codec
+        """
+
+        return self.kafka_producers[
+            self.topic_compression_types.get(
+                kafka_topic, self.default_compression_type
+            )
+        ]
+
+    def produce(self, kafka_topic, *args, **kwargs):
+        """
+        Purpose:
+            Produce a message with the producer of the topic codec (arguments
+            are passed to Producer.produce)
+        Args:
+            kafka_topic (String): Kafka Topic to Produce message to.
+        Return:
+            N/A
+        Raises:
+            BufferError: If the queue of the topic producer is full
+        """
+
+        self.get_producer(kafka_topic).produce(kafka_topic, *args, **kwargs)
+
+    def list_topics(self, topic=None, timeout=-1):
+        """
+        Purpose:
+            Get cluster metadata with the producer of the topic codec (e.g. for
+            the partition counts of kafka_partitioner_helpers partitioners)
+        Args:
+            topic (String): Kafka Topic to get metadata for. Default is None
+                (every topic, with the producer of the default codec)
+            timeout (Float): Max seconds to wait for the metadata. Default is
+                -1 (wait indefinitely)
+        Return:
+            cluster_metadata (ClusterMetadata): Metadata of the cluster
+        """
+
+        return self.get_producer(topic).list_topics(topic=topic, timeout=timeout)
+
+    def poll(self, timeout=None):
+        """
+        Purpose:
+            Serve delivery reports of every producer. If none are ready, waits
+            up to timeout seconds (split across the producers)
+        Args:
+            timeout (Float): Max seconds to wait for events. Default is None
+                (wait for an event)
+        Return:
+            num_events (Int): Number of events served
+        """
+
+        num_events = sum(
+            kafka_producer.poll(0) for kafka_producer in self.kafka_producers.values()
+        )
+        if num_events or timeout == 0:
+            return num_events
+
+        producer_timeout = (
+            -1 if timeout is None or timeout < 0
+            else timeout / len(self.kafka_producers)
+        )
+        for kafka_producer in self.kafka_producers.values():
+            num_events += kafka_producer.poll(producer_timeout)
+            if num_events:
+                break
+
+        return num_events
+
+    def flush(self, timeout=None):
+        """
+        Purpose:
+            Wait for every message of every producer to be delivered
+        Args:
+            timeout (Float): Max seconds to wait in total. Default is None
+                (wait until all messages are delivered)
+        Return:
+            num_pending (Int): Number of messages still in the producer queues
+        """
+
+        if timeout is None:
+            for kafka_producer in self.kafka_producers.values():
+                kafka_producer.flush()
+        else:
+            deadline = time.monotonic() + timeout
+            for kafka_producer in self.kafka_producers.values():
+                kafka_producer.flush(max(deadline - time.monotonic(), 0))
+
+        return len(self)
+
+
+def get_topic_compression_producer(
+    kafka_brokers,
+    topic_compression_types,
+    default_compression_type="none",
+    compression_levels=None,
+    **producer_kwargs,
+):
+    """
+    Purpose:
+        Get a TopicCompressionProducer that compresses each topic with its own
+        codec (e.g. a codec picked per topic with
+        kafka_compression_helpers.measure_compression)
+    Args:
+        kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
+        topic_compression_types (Dict): Key is the topic and value is the codec
+            to compress it with (one of kafka_compression_helpers.COMPRESSION_TYPES)
+        default_compression_type (String): Codec of every other topic. Default
+            is "none"
+        compression_levels (Dict): Key is the codec and value is its compression
+            level. Default is None (the codec defaults)
+        producer_kwargs (Kwargs): Arguments passed to get_kafka_producer for
+            each producer (profile, config_overrides, producer_class, etc.)
+    Return:
+        kafka_producer (TopicCompressionProducer): Producer routing each topic
+            to the producer of its codec
+    Raises:
+        InvalidCompressionType: If a codec or level is not supported
+    """
+
+    compression_levels = compression_levels or {}
+    compression_types = set(topic_compression_types.values())
+    compression_types.add(default_compression_type)
+
+    # Validate every codec before creating any producer
+    for compression_type in compression_types:
+        validate_compression_type(
+            compression_type, compression_levels.get(compression_type)
+        )
+
+    kafka_producers = {
+        compression_type: get_kafka_producer(
+            kafka_brokers,
+            compression_type=compression_type,
+            compression_level=compression_levels.get(compression_type),
+            **producer_kwargs,
+        )
+        for compression_type in sorted(compression_types)
+    }
 
-    return Producer(producer_configuration)
+    return TopicCompressionProducer(
+        kafka_producers, dict(topic_compression_types), default_compression_type
+    )
 
 
-def produce_message(kafka_producer, kafka_topic, msg):
+def produce_message(
+    kafka_producer, kafka_topic, msg, serializer=None, key=None, partitioner=None
+):
     """
     Purpose:
-        Consume Kafka Topics
+        Produce a Message to a Kafka Topic. If the local producer queue is full,
+        delivery reports are served until there is room and the message is
+        retried (the message is not dropped)
     Args:
         kafka_producer (Kafka Producer Obj): Kafka Producer Object
         kafka_topic (String): Kafka Topic to Produce message to.
-        msg (String): Message to produce to Kafka
+        msg (String/Bytes/Any): Message to produce to Kafka
+        serializer (Function): Optional function to encode the message with
+            (e.g. kafka_serde_helpers.json_serializer). Default produces the
+            message as is
+        key (String/Bytes): Message key. Default is None
+        partitioner (String/Function/KafkaPartitioner): Python partitioner to
+            choose the partition with (see
+            kafka_partitioner_helpers.get_partitioner); pass the same object
+            on every call so its caches are reused. Default is None (the
+            librdkafka partitioner, which needs no Python work)
     Returns:
         N/A
+    Raises:
+        InvalidPartitioner: If the partitioner is not supported
+        Exception: Any exception raised by the serializer or partitioner (the
+            message is not produced)
     """
-    logging.info(f"Producing Message to Topic {kafka_topic}")
+
+    if serializer is not None:
+        msg = serializer(msg)
+    partition = None
+    if partitioner is not None:
+        partition = get_partitioner(partitioner).partition(
+            kafka_producer, kafka_topic, key
+        )
 
     try:
         kafka_producer.poll(0)
-        kafka_producer.produce(
-            kafka_topic, msg, callback=produce_results_callback
+        produce_with_backpressure(
+            kafka_producer,
+            kafka_topic,
+            msg,
+            produce_results_callback,
+            key=key,
+            partition=partition,
         )
-    except BufferError as buf_err:
-        logging.exception(
-            f"Local producer queue is full ({len(kafka_producer)} messages "
-            f"awaiting delivery): {buf_err} "
-        )
-        kafka_producer.flush()
     except Exception as err:
         logging.exception(f"General Kafka Exception During Produce: {err}")
 
 
+def produce_messages(
+    kafka_producer,
+    kafka_topic,
+    msgs,
+    poll_interval=1000,
+    buffer_full_timeout=0.1,
+    flush=True,
+    flush_timeout=None,
+    serializer=None,
+    key_function=None,
+    partitioner=None,
+):
+    """
+    Purpose:
+        Produce many Messages to a Kafka Topic. Streams an iterable (such as a
+        generator) into the producer, serving delivery reports every
+        poll_interval messages. If the local producer queue is full, delivery
+        reports are served until there is room and the message is retried, so
+        no messages are lost
+    Args:
+        kafka_producer (Kafka Producer Obj): Kafka Producer Object
+        kafka_topic (String): Kafka Topic to Produce messages to.
+        msgs (Iterable of Strings/Bytes/Any): Messages to produce to Kafka
+        poll_interval (Int): Number of messages to produce between each
+            poll(0) for delivery reports, or 0 to only serve them when the
+            local queue is full and when flushing. Default is 1000
+        buffer_full_timeout (Float): Seconds to wait for delivery reports when
+            the local queue is full before retrying. Default is 0.1
+        flush (Bool): Whether to wait for all messages to be delivered before
+            returning. Default is True
+        flush_timeout (Float): Max seconds to wait when flushing. Default waits
+            until all messages are delivered
+        serializer (Function): Optional function to encode each message with
+            (e.g. kafka_serde_helpers.json_serializer). Default produces the
+            messages as is
+        key_function (Function): Optional function called with each message
+            (before it is serialized) that returns its key. Default produces
+            the messages without keys
+        partitioner (String/Function/KafkaPartitioner): Python partitioner to
+            choose each partition with (see
+            kafka_partitioner_helpers.get_partitioner). Default is None (the
+            librdkafka partitioner, which needs no Python work)
+    Returns:
+        produce_summary (Dict): "produced" (messages handed to the producer),
+            "delivered" and "failed" (delivery reports received), and "pending"
+            (messages still in the producer queue)
+    Raises:
+        KafkaException: If the producer rejects a message for any reason other
+            than a full queue
+        InvalidPartitioner: If the partitioner is not supported
+        ValueError: If poll_interval is negative
+    """
+
+    if poll_interval < 0:
+        raise ValueError(f"Poll interval must be >= 0: {poll_interval}")
+
+    logging.info(f"Producing Messages to Topic {kafka_topic}")
+
+    produce_summary = {"produced": 0, "delivered": 0, "failed": 0, "pending": 0}
+
+    def delivery_callback(err, msg):
+        if err:
+            produce_summary["failed"] += 1
+        else:
+            produce_summary["delivered"] += 1
+        produce_results_callback(err, msg)
+
+    if partitioner is not None:
+        partitioner = get_partitioner(partitioner)
+
+    produced = 0
+    key = None
+    partition = None
+    for msg in msgs:
+        if key_function is not None:
+            key = key_function(msg)
+        if partitioner is not None:
+            partition = partitioner.partition(kafka_producer, kafka_topic, key)
+        if serializer is not None:
+            msg = serializer(msg)
+        produce_with_backpressure(
+            kafka_producer,
+            kafka_topic,
+            msg,
+            delivery_callback,
+            buffer_full_timeout=buffer_full_timeout,
+            key=key,
+            partition=partition,
+        )
+        produced += 1
+        if poll_interval and produced % poll_interval == 0:
+            kafka_producer.poll(0)
+
+    if flush:
+        if flush_timeout is None:
+            kafka_producer.flush()
+        else:
+            kafka_producer.flush(flush_timeout)
+    else:
+        kafka_producer.poll(0)
+
+    produce_summary["produced"] = produced
+    produce_summary["pending"] = len(kafka_producer)
+
+    logging.info(f"Produced Messages to Topic {kafka_topic}: {produce_summary}")
+
+    return produce_summary
+
+
+def produce_with_backpressure(
+    kafka_producer,
+    kafka_topic,
+    msg,
+    callback,
+    buffer_full_timeout=0.1,
+    key=None,
+    partition=None,
+):
+    """
+    Purpose:
+        Produce a message, waiting on delivery reports for room in the local
+        producer queue whenever it is full
+    Args:
+        kafka_producer (Kafka Producer Obj): Kafka Producer Object
+        kafka_topic (String): Kafka Topic to Produce message to.
+        msg (String/Bytes): Message to produce to Kafka
+        callback (Function): Delivery report callback for the message
+        buffer_full_timeout (Float): Seconds to wait for delivery reports when
+            the local queue is full before retrying. Default is 0.1
+        key (String/Bytes): Message key. Default is None
+        partition (Int): Partition to produce to. Default is None (chosen by
+            librdkafka)
+    Returns:
+        N/A
+    """
+
+    produce_kwargs = {"key": key, "callback": callback}
+    if partition is not None:
+        produce_kwargs["partition"] = partition
+
+    while True:
+        try:
+            kafka_producer.produce(kafka_topic, msg, **produce_kwargs)
+            return
+        except BufferError:
+            logging.debug(
+                "Local producer queue is full (%s messages awaiting delivery)",
+                len(kafka_producer)
+            )
+            kafka_producer.poll(buffer_full_timeout)
+
+
 ###
 # Producer Management, Logging, Callbacks
 ###
@@ -67,18 +611,116 @@ def produce_results_callback(err, msg):
     Purpose:
         Optional per-message delivery callback (triggered by poll() or
         flush()) when a message has been successfully delivered or
-        permanently failed delivery (after retries).
+        permanently failed delivery (after retries). Updates the delivery
+        counts and logs a sample of successful deliveries (see
+        set_delivery_log_sample_rate)
     Args:
         err (String): Error Message
         msg (Object): Kafka Callback Message Object
     Return:
         N/A
     """
+    global DELIVERY_LOG_COUNTER
 
-    if not err:
+    delivery_key = (msg.topic(), msg.partition())
+    with DELIVERY_REPORT_LOCK:
+        delivery_counts = DELIVERY_REPORT_COUNTS.get(delivery_key)
+        if delivery_counts is None:
+            delivery_counts = DELIVERY_REPORT_COUNTS[delivery_key] = [0, 0]
+        delivery_counts[1 if err else 0] += 1
+        log_delivery = False
+        if not err:
+            # Only successes are sampled, failures are always logged
+            DELIVERY_LOG_COUNTER += 1
+            log_delivery = (
+                DELIVERY_LOG_SAMPLE_RATE
+                and DELIVERY_LOG_COUNTER % DELIVERY_LOG_SAMPLE_RATE == 0
+            )
+
+    if err:
+        logging.error("Kafka Produce Failed: %s", err)
+    elif log_delivery:
         logging.info(
-            f"Kafka Produce Successful: topic={msg.topic()}, "
-            f"partition={msg.partition()}, offset={msg.offset()}"
+            "Kafka Produce Successful: topic=%s, partition=%s, offset=%s",
+            msg.topic(), msg.partition(), msg.offset()
         )
-    else:
-        logging.error(f"Kafka Produce Failed: {err}")
+
+
+def producer_statistic_callback(stats_json_str):
+    """
+    Purpose:
+        Producer stats_cb. Parse the librdkafka statistics and record them in
+        the kafka_statistics_helpers.STATISTICS_REGISTRY
+    Args:
+        stats_json_str (String): librdkafka statistics JSON
+    Return:
+        stats (Dict): Parsed librdkafka statistics
+    """
+
+    stats = json_loads(stats_json_str)
+    STATISTICS_REGISTRY.record_statistics(stats)
+
+    return stats
+
+
+def set_delivery_log_sample_rate(sample_rate):
+    """
+    Purpose:
+        Set how often successful deliveries are logged by
+        produce_results_callback. Failures are always logged
+    Args:
+        sample_rate (Int): Log 1 in sample_rate successful deliveries. 0
+            disables logging of successful deliveries (the default)
+    Return:
+        N/A
+    """
+    global DELIVERY_LOG_SAMPLE_RATE
+
+    if sample_rate < 0:
+        raise ValueError(f"Delivery log sample rate must be >= 0: {sample_rate}")
+
+    DELIVERY_LOG_SAMPLE_RATE = sample_rate
+
+
+def get_delivery_report_counts():
+    """
+    Purpose:
+        Get the delivery counts aggregated by produce_results_callback
+    Args:
+        N/A
+    Return:
+        delivery_report_counts (Dict of Dicts): Key is the topic name and value
+            is a dict keyed by partition with the "delivered" and "failed"
+            counts for that partition
+    """
+
+    with DELIVERY_REPORT_LOCK:
+        delivery_counts = [
+            (delivery_key, tuple(counts))
+            for delivery_key, counts in DELIVERY_REPORT_COUNTS.items()
+        ]
+
+    delivery_report_counts = {}
+    for (kafka_topic, partition), (delivered, failed) in delivery_counts:
+        delivery_report_counts.setdefault(kafka_topic, {})[partition] = {
+            "delivered": delivered,
+            "failed": failed,
+        }
+
+    return delivery_report_counts
+
+
+def reset_delivery_report_counts():
+    """
+    Purpose:
+        Clear the delivery counts aggregated by produce_results_callback
+    Args:
+        N/A
+    Return:
+        N/A
+    """
+    global DELIVERY_LOG_COUNTER
+
+    with DELIVERY_REPORT_LOCK:
+        DELIVERY_REPORT_COUNTS.clear()
+        DELIVERY_LOG_COUNTER = 0
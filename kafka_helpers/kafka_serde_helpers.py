@@ -0,0 +1,178 @@
+"""
+    Purpose:
+        Kafka Serde Helpers.
+
+        This library is used to serialize and deserialize JSON messages with the
+        fastest JSON backend installed (orjson, then ujson, then simplejson,
+        then the standard library json). Batches of messages are decoded in a
+        single pass with the parser bound once per batch.
+"""
+
+# Python Library Imports
+import importlib
+import logging
+
+
+# JSON backends in order of preference
+JSON_BACKENDS = ("orjson", "ujson", "simplejson", "json")
+
+# Selected backend (see set_json_backend)
+JSON_BACKEND = None
+JSON_DUMPS = None
+JSON_LOADS = None
+
+
+###
+# Backend Selection
+###
+
+
+def set_json_backend(backend_name=None):
+    """
+    Purpose:
+        Select the JSON backend used by the serde helpers
+    Args:
+        backend_name (String): Name of the backend (one of JSON_BACKENDS).
+            Default is None (the fastest installed backend)
+    Return:
+        backend_name (String): Name of the selected backend
+    Raises:
+        ImportError: If the requested backend is not installed
+        ValueError: If the backend is not supported
+    """
+    global JSON_BACKEND, JSON_DUMPS, JSON_LOADS
+
+    if backend_name is None:
+        for backend_name in JSON_BACKENDS:
+            try:
+                importlib.import_module(backend_name)
+                break
+            except ImportError:
+                continue
+    elif backend_name not in JSON_BACKENDS:
+        raise ValueError(
+            f"JSON backend {backend_name} is not supported, must be one of: "
+            f"{', '.join(JSON_BACKENDS)}"
+        )
+
+    backend = importlib.import_module(backend_name)
+    if backend_name == "orjson":
+        # orjson encodes straight to bytes
+        dumps = backend.dumps
+    elif backend_name == "json":
+        def dumps(value, dumps=backend.dumps):
+            return dumps(value, separators=(",", ":")).encode("utf-8")
+    else:
+        def dumps(value, dumps=backend.dumps):
+            return dumps(value).encode("utf-8")
+
+    JSON_BACKEND, JSON_DUMPS, JSON_LOADS = backend_name, dumps, backend.loads
+    # Module logger, logging.debug would configure the root logger on import
+    logging.getLogger(__name__).debug(f"Using JSON Backend {backend_name}")
+
+    return backend_name
+
+
+def get_json_backend():
+    """
+    Purpose:
+        Get the name of the selected JSON backend
+    Args:
+        N/A
+    Return:
+        backend_name (String): Name of the selected backend
+    """
+
+    return JSON_BACKEND
+
+
+###
+# Serializers
+###
+
+
+def json_serializer(value):
+    """
+    Purpose:
+        Encode a value as JSON
+    Args:
+        value (Any): JSON serializable value
+    Return:
+        data (Bytes): UTF-8 encoded JSON
+    """
+
+    return JSON_DUMPS(value)
+
+
+def json_deserializer(data):
+    """
+    Purpose:
+        Decode JSON
+    Args:
+        data (Bytes/String): JSON
+    Return:
+        value (Any): Decoded value
+    """
+
+    return JSON_LOADS(data)
+
+
+def json_loads(data):
+    """
+    Purpose:
+        Decode JSON (alias of json_deserializer for parsing JSON documents such
+        as librdkafka statistics)
+    Args:
+        data (Bytes/String): JSON
+    Return:
+        value (Any): Decoded value
+    """
+
+    return JSON_LOADS(data)
+
+
+###
+# Batch Decoding
+###
+
+
+def decode_message_batch(msg_batch):
+    """
+    Purpose:
+        Decode the JSON values of a batch of Kafka messages. Each value is
+        parsed on its own, so an invalid value can never combine with its
+        neighbours into valid (but wrong) JSON
+    Args:
+        msg_batch (List of Kafka Message Objs): Messages with JSON values
+    Return:
+        values (List): Decoded value of each message, in order (None for
+            messages without a value)
+    Raises:
+        ValueError: If a message value is not valid JSON (raised by the
+            backend for the first invalid message)
+    """
+
+    return decode_json_batch([msg.value() for msg in msg_batch])
+
+
+def decode_json_batch(json_values):
+    """
+    Purpose:
+        Decode a list of JSON documents, one parser call per document
+    Args:
+        json_values (List of Bytes): JSON documents (None values decode to None)
+    Return:
+        values (List): Decoded values, in order
+    Raises:
+        ValueError: If a document is not valid JSON
+    """
+
+    json_loads = JSON_LOADS
+
+    return [
+        None if json_value is None else json_loads(json_value)
+        for json_value in json_values
+    ]
+
+
+set_json_backend()
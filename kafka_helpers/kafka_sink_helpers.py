@@ -0,0 +1,430 @@
+"""
+    Purpose:
+        Kafka Sink Helpers.
+
+        This library is used to write consumed records to downstream systems
+        (databases, search indexes, object stores) in bulk. Records are
+        buffered until a record count, byte size or age limit is reached and
+        then handed to a bulk write function in one call. Failed writes are
+        retried with exponential backoff, and consumer offsets are only
+        committed after the records before them were written, so a crash
+        replays unwritten records instead of losing them (at-least-once).
+"""
+
+# Python Library Imports
+import logging
+import time
+from confluent_kafka import KafkaException
+
+# Local Library Imports
+from kafka_helpers.kafka_consumer_helpers import (
+    consumer_assignment_callback,
+    filter_message_batch,
+)
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy, SinkFlushError
+from kafka_helpers.kafka_offset_helpers import get_topic_partitions
+
+
+###
+# Batch Sink
+###
+
+
+class KafkaBatchSink(object):
+    """
+    Purpose:
+        Buffer of consumed records that is flushed to a bulk write function
+        when it holds max_records records, max_bytes bytes of message values,
+        or its oldest record is max_latency_ms old. After a successful write
+        the next offset of every partition in the buffer is committed
+        synchronously. The consumer must be created with enable.auto.commit
+        set to False, otherwise offsets are committed before records are
+        written. This is only checked when an offset_committer is passed (a
+        consumer does not expose its configuration), so create the consumer
+        with a KafkaOffsetCommitter whose strategy is not "auto"
+    """
+
+    def __init__(
+        self,
+        kafka_consumer,
+        bulk_write,
+        max_records=500,
+        max_bytes=1000000,
+        max_latency_ms=1000,
+        max_retries=5,
+        retry_backoff_ms=100,
+        max_retry_backoff_ms=10000,
+        offset_committer=None,
+    ):
+        """
+        Purpose:
+            Initialize the KafkaBatchSink
+        Args:
+            kafka_consumer (Kafka Consumer Obj): Consumer the records are read
+                with (offsets are committed with it)
+            bulk_write (Function): Function called with a list of records to
+                write them downstream. Raising an exception fails the write
+            max_records (Int): Records that trigger a flush. Default is 500
+            max_bytes (Int): Bytes of message values that trigger a flush.
+                Default is 1000000
+            max_latency_ms (Int): Age in ms of the oldest buffered record that
+                triggers a flush. Default is 1000
+            max_retries (Int): Times a failed write is retried before the flush
+                fails. Default is 5
+            retry_backoff_ms (Int): Wait in ms before the first retry, doubled
+                for each further retry. Default is 100
+            max_retry_backoff_ms (Int): Max wait in ms between retries. Default
+                is 10000. Keep the total backoff well below the consumer
+                max.poll.interval.ms, as the consumer is not polled meanwhile
+            offset_committer (KafkaOffsetCommitter): Optional committer the
+                consumer was created with. Sink commits are made through it, so
+                their result and latency are recorded in its get_commit_summary
+        Return:
+            N/A
+        Raises:
+            InvalidCommitStrategy: If the offset_committer strategy is "auto"
+        """
+
+        if offset_committer is not None and offset_committer.commit_strategy == "auto":
+            raise InvalidCommitStrategy(
+                "KafkaBatchSink needs a consumer that does not auto commit"
+            )
+
+        self.kafka_consumer = kafka_consumer
+        self.bulk_write = bulk_write
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_latency_ms = max_latency_ms
+        self.max_retries = max_retries
+        self.retry_backoff_ms = retry_backoff_ms
+        self.max_retry_backoff_ms = max_retry_backoff_ms
+        self.offset_committer = offset_committer
+
+        self.records = []
+        self.buffered_messages = 0
+        self.buffered_bytes = 0
+        self.first_buffered_time = None
+        self.next_offsets = {}
+
+        self.sink_summary = {
+            "flushes": 0,
+            "records": 0,
+            "messages": 0,
+            "bytes": 0,
+            "retries": 0,
+            "commit_failures": 0,
+        }
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, msg, record=None):
+        """
+        Purpose:
+            Buffer the record decoded from a message
+        Args:
+            msg (Kafka Message Obj): Consumed message (its offset is committed
+                after the next successful flush)
+            record (Any): Record to write for the message, or None to write
+                nothing (the offset is still committed, e.g. for filtered
+                messages)
+        Return:
+            N/A
+        """
+
+        if self.first_buffered_time is None:
+            self.first_buffered_time = time.monotonic()
+
+        if record is not None:
+            self.records.append(record)
+        self.buffered_messages += 1
+        self.buffered_bytes += len(msg.value() or b"")
+        self.next_offsets[(msg.topic(), msg.partition())] = msg.offset() + 1
+
+    def should_flush(self):
+        """
+        Purpose:
+            Check if a flush limit has been reached
+        Args:
+            N/A
+        Return:
+            should_flush (Bool): Whether the buffer should be flushed
+        """
+
+        if self.first_buffered_time is None:
+            return False
+
+        return (
+            len(self.records) >= self.max_records
+            or self.buffered_bytes >= self.max_bytes
+            or self.get_time_until_flush() <= 0
+        )
+
+    def get_time_until_flush(self):
+        """
+        Purpose:
+            Get the seconds until the oldest buffered record reaches
+            max_latency_ms
+        Args:
+            N/A
+        Return:
+            seconds (Float): Seconds until a time based flush (None if the
+                buffer is empty)
+        """
+
+        if self.first_buffered_time is None:
+            return None
+
+        return (
+            self.first_buffered_time
+            + self.max_latency_ms / 1000.0
+            - time.monotonic()
+        )
+
+    def flush(self, max_retries=None):
+        """
+        Purpose:
+            Write the buffered records with bulk_write (retrying failures with
+            backoff) and commit the offsets of the buffered messages
+        Args:
+            max_retries (Int): Times a failed write is retried for this flush.
+                Default is the max_retries of the sink
+        Return:
+            flushed_records (Int): Number of records written
+        Raises:
+            SinkFlushError: If the write still fails after max_retries
+                retries. The records stay buffered and no offsets are committed
+        """
+
+        if self.first_buffered_time is None:
+            return 0
+
+        if self.records:
+            self.write_records(max_retries)
+
+        flushed_records = len(self.records)
+        self.sink_summary["flushes"] += 1
+        self.sink_summary["records"] += flushed_records
+        self.sink_summary["messages"] += self.buffered_messages
+        self.sink_summary["bytes"] += self.buffered_bytes
+
+        next_offsets = self.next_offsets
+        buffered_messages = self.buffered_messages
+        self.records = []
+        self.buffered_messages = 0
+        self.buffered_bytes = 0
+        self.first_buffered_time = None
+        self.next_offsets = {}
+
+        self.commit_offsets(next_offsets, buffered_messages)
+
+        return flushed_records
+
+    def write_records(self, max_retries=None):
+        """
+        Purpose:
+            Call bulk_write with the buffered records, retrying with
+            exponential backoff
+        Args:
+            max_retries (Int): Times a failed write is retried. Default is the
+                max_retries of the sink
+        Return:
+            N/A
+        Raises:
+            SinkFlushError: If the write still fails after max_retries retries
+        """
+
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        for attempt in range(max_retries + 1):
+            try:
+                self.bulk_write(self.records)
+                return
+            except Exception as err:
+                if attempt == max_retries:
+                    raise SinkFlushError(
+                        f"Failed to write {len(self.records)} records after "
+                        f"{attempt + 1} attempts: {err}"
+                    ) from err
+                backoff_ms = min(
+                    self.retry_backoff_ms * 2 ** attempt, self.max_retry_backoff_ms
+                )
+                logging.warning(
+                    f"Failed to Write {len(self.records)} Records ({err}), "
+                    f"Retrying in {backoff_ms}ms"
+                )
+                self.sink_summary["retries"] += 1
+                time.sleep(backoff_ms / 1000.0)
+
+    def commit_offsets(self, next_offsets, num_messages):
+        """
+        Purpose:
+            Synchronously commit the offsets after flushed messages. A failed
+            commit is logged and counted, not raised: the records are already
+            written and will at worst be written again after a restart
+        Args:
+            next_offsets (Dict): Key is (topic, partition) and value is the
+                offset to commit
+            num_messages (Int): Messages covered by the commit
+        Return:
+            N/A
+        """
+
+        if not next_offsets:
+            return
+
+        if self.offset_committer is not None:
+            # The committer records the result, read from commit() or from its
+            # on_commit callback depending on the strategy
+            committed_partitions = self.offset_committer.commit_offsets(
+                self.kafka_consumer, next_offsets, num_messages
+            )
+        else:
+            try:
+                committed_partitions = self.kafka_consumer.commit(
+                    offsets=get_topic_partitions(next_offsets), asynchronous=False
+                )
+            except KafkaException as err:
+                logging.warning(f"Failed to Commit Flushed Offsets: {err}")
+                committed_partitions = None
+
+        if committed_partitions is None:
+            self.sink_summary["commit_failures"] += 1
+            return
+
+        for committed_partition in committed_partitions:
+            if getattr(committed_partition, "error", None):
+                self.sink_summary["commit_failures"] += 1
+                logging.warning(
+                    f"Failed to Commit Offset of {committed_partition.topic} "
+                    f"[{committed_partition.partition}]: {committed_partition.error}"
+                )
+
+
+###
+# Consuming Into a Sink
+###
+
+
+def sink_topic(
+    kafka_consumer,
+    kafka_topics,
+    bulk_write,
+    record_decoder=None,
+    max_records=500,
+    max_bytes=1000000,
+    max_latency_ms=1000,
+    max_retries=5,
+    retry_backoff_ms=100,
+    max_retry_backoff_ms=10000,
+    stop_event=None,
+    offset_committer=None,
+):
+    """
+    Purpose:
+        Consume Kafka Topics into a KafkaBatchSink: messages are fetched in
+        batches, decoded, buffered and written in bulk, and offsets are
+        committed after each successful write. The buffer is also flushed
+        before partitions are revoked in a rebalance and when consuming stops.
+        Writes during a rebalance are not retried, as backing off inside the
+        revoke callback stalls the whole group: a failed write fails the sink
+        and its records are consumed again by the next owner
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object created with
+            the offset_committer (see kafka_consumer_helpers.get_kafka_consumer)
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        bulk_write (Function): Function called with each list of records
+        record_decoder (Function): Optional function called with each message
+            that returns the record to write, or None to skip the message.
+            Default writes the messages
+        max_records (Int): Records that trigger a flush. Default is 500
+        max_bytes (Int): Bytes of message values that trigger a flush. Default
+            is 1000000
+        max_latency_ms (Int): Age in ms of the oldest buffered record that
+            triggers a flush. Default is 1000
+        max_retries (Int): Times a failed write is retried. Default is 5
+        retry_backoff_ms (Int): Wait in ms before the first retry, doubled for
+            each further retry. Default is 100
+        max_retry_backoff_ms (Int): Max wait in ms between retries. Default is
+            10000
+        stop_event (Event Obj): Optional threading/multiprocessing Event. When
+            set, the buffer is flushed and the consumer is closed
+        offset_committer (KafkaOffsetCommitter): Committer the consumer was
+            created with. Its strategy cannot be "auto", so offsets are never
+            committed before their records are written. Sink commits are
+            recorded in its get_commit_summary
+    Return:
+        sink_summary (Dict): "flushes", "records" (written), "messages" and
+            "bytes" (consumed and committed), "retries" (failed writes that
+            were retried) and "commit_failures"
+    Raises:
+        InvalidCommitStrategy: If no offset_committer is passed or its strategy
+            is "auto"
+        SinkFlushError: If a write fails after every retry. The consumer is
+            closed without committing the unwritten records
+    """
+
+    if offset_committer is None or offset_committer.commit_strategy == "auto":
+        raise InvalidCommitStrategy(
+            "sink_topic needs a consumer created with an offset_committer that "
+            "does not auto commit"
+        )
+
+    logging.info(f"Sinking Topics {', '.join(kafka_topics)}")
+
+    batch_sink = KafkaBatchSink(
+        kafka_consumer,
+        bulk_write,
+        max_records=max_records,
+        max_bytes=max_bytes,
+        max_latency_ms=max_latency_ms,
+        max_retries=max_retries,
+        retry_backoff_ms=retry_backoff_ms,
+        max_retry_backoff_ms=max_retry_backoff_ms,
+        offset_committer=offset_committer,
+    )
+    sink_state = {"consuming": True}
+
+    def revoke_callback(consumer, partitions):
+        # Commit what was read from the partitions while they are still owned,
+        # without backing off while the group waits on the rebalance
+        if sink_state["consuming"]:
+            batch_sink.flush(max_retries=0)
+
+    kafka_consumer.subscribe(
+        kafka_topics, on_assign=consumer_assignment_callback, on_revoke=revoke_callback
+    )
+
+    try:
+        while stop_event is None or not stop_event.is_set():
+            time_until_flush = batch_sink.get_time_until_flush()
+            msg_batch = kafka_consumer.consume(
+                num_messages=max(max_records - len(batch_sink), 1),
+                timeout=1.0 if time_until_flush is None else max(
+                    min(time_until_flush, 1.0), 0
+                ),
+            )
+            for msg in filter_message_batch(msg_batch):
+                batch_sink.add(
+                    msg, msg if record_decoder is None else record_decoder(msg)
+                )
+                if batch_sink.should_flush():
+                    batch_sink.flush()
+
+            if batch_sink.should_flush():
+                batch_sink.flush()
+
+        batch_sink.flush()
+    except KeyboardInterrupt:
+        logging.info('Sink Ended By User')
+        batch_sink.flush()
+    finally:
+        # The buffer is empty unless the sink failed, in which case nothing is
+        # written or committed while closing
+        sink_state["consuming"] = False
+        kafka_consumer.close()
+
+    logging.info(f"Sank Topics {', '.join(kafka_topics)}: {batch_sink.sink_summary}")
+
+    return batch_sink.sink_summary
@@ -0,0 +1,236 @@
+"""
+    Purpose:
+        Kafka Statistics Helpers.
+
+        This library is used to collect the statistics librdkafka emits for
+        producers and consumers (see statistics.interval.ms). The raw stats JSON
+        is reduced to a compact snapshot (message/byte counters, queue depths,
+        broker round trip times and per-partition consumer lag) that is kept in
+        an in-memory registry with a short history for computing rates.
+"""
+
+# Python Library Imports
+import threading
+from collections import deque
+
+# Local Library Imports
+from kafka_helpers.kafka_serde_helpers import json_loads
+
+
+###
+# Statistics Registry
+###
+
+
+class KafkaStatisticsRegistry(object):
+    """
+    Purpose:
+        In-memory registry of compact statistics snapshots, keyed by the
+        librdkafka client name. Keeps the last history_size snapshots of each
+        client for computing rolling rates
+    """
+
+    def __init__(self, history_size=60):
+        """
+        Purpose:
+            Initialize the KafkaStatisticsRegistry
+        Args:
+            history_size (Int): Number of snapshots to keep per client. Default
+                is 60 (one minute at a 1 second statistics.interval.ms)
+        Return:
+            N/A
+        """
+
+        self.history_size = history_size
+        self.snapshots = {}
+        self.lock = threading.Lock()
+
+    def record_statistics(self, stats):
+        """
+        Purpose:
+            Reduce librdkafka statistics to a snapshot and record it
+        Args:
+            stats (String or Dict): librdkafka stats JSON string or parsed dict
+        Return:
+            snapshot (Dict): Compact statistics snapshot (see parse_statistics)
+        """
+
+        if isinstance(stats, (str, bytes)):
+            stats = json_loads(stats)
+        snapshot = parse_statistics(stats)
+
+        with self.lock:
+            client_snapshots = self.snapshots.get(snapshot["client_name"])
+            if client_snapshots is None:
+                client_snapshots = deque(maxlen=self.history_size)
+                self.snapshots[snapshot["client_name"]] = client_snapshots
+            client_snapshots.append(snapshot)
+
+        return snapshot
+
+    def get_client_names(self):
+        """
+        Purpose:
+            Get the names of the clients with recorded statistics
+        Args:
+            N/A
+        Return:
+            client_names (List of Strings): librdkafka client names
+        """
+
+        with self.lock:
+            return list(self.snapshots)
+
+    def get_snapshot(self, client_name):
+        """
+        Purpose:
+            Get the latest snapshot recorded for a client
+        Args:
+            client_name (String): librdkafka client name
+        Return:
+            snapshot (Dict): Latest compact statistics snapshot, or None if no
+                statistics have been recorded for the client
+        """
+
+        with self.lock:
+            client_snapshots = self.snapshots.get(client_name)
+            return client_snapshots[-1] if client_snapshots else None
+
+    def get_snapshots(self):
+        """
+        Purpose:
+            Get the latest snapshot recorded for every client
+        Args:
+            N/A
+        Return:
+            snapshots (Dict): Key is the client name and value is the latest
+                compact statistics snapshot
+        """
+
+        with self.lock:
+            return {
+                client_name: client_snapshots[-1]
+                for client_name, client_snapshots in self.snapshots.items()
+                if client_snapshots
+            }
+
+    def get_rates(self, client_name, window=10):
+        """
+        Purpose:
+            Get per-second message and byte rates for a client over a rolling
+            window of recorded snapshots
+        Args:
+            client_name (String): librdkafka client name
+            window (Float): Seconds of history to compute the rates over.
+                Default is 10
+        Return:
+            rates (Dict): "tx_msgs", "tx_bytes", "rx_msgs" and "rx_bytes" per
+                second, or None if there are fewer than two snapshots
+        """
+
+        with self.lock:
+            client_snapshots = list(self.snapshots.get(client_name, ()))
+
+        if len(client_snapshots) < 2:
+            return None
+
+        latest = client_snapshots[-1]
+        earliest = client_snapshots[-2]
+        for snapshot in reversed(client_snapshots[:-1]):
+            if latest["timestamp"] - snapshot["timestamp"] > window:
+                break
+            earliest = snapshot
+
+        elapsed = latest["timestamp"] - earliest["timestamp"]
+        if elapsed <= 0:
+            return None
+
+        return {
+            counter: (latest[counter] - earliest[counter]) / elapsed
+            for counter in ("tx_msgs", "tx_bytes", "rx_msgs", "rx_bytes")
+        }
+
+    def clear(self):
+        """
+        Purpose:
+            Remove all recorded snapshots
+        Args:
+            N/A
+        Return:
+            N/A
+        """
+
+        with self.lock:
+            self.snapshots.clear()
+
+
+# Process-wide registry used by the statistics callbacks
+STATISTICS_REGISTRY = KafkaStatisticsRegistry()
+
+
+###
+# Statistics Parsing
+###
+
+
+def parse_statistics(stats):
+    """
+    Purpose:
+        Reduce parsed librdkafka statistics to a compact snapshot
+    Args:
+        stats (Dict): Parsed librdkafka statistics
+    Return:
+        snapshot (Dict): Compact statistics snapshot with client details,
+            "tx_msgs"/"tx_bytes"/"rx_msgs"/"rx_bytes" counters, queue depths,
+            "brokers" (keyed by broker name, with rtt in ms and request queue
+            depths), "partitions" (keyed by (topic, partition) with consumer lag
+            and queue depths) and "consumer_lag" (the total lag)
+    """
+
+    brokers = {}
+    for broker_name, broker_stats in stats.get("brokers", {}).items():
+        if broker_stats.get("nodeid", -1) < 0:
+            # Bootstrap entries that have not been resolved to a broker
+            continue
+        rtt = broker_stats.get("rtt", {})
+        brokers[broker_name] = {
+            "rtt_avg_ms": rtt.get("avg", 0) / 1000.0,
+            "rtt_p99_ms": rtt.get("p99", 0) / 1000.0,
+            "outbuf_count": broker_stats.get("outbuf_cnt", 0),
+            "waitresp_count": broker_stats.get("waitresp_cnt", 0),
+        }
+
+    partitions = {}
+    total_consumer_lag = 0
+    for topic_name, topic_stats in stats.get("topics", {}).items():
+        for partition_id, partition_stats in topic_stats.get("partitions", {}).items():
+            partition_id = int(partition_id)
+            if partition_id < 0:
+                # Internal UnAssigned partition
+                continue
+            consumer_lag = partition_stats.get("consumer_lag", -1)
+            if consumer_lag > 0:
+                total_consumer_lag += consumer_lag
+            partitions[(topic_name, partition_id)] = {
+                "consumer_lag": consumer_lag,
+                "msgq_count": partition_stats.get("msgq_cnt", 0),
+                "xmit_msgq_count": partition_stats.get("xmit_msgq_cnt", 0),
+                "fetchq_count": partition_stats.get("fetchq_cnt", 0),
+            }
+
+    return {
+        "client_name": stats.get("name"),
+        "client_type": stats.get("type"),
+        "timestamp": stats.get("ts", 0) / 1000000.0,
+        "tx_msgs": stats.get("txmsgs", 0),
+        "tx_bytes": stats.get("txmsg_bytes", 0),
+        "rx_msgs": stats.get("rxmsgs", 0),
+        "rx_bytes": stats.get("rxmsg_bytes", 0),
+        "msg_queue_count": stats.get("msg_cnt", 0),
+        "msg_queue_bytes": stats.get("msg_size", 0),
+        "reply_queue_count": stats.get("replyq", 0),
+        "brokers": brokers,
+        "partitions": partitions,
+        "consumer_lag": total_consumer_lag,
+    }
+
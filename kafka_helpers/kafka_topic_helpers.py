@@ -4,12 +4,27 @@
 
         This library is used to interact with kafka topics. This includes getting
         a list of the topics, finding details about a topic, creating topics, and
-        more.
+        more. Topic layouts can also be declared as a spec (JSON or YAML) and
+        reconciled against a cluster, applying only the changes needed.
 """
 
 # Python Library Imports
 import logging
-from confluent_kafka.admin import NewTopic
+import os
+import threading
+import time
+import simplejson as json
+from confluent_kafka import KafkaError, KafkaException
+from confluent_kafka.admin import (
+    AlterConfigOpType,
+    ConfigEntry,
+    ConfigResource,
+    NewPartitions,
+    NewTopic,
+)
+
+# Local Library Imports
+from kafka_helpers.kafka_exceptions import InvalidTopicSpec
 
 
 ###
@@ -17,40 +32,246 @@ from confluent_kafka.admin import NewTopic
 ###
 
 
-def get_topics(kafka_admin_client, return_system_topics=False):
+def get_topics(kafka_admin_client, return_system_topics=False, metadata_cache=None):
     """
     Purpose:
         Get a List of Kafka Topics.
     Args:
         kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
             brokers
+        return_system_topics (Bool): Whether to include system topics (topics
+            starting with "_"). Default is False
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to read the
+            topics from (the cluster is only listed when the cache expired).
+            Default lists the cluster on every call
     Return:
         kafka_topics (Dict of Kafka Topics): Key is the topic name and value is a
             Kafka metadata object that has basic topic information
     """
 
+    if metadata_cache is not None:
+        return metadata_cache.get_topics(return_system_topics=return_system_topics)
+
     raw_kafka_topics = kafka_admin_client.list_topics().topics
 
     if return_system_topics:
         kafka_topics = raw_kafka_topics
     else:
-        kafka_topics = {}
-        for kafka_topic_name, kafka_topic_metadata in raw_kafka_topics.items():
-            if kafka_topic_name.startswith("_"):
-                continue
-            else:
-                kafka_topics[kafka_topic_name] = kafka_topic_metadata
+        kafka_topics = filter_system_topics(raw_kafka_topics)
 
     return kafka_topics
 
 
+def topic_exists(kafka_admin_client, topic_name, metadata_cache=None):
+    """
+    Purpose:
+        Check if a Kafka Topic exists, looking up only that topic instead of
+        listing the cluster
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_name (String): Name of the topic
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to check.
+            Default looks the topic up on every call
+    Return:
+        topic_exists (Bool): Whether the topic exists
+    """
+
+    if metadata_cache is not None:
+        return metadata_cache.topic_exists(topic_name)
+
+    return get_topic_metadata(kafka_admin_client, topic_name) is not None
+
+
+def get_topic_metadata(kafka_admin_client, topic_name, timeout=10):
+    """
+    Purpose:
+        Get the metadata of a single Kafka Topic (list_topics(topic=...))
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_name (String): Name of the topic
+        timeout (Float): Max seconds to wait for the metadata. Default is 10
+    Return:
+        kafka_topic_metadata (TopicMetadata Obj): Metadata of the topic, or None
+            if the topic does not exist
+    """
+
+    kafka_topic_metadata = kafka_admin_client.list_topics(
+        topic=topic_name, timeout=timeout
+    ).topics.get(topic_name)
+
+    if (
+        kafka_topic_metadata is None
+        or (
+            kafka_topic_metadata.error is not None
+            and kafka_topic_metadata.error.code() == KafkaError.UNKNOWN_TOPIC_OR_PART
+        )
+    ):
+        return None
+
+    return kafka_topic_metadata
+
+
+def filter_system_topics(kafka_topics):
+    """
+    Purpose:
+        Remove system topics (topics starting with "_") from topic metadata
+    Args:
+        kafka_topics (Dict of Kafka Topics): Key is the topic name and value is
+            the topic metadata
+    Return:
+        kafka_topics (Dict of Kafka Topics): Topics without the system topics
+    """
+
+    return {
+        kafka_topic_name: kafka_topic_metadata
+        for kafka_topic_name, kafka_topic_metadata in kafka_topics.items()
+        if not kafka_topic_name.startswith("_")
+    }
+
+
+###
+# Topic Metadata Cache
+###
+
+
+class KafkaTopicMetadataCache(object):
+    """
+    Purpose:
+        TTL cache of the topic metadata of a cluster. The full topic listing
+        and single topic lookups are cached separately, so existence checks
+        only fetch the topics they ask about, and a full listing also answers
+        single topic lookups until it expires. Invalidate topics after creating
+        or deleting them (create_kafka_topic and delete_kafka_topic do when
+        passed the cache)
+    """
+
+    def __init__(self, kafka_admin_client, ttl=60, timeout=10):
+        """
+        Purpose:
+            Initialize the KafkaTopicMetadataCache
+        Args:
+            kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj
+                for the brokers
+            ttl (Float): Seconds cached metadata is used for. Default is 60
+            timeout (Float): Max seconds to wait for metadata requests. Default
+                is 10
+        Return:
+            N/A
+        """
+
+        self.kafka_admin_client = kafka_admin_client
+        self.ttl = ttl
+        self.timeout = timeout
+        self.lock = threading.Lock()
+
+        # Full topic listing (all topics and user topics) and its expiry
+        self.all_topics = None
+        self.user_topics = None
+        self.topics_expiry = 0
+
+        # Single topic lookups, key is the topic and value is (expiry, metadata)
+        self.topic_entries = {}
+
+    def get_topics(self, return_system_topics=False):
+        """
+        Purpose:
+            Get the topics of the cluster, listing the cluster if the cached
+            listing expired
+        Args:
+            return_system_topics (Bool): Whether to include system topics.
+                Default is False
+        Return:
+            kafka_topics (Dict of Kafka Topics): Key is the topic name and value
+                is the topic metadata
+        """
+
+        with self.lock:
+            if time.monotonic() >= self.topics_expiry:
+                all_topics = self.kafka_admin_client.list_topics(
+                    timeout=self.timeout
+                ).topics
+                self.all_topics = all_topics
+                self.user_topics = filter_system_topics(all_topics)
+                self.topics_expiry = time.monotonic() + self.ttl
+                self.topic_entries = {}
+
+            return dict(self.all_topics if return_system_topics else self.user_topics)
+
+    def get_topic(self, topic_name):
+        """
+        Purpose:
+            Get the metadata of a topic from the cache, the cached full listing
+            or a single topic lookup
+        Args:
+            topic_name (String): Name of the topic
+        Return:
+            kafka_topic_metadata (TopicMetadata Obj): Metadata of the topic, or
+                None if the topic does not exist
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            topic_entry = self.topic_entries.get(topic_name)
+            if topic_entry is not None and now < topic_entry[0]:
+                return topic_entry[1]
+            if now < self.topics_expiry:
+                return self.all_topics.get(topic_name)
+
+        kafka_topic_metadata = get_topic_metadata(
+            self.kafka_admin_client, topic_name, timeout=self.timeout
+        )
+
+        with self.lock:
+            self.topic_entries[topic_name] = (
+                time.monotonic() + self.ttl, kafka_topic_metadata
+            )
+
+        return kafka_topic_metadata
+
+    def topic_exists(self, topic_name):
+        """
+        Purpose:
+            Check if a topic exists (see get_topic)
+        Args:
+            topic_name (String): Name of the topic
+        Return:
+            topic_exists (Bool): Whether the topic exists
+        """
+
+        return self.get_topic(topic_name) is not None
+
+    def invalidate(self, topic_name=None):
+        """
+        Purpose:
+            Drop cached metadata so it is fetched again on next use
+        Args:
+            topic_name (String): Topic to invalidate (the full listing is also
+                invalidated as it holds the topic). Default is None (everything)
+        Return:
+            N/A
+        """
+
+        with self.lock:
+            self.topics_expiry = 0
+            if topic_name is None:
+                self.topic_entries = {}
+            else:
+                self.topic_entries.pop(topic_name, None)
+
+
 ###
 # Topic Administration
 ###
 
 
 def create_kafka_topic(
-    kafka_admin_client, topic_name, topic_replication=1, topic_partitions=1
+    kafka_admin_client,
+    topic_name,
+    topic_replication=1,
+    topic_partitions=1,
+    metadata_cache=None,
 ):
     """
     Purpose:
@@ -61,14 +282,676 @@ def create_kafka_topic(
         topic_name (String): Name of the topic to create
         topic_replication (Int): Replication factor for the new topic
         topic_partitions (Int): Number of partitions to devide the topic into
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to invalidate
+            the topic in (now and when the creation completes)
     Return:
-        N/A
+        topic_futures (Dict): Key is the topic name and value is a Future that
+            completes when the topic is created (raising on failure)
     """
 
-    kafka_admin_client.create_topics([
+    topic_futures = kafka_admin_client.create_topics([
         NewTopic(
             topic_name,
-            topic_replication,
-            topic_partitions,
+            num_partitions=topic_partitions,
+            replication_factor=topic_replication,
         )
     ])
+
+    if metadata_cache is not None:
+        invalidate_on_completion(metadata_cache, topic_futures)
+
+    return topic_futures
+
+
+def delete_kafka_topic(kafka_admin_client, topic_name, metadata_cache=None):
+    """
+    Purpose:
+        Delete a Kafka Topic
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_name (String): Name of the topic to delete
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to invalidate
+            the topic in (now and when the deletion completes)
+    Return:
+        topic_futures (Dict): Key is the topic name and value is a Future that
+            completes when the topic is deleted (raising on failure)
+    """
+
+    topic_futures = kafka_admin_client.delete_topics([topic_name])
+
+    if metadata_cache is not None:
+        invalidate_on_completion(metadata_cache, topic_futures)
+
+    return topic_futures
+
+
+def create_kafka_topics(
+    kafka_admin_client,
+    topic_names,
+    topic_replication=1,
+    topic_partitions=1,
+    topic_config=None,
+    timeout=60,
+    metadata_cache=None,
+):
+    """
+    Purpose:
+        Create many Kafka Topics with one admin request and wait for all of
+        them. Topics that already exist are skipped, so reruns are idempotent
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_names (List of Strings): Names of the topics to create
+        topic_replication (Int): Replication factor for the new topics
+        topic_partitions (Int): Number of partitions to devide each topic into
+        topic_config (Dict): Optional topic configuration for the new topics
+        timeout (Float): Max seconds to wait for the creations. Default is 60
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to invalidate
+            the topics in
+    Return:
+        topic_outcomes (Dict of Dicts): Key is the topic name and value has
+            "status" ("created", "exists" or "failed") and "errors" (list of
+            Strings)
+    """
+
+    if not topic_names:
+        return {}
+
+    topic_futures = kafka_admin_client.create_topics(
+        [
+            NewTopic(
+                topic_name,
+                num_partitions=topic_partitions,
+                replication_factor=topic_replication,
+                config={
+                    name: str(value) for name, value in (topic_config or {}).items()
+                },
+            )
+            for topic_name in topic_names
+        ],
+        request_timeout=timeout,
+    )
+
+    return wait_for_topic_futures(
+        topic_futures,
+        "created",
+        {KafkaError.TOPIC_ALREADY_EXISTS: "exists"},
+        timeout=timeout,
+        metadata_cache=metadata_cache,
+    )
+
+
+def delete_kafka_topics(
+    kafka_admin_client, topic_names, timeout=60, metadata_cache=None
+):
+    """
+    Purpose:
+        Delete many Kafka Topics with one admin request and wait for all of
+        them. Topics that do not exist are skipped, so reruns are idempotent
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_names (List of Strings): Names of the topics to delete
+        timeout (Float): Max seconds to wait for the deletions. Default is 60
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to invalidate
+            the topics in
+    Return:
+        topic_outcomes (Dict of Dicts): Key is the topic name and value has
+            "status" ("deleted", "missing" or "failed") and "errors" (list of
+            Strings)
+    """
+
+    if not topic_names:
+        return {}
+
+    topic_futures = kafka_admin_client.delete_topics(
+        list(topic_names), request_timeout=timeout
+    )
+
+    return wait_for_topic_futures(
+        topic_futures,
+        "deleted",
+        {KafkaError.UNKNOWN_TOPIC_OR_PART: "missing"},
+        timeout=timeout,
+        metadata_cache=metadata_cache,
+    )
+
+
+def wait_for_topic_futures(
+    topic_futures, done_status, skipped_statuses, timeout=60, metadata_cache=None
+):
+    """
+    Purpose:
+        Wait for the Futures of a bulk admin operation on topics and get the
+        outcome of each topic
+    Args:
+        topic_futures (Dict): Key is the topic name and value is the Future of
+            the admin operation on the topic
+        done_status (String): Status of topics whose operation succeeded
+        skipped_statuses (Dict): Key is a KafkaError code that means the
+            operation was not needed (e.g. the topic already exists) and value
+            is the status to report for it
+        timeout (Float): Max seconds to wait for all the Futures. Default is 60
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to invalidate
+            the topics in
+    Return:
+        topic_outcomes (Dict of Dicts): Key is the topic name and value has
+            "status" (done_status, a skipped status or "failed") and "errors"
+            (list of Strings)
+    """
+
+    topic_outcomes = {}
+
+    deadline = time.monotonic() + timeout
+    for topic_name, topic_future in topic_futures.items():
+        topic_outcome = topic_outcomes[topic_name] = {
+            "status": done_status,
+            "errors": [],
+        }
+        try:
+            topic_future.result(max(deadline - time.monotonic(), 0))
+        except KafkaException as err:
+            if err.args[0].code() in skipped_statuses:
+                topic_outcome["status"] = skipped_statuses[err.args[0].code()]
+            else:
+                topic_outcome["status"] = "failed"
+                topic_outcome["errors"].append(str(err))
+        except Exception as err:
+            topic_outcome["status"] = "failed"
+            topic_outcome["errors"].append(str(err))
+
+        if topic_outcome["status"] == "failed":
+            logging.warning(
+                f"Failed Admin Operation on Topic {topic_name}: "
+                f"{'; '.join(topic_outcome['errors'])}"
+            )
+        if metadata_cache is not None:
+            metadata_cache.invalidate(topic_name)
+
+    return topic_outcomes
+
+
+def invalidate_on_completion(metadata_cache, topic_futures):
+    """
+    Purpose:
+        Invalidate topics in a metadata cache now and again when their admin
+        operation completes (so a lookup made while the operation is in flight
+        is not cached for the whole TTL)
+    Args:
+        metadata_cache (KafkaTopicMetadataCache): Cache to invalidate
+        topic_futures (Dict): Key is the topic name and value is the Future of
+            the admin operation on the topic
+    Return:
+        N/A
+    """
+
+    for topic_name, topic_future in topic_futures.items():
+        metadata_cache.invalidate(topic_name)
+        topic_future.add_done_callback(
+            lambda _, topic_name=topic_name: metadata_cache.invalidate(topic_name)
+        )
+
+
+###
+# Topic Reconciliation
+###
+
+
+def reconcile_topics(
+    kafka_admin_client,
+    topic_specs,
+    dry_run=False,
+    timeout=60,
+    metadata_cache=None,
+):
+    """
+    Purpose:
+        Reconcile the topics of a cluster with a desired layout: missing topics
+        are created, partitions are added and differing configs are set. The
+        current state of each topic is fetched with a metadata request for
+        only that topic and one shared describe configs request, and all
+        changes are sent as one request per operation type. Topics that already
+        match are skipped, and a topic that cannot be described fails without
+        stopping the others
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_specs (Dict or List): Desired topics (see get_topic_specs) or a
+            path to a JSON or YAML file holding them (see load_topic_specs)
+        dry_run (Bool): Only have the brokers validate the changes. Default is
+            False
+        timeout (Float): Max seconds to wait for the changes. Default is 60
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to invalidate
+            the changed topics in
+    Return:
+        topic_outcomes (Dict of Dicts): Key is the topic name and value has
+            "status" ("unchanged", "created", "updated", "validated" when
+            dry_run, or "failed"), "actions" (list of "create",
+            "add_partitions" and "alter_config") and "errors" (list of Strings)
+    Raises:
+        InvalidTopicSpec: If the spec is malformed
+    """
+
+    if isinstance(topic_specs, str):
+        topic_specs = load_topic_specs(topic_specs)
+    else:
+        topic_specs = get_topic_specs(topic_specs)
+
+    topic_states = get_topic_states(
+        kafka_admin_client, list(topic_specs), timeout=timeout
+    )
+    topic_changes = get_topic_changes(topic_specs, topic_states)
+
+    topic_outcomes = apply_topic_changes(
+        kafka_admin_client,
+        topic_changes,
+        dry_run=dry_run,
+        timeout=timeout,
+        metadata_cache=metadata_cache,
+    )
+
+    status_counts = {}
+    for topic_outcome in topic_outcomes.values():
+        status_counts[topic_outcome["status"]] = (
+            status_counts.get(topic_outcome["status"], 0) + 1
+        )
+    logging.info(f"Reconciled {len(topic_outcomes)} Topics: {status_counts}")
+
+    return topic_outcomes
+
+
+def load_topic_specs(spec_filename):
+    """
+    Purpose:
+        Load desired topics from a JSON or YAML file (.yaml/.yml requires
+        PyYAML). The file holds a "topics" key with the specs (see
+        get_topic_specs), e.g.
+
+            topics:
+              orders:
+                partitions: 12
+                replication_factor: 3
+                config:
+                  retention.ms: 604800000
+    Args:
+        spec_filename (String): Path of the spec file
+    Return:
+        topic_specs (Dict of Dicts): Normalized specs (see get_topic_specs)
+    Raises:
+        InvalidTopicSpec: If the spec is malformed
+        ImportError: If the file is YAML and PyYAML is not installed
+    """
+
+    with open(spec_filename) as spec_file:
+        if os.path.splitext(spec_filename)[1].lower() in (".yaml", ".yml"):
+            raw_specs = get_yaml_module().safe_load(spec_file)
+        else:
+            raw_specs = json.load(spec_file)
+
+    if isinstance(raw_specs, dict) and "topics" in raw_specs:
+        raw_specs = raw_specs["topics"]
+
+    return get_topic_specs(raw_specs)
+
+
+def get_topic_specs(raw_specs):
+    """
+    Purpose:
+        Validate and normalize desired topics. Each spec may set "partitions",
+        "replication_factor" and "config"; a setting that is left out is not
+        managed (new topics get the broker default)
+    Args:
+        raw_specs (Dict or List): Either a dict with the topic name as key and
+            its spec as value, or a list of specs with a "name" key
+    Return:
+        topic_specs (Dict of Dicts): Key is the topic name and value has
+            "partitions" (Int or None), "replication_factor" (Int or None) and
+            "config" (Dict of Strings)
+    Raises:
+        InvalidTopicSpec: If the spec is malformed
+    """
+
+    if isinstance(raw_specs, list):
+        named_specs = []
+        for raw_spec in raw_specs:
+            if not isinstance(raw_spec, dict) or not raw_spec.get("name"):
+                raise InvalidTopicSpec(f"Topic spec without a name: {raw_spec}")
+            named_specs.append((raw_spec["name"], raw_spec))
+    elif isinstance(raw_specs, dict):
+        named_specs = list(raw_specs.items())
+    else:
+        raise InvalidTopicSpec(
+            f"Topic specs must be a dict or a list, got {type(raw_specs).__name__}"
+        )
+
+    topic_specs = {}
+    for topic_name, raw_spec in named_specs:
+        raw_spec = raw_spec or {}
+        if not isinstance(raw_spec, dict):
+            raise InvalidTopicSpec(f"Spec of topic {topic_name} must be a dict")
+        if topic_name in topic_specs:
+            raise InvalidTopicSpec(f"Topic {topic_name} is specified more than once")
+
+        topic_spec = {"config": {}}
+        for spec_key in ("partitions", "replication_factor"):
+            spec_value = raw_spec.get(spec_key)
+            if spec_value is not None and (
+                isinstance(spec_value, bool)
+                or not isinstance(spec_value, int)
+                or spec_value < 1
+            ):
+                raise InvalidTopicSpec(
+                    f"{spec_key} of topic {topic_name} must be a positive integer, "
+                    f"got {spec_value}"
+                )
+            topic_spec[spec_key] = spec_value
+
+        raw_config = raw_spec.get("config") or {}
+        if not isinstance(raw_config, dict):
+            raise InvalidTopicSpec(f"config of topic {topic_name} must be a dict")
+        for config_name, config_value in raw_config.items():
+            if isinstance(config_value, bool):
+                config_value = "true" if config_value else "false"
+            topic_spec["config"][config_name] = str(config_value)
+
+        topic_specs[topic_name] = topic_spec
+
+    return topic_specs
+
+
+def get_topic_states(kafka_admin_client, topic_names, timeout=60):
+    """
+    Purpose:
+        Get the current partitions, replication factor and configs of topics
+        with a metadata request per topic (so the rest of the cluster is not
+        listed) and one describe configs request
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_names (List of Strings): Topics to describe
+        timeout (Float): Max seconds to wait for each request. Default is 60
+    Return:
+        topic_states (Dict of Dicts): Key is the name of each existing topic and
+            value has "partitions" (Int), "replication_factor" (Int), "config"
+            (Dict of Strings) and "errors" (list of Strings, set when the
+            topic could not be described). Topics that do not exist are left
+            out
+    """
+
+    topic_states = {}
+    for topic_name in topic_names:
+        try:
+            kafka_topic_metadata = get_topic_metadata(
+                kafka_admin_client, topic_name, timeout=timeout
+            )
+        except Exception as err:
+            topic_states[topic_name] = get_failed_topic_state(err)
+            continue
+        if kafka_topic_metadata is None:
+            continue
+        if kafka_topic_metadata.error is not None:
+            topic_states[topic_name] = get_failed_topic_state(
+                kafka_topic_metadata.error
+            )
+            continue
+
+        partitions = list(kafka_topic_metadata.partitions.values())
+        topic_states[topic_name] = {
+            "partitions": len(partitions),
+            "replication_factor": (
+                max(len(partition.replicas) for partition in partitions)
+                if partitions else 0
+            ),
+            "config": {},
+            "errors": [],
+        }
+
+    described_topics = [
+        topic_name
+        for topic_name, topic_state in topic_states.items()
+        if not topic_state["errors"]
+    ]
+    if not described_topics:
+        return topic_states
+
+    config_futures = kafka_admin_client.describe_configs(
+        [
+            ConfigResource(ConfigResource.Type.TOPIC, topic_name)
+            for topic_name in described_topics
+        ],
+        request_timeout=timeout,
+    )
+    deadline = time.monotonic() + timeout
+    for config_resource, config_future in config_futures.items():
+        try:
+            config_entries = config_future.result(max(deadline - time.monotonic(), 0))
+        except Exception as err:
+            topic_states[config_resource.name]["errors"].append(
+                f"Failed to describe configs: {err}"
+            )
+            continue
+        topic_states[config_resource.name]["config"] = {
+            config_name: config_entry.value
+            for config_name, config_entry in config_entries.items()
+        }
+
+    return topic_states
+
+
+def get_failed_topic_state(err):
+    """
+    Purpose:
+        Get the state of a topic whose metadata could not be fetched
+    Args:
+        err (Exception or KafkaError): Error of the metadata request
+    Return:
+        topic_state (Dict): Topic state (see get_topic_states) holding the error
+    """
+
+    return {
+        "partitions": None,
+        "replication_factor": None,
+        "config": {},
+        "errors": [f"Failed to get metadata: {err}"],
+    }
+
+
+def get_topic_changes(topic_specs, topic_states):
+    """
+    Purpose:
+        Compute the minimal changes that bring topics to their specs. Only
+        settings present in a spec are compared; configs that are not in the
+        spec are left untouched. Partitions cannot be removed and the
+        replication factor cannot be changed with these operations (it needs a
+        partition reassignment), so such differences are reported as errors
+    Args:
+        topic_specs (Dict of Dicts): Normalized specs (see get_topic_specs)
+        topic_states (Dict of Dicts): Current state (see get_topic_states)
+    Return:
+        topic_changes (Dict of Dicts): Key is the topic name and value has
+            "create" (Bool), "partitions" (new total count or None), "config"
+            (Dict of configs to set), "spec" (the topic spec) and "errors"
+            (list of Strings)
+    """
+
+    topic_changes = {}
+    for topic_name, topic_spec in topic_specs.items():
+        topic_change = {
+            "create": False,
+            "partitions": None,
+            "config": {},
+            "spec": topic_spec,
+            "errors": [],
+        }
+        topic_changes[topic_name] = topic_change
+
+        topic_state = topic_states.get(topic_name)
+        if topic_state is None:
+            topic_change["create"] = True
+            continue
+        if topic_state["errors"]:
+            # The current state is unknown, so nothing can be compared
+            topic_change["errors"].extend(topic_state["errors"])
+            continue
+
+        desired_partitions = topic_spec["partitions"]
+        if desired_partitions is not None:
+            if desired_partitions > topic_state["partitions"]:
+                topic_change["partitions"] = desired_partitions
+            elif desired_partitions < topic_state["partitions"]:
+                topic_change["errors"].append(
+                    f"Cannot reduce partitions from {topic_state['partitions']} "
+                    f"to {desired_partitions}"
+                )
+
+        desired_replication_factor = topic_spec["replication_factor"]
+        if (
+            desired_replication_factor is not None
+            and desired_replication_factor != topic_state["replication_factor"]
+        ):
+            topic_change["errors"].append(
+                "Cannot change replication factor from "
+                f"{topic_state['replication_factor']} to {desired_replication_factor} "
+                "(requires a partition reassignment)"
+            )
+
+        for config_name, config_value in topic_spec["config"].items():
+            if topic_state["config"].get(config_name) != config_value:
+                topic_change["config"][config_name] = config_value
+
+    return topic_changes
+
+
+def apply_topic_changes(
+    kafka_admin_client,
+    topic_changes,
+    dry_run=False,
+    timeout=60,
+    metadata_cache=None,
+):
+    """
+    Purpose:
+        Apply topic changes. Topics are created, partitions added and configs
+        set with one request each, all sent before any result is awaited, so
+        the operations run in parallel. A failure only fails its own topic
+    Args:
+        kafka_admin_client (Kafka Admin Client Obj): Kafka Admin Client Obj for the
+            brokers
+        topic_changes (Dict of Dicts): Changes from get_topic_changes
+        dry_run (Bool): Only have the brokers validate the changes
+            (validate_only). Default is False
+        timeout (Float): Max seconds to wait for the changes. Default is 60
+        metadata_cache (KafkaTopicMetadataCache): Optional cache to invalidate
+            the changed topics in
+    Return:
+        topic_outcomes (Dict of Dicts): Key is the topic name and value has
+            "status", "actions" and "errors" (see reconcile_topics)
+    """
+
+    new_topics = []
+    new_partitions = []
+    config_resources = []
+    topic_outcomes = {}
+    for topic_name, topic_change in topic_changes.items():
+        topic_outcome = {
+            "status": "unchanged",
+            "actions": [],
+            "errors": list(topic_change["errors"]),
+        }
+        topic_outcomes[topic_name] = topic_outcome
+
+        if topic_change["create"]:
+            topic_spec = topic_change["spec"]
+            new_topics.append(NewTopic(
+                topic_name,
+                num_partitions=topic_spec["partitions"] or -1,
+                replication_factor=topic_spec["replication_factor"] or -1,
+                config=topic_spec["config"],
+            ))
+            topic_outcome["actions"].append("create")
+        if topic_change["partitions"] is not None:
+            new_partitions.append(NewPartitions(topic_name, topic_change["partitions"]))
+            topic_outcome["actions"].append("add_partitions")
+        if topic_change["config"]:
+            config_resources.append(ConfigResource(
+                ConfigResource.Type.TOPIC,
+                topic_name,
+                incremental_configs=[
+                    ConfigEntry(
+                        config_name,
+                        config_value,
+                        incremental_operation=AlterConfigOpType.SET,
+                    )
+                    for config_name, config_value in topic_change["config"].items()
+                ],
+            ))
+            topic_outcome["actions"].append("alter_config")
+
+    # Send every request before waiting on any of them
+    action_futures = []
+    if new_topics:
+        action_futures.extend(kafka_admin_client.create_topics(
+            new_topics, validate_only=dry_run, request_timeout=timeout
+        ).items())
+    if new_partitions:
+        action_futures.extend(kafka_admin_client.create_partitions(
+            new_partitions, validate_only=dry_run, request_timeout=timeout
+        ).items())
+    if config_resources:
+        action_futures.extend(
+            (config_resource.name, config_future)
+            for config_resource, config_future
+            in kafka_admin_client.incremental_alter_configs(
+                config_resources, validate_only=dry_run, request_timeout=timeout
+            ).items()
+        )
+
+    deadline = time.monotonic() + timeout
+    for topic_name, action_future in action_futures:
+        try:
+            action_future.result(max(deadline - time.monotonic(), 0))
+        except Exception as err:
+            topic_outcomes[topic_name]["errors"].append(str(err))
+        if metadata_cache is not None and not dry_run:
+            metadata_cache.invalidate(topic_name)
+
+    for topic_name, topic_outcome in topic_outcomes.items():
+        if topic_outcome["errors"]:
+            topic_outcome["status"] = "failed"
+            logging.warning(
+                f"Failed to Reconcile Topic {topic_name}: "
+                f"{'; '.join(topic_outcome['errors'])}"
+            )
+        elif not topic_outcome["actions"]:
+            topic_outcome["status"] = "unchanged"
+        elif dry_run:
+            topic_outcome["status"] = "validated"
+        elif "create" in topic_outcome["actions"]:
+            topic_outcome["status"] = "created"
+        else:
+            topic_outcome["status"] = "updated"
+
+    return topic_outcomes
+
+
+def get_yaml_module():
+    """
+    Purpose:
+        Import PyYAML, which is only needed for YAML topic specs
+    Args:
+        N/A
+    Return:
+        yaml (Module): PyYAML
+    Raises:
+        ImportError: If PyYAML is not installed
+    """
+
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(
+            "PyYAML is required for YAML topic specs (pip install pyyaml)"
+        )
+
+    return yaml
@@ -0,0 +1,343 @@
+"""
+    Purpose:
+        Kafka Transaction Helpers.
+
+        This library is used to build exactly-once consume-transform-produce
+        applications. Batches of messages are consumed, transformed and
+        produced, and the consumer offsets are committed inside the same
+        producer transaction, so the output and the progress of the consumer
+        are committed together or not at all (no duplicates on restart).
+"""
+
+# Python Library Imports
+import logging
+from confluent_kafka import KafkaException, TopicPartition
+
+# Local Library Imports
+from kafka_helpers.kafka_consumer_helpers import (
+    consume_topic_batches,
+    get_kafka_consumer,
+)
+from kafka_helpers.kafka_producer_helpers import (
+    get_kafka_producer,
+    produce_with_backpressure,
+)
+
+
+###
+# Transactional Clients
+###
+
+
+def get_transactional_producer(
+    kafka_brokers,
+    transactional_id,
+    transaction_timeout_ms=60000,
+    init_timeout=30,
+    config_overrides=None,
+    **producer_kwargs,
+):
+    """
+    Purpose:
+        Get a Kafka Producer Object with transactions initialized. The producer
+        is built with the "exactly-once" profile (idempotent, acks=all)
+    Args:
+        kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
+        transactional_id (String): Transactional ID of the producer. Must be
+            stable across restarts of the same application instance, so a
+            restarted producer fences its previous incarnation
+        transaction_timeout_ms (Int): Max time in ms a transaction may stay
+            open before the broker aborts it. Default is 60000
+        init_timeout (Float): Max seconds to wait for transactions to be
+            initialized. Default is 30
+        config_overrides (Dict): librdkafka configuration applied on top of the
+            transactional configuration. Default is None
+        producer_kwargs (Kwargs): Arguments passed to get_kafka_producer
+            (get_stats, producer_class, etc.)
+    Return:
+        kafka_producer (Kafka Producer Obj): Kafka Producer Object ready to
+            begin transactions
+    """
+    logging.info(f"Creating Transactional Producer {transactional_id}")
+
+    transactional_configuration = {
+        "transactional.id": transactional_id,
+        "transaction.timeout.ms": transaction_timeout_ms,
+    }
+    if config_overrides:
+        transactional_configuration.update(config_overrides)
+
+    producer_kwargs.setdefault("profile", "exactly-once")
+    kafka_producer = get_kafka_producer(
+        kafka_brokers, config_overrides=transactional_configuration, **producer_kwargs
+    )
+    kafka_producer.init_transactions(init_timeout)
+
+    return kafka_producer
+
+
+def get_transactional_consumer(
+    kafka_brokers,
+    consumer_group,
+    offset_start="earliest",
+    config_overrides=None,
+    **consumer_kwargs,
+):
+    """
+    Purpose:
+        Get a Kafka Consumer Object for consume-transform-produce. Offsets are
+        never auto committed (they are committed by the producer transaction)
+        and only messages of committed transactions are read
+    Args:
+        kafka_brokers (List of Strings): List of host:port combinations for kakfa brokers
+        consumer_group (String): Consumer group to consume as
+        offset_start (String): Where to start consuming when the group has no
+            committed offset. Default is "earliest"
+        config_overrides (Dict): librdkafka configuration applied on top of the
+            transactional configuration. Default is None
+        consumer_kwargs (Kwargs): Arguments passed to get_kafka_consumer
+            (get_stats, consumer_class, etc.)
+    Return:
+        kafka_consumer (Kafka Consumer Obj): Kafka Consumer Object
+    """
+
+    transactional_configuration = {
+        "enable.auto.commit": False,
+        "isolation.level": "read_committed",
+    }
+    if config_overrides:
+        transactional_configuration.update(config_overrides)
+
+    return get_kafka_consumer(
+        kafka_brokers,
+        consumer_group=consumer_group,
+        offset_start=offset_start,
+        config_overrides=transactional_configuration,
+        **consumer_kwargs,
+    )
+
+
+###
+# Consume-Transform-Produce
+###
+
+
+def transform_topic_transactionally(
+    kafka_consumer,
+    kafka_producer,
+    kafka_topics,
+    output_topic,
+    transform,
+    batch_size=500,
+    batch_timeout=1000,
+    stop_event=None,
+    commit_retries=3,
+):
+    """
+    Purpose:
+        Consume Kafka Topics, transform each message and produce the results to
+        an output topic with exactly-once semantics. Each batch of up to
+        batch_size messages is one transaction: the transformed messages and
+        the next offsets of the consumer are committed together. If the
+        transaction has to be aborted, the consumer is rewound to the start of
+        the batch so the batch is processed again
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Consumer from
+            get_transactional_consumer
+        kafka_producer (Kafka Producer Obj): Producer from
+            get_transactional_producer
+        kafka_topics (List of Strings): List of Kafka Topics to Consume.
+        output_topic (String): Kafka Topic to produce the transformed messages to
+        transform (Function): Function called with each consumed message that
+            returns the value to produce (with the key of the consumed
+            message), or None to drop the message
+        batch_size (Int): Max number of messages per transaction. Default is 500
+        batch_timeout (Int): Max time in ms to wait for a full batch. Default
+            is 1000
+        stop_event (Event Obj): Optional threading/multiprocessing Event. When
+            set, consuming stops and the consumer is closed
+        commit_retries (Int): Times a retriable commit_transaction error is
+            retried before the transaction is aborted. Default is 3
+    Return:
+        transaction_summary (Dict): "transactions" (committed), "aborted",
+            "consumed" and "produced" (messages in committed transactions)
+    Raises:
+        KafkaException: On a fatal producer error (e.g. the producer was
+            fenced by a newer instance with the same transactional.id), or
+            after the transaction is aborted for an error that is neither
+            retriable nor abortable
+        Exception: Any exception raised by transform, after the transaction
+            is aborted and the consumer rewound
+    """
+    logging.info(
+        f"Transforming Topics {', '.join(kafka_topics)} to {output_topic} in "
+        f"Transactions of {batch_size}"
+    )
+
+    transaction_summary = {
+        "transactions": 0, "aborted": 0, "consumed": 0, "produced": 0
+    }
+
+    msg_batches = consume_topic_batches(
+        kafka_consumer,
+        kafka_topics,
+        batch_size=batch_size,
+        batch_timeout=batch_timeout,
+        stop_event=stop_event,
+    )
+    try:
+        for msg_batch in msg_batches:
+            produced = produce_transaction(
+                kafka_consumer,
+                kafka_producer,
+                msg_batch,
+                output_topic,
+                transform,
+                commit_retries=commit_retries,
+            )
+            if produced is None:
+                transaction_summary["aborted"] += 1
+                continue
+
+            transaction_summary["transactions"] += 1
+            transaction_summary["consumed"] += len(msg_batch)
+            transaction_summary["produced"] += produced
+    finally:
+        msg_batches.close()
+
+    logging.info(f"Transformed Topics {', '.join(kafka_topics)}: {transaction_summary}")
+
+    return transaction_summary
+
+
+def produce_transaction(
+    kafka_consumer,
+    kafka_producer,
+    msg_batch,
+    output_topic,
+    transform,
+    commit_retries=3,
+):
+    """
+    Purpose:
+        Transform and produce a batch of consumed messages and commit the next
+        offsets of the consumer in one transaction
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Consumer the batch was read with
+        kafka_producer (Kafka Producer Obj): Producer with transactions
+            initialized
+        msg_batch (List of Kafka Message Objs): Messages to transform
+        output_topic (String): Kafka Topic to produce the transformed messages to
+        transform (Function): Function called with each message that returns
+            the value to produce, or None to drop the message
+        commit_retries (Int): Times a retriable commit_transaction error is
+            retried. Default is 3
+    Return:
+        produced (Int): Number of messages produced, or None if the transaction
+            was aborted (the consumer is rewound to the start of the batch)
+    Raises:
+        KafkaException: On a fatal producer error, or after the transaction is
+            aborted and the consumer rewound for any other error that does not
+            only require an abort
+        Exception: Any exception raised by transform, after the transaction
+            is aborted and the consumer rewound
+    """
+
+    kafka_producer.begin_transaction()
+    try:
+        produced = 0
+        for msg in msg_batch:
+            value = transform(msg)
+            if value is None:
+                continue
+            produce_with_backpressure(
+                kafka_producer, output_topic, value, None, key=msg.key()
+            )
+            produced += 1
+
+        kafka_producer.send_offsets_to_transaction(
+            get_next_offsets(msg_batch),
+            kafka_consumer.consumer_group_metadata(),
+        )
+        commit_transaction(kafka_producer, commit_retries=commit_retries)
+    except KafkaException as err:
+        if err.args[0].fatal():
+            # The producer can no longer be used (e.g. it was fenced)
+            raise
+        abort_transaction(kafka_consumer, kafka_producer, msg_batch)
+        if not err.args[0].txn_requires_abort():
+            raise
+        logging.warning(f"Aborted Transaction: {err}")
+        return None
+    except Exception:
+        abort_transaction(kafka_consumer, kafka_producer, msg_batch)
+        raise
+
+    return produced
+
+
+def commit_transaction(kafka_producer, commit_retries=3):
+    """
+    Purpose:
+        Commit the current transaction, retrying retriable errors
+    Args:
+        kafka_producer (Kafka Producer Obj): Producer in a transaction
+        commit_retries (Int): Times a retriable error is retried. Default is 3
+    Return:
+        N/A
+    Raises:
+        KafkaException: If the commit fails with a non-retriable error or the
+            retries are exhausted
+    """
+
+    for attempt in range(commit_retries + 1):
+        try:
+            kafka_producer.commit_transaction()
+            return
+        except KafkaException as err:
+            if not err.args[0].retriable() or attempt == commit_retries:
+                raise
+            logging.warning(f"Retrying Transaction Commit: {err}")
+
+
+def abort_transaction(kafka_consumer, kafka_producer, msg_batch):
+    """
+    Purpose:
+        Abort the current transaction and rewind the consumer to the first
+        message of the batch in each partition, so the batch is consumed again
+    Args:
+        kafka_consumer (Kafka Consumer Obj): Consumer the batch was read with
+        kafka_producer (Kafka Producer Obj): Producer in a transaction
+        msg_batch (List of Kafka Message Objs): Messages of the transaction
+    Return:
+        N/A
+    """
+
+    kafka_producer.abort_transaction()
+
+    first_offsets = {}
+    for msg in msg_batch:
+        first_offsets.setdefault((msg.topic(), msg.partition()), msg.offset())
+    for (kafka_topic, partition), offset in first_offsets.items():
+        kafka_consumer.seek(TopicPartition(kafka_topic, partition, offset))
+
+
+def get_next_offsets(msg_batch):
+    """
+    Purpose:
+        Get the offsets to commit after a batch of messages (the offset after
+        the last message of each partition)
+    Args:
+        msg_batch (List of Kafka Message Objs): Consumed messages
+    Return:
+        next_offsets (List of TopicPartitions): Offset to commit per partition
+    """
+
+    next_offsets = {}
+    for msg in msg_batch:
+        next_offsets[(msg.topic(), msg.partition())] = msg.offset() + 1
+
+    return [
+        TopicPartition(kafka_topic, partition, offset)
+        for (kafka_topic, partition), offset in next_offsets.items()
+    ]
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_async_helpers.py
+"""
+
+# Python Library Imports
+import asyncio
+import os
+import sys
+import threading
+import pytest
+from confluent_kafka import KafkaError, KafkaException, TopicPartition
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_async_helpers, kafka_consumer_helpers
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def kafka_producer():
+    """
+    Purpose:
+        Mocked Kafka Producer with a queue of 2 messages
+    """
+
+    return MockProducer(queue_size=2)
+
+
+###
+# Mocked Functions
+###
+
+
+def get_mock_message(topic="test-topic", partition=0, offset=0, value=b""):
+    """
+    Purpose:
+        Build a Mocked Kafka Message
+    """
+
+    msg = mock.Mock()
+    msg.topic.return_value = topic
+    msg.partition.return_value = partition
+    msg.offset.return_value = offset
+    msg.value.return_value = value
+    msg.error.return_value = None
+
+    return msg
+
+
+class MockProducer(object):
+    """
+    Purpose:
+        Mocked Kafka Producer with a bounded queue that serves delivery
+        reports on poll(). Messages with the value b"fail" fail delivery
+    """
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self.queue = []
+        self.lock = threading.Lock()
+        self.buffer_errors = 0
+        self.delivered = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def produce(self, topic, value, key=None, callback=None):
+        with self.lock:
+            if len(self.queue) >= self.queue_size:
+                self.buffer_errors += 1
+                raise BufferError("Local: Queue full")
+            self.queue.append((topic, value, callback))
+
+    def poll(self, timeout=None):
+        with self.lock:
+            queue, self.queue = self.queue, []
+        for topic, value, callback in queue:
+            self.delivered += 1
+            err = "Broker: Timed out" if value == b"fail" else None
+            callback(err, get_mock_message(topic, offset=self.delivered, value=value))
+        if not queue and timeout:
+            threading.Event().wait(timeout / 10)
+        return len(queue)
+
+    def flush(self, timeout=None):
+        while self.queue:
+            self.poll()
+        return 0
+
+
+class MockConsumer(object):
+    """
+    Purpose:
+        Mocked Kafka Consumer that returns fixed batches and then empty batches
+    """
+
+    def __init__(self, msg_batches, assigned_partitions=None):
+        self.msg_batches = list(msg_batches)
+        self.assigned_partitions = assigned_partitions
+        self.stored_offsets = {}
+        self.closed = False
+
+    def subscribe(self, topics, on_assign=None):
+        pass
+
+    def assignment(self):
+        return [
+            TopicPartition(topic, partition)
+            for topic, partition in self.assigned_partitions or ()
+        ]
+
+    def pause(self, partitions):
+        pass
+
+    def resume(self, partitions):
+        pass
+
+    def store_offsets(self, offsets):
+        assigned_offsets = [
+            offset for offset in offsets
+            if self.assigned_partitions is None
+            or (offset.topic, offset.partition) in self.assigned_partitions
+        ]
+        if offsets and not assigned_offsets:
+            raise KafkaException(KafkaError(KafkaError._STATE))
+        for offset in assigned_offsets:
+            self.stored_offsets[(offset.topic, offset.partition)] = offset.offset
+
+    def consume(self, num_messages=1, timeout=-1):
+        if self.msg_batches:
+            msg_batch = self.msg_batches.pop(0)
+            if isinstance(msg_batch, Exception):
+                raise msg_batch
+            return msg_batch
+        threading.Event().wait(timeout)
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+###
+# Test Payload
+###
+
+
+def test_async_producer(kafka_producer):
+    """
+    Purpose:
+        Test that produce futures resolve on delivery under backpressure
+    """
+
+    async def produce_messages():
+        async with kafka_async_helpers.AsyncProducer(
+            kafka_producer, poll_timeout=0.01
+        ) as async_producer:
+            delivery_futures = [
+                await async_producer.produce("test-topic", str(number).encode())
+                for number in range(10)
+            ]
+            delivered_msgs = await asyncio.gather(*delivery_futures)
+            sent_msg = await async_producer.send("test-topic", b"sent")
+
+            with pytest.raises(KafkaException):
+                await async_producer.send("test-topic", b"fail")
+
+        return delivered_msgs, sent_msg, async_producer
+
+    delivered_msgs, sent_msg, async_producer = asyncio.run(produce_messages())
+
+    assert [msg.value() for msg in delivered_msgs] == [
+        str(number).encode() for number in range(10)
+    ]
+    assert sent_msg.value() == b"sent"
+    assert kafka_producer.buffer_errors > 0
+    assert not async_producer.poll_thread.is_alive()
+
+
+def test_async_consumer():
+    """
+    Purpose:
+        Test that consumed messages are iterated in order on the event loop
+    """
+
+    kafka_consumer = MockConsumer(
+        [
+            [get_mock_message(offset=offset) for offset in range(start, start + 3)]
+            for start in range(0, 30, 3)
+        ]
+    )
+
+    async def consume_messages():
+        consumed_offsets = []
+        async with kafka_async_helpers.AsyncConsumer(
+            kafka_consumer, ["test-topic"], batch_timeout=10, max_queued_batches=2
+        ) as async_consumer:
+            async for msg in async_consumer:
+                consumed_offsets.append(msg.offset())
+                if len(consumed_offsets) == 25:
+                    break
+        return consumed_offsets
+
+    consumed_offsets = asyncio.run(consume_messages())
+
+    assert consumed_offsets == list(range(25))
+    assert kafka_consumer.stored_offsets == {("test-topic", 0): 25}
+    assert kafka_consumer.closed
+
+
+def test_async_consumer_raises_consume_errors():
+    """
+    Purpose:
+        Test that an error of the consume thread is raised by the iteration
+        after the messages consumed before it
+    """
+
+    kafka_consumer = MockConsumer([
+        [get_mock_message(offset=0), get_mock_message(offset=1)],
+        KafkaException(KafkaError(KafkaError._TRANSPORT)),
+    ])
+
+    async def consume_messages(consumed_offsets):
+        async with kafka_async_helpers.AsyncConsumer(
+            kafka_consumer, ["test-topic"], batch_timeout=10
+        ) as async_consumer:
+            async for msg in async_consumer:
+                consumed_offsets.append(msg.offset())
+
+    consumed_offsets = []
+    with pytest.raises(KafkaException):
+        asyncio.run(consume_messages(consumed_offsets))
+
+    assert consumed_offsets == [0, 1]
+    assert kafka_consumer.closed
+
+
+def test_async_consumer_drops_offsets_of_revoked_partitions():
+    """
+    Purpose:
+        Test that offsets of partitions revoked since their batch was consumed
+        are dropped instead of ending the iteration
+    """
+
+    kafka_consumer = MockConsumer(
+        [
+            [get_mock_message(partition=1, offset=0)],
+            [get_mock_message(partition=0, offset=0)],
+            [get_mock_message(partition=0, offset=1)],
+        ],
+        assigned_partitions={("test-topic", 0)},
+    )
+
+    async def consume_messages():
+        consumed_offsets = []
+        async with kafka_async_helpers.AsyncConsumer(
+            kafka_consumer, ["test-topic"], batch_timeout=10
+        ) as async_consumer:
+            async for msg in async_consumer:
+                consumed_offsets.append((msg.partition(), msg.offset()))
+                if len(consumed_offsets) == 3:
+                    break
+        return consumed_offsets
+
+    assert asyncio.run(consume_messages()) == [(1, 0), (0, 0), (0, 1)]
+    assert kafka_consumer.stored_offsets == {("test-topic", 0): 2}
+
+
+def test_async_consumer_requires_manual_offset_store():
+    """
+    Purpose:
+        Test that consumers storing offsets automatically are refused
+    """
+
+    fake_broker = FakeKafkaBroker()
+    kafka_consumer = kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"], get_stats=False, consumer_class=fake_broker.Consumer
+    )
+
+    with pytest.raises(InvalidCommitStrategy):
+        kafka_async_helpers.AsyncConsumer(kafka_consumer, ["test-topic"])
+
+
+def test_async_consumer_pauses_and_commits_handed_messages():
+    """
+    Purpose:
+        Test that partitions are paused (and still polled) while the queue is
+        full, and that only messages handed to the caller are committed
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("test-topic", num_partitions=1)
+    for offset in range(30):
+        fake_broker.append_message("test-topic", 0, None, str(offset).encode())
+    kafka_consumer = kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"],
+        consumer_group="async-group",
+        offset_start="earliest",
+        get_stats=False,
+        config_overrides={"enable.auto.offset.store": False},
+        consumer_class=fake_broker.Consumer,
+    )
+    consume_calls = []
+    consume = kafka_consumer.consume
+    kafka_consumer.consume = lambda **kwargs: consume_calls.append(1) or consume(
+        **kwargs
+    )
+
+    async def consume_messages():
+        async with kafka_async_helpers.AsyncConsumer(
+            kafka_consumer,
+            ["test-topic"],
+            batch_size=3,
+            batch_timeout=10,
+            max_queued_batches=2,
+        ) as async_consumer:
+            async for msg in async_consumer:
+                if msg.offset() == 0:
+                    # Let the queue fill up
+                    await asyncio.sleep(0.2)
+                    paused = set(kafka_consumer.paused)
+                    consume_calls_while_full = len(consume_calls)
+                    await asyncio.sleep(0.1)
+                    consume_calls_while_full = (
+                        len(consume_calls) - consume_calls_while_full
+                    )
+                if msg.offset() == 4:
+                    break
+        return paused, consume_calls_while_full
+
+    paused, consume_calls_while_full = asyncio.run(consume_messages())
+
+    assert paused == {("test-topic", 0)}
+    assert consume_calls_while_full > 0
+    assert fake_broker.get_committed_offset("async-group", "test-topic", 0) == 5
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_avro_helpers.py
+"""
+
+# Python Library Imports
+import io
+import os
+import sys
+import urllib.error
+import pytest
+import simplejson as json
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_avro_helpers
+from kafka_helpers.kafka_exceptions import (
+    SchemaNotFound,
+    SchemaRegistryError,
+    SerializationError,
+)
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def schema_registry_client(tmp_path):
+    """
+    Purpose:
+        File based schema registry in a temporary directory
+    """
+
+    return kafka_avro_helpers.FileSchemaRegistryClient(str(tmp_path / "schemas"))
+
+
+###
+# Mocked Functions
+###
+
+
+USER_SCHEMA = {
+    "type": "record",
+    "name": "User",
+    "fields": [
+        {"name": "name", "type": "string"},
+        {"name": "age", "type": "int"},
+    ],
+}
+
+USER_SCHEMA_V2 = {
+    "type": "record",
+    "name": "User",
+    "fields": [
+        {"name": "name", "type": "string"},
+        {"name": "age", "type": "int"},
+        {"name": "email", "type": ["null", "string"], "default": None},
+    ],
+}
+
+
+def get_mock_response(response):
+    """
+    Purpose:
+        Mocked urlopen response with a JSON body
+    """
+
+    mock_response = mock.MagicMock()
+    mock_response.__enter__.return_value.read.return_value = json.dumps(response)
+
+    return mock_response
+
+
+###
+# Test Payload
+###
+
+
+def test_lru_cache():
+    """
+    Purpose:
+        Test that the least recently used entry is evicted
+    """
+
+    lru_cache = kafka_avro_helpers.LRUCache(max_size=2)
+    lru_cache.put("a", 1)
+    lru_cache.put("b", 2)
+    assert lru_cache.get("a") == 1
+    lru_cache.put("c", 3)
+
+    assert lru_cache.get("b") is None
+    assert lru_cache.get("a") == 1
+    assert lru_cache.get("c") == 3
+    assert len(lru_cache) == 2
+
+
+def test_file_schema_registry(schema_registry_client):
+    """
+    Purpose:
+        Test that schemas are registered once and versions are tracked per
+        subject
+    """
+
+    schema_id = schema_registry_client.register_schema("users-value", USER_SCHEMA)
+    assert schema_registry_client.register_schema(
+        "users-value", json.dumps(USER_SCHEMA, indent=4)
+    ) == schema_id
+    assert schema_registry_client.register_schema("other-value", USER_SCHEMA) == schema_id
+
+    schema_id_v2 = schema_registry_client.register_schema("users-value", USER_SCHEMA_V2)
+    assert schema_id_v2 == schema_id + 1
+
+    latest_schema_id, latest_schema_str = schema_registry_client.get_latest_schema(
+        "users-value"
+    )
+    assert latest_schema_id == schema_id_v2
+    assert json.loads(latest_schema_str) == USER_SCHEMA_V2
+    assert schema_registry_client.lookup_schema("users-value", USER_SCHEMA) == schema_id
+
+    # A new client reads the schemas back from the directory
+    file_client = kafka_avro_helpers.FileSchemaRegistryClient(
+        schema_registry_client.schema_directory
+    )
+    assert json.loads(file_client.get_schema(schema_id)) == USER_SCHEMA
+
+    with pytest.raises(SchemaNotFound):
+        file_client.get_schema(99)
+    with pytest.raises(SchemaNotFound):
+        file_client.get_latest_schema("missing-value")
+    assert file_client.lookup_schema("users-value", USER_SCHEMA_V2) == schema_id_v2
+    with pytest.raises(SchemaNotFound):
+        file_client.lookup_schema("other-value", USER_SCHEMA_V2)
+
+
+@mock.patch("urllib.request.urlopen")
+def test_schema_registry_client_caches_lookups(mock_urlopen):
+    """
+    Purpose:
+        Test that schemas are only requested from the registry once
+    """
+
+    mock_urlopen.return_value = get_mock_response(
+        {"schema": json.dumps(USER_SCHEMA)}
+    )
+    schema_registry_client = kafka_avro_helpers.SchemaRegistryClient(
+        "http://registry:8081/"
+    )
+
+    for _ in range(5):
+        schema_str = schema_registry_client.get_schema(7)
+
+    assert json.loads(schema_str) == USER_SCHEMA
+    assert mock_urlopen.call_count == 1
+    request = mock_urlopen.call_args[0][0]
+    assert request.full_url == "http://registry:8081/schemas/ids/7"
+
+    mock_urlopen.return_value = get_mock_response({"id": 7})
+    for _ in range(5):
+        assert schema_registry_client.register_schema("users-value", USER_SCHEMA) == 7
+    assert mock_urlopen.call_count == 2
+    request = mock_urlopen.call_args[0][0]
+    assert request.get_method() == "POST"
+    assert request.full_url.endswith("/subjects/users-value/versions")
+
+    mock_urlopen.return_value = get_mock_response({"id": 3, "version": 1})
+    for _ in range(5):
+        assert schema_registry_client.lookup_schema("users-value", USER_SCHEMA_V2) == 3
+    assert mock_urlopen.call_count == 3
+    request = mock_urlopen.call_args[0][0]
+    assert request.get_method() == "POST"
+    assert request.full_url.endswith("/subjects/users-value")
+    assert json.loads(request.data) == {
+        "schema": kafka_avro_helpers.get_schema_str(USER_SCHEMA_V2)
+    }
+
+
+@mock.patch("urllib.request.urlopen")
+def test_schema_registry_client_errors(mock_urlopen):
+    """
+    Purpose:
+        Test that registry errors are raised as schema exceptions
+    """
+
+    schema_registry_client = kafka_avro_helpers.SchemaRegistryClient(
+        "http://registry:8081"
+    )
+
+    mock_urlopen.side_effect = urllib.error.HTTPError(
+        "http://registry:8081", 404, "Not Found", {}, None
+    )
+    with pytest.raises(SchemaNotFound):
+        schema_registry_client.get_schema(1)
+
+    mock_urlopen.side_effect = urllib.error.URLError("Connection refused")
+    with pytest.raises(SchemaRegistryError):
+        schema_registry_client.get_latest_schema("users-value")
+
+
+def test_get_schema_id():
+    """
+    Purpose:
+        Test that the schema ID is read from the wire format header
+    """
+
+    assert kafka_avro_helpers.get_schema_id(b"\x00\x00\x00\x01\x02payload") == 258
+
+    with pytest.raises(SerializationError):
+        kafka_avro_helpers.get_schema_id(b"\x01\x00\x00\x00\x01")
+    with pytest.raises(SerializationError):
+        kafka_avro_helpers.get_schema_id(b"\x00\x00")
+
+
+def test_get_subject_name():
+    """
+    Purpose:
+        Test the topic name strategy
+    """
+
+    assert kafka_avro_helpers.get_subject_name("users") == "users-value"
+    assert kafka_avro_helpers.get_subject_name("users", is_key=True) == "users-key"
+
+
+def test_avro_serializer_round_trip(schema_registry_client):
+    """
+    Purpose:
+        Test that records are encoded in the wire format and decoded with schema
+        resolution
+    """
+    pytest.importorskip("fastavro")
+
+    avro_serializer = kafka_avro_helpers.AvroSerializer(
+        schema_registry_client, "users-value", USER_SCHEMA
+    )
+    data = avro_serializer({"name": "alice", "age": 30})
+
+    assert kafka_avro_helpers.get_schema_id(data) == avro_serializer.schema_id
+
+    avro_deserializer = kafka_avro_helpers.AvroDeserializer(schema_registry_client)
+    assert avro_deserializer(data) == {"name": "alice", "age": 30}
+
+    avro_deserializer = kafka_avro_helpers.AvroDeserializer(
+        schema_registry_client, reader_schema=USER_SCHEMA_V2
+    )
+    assert avro_deserializer(data) == {"name": "alice", "age": 30, "email": None}
+
+
+def test_avro_serializer_without_auto_register(schema_registry_client):
+    """
+    Purpose:
+        Test that a schema registered in an older version is used without
+        registering it, and that an unregistered schema is rejected
+    """
+    pytest.importorskip("fastavro")
+
+    schema_id = schema_registry_client.register_schema("users-value", USER_SCHEMA)
+    schema_registry_client.register_schema("users-value", USER_SCHEMA_V2)
+
+    avro_serializer = kafka_avro_helpers.AvroSerializer(
+        schema_registry_client,
+        "users-value",
+        json.dumps(USER_SCHEMA, indent=4),
+        auto_register=False,
+    )
+    assert avro_serializer.schema_id == schema_id
+
+    with pytest.raises(SchemaNotFound):
+        kafka_avro_helpers.AvroSerializer(
+            schema_registry_client, "other-value", USER_SCHEMA, auto_register=False
+        )
+    assert schema_registry_client.get_subjects() == {
+        "users-value": [schema_id, schema_id + 1]
+    }
+
+
+def test_avro_serializer_without_fastavro(schema_registry_client):
+    """
+    Purpose:
+        Test that a clear error is raised when fastavro is not installed
+    """
+
+    with mock.patch.dict(sys.modules, {"fastavro": None}):
+        with pytest.raises(ImportError, match="pip install fastavro"):
+            kafka_avro_helpers.AvroSerializer(
+                schema_registry_client, "users-value", USER_SCHEMA
+            )
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_benchmark_helpers.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import pytest
+
+# Import File to Test
+from kafka_helpers import kafka_benchmark_helpers
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def baseline_results():
+    """
+    Purpose:
+        Saved results of a baseline run
+    """
+
+    return {
+        "version": "1.0.0",
+        "benchmarks": {
+            "produce": {"msgs_per_sec": 1000, "p99_us": 10, "alloc_bytes_per_msg": 100},
+            "consume": {"msgs_per_sec": 1000, "p99_us": 10, "alloc_bytes_per_msg": 100},
+            "removed": {"msgs_per_sec": 1000, "p99_us": 10, "alloc_bytes_per_msg": 100},
+        },
+    }
+
+
+###
+# Mocked Functions
+###
+
+
+RETAINED_OBJECTS = []
+
+
+def allocating_benchmark(batch_index):
+    """
+    Purpose:
+        Benchmark function that allocates and keeps a 1 KiB buffer per call
+    """
+
+    RETAINED_OBJECTS.append(bytearray(1024))
+
+
+###
+# Test Payload
+###
+
+
+def test_run_benchmark():
+    """
+    Purpose:
+        Test that batches are timed, per-message overhead is derived from the
+        batch size and allocations are measured
+    """
+
+    batch_indexes = []
+    benchmark_result = kafka_benchmark_helpers.run_benchmark(
+        "test",
+        batch_indexes.append,
+        num_messages=100,
+        batch_size=10,
+        warmup_messages=20,
+        allocation_messages=30,
+    )
+
+    assert batch_indexes == list(range(2 + 10 + 3))
+    assert benchmark_result["name"] == "test"
+    assert benchmark_result["messages"] == 100
+    assert benchmark_result["msgs_per_sec"] > 0
+    assert 0 <= benchmark_result["p50_us"] <= benchmark_result["p99_us"]
+
+
+def test_measure_allocations():
+    """
+    Purpose:
+        Test that allocated and retained memory is reported per message
+    """
+
+    del RETAINED_OBJECTS[:]
+    alloc_bytes_per_msg, retained_blocks_per_msg = (
+        kafka_benchmark_helpers.measure_allocations(allocating_benchmark, 50)
+    )
+
+    assert alloc_bytes_per_msg >= 1024
+    assert retained_blocks_per_msg >= 1
+    del RETAINED_OBJECTS[:]
+
+
+def test_get_percentile():
+    """
+    Purpose:
+        Test nearest rank percentiles
+    """
+
+    values = list(range(101))
+
+    assert kafka_benchmark_helpers.get_percentile(values, 50) == 50
+    assert kafka_benchmark_helpers.get_percentile(values, 99) == 99
+    assert kafka_benchmark_helpers.get_percentile([], 99) == 0
+
+
+def test_save_and_load_benchmark_results(tmp_path):
+    """
+    Purpose:
+        Test that results are saved as JSON keyed by benchmark name
+    """
+
+    results = kafka_benchmark_helpers.get_benchmark_results(
+        [{"name": "produce", "msgs_per_sec": 1000}], version="1.0.0"
+    )
+    results_filename = str(tmp_path / "results.json")
+    kafka_benchmark_helpers.save_benchmark_results(results, results_filename)
+
+    loaded_results = kafka_benchmark_helpers.load_benchmark_results(results_filename)
+
+    assert loaded_results["version"] == "1.0.0"
+    assert loaded_results["benchmarks"]["produce"]["msgs_per_sec"] == 1000
+
+
+def test_compare_benchmark_results(baseline_results):
+    """
+    Purpose:
+        Test that drops in throughput beyond the threshold are regressions
+    """
+
+    results = {
+        "benchmarks": {
+            "produce": {"msgs_per_sec": 850, "p99_us": 10, "alloc_bytes_per_msg": 100},
+            "consume": {"msgs_per_sec": 950, "p99_us": 10.5, "alloc_bytes_per_msg": 50},
+            "added": {"msgs_per_sec": 1000, "p99_us": 10, "alloc_bytes_per_msg": 100},
+        },
+    }
+
+    comparison = kafka_benchmark_helpers.compare_benchmark_results(
+        baseline_results, results, threshold=0.1
+    )
+
+    assert set(comparison) == {"produce", "consume"}
+    assert comparison["produce"]["regression"]
+    assert comparison["produce"]["msgs_per_sec_change"] == pytest.approx(-0.15)
+    assert not comparison["consume"]["regression"]
+    assert comparison["consume"]["alloc_bytes_per_msg_change"] == pytest.approx(-0.5)
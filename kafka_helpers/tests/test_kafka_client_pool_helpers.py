@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_client_pool_helpers.py
+"""
+
+# Python Library Imports
+import multiprocessing
+import os
+import sys
+import pytest
+
+# Import File to Test
+from kafka_helpers import (
+    kafka_admin_helpers,
+    kafka_client_pool_helpers,
+    kafka_consumer_helpers,
+    kafka_producer_helpers,
+)
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Empty fake broker
+    """
+
+    return FakeKafkaBroker()
+
+
+@pytest.fixture(autouse=True)
+def client_pool():
+    """
+    Purpose:
+        Empty the process-wide pool around each test
+    """
+
+    kafka_client_pool_helpers.CLIENT_POOL.close()
+    yield kafka_client_pool_helpers.CLIENT_POOL
+    kafka_client_pool_helpers.CLIENT_POOL.close()
+
+
+###
+# Mocked Functions
+###
+
+
+def get_pooled_producer(fake_broker, kafka_brokers=("broker-1:9092",), **kwargs):
+    """
+    Purpose:
+        Get a pooled producer on the fake broker
+    """
+
+    return kafka_producer_helpers.get_kafka_producer(
+        list(kafka_brokers),
+        get_stats=False,
+        producer_class=fake_broker.Producer,
+        pooled=True,
+        **kwargs,
+    )
+
+
+def report_pool_size(connection):
+    """
+    Purpose:
+        Send the size of the pool of a forked child to the parent
+    """
+
+    connection.send(len(kafka_client_pool_helpers.CLIENT_POOL))
+    connection.close()
+
+
+###
+# Test Payload
+###
+
+
+def test_pooled_producer_reused(fake_broker, client_pool):
+    """
+    Purpose:
+        Test that equivalent configurations share a producer
+    """
+
+    kafka_producer = get_pooled_producer(fake_broker, ["broker-1:9092", "broker-2:9092"])
+
+    assert get_pooled_producer(
+        fake_broker, [" broker-2:9092", "broker-1:9092"]
+    ) is kafka_producer
+    assert get_pooled_producer(
+        fake_broker, ["broker-1:9092", "broker-2:9092"],
+        config_overrides={"linger.ms": "5"},
+    ) is get_pooled_producer(
+        fake_broker, ["broker-1:9092", "broker-2:9092"],
+        config_overrides={"linger.ms": 5},
+    )
+    assert get_pooled_producer(fake_broker, ["broker-3:9092"]) is not kafka_producer
+    assert get_pooled_producer(FakeKafkaBroker()) is not get_pooled_producer(
+        fake_broker
+    )
+    assert kafka_producer_helpers.get_kafka_producer(
+        ["broker-1:9092", "broker-2:9092"],
+        get_stats=False,
+        producer_class=fake_broker.Producer,
+    ) is not kafka_producer
+    assert len(client_pool) == 5
+
+
+def test_pooled_consumer_replaced_when_closed(fake_broker):
+    """
+    Purpose:
+        Test that a pooled consumer is reused until it is closed
+    """
+
+    def get_pooled_consumer():
+        return kafka_consumer_helpers.get_kafka_consumer(
+            ["broker-1:9092"],
+            consumer_group="pooled-group",
+            get_stats=False,
+            consumer_class=fake_broker.Consumer,
+            pooled=True,
+        )
+
+    kafka_consumer = get_pooled_consumer()
+    assert get_pooled_consumer() is kafka_consumer
+
+    kafka_consumer.close()
+    assert get_pooled_consumer() is not kafka_consumer
+
+
+def test_pooled_admin_client(fake_broker):
+    """
+    Purpose:
+        Test that admin clients are pooled per brokers
+    """
+
+    kafka_admin_client = kafka_admin_helpers.get_kafka_admin_client(
+        ["broker-1:9092"], admin_client_class=fake_broker.AdminClient, pooled=True
+    )
+
+    assert kafka_admin_helpers.get_kafka_admin_client(
+        ["broker-1:9092"], admin_client_class=fake_broker.AdminClient, pooled=True
+    ) is kafka_admin_client
+
+
+def test_client_pool_close(fake_broker, client_pool):
+    """
+    Purpose:
+        Test that closing the pool delivers queued messages and closes consumers
+    """
+
+    kafka_producer = get_pooled_producer(fake_broker)
+    kafka_producer.produce("pooled-topic", b"message")
+    kafka_consumer = kafka_consumer_helpers.get_kafka_consumer(
+        ["broker-1:9092"],
+        get_stats=False,
+        consumer_class=fake_broker.Consumer,
+        pooled=True,
+    )
+
+    client_pool.close()
+
+    assert len(client_pool) == 0
+    assert len(fake_broker.get_messages("pooled-topic")) == 1
+    assert kafka_consumer.closed
+    assert client_pool.remove_client(kafka_producer) is False
+
+
+def test_client_pool_dropped_after_fork(fake_broker, client_pool):
+    """
+    Purpose:
+        Test that clients of the parent are not reused in a forked child
+    """
+
+    kafka_producer = get_pooled_producer(fake_broker)
+
+    # Process id changed without the fork hook running
+    client_pool.pid = -1
+    assert get_pooled_producer(fake_broker) is not kafka_producer
+    assert len(client_pool) == 1
+
+    client_pool.reset_after_fork()
+    assert len(client_pool) == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires fork")
+def test_client_pool_empty_in_forked_child(fake_broker, client_pool):
+    """
+    Purpose:
+        Test that a forked child starts with an empty pool
+    """
+
+    get_pooled_producer(fake_broker)
+
+    fork_context = multiprocessing.get_context("fork")
+    parent_connection, child_connection = fork_context.Pipe()
+    child_process = fork_context.Process(
+        target=report_pool_size, args=(child_connection,)
+    )
+    child_process.start()
+    child_pool_size = parent_connection.recv()
+    child_process.join()
+
+    assert child_pool_size == 0
+    assert len(client_pool) == 1
+
+
+def test_get_client_key_normalization():
+    """
+    Purpose:
+        Test that equivalent configuration values share a key
+    """
+
+    get_client_key = kafka_client_pool_helpers.get_client_key
+
+    assert get_client_key(
+        "producer", {"bootstrap.servers": "b:1,a:1", "enable.idempotence": True}, dict
+    ) == get_client_key(
+        "producer", {"enable.idempotence": "True", "bootstrap.servers": "a:1, b:1"}, dict
+    )
+    assert get_client_key("producer", {"acks": 1}, dict) != get_client_key(
+        "consumer", {"acks": 1}, dict
+    )
+    assert get_client_key("producer", {"acks": [1]}, dict)
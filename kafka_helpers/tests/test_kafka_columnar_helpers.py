@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_columnar_helpers.py
+"""
+
+# Python Library Imports
+import os
+import struct
+import sys
+import threading
+import pytest
+
+# Import File to Test
+from kafka_helpers import (
+    kafka_columnar_helpers,
+    kafka_consumer_helpers,
+    kafka_offset_helpers,
+)
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy, SerializationError
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker, FakeMessage
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def msg_batch():
+    """
+    Purpose:
+        Messages holding one (id, price, flag) record each
+    """
+
+    return [
+        FakeMessage(
+            "prices",
+            offset % 2,
+            offset,
+            f"key-{offset}".encode(),
+            struct.pack(">qd?", offset, offset + 0.5, offset % 2 == 0),
+            timestamp=1000 + offset,
+        )
+        for offset in range(4)
+    ]
+
+
+###
+# Mocked Functions
+###
+
+
+VALUE_FIELDS = [("id", "q"), ("price", "d"), ("flag", "?")]
+
+
+def get_fake_broker(invalid_offsets=()):
+    """
+    Purpose:
+        Fake broker with 10 (id, price, flag) records in the "prices" topic,
+        with truncated values at invalid_offsets
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("prices")
+    for offset in range(10):
+        value = struct.pack(">qd?", offset, 1.0, True)
+        if offset in invalid_offsets:
+            value = value[:-1]
+        fake_broker.append_message("prices", 0, None, value)
+
+    return fake_broker
+
+
+def get_consumer(fake_broker, offset_committer=None, config_overrides=None):
+    """
+    Purpose:
+        Consumer on the fake broker configured by an offset committer or
+        config overrides
+    """
+
+    return kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"],
+        consumer_group="test-group",
+        offset_start="earliest",
+        get_stats=False,
+        config_overrides=config_overrides,
+        consumer_class=fake_broker.Consumer,
+        offset_committer=offset_committer,
+    )
+
+
+###
+# Test Payload
+###
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_columnar_batch_decoder(msg_batch, use_numpy):
+    """
+    Purpose:
+        Test that a batch is decoded into columns with and without NumPy
+    """
+    if use_numpy:
+        pytest.importorskip("numpy")
+
+    columnar_batch_decoder = kafka_columnar_helpers.get_columnar_batch_decoder(
+        VALUE_FIELDS, use_numpy=use_numpy
+    )
+    column_batch = columnar_batch_decoder(msg_batch)
+
+    assert len(column_batch) == 4
+    assert list(column_batch.partitions) == [0, 1, 0, 1]
+    assert list(column_batch.offsets) == [0, 1, 2, 3]
+    assert list(column_batch.timestamps) == [1000, 1001, 1002, 1003]
+    assert column_batch.keys == [b"key-0", b"key-1", b"key-2", b"key-3"]
+    assert list(column_batch.values["id"]) == [0, 1, 2, 3]
+    assert list(column_batch.values["price"]) == [0.5, 1.5, 2.5, 3.5]
+    assert [bool(flag) for flag in column_batch.values["flag"]] == [
+        True, False, True, False
+    ]
+    assert set(column_batch.get_columns()) == {
+        "topic", "partition", "offset", "timestamp", "key", "id", "price", "flag"
+    }
+
+
+def test_columnar_batch_decoder_invalid_record(msg_batch):
+    """
+    Purpose:
+        Test that values that are not a single record are rejected
+    """
+
+    columnar_batch_decoder = kafka_columnar_helpers.get_columnar_batch_decoder(
+        VALUE_FIELDS, use_numpy=False
+    )
+    msg_batch.append(FakeMessage("prices", 0, 4, None, b"short"))
+
+    with pytest.raises(SerializationError):
+        columnar_batch_decoder(msg_batch)
+
+
+def test_columnar_batch_decoder_invalid_fields():
+    """
+    Purpose:
+        Test that native alignment and unsupported struct codes are rejected
+    """
+
+    with pytest.raises(ValueError):
+        kafka_columnar_helpers.get_columnar_batch_decoder(VALUE_FIELDS, byteorder="@")
+    with pytest.raises(ValueError):
+        kafka_columnar_helpers.get_columnar_batch_decoder([("name", "s")])
+
+
+def test_consume_topic_columns():
+    """
+    Purpose:
+        Test consuming column batches from the fake broker with the simple
+        manual offset store configuration
+    """
+
+    fake_broker = get_fake_broker()
+    kafka_consumer = get_consumer(
+        fake_broker, config_overrides={"enable.auto.offset.store": False}
+    )
+
+    stop_event = threading.Event()
+    ids = []
+    for column_batch in kafka_columnar_helpers.consume_topic_columns(
+        kafka_consumer, ["prices"], VALUE_FIELDS, batch_size=4, batch_timeout=10,
+        stop_event=stop_event,
+    ):
+        ids.extend(column_batch.values["id"])
+        if len(ids) == 10:
+            stop_event.set()
+
+    assert ids == list(range(10))
+    assert fake_broker.get_committed_offset("test-group", "prices", 0) == 10
+
+
+@pytest.mark.parametrize("commit_strategy", [None, "async"])
+def test_consume_topic_columns_does_not_commit_invalid_batch(commit_strategy):
+    """
+    Purpose:
+        Test that a batch failing to decode is not committed when the consumer
+        is closed, with stored offsets or with an offset committer
+    """
+
+    fake_broker = get_fake_broker(invalid_offsets=(6,))
+    if commit_strategy is None:
+        offset_committer = None
+        kafka_consumer = get_consumer(
+            fake_broker, config_overrides={"enable.auto.offset.store": False}
+        )
+    else:
+        offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(commit_strategy)
+        kafka_consumer = get_consumer(fake_broker, offset_committer)
+
+    ids = []
+    with pytest.raises(SerializationError):
+        for column_batch in kafka_columnar_helpers.consume_topic_columns(
+            kafka_consumer, ["prices"], VALUE_FIELDS, batch_size=4,
+            batch_timeout=10, offset_committer=offset_committer,
+        ):
+            ids.extend(column_batch.values["id"])
+
+    assert ids == [0, 1, 2, 3]
+    assert fake_broker.get_committed_offset("test-group", "prices", 0) == 4
+    assert kafka_consumer.closed
+
+
+def test_consume_topic_columns_requires_manual_commits():
+    """
+    Purpose:
+        Test that consumers that would auto commit a failed batch are refused
+    """
+
+    fake_broker = get_fake_broker()
+
+    with pytest.raises(InvalidCommitStrategy):
+        next(kafka_columnar_helpers.consume_topic_columns(
+            get_consumer(fake_broker), ["prices"], VALUE_FIELDS,
+        ))
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter("auto")
+    with pytest.raises(InvalidCommitStrategy):
+        next(kafka_columnar_helpers.consume_topic_columns(
+            get_consumer(fake_broker, offset_committer), ["prices"],
+            VALUE_FIELDS, offset_committer=offset_committer,
+        ))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_compression_helpers.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import pytest
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_compression_helpers
+from kafka_helpers.kafka_exceptions import InvalidCompressionType
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def payloads():
+    """
+    Purpose:
+        Repetitive JSON payloads that compress well
+    """
+
+    return [
+        b'{"id": %d, "status": "created", "customer": "customer-%d"}'
+        % (index, index % 10)
+        for index in range(500)
+    ]
+
+
+###
+# Mocked Functions
+###
+
+
+# None at the Moment
+
+
+###
+# Test Payload
+###
+
+
+def test_get_compression_configuration():
+    """
+    Purpose:
+        Test the producer configuration of a codec
+    """
+
+    assert kafka_compression_helpers.get_compression_configuration("lz4") == {
+        "compression.type": "lz4"
+    }
+    assert kafka_compression_helpers.get_compression_configuration("gzip", 9) == {
+        "compression.type": "gzip",
+        "compression.level": 9,
+    }
+
+
+@pytest.mark.parametrize(
+    "compression_type,compression_level",
+    [("brotli", None), ("gzip", 10), ("snappy", 1), ("zstd", -2)],
+)
+def test_get_compression_configuration_invalid(compression_type, compression_level):
+    """
+    Purpose:
+        Test that unsupported codecs and levels are rejected
+    """
+
+    with pytest.raises(InvalidCompressionType):
+        kafka_compression_helpers.get_compression_configuration(
+            compression_type, compression_level
+        )
+
+
+@pytest.mark.parametrize("compression_type", ["none", "gzip", "snappy", "lz4", "zstd"])
+def test_get_compression_codec_round_trip(compression_type):
+    """
+    Purpose:
+        Test that each codec decompresses what it compressed
+    """
+
+    try:
+        compress, decompress = kafka_compression_helpers.get_compression_codec(
+            compression_type
+        )
+    except ImportError:
+        pytest.skip(f"No package installed for {compression_type}")
+
+    data = b"kafka compression " * 100
+    compressed_data = compress(data)
+
+    assert bytes(decompress(compressed_data)) == data
+    if compression_type != "none":
+        assert len(compressed_data) < len(data)
+
+
+def test_get_compression_codec_missing_package():
+    """
+    Purpose:
+        Test that a clear error is raised when no codec package is installed
+    """
+
+    with mock.patch.dict(sys.modules, {"zstandard": None, "cramjam": None}):
+        with pytest.raises(ImportError, match="pip install zstandard"):
+            kafka_compression_helpers.get_compression_codec("zstd")
+
+
+def test_measure_compression(payloads):
+    """
+    Purpose:
+        Test that codecs are measured on batches of payloads
+    """
+
+    compression_results = kafka_compression_helpers.measure_compression(
+        payloads,
+        compression_types=["none", "gzip"],
+        compression_levels={"gzip": 9},
+        batch_size=50,
+        iterations=1,
+    )
+
+    raw_bytes = sum(len(payload) for payload in payloads)
+    assert set(compression_results) == {"none", "gzip"}
+    assert compression_results["none"]["raw_bytes"] == raw_bytes
+    assert compression_results["none"]["ratio"] == 1
+    assert compression_results["gzip"]["messages"] == 500
+    assert compression_results["gzip"]["ratio"] > 3
+    assert compression_results["gzip"]["compress_us_per_msg"] > 0
+
+    with pytest.raises(ValueError):
+        kafka_compression_helpers.measure_compression([])
+
+
+def test_measure_compression_skips_missing_codecs(payloads):
+    """
+    Purpose:
+        Test that codecs without an installed package are skipped
+    """
+
+    with mock.patch.dict(sys.modules, {"lz4.frame": None, "cramjam": None}):
+        compression_results = kafka_compression_helpers.measure_compression(
+            payloads, compression_types=["gzip", "lz4"], iterations=1
+        )
+
+    assert list(compression_results) == ["gzip"]
+
+
+def test_get_best_compression_type():
+    """
+    Purpose:
+        Test that the codec with the lowest CPU plus network cost is picked
+    """
+
+    compression_results = {
+        "none": {
+            "messages": 1000, "compressed_bytes": 1000000,
+            "compress_us_per_msg": 0, "decompress_us_per_msg": 0,
+        },
+        "zstd": {
+            "messages": 1000, "compressed_bytes": 100000,
+            "compress_us_per_msg": 2, "decompress_us_per_msg": 1,
+        },
+    }
+
+    # 1000 bytes/msg at 1 GB/s costs 1us, less than zstd CPU
+    assert kafka_compression_helpers.get_best_compression_type(
+        compression_results, network_bytes_per_sec=1000000000
+    ) == "none"
+    # 1000 bytes/msg at 10 MB/s costs 100us, zstd saves 90us for 3us of CPU
+    assert kafka_compression_helpers.get_best_compression_type(
+        compression_results, network_bytes_per_sec=10000000
+    ) == "zstd"
+    assert kafka_compression_helpers.get_best_compression_type({}) is None
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_concurrent_helpers.py
+"""
+
+# Python Library Imports
+import os
+import random
+import sys
+import threading
+import time
+import pytest
+from confluent_kafka import KafkaError, KafkaException, TopicPartition
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_concurrent_helpers, kafka_exceptions
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def stop_event():
+    """
+    Purpose:
+        Event used to stop consuming once the mocked messages run out
+    """
+
+    return threading.Event()
+
+
+@pytest.fixture
+def kafka_consumer(stop_event):
+    """
+    Purpose:
+        Mocked Kafka Consumer with 3 partitions of 20 messages each
+    """
+
+    msgs = [
+        get_mock_message(partition=partition, offset=offset)
+        for offset in range(20)
+        for partition in range(3)
+    ]
+
+    return MockConsumer(msgs, stop_event)
+
+
+###
+# Mocked Functions
+###
+
+
+def get_mock_message(topic="test-topic", partition=0, offset=0):
+    """
+    Purpose:
+        Build a Mocked Kafka Message
+    """
+
+    msg = mock.Mock()
+    msg.topic.return_value = topic
+    msg.partition.return_value = partition
+    msg.offset.return_value = offset
+    msg.error.return_value = None
+
+    return msg
+
+
+class MockConsumer(object):
+    """
+    Purpose:
+        Mocked Kafka Consumer that returns batches of up to 7 messages (none
+        while paused) and then sets the stop event
+    """
+
+    def __init__(self, msgs, stop_event, auto_offset_store=False):
+        self.msgs = list(msgs)
+        self.stop_event = stop_event
+        self.auto_offset_store = auto_offset_store
+        self.commits = []
+        self.paused = False
+        self.pauses = 0
+        self.paused_consumes = 0
+        self.closed = False
+
+    def subscribe(self, topics, on_assign=None, on_revoke=None):
+        self.on_revoke = on_revoke
+
+    def assignment(self):
+        return [TopicPartition("test-topic", partition) for partition in range(3)]
+
+    def pause(self, partitions):
+        self.pauses += not self.paused
+        self.paused = True
+
+    def resume(self, partitions):
+        self.paused = False
+
+    def consume(self, num_messages=1, timeout=-1):
+        if self.paused:
+            self.paused_consumes += 1
+            time.sleep(0.001)
+            return []
+        if self.msgs:
+            msg_batch = self.msgs[:min(num_messages, 7)]
+            del self.msgs[:len(msg_batch)]
+            return msg_batch
+        self.stop_event.set()
+        return []
+
+    def store_offsets(self, message=None, offsets=None):
+        if self.auto_offset_store:
+            raise KafkaException(KafkaError(KafkaError._INVALID_ARG))
+
+    def commit(self, offsets=None, asynchronous=True):
+        self.commits.append(
+            {(offset.topic, offset.partition): offset.offset for offset in offsets}
+        )
+
+    def close(self):
+        self.closed = True
+
+
+###
+# Test Payload
+###
+
+
+def test_consume_topic_concurrently(kafka_consumer, stop_event):
+    """
+    Purpose:
+        Test that partitions are handled in order and every offset is committed
+    """
+
+    handled_offsets = {}
+
+    def message_handler(msg):
+        time.sleep(random.random() / 1000)
+        handled_offsets.setdefault(msg.partition(), []).append(msg.offset())
+
+    consume_stats = kafka_concurrent_helpers.consume_topic_concurrently(
+        kafka_consumer,
+        ["test-topic"],
+        message_handler,
+        max_workers=3,
+        max_in_flight=5,
+        commit_interval=0,
+        stop_event=stop_event,
+    )
+
+    assert handled_offsets == {partition: list(range(20)) for partition in range(3)}
+    assert consume_stats["dispatched"] == consume_stats["completed"] == 60
+
+    committed_offsets = {}
+    for commit in kafka_consumer.commits:
+        committed_offsets.update(commit)
+    assert committed_offsets == {("test-topic", partition): 20 for partition in range(3)}
+    assert kafka_consumer.closed
+
+
+def test_consume_topic_concurrently_pauses_when_saturated(kafka_consumer, stop_event):
+    """
+    Purpose:
+        Test that saturated handlers pause the partitions while the consumer
+        keeps polling, and that consuming resumes once they catch up
+    """
+
+    release_handlers = threading.Event()
+
+    def message_handler(msg):
+        release_handlers.wait(5)
+
+    def release_when_polled_paused():
+        while kafka_consumer.paused_consumes < 5:
+            time.sleep(0.001)
+        release_handlers.set()
+
+    release_thread = threading.Thread(target=release_when_polled_paused)
+    release_thread.start()
+    consume_stats = kafka_concurrent_helpers.consume_topic_concurrently(
+        kafka_consumer,
+        ["test-topic"],
+        message_handler,
+        max_workers=3,
+        max_in_flight=4,
+        commit_interval=0,
+        stop_event=stop_event,
+    )
+    release_thread.join()
+
+    assert kafka_consumer.pauses >= 1
+    assert kafka_consumer.paused_consumes >= 5
+    assert consume_stats["completed"] == 60
+
+
+def test_consume_topic_concurrently_handler_failure(kafka_consumer, stop_event):
+    """
+    Purpose:
+        Test that offsets at or past a failed message are never committed
+    """
+
+    def message_handler(msg):
+        if msg.partition() == 1 and msg.offset() == 5:
+            raise ValueError("Handler Failed")
+
+    with pytest.raises(ValueError):
+        kafka_concurrent_helpers.consume_topic_concurrently(
+            kafka_consumer,
+            ["test-topic"],
+            message_handler,
+            max_workers=2,
+            commit_interval=0,
+            stop_event=stop_event,
+        )
+
+    committed_offsets = {}
+    for commit in kafka_consumer.commits:
+        committed_offsets.update(commit)
+    assert committed_offsets[("test-topic", 1)] <= 5
+    assert kafka_consumer.closed
+
+
+def test_consume_topic_concurrently_requires_manual_offset_store(stop_event):
+    """
+    Purpose:
+        Test that a consumer storing offsets automatically is refused, as
+        auto commit would commit messages that are still being handled
+    """
+
+    kafka_consumer = MockConsumer(
+        [get_mock_message()], stop_event, auto_offset_store=True
+    )
+
+    with pytest.raises(kafka_exceptions.InvalidCommitStrategy):
+        kafka_concurrent_helpers.consume_topic_concurrently(
+            kafka_consumer, ["test-topic"], lambda msg: None, stop_event=stop_event
+        )
+    assert kafka_consumer.msgs and not kafka_consumer.commits
+
+
+def test_partition_offset_tracker():
+    """
+    Purpose:
+        Test that only contiguous finished offsets advance the commit offset
+    """
+
+    offset_tracker = kafka_concurrent_helpers.PartitionOffsetTracker()
+    for offset in range(4):
+        offset_tracker.dispatch("test-topic", 0, offset)
+
+    offset_tracker.complete("test-topic", 0, 1)
+    assert offset_tracker.get_commit_offsets() == []
+
+    offset_tracker.complete("test-topic", 0, 0)
+    offset_tracker.complete("test-topic", 0, 3)
+    commit_offsets = offset_tracker.get_commit_offsets()
+    assert [(offset.partition, offset.offset) for offset in commit_offsets] == [(0, 2)]
+    assert offset_tracker.get_commit_offsets() == []
+    assert offset_tracker.get_in_flight() == 2
+
+    offset_tracker.remove_partitions([TopicPartition("test-topic", 0)])
+    offset_tracker.complete("test-topic", 0, 2)
+    assert offset_tracker.get_in_flight() == 0
@@ -9,9 +9,17 @@ import os
 import sys
 import pytest
 from unittest import mock
+from confluent_kafka import KafkaError, KafkaException, TopicPartition
 
 # Import File to Test
-from kafka_helpers import kafka_consumer_helpers
+from kafka_helpers import (
+    kafka_consumer_helpers,
+    kafka_offset_helpers,
+    kafka_pipeline_helpers,
+    kafka_serde_helpers,
+)
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy, UnknownRecordOffset
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
 
 
 ###
@@ -19,7 +27,25 @@ from kafka_helpers import kafka_consumer_helpers
 ###
 
 
-# None at the Moment (Empty Test Suite)
+@pytest.fixture
+def kafka_consumer():
+    """
+    Purpose:
+        Mocked Kafka Consumer that returns two batches and then stops
+    """
+
+    consumer = mock.Mock()
+    consumer.consume.side_effect = [
+        [get_mock_message(offset=0), get_mock_message(offset=1)],
+        [],
+        [
+            get_mock_message(offset=2),
+            get_mock_message(offset=3, error_code=KafkaError._PARTITION_EOF),
+        ],
+        KeyboardInterrupt(),
+    ]
+
+    return consumer
 
 
 ###
@@ -27,7 +53,23 @@ from kafka_helpers import kafka_consumer_helpers
 ###
 
 
-# None at the Moment (Empty Test Suite)
+def get_mock_message(
+    topic="test-topic", partition=0, offset=0, key=None, value=b"1", error_code=None
+):
+    """
+    Purpose:
+        Build a Mocked Kafka Message
+    """
+
+    msg = mock.Mock()
+    msg.topic.return_value = topic
+    msg.partition.return_value = partition
+    msg.offset.return_value = offset
+    msg.key.return_value = key
+    msg.value.return_value = value
+    msg.error.return_value = KafkaError(error_code) if error_code else None
+
+    return msg
 
 
 ###
@@ -35,4 +77,265 @@ from kafka_helpers import kafka_consumer_helpers
 ###
 
 
-# None at the Moment (Empty Test Suite)
+def test_consume_topic(kafka_consumer):
+    """
+    Purpose:
+        Test that consume_topic yields messages through a pipeline
+    """
+
+    kafka_consumer.poll.side_effect = [
+        get_mock_message(offset=0),
+        None,
+        get_mock_message(offset=1, error_code=KafkaError._PARTITION_EOF),
+        get_mock_message(offset=2),
+        KeyboardInterrupt(),
+    ]
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_pipeline_helpers.get_deserializer_stage(
+            value_deserializer=kafka_pipeline_helpers.int_deserializer
+        )
+    )
+
+    records = list(
+        kafka_consumer_helpers.consume_topic(
+            kafka_consumer, ["test-topic"], message_pipeline=message_pipeline
+        )
+    )
+
+    assert [(record.offset, record.value) for record in records] == [(0, 49), (2, 49)]
+    kafka_consumer.close.assert_called_once()
+
+
+def test_consume_topic_commits_after_pipeline_output():
+    """
+    Purpose:
+        Test that messages a pipeline stage read ahead are not committed until
+        an output past them is consumed
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("test-topic", num_partitions=1)
+    for index in range(10):
+        fake_broker.append_message("test-topic", 0, None, str(index).encode())
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(
+        "sync", commit_every=1
+    )
+    kafka_consumer = kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"],
+        consumer_group="pipeline-group",
+        offset_start="earliest",
+        get_stats=False,
+        consumer_class=fake_broker.Consumer,
+        offset_committer=offset_committer,
+    )
+
+    def read_ahead_stage(records):
+        buffered_records = []
+        for record in records:
+            buffered_records.append(record)
+            if len(buffered_records) == 3:
+                yield from buffered_records
+                buffered_records = []
+        yield from buffered_records
+
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_pipeline_helpers.get_deserializer_stage(),
+        kafka_pipeline_helpers.get_filter_stage(lambda record: record.offset != 2),
+        read_ahead_stage,
+    )
+    records = kafka_consumer_helpers.consume_topic(
+        kafka_consumer,
+        ["test-topic"],
+        message_pipeline=message_pipeline,
+        offset_committer=offset_committer,
+    )
+
+    assert [next(records).offset for _ in range(4)] == [0, 1, 3, 4]
+    records.close()
+
+    # Offsets 5 and 6 were read ahead but never handed out
+    assert fake_broker.get_committed_offset("pipeline-group", "test-topic", 0) == 4
+    assert kafka_consumer.closed
+
+
+def test_consume_topic_rejects_untracked_pipeline_output(kafka_consumer):
+    """
+    Purpose:
+        Test that offsets are not committed for outputs without an offset
+    """
+
+    kafka_consumer.poll.side_effect = [get_mock_message(offset=0)]
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_pipeline_helpers.get_deserializer_stage(),
+        lambda records: (record.value for record in records),
+    )
+
+    with pytest.raises(UnknownRecordOffset):
+        list(
+            kafka_consumer_helpers.consume_topic(
+                kafka_consumer,
+                ["test-topic"],
+                message_pipeline=message_pipeline,
+                offset_committer=kafka_offset_helpers.KafkaOffsetCommitter("sync"),
+            )
+        )
+    kafka_consumer.close.assert_called_once()
+
+
+def test_consume_topic_batches(kafka_consumer):
+    """
+    Purpose:
+        Test that batches are yielded without empty batches or EOF events
+    """
+
+    msg_batches = list(
+        kafka_consumer_helpers.consume_topic_batches(
+            kafka_consumer, ["test-topic"], batch_size=10, batch_timeout=250
+        )
+    )
+
+    assert [[msg.offset() for msg in batch] for batch in msg_batches] == [[0, 1], [2]]
+    kafka_consumer.consume.assert_called_with(num_messages=10, timeout=0.25)
+    kafka_consumer.close.assert_called_once()
+
+
+def test_consume_topic_batches_with_decoder(kafka_consumer):
+    """
+    Purpose:
+        Test that each batch is decoded with the batch decoder
+    """
+
+    msg_batches = list(
+        kafka_consumer_helpers.consume_topic_batches(
+            kafka_consumer,
+            ["test-topic"],
+            batch_decoder=kafka_serde_helpers.decode_message_batch,
+        )
+    )
+
+    assert msg_batches == [[1, 1], [1]]
+    kafka_consumer.store_offsets.assert_called_with(
+        offsets=[TopicPartition("test-topic", 0, 3)]
+    )
+
+
+def get_fake_consumer(fake_broker, config_overrides=None):
+    """
+    Purpose:
+        Consumer on the fake broker reading the "test-topic" from the start
+    """
+
+    return kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"],
+        consumer_group="test-group",
+        offset_start="earliest",
+        get_stats=False,
+        config_overrides=config_overrides,
+        consumer_class=fake_broker.Consumer,
+    )
+
+
+def test_handle_topic_batches_with_decoder_does_not_commit_failed_batch():
+    """
+    Purpose:
+        Test that a batch failing to decode is not committed by the auto
+        commit when offsets are stored manually, and that consumers storing
+        offsets automatically are refused
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("test-topic")
+    for value in (b"1", b"2", b"{"):
+        fake_broker.append_message("test-topic", 0, None, value)
+
+    with pytest.raises(InvalidCommitStrategy):
+        kafka_consumer_helpers.handle_topic_batches(
+            get_fake_consumer(fake_broker), ["test-topic"], mock.Mock(),
+            batch_decoder=kafka_serde_helpers.decode_message_batch,
+        )
+
+    kafka_consumer = get_fake_consumer(
+        fake_broker, config_overrides={"enable.auto.offset.store": False}
+    )
+    batch_handler = mock.Mock()
+    with pytest.raises(ValueError):
+        kafka_consumer_helpers.handle_topic_batches(
+            kafka_consumer, ["test-topic"], batch_handler, batch_size=2,
+            batch_timeout=10, batch_decoder=kafka_serde_helpers.decode_message_batch,
+        )
+
+    batch_handler.assert_called_once_with([1, 2])
+    assert fake_broker.get_committed_offset("test-group", "test-topic", 0) == 2
+
+
+def test_handle_topic_batches(kafka_consumer):
+    """
+    Purpose:
+        Test that each batch is passed to the handler in a single call
+    """
+
+    batch_handler = mock.Mock()
+
+    total_messages = kafka_consumer_helpers.handle_topic_batches(
+        kafka_consumer, ["test-topic"], batch_handler
+    )
+
+    assert total_messages == 3
+    assert batch_handler.call_count == 2
+
+
+def test_filter_message_batch_raises_on_error():
+    """
+    Purpose:
+        Test that non-EOF errors in a batch are raised
+    """
+
+    msg_batch = [
+        get_mock_message(offset=0),
+        get_mock_message(offset=1, error_code=KafkaError._MSG_TIMED_OUT),
+    ]
+
+    with pytest.raises(KafkaException):
+        kafka_consumer_helpers.filter_message_batch(msg_batch)
+
+
+def test_consume_topic_batches_yields_messages_before_error():
+    """
+    Purpose:
+        Test that the valid messages of a batch holding an error are yielded
+        before consuming stops
+    """
+
+    kafka_consumer = mock.Mock()
+    kafka_consumer.consume.side_effect = [
+        [
+            get_mock_message(offset=0),
+            get_mock_message(offset=1),
+            get_mock_message(offset=2, error_code=KafkaError._MSG_TIMED_OUT),
+        ],
+        AssertionError("Consumed after the error"),
+    ]
+
+    msg_batches = list(
+        kafka_consumer_helpers.consume_topic_batches(kafka_consumer, ["test-topic"])
+    )
+
+    assert [[msg.offset() for msg in batch] for batch in msg_batches] == [[0, 1]]
+    kafka_consumer.close.assert_called_once()
+
+
+def test_split_message_batch():
+    """
+    Purpose:
+        Test that valid messages and the first error of a batch are separated
+    """
+
+    valid_msgs, msg_error = kafka_consumer_helpers.split_message_batch([
+        get_mock_message(offset=0),
+        get_mock_message(offset=1, error_code=KafkaError._MSG_TIMED_OUT),
+        get_mock_message(offset=2, error_code=KafkaError._PARTITION_EOF),
+        get_mock_message(offset=3),
+    ])
+
+    assert [msg.offset() for msg in valid_msgs] == [0, 3]
+    assert msg_error.code() == KafkaError._MSG_TIMED_OUT
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_fake_broker.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import threading
+import pytest
+from confluent_kafka import KafkaError, KafkaException, OFFSET_BEGINNING, TopicPartition
+from confluent_kafka.admin import (
+    AlterConfigOpType,
+    ConfigEntry,
+    ConfigResource,
+    NewPartitions,
+    NewTopic,
+)
+
+# Import File to Test
+from kafka_helpers import (
+    kafka_admin_helpers,
+    kafka_consumer_helpers,
+    kafka_fake_broker,
+    kafka_lag_helpers,
+    kafka_producer_helpers,
+    kafka_topic_helpers,
+)
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Fake broker with a three partition topic
+    """
+
+    broker = kafka_fake_broker.FakeKafkaBroker(num_brokers=3)
+    broker.create_topic("test-topic", num_partitions=3, replication_factor=2)
+
+    return broker
+
+
+@pytest.fixture
+def kafka_producer(fake_broker):
+    """
+    Purpose:
+        Producer on the fake broker
+    """
+
+    return kafka_producer_helpers.get_kafka_producer(
+        ["localhost:9092"], get_stats=False, producer_class=fake_broker.Producer
+    )
+
+
+###
+# Mocked Functions
+###
+
+
+def get_fake_consumer(fake_broker, consumer_group="test-group", **kwargs):
+    """
+    Purpose:
+        Consumer on the fake broker reading from the start of the topics
+    """
+
+    return kafka_consumer_helpers.get_kafka_consumer(
+        ["localhost:9092"],
+        consumer_group,
+        offset_start="earliest",
+        get_stats=False,
+        consumer_class=fake_broker.Consumer,
+        **kwargs,
+    )
+
+
+###
+# Test Payload
+###
+
+
+def test_produce_and_consume_batches(fake_broker, kafka_producer):
+    """
+    Purpose:
+        Messages produced with produce_messages are consumed in order per
+        partition and committed by auto commit
+    """
+
+    produce_results = kafka_producer_helpers.produce_messages(
+        kafka_producer, "test-topic", [str(index) for index in range(30)]
+    )
+    assert produce_results["delivered"] == 30
+    assert len(fake_broker.get_messages("test-topic")) == 30
+
+    kafka_consumer = get_fake_consumer(fake_broker)
+    stop_event = threading.Event()
+    consumed = []
+    for msg_batch in kafka_consumer_helpers.consume_topic_batches(
+        kafka_consumer, ["test-topic"], batch_size=7, batch_timeout=10,
+        stop_event=stop_event,
+    ):
+        consumed.extend(msg_batch)
+        if len(consumed) == 30:
+            stop_event.set()
+
+    assert sorted(int(msg.value()) for msg in consumed) == list(range(30))
+    for partition in range(3):
+        offsets = [msg.offset() for msg in consumed if msg.partition() == partition]
+        assert offsets == list(range(10))
+        assert fake_broker.get_committed_offset("test-group", "test-topic", partition) == 10
+
+
+def test_keyed_messages_share_a_partition(fake_broker, kafka_producer):
+    """
+    Purpose:
+        Messages with the same key are delivered to the same partition
+    """
+
+    for index in range(10):
+        kafka_producer.produce("test-topic", str(index), key="same-key")
+    kafka_producer.flush()
+
+    partitions = {msg.partition() for msg in fake_broker.get_messages("test-topic")}
+    assert len(partitions) == 1
+
+
+def test_producer_queue_full(fake_broker):
+    """
+    Purpose:
+        produce raises BufferError once queue.buffering.max.messages are queued
+    """
+
+    kafka_producer = fake_broker.Producer({"queue.buffering.max.messages": 2})
+    kafka_producer.produce("test-topic", b"1")
+    kafka_producer.produce("test-topic", b"2")
+    with pytest.raises(BufferError):
+        kafka_producer.produce("test-topic", b"3")
+
+    assert kafka_producer.poll(0) == 2
+    assert len(kafka_producer) == 0
+
+
+def test_producer_unknown_topic_delivery_error():
+    """
+    Purpose:
+        Delivery fails for an unknown topic when auto create is disabled
+    """
+
+    broker = kafka_fake_broker.FakeKafkaBroker(auto_create_topics=False)
+    delivery_reports = []
+    kafka_producer = broker.Producer({})
+    kafka_producer.produce(
+        "missing-topic", b"1", callback=lambda err, msg: delivery_reports.append(err)
+    )
+    kafka_producer.flush()
+
+    assert delivery_reports[0].code() == KafkaError.UNKNOWN_TOPIC_OR_PART
+
+
+def test_consumer_group_rebalance(fake_broker, kafka_producer):
+    """
+    Purpose:
+        Partitions are spread over the group members and revoked when a member
+        joins
+    """
+
+    assigned = {}
+    revoked = []
+
+    first_consumer = get_fake_consumer(fake_broker)
+    first_consumer.subscribe(
+        ["test-topic"],
+        on_assign=lambda consumer, partitions: assigned.update({"first": partitions}),
+        on_revoke=lambda consumer, partitions: revoked.append(partitions),
+    )
+    first_consumer.poll(0)
+    assert len(assigned["first"]) == 3
+
+    second_consumer = get_fake_consumer(fake_broker)
+    second_consumer.subscribe(["test-topic"])
+    first_consumer.poll(0)
+    second_consumer.poll(0)
+
+    assert len(revoked) == 1
+    assert len(first_consumer.assignment()) == 2
+    assert len(second_consumer.assignment()) == 1
+
+    second_consumer.close()
+    first_consumer.poll(0)
+    assert len(first_consumer.assignment()) == 3
+
+
+def test_manual_offsets_and_partition_eof(fake_broker, kafka_producer):
+    """
+    Purpose:
+        Stored offsets are only committed by commit, and partition EOF events
+        are raised once per partition
+    """
+
+    kafka_producer_helpers.produce_messages(
+        kafka_producer, "test-topic", [str(index) for index in range(3)]
+    )
+
+    kafka_consumer = get_fake_consumer(
+        fake_broker,
+        config_overrides={
+            "enable.auto.commit": False,
+            "enable.auto.offset.store": False,
+            "enable.partition.eof": True,
+        },
+    )
+    kafka_consumer.assign([TopicPartition("test-topic", 0, OFFSET_BEGINNING)])
+
+    msgs = kafka_consumer.consume(num_messages=10, timeout=0)
+    assert [msg.error() is None for msg in msgs] == [True, False]
+    assert msgs[1].error().code() == KafkaError._PARTITION_EOF
+    assert kafka_consumer.consume(num_messages=10, timeout=0) == []
+
+    with pytest.raises(KafkaException):
+        kafka_consumer.commit(asynchronous=False)
+
+    kafka_consumer.store_offsets(message=msgs[0])
+    kafka_consumer.commit(asynchronous=False)
+    committed = kafka_consumer.committed([TopicPartition("test-topic", 0)])
+    assert committed[0].offset == 1
+
+    # Offsets of unassigned partitions are not stored
+    with pytest.raises(KafkaException) as raised:
+        kafka_consumer.store_offsets(offsets=[TopicPartition("test-topic", 1, 1)])
+    assert raised.value.args[0].code() == KafkaError._STATE
+
+    kafka_consumer.close()
+    with pytest.raises(RuntimeError):
+        kafka_consumer.poll(0)
+
+
+def test_consumer_group_lag(fake_broker, kafka_producer):
+    """
+    Purpose:
+        Lag helpers work against the fake consumer and admin client
+    """
+
+    kafka_producer_helpers.produce_messages(
+        kafka_producer, "test-topic", [str(index) for index in range(30)]
+    )
+    kafka_consumer = get_fake_consumer(fake_broker)
+    kafka_consumer.commit(
+        offsets=[TopicPartition("test-topic", 0, 4)], asynchronous=False
+    )
+    kafka_admin_client = kafka_admin_helpers.get_kafka_admin_client(
+        ["localhost:9092"], admin_client_class=fake_broker.AdminClient
+    )
+
+    consumer_group_lag = kafka_lag_helpers.get_consumer_group_lag(
+        kafka_consumer, ["test-topic"], kafka_admin_client=kafka_admin_client
+    )
+
+    assert consumer_group_lag["partitions"][("test-topic", 0)]["lag"] == 6
+    assert consumer_group_lag["total_lag"] == 26
+
+
+def test_admin_client(fake_broker):
+    """
+    Purpose:
+        Topic administration through the fake admin client
+    """
+
+    kafka_admin_client = kafka_admin_helpers.get_kafka_admin_client(
+        ["localhost:9092"], admin_client_class=fake_broker.AdminClient
+    )
+
+    kafka_topic_helpers.create_kafka_topic(
+        kafka_admin_client, "new-topic", topic_partitions=2
+    )
+    assert fake_broker.get_partition_count("new-topic") == 2
+    assert set(kafka_topic_helpers.get_topics(kafka_admin_client)) == {
+        "test-topic", "new-topic"
+    }
+
+    futures = kafka_admin_client.create_topics([NewTopic("new-topic", 1, 1)])
+    with pytest.raises(KafkaException):
+        futures["new-topic"].result()
+
+    kafka_admin_client.create_partitions([NewPartitions("new-topic", 4)])
+    assert fake_broker.get_partition_count("new-topic") == 4
+
+    resource = ConfigResource(
+        ConfigResource.Type.TOPIC, "new-topic",
+        incremental_configs=[
+            ConfigEntry(
+                "retention.ms", "1000",
+                incremental_operation=AlterConfigOpType.SET,
+            ),
+        ],
+    )
+    kafka_admin_client.incremental_alter_configs([resource])[resource].result()
+    described = kafka_admin_client.describe_configs([resource])[resource].result()
+    assert described["retention.ms"].value == "1000"
+
+    metadata = kafka_admin_client.list_topics(topic="test-topic")
+    partition_metadata = metadata.topics["test-topic"].partitions[1]
+    assert partition_metadata.leader == 2
+    assert partition_metadata.replicas == [2, 3]
+
+    kafka_admin_client.delete_topics(["new-topic"])["new-topic"].result()
+    assert "new-topic" not in fake_broker.topics
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_lag_helpers.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import pytest
+from concurrent.futures import Future
+from confluent_kafka import TopicPartition
+from confluent_kafka.admin import ClusterMetadata, OffsetSpec, TopicMetadata
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_lag_helpers
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def kafka_admin_client():
+    """
+    Purpose:
+        Mocked Kafka Admin Client returning the watermarks from list_offsets
+    """
+
+    admin_client = mock.Mock()
+    admin_client.list_offsets.side_effect = get_mock_list_offsets
+
+    return admin_client
+
+
+@pytest.fixture
+def kafka_consumer():
+    """
+    Purpose:
+        Mocked Kafka Consumer for a topic with three partitions
+    """
+
+    consumer = mock.Mock()
+    consumer.list_topics.return_value = get_mock_cluster_metadata(
+        {"test-topic": 3, "other-topic": 1}
+    )
+    consumer.committed.side_effect = lambda partitions, timeout=None: [
+        TopicPartition(
+            partition.topic, partition.partition, COMMITTED_OFFSETS[partition.partition]
+        )
+        for partition in partitions
+    ]
+    consumer.get_watermark_offsets.side_effect = lambda partition, timeout=None: (
+        WATERMARKS[partition.partition]
+    )
+
+    return consumer
+
+
+###
+# Mocked Functions
+###
+
+
+COMMITTED_OFFSETS = {0: 90, 1: -1001, 2: 200}
+WATERMARKS = {0: (0, 100), 1: (10, 50), 2: (0, 200)}
+
+
+def get_mock_cluster_metadata(topic_partition_counts):
+    """
+    Purpose:
+        Build Cluster Metadata with the given number of partitions per topic
+    """
+
+    cluster_metadata = ClusterMetadata()
+    for topic_name, partition_count in topic_partition_counts.items():
+        topic_metadata = TopicMetadata()
+        topic_metadata.topic = topic_name
+        topic_metadata.partitions = {
+            partition_id: None for partition_id in range(partition_count)
+        }
+        cluster_metadata.topics[topic_name] = topic_metadata
+
+    return cluster_metadata
+
+
+def get_mock_list_offsets(topic_partition_offsets, request_timeout=None):
+    """
+    Purpose:
+        Mocked AdminClient.list_offsets returning resolved futures
+    """
+
+    futures = {}
+    for topic_partition, offset_spec in topic_partition_offsets.items():
+        low_watermark, high_watermark = WATERMARKS[topic_partition.partition]
+        future = Future()
+        future.set_result(
+            mock.Mock(
+                offset=(
+                    low_watermark
+                    if isinstance(offset_spec, type(OffsetSpec.earliest()))
+                    else high_watermark
+                )
+            )
+        )
+        futures[topic_partition] = future
+
+    return futures
+
+
+###
+# Test Payload
+###
+
+
+def test_get_consumer_group_lag(kafka_consumer, kafka_admin_client):
+    """
+    Purpose:
+        Test that lag is computed per partition, per topic and in total
+    """
+
+    consumer_group_lag = kafka_lag_helpers.get_consumer_group_lag(
+        kafka_consumer, ["test-topic"], kafka_admin_client
+    )
+
+    assert consumer_group_lag["partitions"][("test-topic", 0)] == {
+        "committed_offset": 90,
+        "low_watermark": 0,
+        "high_watermark": 100,
+        "lag": 10,
+    }
+    assert consumer_group_lag["partitions"][("test-topic", 1)]["lag"] == 40
+    assert consumer_group_lag["partitions"][("test-topic", 2)]["lag"] == 0
+    assert consumer_group_lag["topics"] == {"test-topic": 50}
+    assert consumer_group_lag["total_lag"] == 50
+    kafka_consumer.committed.assert_called_once()
+    kafka_consumer.list_topics.assert_called_once_with(topic="test-topic", timeout=10)
+
+
+def test_get_consumer_group_lag_bulk_watermarks(kafka_consumer, kafka_admin_client):
+    """
+    Purpose:
+        Test that the admin client fetches all watermarks in two bulk requests
+    """
+
+    consumer_group_lag = kafka_lag_helpers.get_consumer_group_lag(
+        kafka_consumer, ["test-topic"], kafka_admin_client=kafka_admin_client
+    )
+
+    assert consumer_group_lag["total_lag"] == 50
+    assert kafka_admin_client.list_offsets.call_count == 2
+    kafka_consumer.get_watermark_offsets.assert_not_called()
+
+
+def test_monitor_consumer_group_lag(kafka_consumer, kafka_admin_client):
+    """
+    Purpose:
+        Test that samples include the rate the lag is changing at
+    """
+
+    with mock.patch.object(kafka_lag_helpers.time, "sleep"):
+        samples = list(
+            kafka_lag_helpers.monitor_consumer_group_lag(
+                kafka_consumer,
+                ["test-topic", "missing-topic"],
+                kafka_admin_client,
+                max_samples=2,
+            )
+        )
+
+    assert len(samples) == 2
+    assert samples[0]["lag_rate"] is None
+    assert samples[1]["total_lag"] == 50
+    kafka_consumer.list_topics.assert_called_with(timeout=10)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_message_helpers.py
+"""
+
+# Python Library Imports
+import os
+import struct
+import sys
+import pytest
+
+# Import File to Test
+from kafka_helpers import kafka_message_helpers, kafka_pipeline_helpers
+from kafka_helpers.kafka_fake_broker import FakeMessage
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def msg_batch():
+    """
+    Purpose:
+        Messages holding fixed-width (id, price) records
+    """
+
+    return [
+        FakeMessage(
+            "prices", 1, offset, b"key", get_records(offset), timestamp=1000 + offset
+        )
+        for offset in range(3)
+    ]
+
+
+###
+# Mocked Functions
+###
+
+
+RECORD_FORMAT = ">qd"
+
+
+def get_records(offset, num_records=2):
+    """
+    Purpose:
+        Pack back to back (id, price) records
+    """
+
+    return b"".join(
+        struct.pack(RECORD_FORMAT, offset * 10 + index, index + 0.5)
+        for index in range(num_records)
+    )
+
+
+###
+# Test Payload
+###
+
+
+def test_get_message_views_share_message_buffers(msg_batch):
+    """
+    Purpose:
+        Test that views hold memoryviews over the message buffers (no copies)
+        and plain ints for the location of the message
+    """
+
+    message_views = kafka_message_helpers.get_message_views(msg_batch)
+
+    for msg, message_view in zip(msg_batch, message_views):
+        assert message_view.value.obj is msg.value()
+        assert message_view.key.obj is msg.key()
+        assert (message_view.topic, message_view.partition, message_view.offset) == (
+            "prices", 1, msg.offset()
+        )
+        assert message_view.timestamp == 1000 + msg.offset()
+
+    assert "value=<32 bytes>" in repr(message_views[0])
+
+
+def test_message_view_without_key():
+    """
+    Purpose:
+        Test that a missing key or value stays None
+    """
+
+    message_view = kafka_message_helpers.get_message_view(
+        FakeMessage("prices", 0, 0, None, None, timestamp=1)
+    )
+
+    assert message_view.key is None
+    assert message_view.value is None
+
+
+def test_message_view_stage_struct_deserializers(msg_batch):
+    """
+    Purpose:
+        Test that struct deserializers parse the memoryviews in place
+    """
+
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_message_helpers.get_message_view_stage(
+            value_deserializer=kafka_message_helpers.get_struct_array_deserializer(
+                RECORD_FORMAT
+            ),
+            key_deserializer=bytes,
+        )
+    )
+
+    message_views = list(message_pipeline(msg_batch))
+
+    assert message_views[2].value == [(20, 0.5), (21, 1.5)]
+    assert message_views[2].key == b"key"
+
+    second_record_deserializer = kafka_message_helpers.get_struct_deserializer(
+        RECORD_FORMAT, offset=struct.calcsize(RECORD_FORMAT)
+    )
+    assert second_record_deserializer(memoryview(get_records(1))) == (11, 1.5)
+
+
+def test_numpy_deserializer(msg_batch):
+    """
+    Purpose:
+        Test that NumPy arrays share the memory of the message
+    """
+    numpy = pytest.importorskip("numpy")
+
+    numpy_deserializer = kafka_message_helpers.get_numpy_deserializer(
+        [("id", ">i8"), ("price", ">f8")]
+    )
+    message_view = kafka_message_helpers.get_message_view(msg_batch[1])
+
+    records = numpy_deserializer(message_view.value)
+
+    assert records["id"].tolist() == [10, 11]
+    assert numpy.shares_memory(records, numpy.frombuffer(msg_batch[1].value(), "u1"))
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_multiprocess_helpers.py
+"""
+
+# Python Library Imports
+import os
+import queue
+import sys
+import threading
+import time
+import pytest
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_multiprocess_helpers
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def mock_get_kafka_consumer():
+    """
+    Purpose:
+        Patch get_kafka_consumer (before the workers are forked) to return a
+        consumer with a fixed number of messages
+    """
+
+    with mock.patch.object(
+        kafka_multiprocess_helpers.kafka_consumer_helpers,
+        "get_kafka_consumer",
+        side_effect=lambda *args, **kwargs: MockConsumer(total_messages=25),
+    ) as get_kafka_consumer:
+        yield get_kafka_consumer
+
+
+###
+# Mocked Functions
+###
+
+
+class MockMessage(object):
+    """
+    Purpose:
+        Mocked Kafka Message without an error
+    """
+
+    def error(self):
+        return None
+
+
+class MockConsumer(object):
+    """
+    Purpose:
+        Mocked Kafka Consumer that returns total_messages messages in batches
+        and then returns empty batches
+    """
+
+    def __init__(self, total_messages):
+        self.remaining_messages = total_messages
+
+    def subscribe(self, topics, on_assign=None):
+        pass
+
+    def consume(self, num_messages=1, timeout=-1):
+        batch_size = min(num_messages, self.remaining_messages)
+        self.remaining_messages -= batch_size
+        if not batch_size:
+            kafka_multiprocess_helpers.time.sleep(timeout)
+        return [MockMessage() for _ in range(batch_size)]
+
+    def close(self):
+        self.closed = True
+
+
+class MockWorker(object):
+    """
+    Purpose:
+        Mocked worker Process that is either dead (exited with code 1) or
+        alive until it is terminated
+    """
+
+    def __init__(self, alive=False):
+        self.alive = alive
+        self.pid = 1234
+        self.exitcode = None if alive else 1
+        self.terminated = False
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+    def terminate(self):
+        self.alive = False
+        self.terminated = True
+
+
+def get_crash_once_handler(crash_marker):
+    """
+    Purpose:
+        Batch handler that crashes the first worker process it runs in
+    """
+
+    def crash_once_handler(msg_batch):
+        if not crash_marker.exists():
+            crash_marker.touch()
+            raise ValueError("Handler Failed")
+
+    return crash_once_handler
+
+
+###
+# Test Payload
+###
+
+
+def test_run_consumer_group_processes(mock_get_kafka_consumer):
+    """
+    Purpose:
+        Test that worker stats are aggregated in the parent
+    """
+
+    consumer_group_stats = kafka_multiprocess_helpers.run_consumer_group_processes(
+        ["broker:9092"],
+        ["test-topic"],
+        "test-group",
+        lambda msg_batch: None,
+        num_processes=2,
+        batch_size=10,
+        batch_timeout=50,
+        report_interval=0.1,
+        run_time=1,
+    )
+
+    assert consumer_group_stats["messages"] == 50
+    assert consumer_group_stats["batches"] == 6
+    assert consumer_group_stats["restarts"] == 0
+    assert {
+        worker_stats["messages"]
+        for worker_stats in consumer_group_stats["workers"].values()
+    } == {25}
+
+
+def test_run_consumer_group_processes_restarts_workers(
+    mock_get_kafka_consumer, tmp_path
+):
+    """
+    Purpose:
+        Test that a crashed worker is restarted
+    """
+
+    consumer_group_stats = kafka_multiprocess_helpers.run_consumer_group_processes(
+        ["broker:9092"],
+        ["test-topic"],
+        "test-group",
+        get_crash_once_handler(tmp_path / "crashed"),
+        num_processes=1,
+        batch_size=10,
+        batch_timeout=50,
+        restart_backoff=0.1,
+        report_interval=0.1,
+        run_time=2,
+    )
+
+    assert consumer_group_stats["restarts"] == 1
+    assert consumer_group_stats["workers"][0]["messages"] > 0
+
+
+def test_run_consumer_group_processes_restart_backoff():
+    """
+    Purpose:
+        Test that a worker that keeps exiting is restarted with exponential
+        backoff instead of in a tight loop
+    """
+
+    with mock.patch.object(
+        kafka_multiprocess_helpers,
+        "start_consumer_worker",
+        side_effect=lambda worker_index, worker_kwargs: MockWorker(),
+    ) as start_consumer_worker, mock.patch.object(
+        kafka_multiprocess_helpers,
+        "collect_worker_stats",
+        side_effect=lambda *args, **kwargs: time.sleep(0.01),
+    ):
+        consumer_group_stats = kafka_multiprocess_helpers.run_consumer_group_processes(
+            ["broker:9092"],
+            ["test-topic"],
+            "test-group",
+            lambda msg_batch: None,
+            num_processes=1,
+            restart_backoff=0.1,
+            max_restart_backoff=10,
+            run_time=1.2,
+        )
+
+    # Restarts after 0.1s, 0.2s and 0.4s, the next one is due after 1.5s
+    assert consumer_group_stats["restarts"] == 3
+    assert start_consumer_worker.call_count == 4
+
+
+def test_run_consumer_group_processes_without_restarts():
+    """
+    Purpose:
+        Test that the group stops once every worker exited when restarts are
+        turned off
+    """
+
+    with mock.patch.object(
+        kafka_multiprocess_helpers,
+        "start_consumer_worker",
+        side_effect=lambda worker_index, worker_kwargs: MockWorker(),
+    ):
+        consumer_group_stats = kafka_multiprocess_helpers.run_consumer_group_processes(
+            ["broker:9092"],
+            ["test-topic"],
+            "test-group",
+            lambda msg_batch: None,
+            num_processes=2,
+            restart_workers=False,
+            run_time=30,
+        )
+
+    assert consumer_group_stats["restarts"] == 0
+    assert consumer_group_stats["run_time"] < 30
+
+
+def test_run_consumer_group_processes_interrupted():
+    """
+    Purpose:
+        Test that an interrupt stops the workers and restores SIGTERM handling
+    """
+
+    workers = []
+
+    def start_consumer_worker(worker_index, worker_kwargs):
+        workers.append(MockWorker(alive=True))
+        return workers[-1]
+
+    previous_sigterm_handler = kafka_multiprocess_helpers.signal.getsignal(
+        kafka_multiprocess_helpers.signal.SIGTERM
+    )
+    with mock.patch.object(
+        kafka_multiprocess_helpers, "start_consumer_worker", start_consumer_worker
+    ), mock.patch.object(
+        kafka_multiprocess_helpers,
+        "collect_worker_stats",
+        side_effect=[KeyboardInterrupt(), None],
+    ):
+        consumer_group_stats = kafka_multiprocess_helpers.run_consumer_group_processes(
+            ["broker:9092"],
+            ["test-topic"],
+            "test-group",
+            lambda msg_batch: None,
+            num_processes=2,
+            shutdown_timeout=0,
+        )
+
+    assert consumer_group_stats["messages"] == 0
+    assert [worker.terminated for worker in workers] == [True, True]
+    assert kafka_multiprocess_helpers.signal.getsignal(
+        kafka_multiprocess_helpers.signal.SIGTERM
+    ) == previous_sigterm_handler
+
+
+def test_stop_consumer_workers():
+    """
+    Purpose:
+        Test that stopped workers are joined and hung workers are terminated
+    """
+
+    stopped_worker = MockWorker()
+    hung_worker = MockWorker(alive=True)
+
+    kafka_multiprocess_helpers.stop_consumer_workers(
+        {0: stopped_worker, 1: hung_worker}, queue.Queue(), {}, shutdown_timeout=0
+    )
+
+    assert not stopped_worker.terminated
+    assert hung_worker.terminated
+
+
+def test_stop_consumer_workers_drains_stats():
+    """
+    Purpose:
+        Test that stats are collected while waiting, so a worker blocked on
+        flushing its last report can exit
+    """
+
+    stats_queue = queue.Queue()
+    stats_queue.put((0, 1234, {"messages": 5, "batches": 1}))
+    flushing_worker = MockWorker(alive=True)
+    flushing_worker.is_alive = lambda: not stats_queue.empty()
+    consumer_group_stats = {
+        "messages": 0, "batches": 0, "workers": {0: {"messages": 0, "batches": 0}}
+    }
+
+    kafka_multiprocess_helpers.stop_consumer_workers(
+        {0: flushing_worker}, stats_queue, consumer_group_stats, shutdown_timeout=5
+    )
+
+    assert not flushing_worker.terminated
+    assert consumer_group_stats["messages"] == 5
+
+
+def test_consumer_worker(mock_get_kafka_consumer):
+    """
+    Purpose:
+        Test that a worker hands batches to the handler, reports its stats and
+        passes the consumer_kwargs to get_kafka_consumer
+    """
+
+    stop_event = threading.Event()
+    stats_queue = queue.Queue()
+    handled_messages = []
+
+    def batch_handler(msg_batch):
+        handled_messages.extend(msg_batch)
+        if len(handled_messages) == 25:
+            stop_event.set()
+
+    with mock.patch.object(kafka_multiprocess_helpers.signal, "signal"):
+        kafka_multiprocess_helpers.consumer_worker(
+            0,
+            ["broker:9092"],
+            ["test-topic"],
+            "test-group",
+            batch_handler,
+            {"offset_start": "earliest"},
+            batch_size=10,
+            batch_timeout=50,
+            report_interval=0,
+            stop_event=stop_event,
+            stats_queue=stats_queue,
+        )
+
+    mock_get_kafka_consumer.assert_called_once_with(
+        ["broker:9092"], "test-group", offset_start="earliest"
+    )
+    consumer_group_stats = {
+        "messages": 0, "batches": 0, "workers": {0: {"messages": 0, "batches": 0}}
+    }
+    kafka_multiprocess_helpers.collect_worker_stats(stats_queue, consumer_group_stats)
+    assert consumer_group_stats["messages"] == 25
+    assert consumer_group_stats["batches"] == 3
+    assert consumer_group_stats["workers"][0]["pid"] == os.getpid()
+
+
+def test_sample_consumer_group_lag(mock_get_kafka_consumer):
+    """
+    Purpose:
+        Test that lag is sampled with the consumer_kwargs of the workers and
+        that failed samples return None
+    """
+
+    consumer_kwargs = {
+        "config_overrides": {"security.protocol": "SSL"},
+        "get_stats": True,
+    }
+
+    with mock.patch.object(
+        kafka_multiprocess_helpers.kafka_admin_helpers, "get_kafka_admin_client"
+    ) as get_kafka_admin_client, mock.patch.object(
+        kafka_multiprocess_helpers.kafka_lag_helpers,
+        "get_consumer_group_lag",
+        return_value={"total_lag": 5},
+    ) as get_consumer_group_lag:
+        consumer_group_lag = kafka_multiprocess_helpers.sample_consumer_group_lag(
+            ["broker:9092"], ["test-topic"], "test-group",
+            consumer_kwargs=consumer_kwargs,
+        )
+
+        get_consumer_group_lag.side_effect = Exception("Broker Unavailable")
+        failed_consumer_group_lag = kafka_multiprocess_helpers.sample_consumer_group_lag(
+            ["broker:9092"], ["test-topic"], "test-group"
+        )
+
+    assert consumer_group_lag == {"total_lag": 5}
+    assert failed_consumer_group_lag is None
+    mock_get_kafka_consumer.assert_any_call(
+        ["broker:9092"],
+        "test-group",
+        config_overrides={"security.protocol": "SSL"},
+        get_stats=False,
+        pooled=False,
+    )
+    get_kafka_admin_client.assert_any_call(
+        ["broker:9092"],
+        admin_client_class=None,
+        config_overrides={"security.protocol": "SSL"},
+    )
+    get_consumer_group_lag.assert_any_call(
+        mock.ANY, ["test-topic"], get_kafka_admin_client.return_value, timeout=1
+    )
+    assert consumer_kwargs["get_stats"]
+
+
+def test_sample_consumer_group_lag_on_fake_broker():
+    """
+    Purpose:
+        Test that lag is sampled with the fake clients passed for the workers
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("test-topic", num_partitions=2)
+    for index in range(6):
+        fake_broker.append_message("test-topic", index % 2, None, b"value")
+    fake_broker.commit_offsets("test-group", {("test-topic", 0): 1})
+
+    consumer_group_lag = kafka_multiprocess_helpers.sample_consumer_group_lag(
+        ["fake-broker:9092"],
+        ["test-topic"],
+        "test-group",
+        consumer_kwargs={"consumer_class": fake_broker.Consumer},
+        admin_client_class=fake_broker.AdminClient,
+    )
+
+    assert consumer_group_lag["total_lag"] == 5
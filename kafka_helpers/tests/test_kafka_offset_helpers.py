@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_offset_helpers.py
+"""
+
+# Python Library Imports
+import threading
+import pytest
+from unittest import mock
+from confluent_kafka import KafkaError, KafkaException, TopicPartition
+
+# Import File to Test
+from kafka_helpers import kafka_consumer_helpers, kafka_offset_helpers
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Fake broker with 10 messages in the "input" topic
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("input", num_partitions=2)
+    for index in range(10):
+        fake_broker.append_message("input", index % 2, None, f"value-{index}".encode())
+
+    return fake_broker
+
+
+###
+# Mocked Functions
+###
+
+
+def get_consumer(fake_broker, offset_committer):
+    """
+    Purpose:
+        Consumer on the fake broker configured by an offset committer
+    """
+
+    return kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"],
+        consumer_group="offset-group",
+        offset_start="earliest",
+        get_stats=False,
+        consumer_class=fake_broker.Consumer,
+        offset_committer=offset_committer,
+    )
+
+
+def get_committed_offsets(fake_broker):
+    """
+    Purpose:
+        Get the committed offsets of both "input" partitions
+    """
+
+    return [
+        fake_broker.get_committed_offset("offset-group", "input", partition)
+        for partition in range(2)
+    ]
+
+
+def consume_batches(kafka_consumer, offset_committer, num_batches, batch_size=2):
+    """
+    Purpose:
+        Consume num_batches batches and stop, returning the number of committed
+        messages seen while each batch was processed
+    """
+
+    committed_during_batches = []
+    stop_event = threading.Event()
+
+    def batch_handler(msg_batch):
+        committed_during_batches.append(
+            sum(
+                max(partition.offset, 0)
+                for partition in kafka_consumer.committed(
+                    [TopicPartition("input", 0), TopicPartition("input", 1)]
+                )
+            )
+        )
+        if len(committed_during_batches) == num_batches:
+            stop_event.set()
+
+    kafka_consumer_helpers.handle_topic_batches(
+        kafka_consumer,
+        ["input"],
+        batch_handler,
+        batch_size=batch_size,
+        batch_timeout=100,
+        stop_event=stop_event,
+        offset_committer=offset_committer,
+    )
+
+    return committed_during_batches
+
+
+###
+# Test Payload
+###
+
+
+def test_invalid_commit_strategy():
+    """
+    Purpose:
+        Test that unknown strategies are rejected
+    """
+
+    with pytest.raises(InvalidCommitStrategy):
+        kafka_offset_helpers.KafkaOffsetCommitter("per-message")
+
+
+@pytest.mark.parametrize(
+    "commit_strategy,expected_configuration",
+    [
+        ("auto", {"enable.auto.commit": True, "auto.commit.interval.ms": 5000}),
+        ("sync", {"enable.auto.commit": False}),
+        ("async", {"enable.auto.commit": False}),
+        ("store", {"enable.auto.commit": False, "enable.auto.offset.store": False}),
+    ],
+)
+def test_get_consumer_configuration(commit_strategy, expected_configuration):
+    """
+    Purpose:
+        Test the consumer configuration of each strategy
+    """
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(commit_strategy)
+    consumer_configuration = offset_committer.get_consumer_configuration()
+
+    assert consumer_configuration.pop("on_commit", None) == (
+        None if commit_strategy == "sync" else offset_committer.commit_callback
+    )
+    assert consumer_configuration == expected_configuration
+
+
+def test_sync_commits_every_batch(fake_broker):
+    """
+    Purpose:
+        Test that processed batches reaching commit_every are committed before
+        the next batch is consumed
+    """
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(
+        "sync", commit_every=2
+    )
+    kafka_consumer = get_consumer(fake_broker, offset_committer)
+
+    committed_during_batches = consume_batches(
+        kafka_consumer, offset_committer, num_batches=3
+    )
+
+    assert committed_during_batches == [0, 2, 4]
+    assert sum(get_committed_offsets(fake_broker)) == 6
+
+    commit_summary = offset_committer.get_commit_summary()
+    assert commit_summary["commits"] == 3
+    assert commit_summary["committed_messages"] == 6
+    assert commit_summary["commit_failures"] == 0
+    assert commit_summary["avg_latency_ms"] is not None
+
+
+@pytest.mark.parametrize("commit_strategy", ["async", "store"])
+def test_periodic_commits(fake_broker, commit_strategy):
+    """
+    Purpose:
+        Test that offsets are committed every commit_every messages and that
+        pending offsets are committed on close
+    """
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(
+        commit_strategy, commit_every=4, commit_interval_ms=60000
+    )
+    kafka_consumer = get_consumer(fake_broker, offset_committer)
+
+    committed_during_batches = consume_batches(
+        kafka_consumer, offset_committer, num_batches=5
+    )
+
+    assert committed_during_batches == [0, 0, 4, 4, 8]
+    assert get_committed_offsets(fake_broker) == [5, 5]
+
+    commit_summary = offset_committer.get_commit_summary()
+    assert commit_summary["commits"] == 3
+    assert commit_summary["committed_messages"] == 10
+    assert commit_summary["pending_messages"] == 0
+    assert len(offset_committer.commit_send_times) == 0
+
+
+def test_store_skips_revoked_partitions(fake_broker):
+    """
+    Purpose:
+        Test that storing offsets of partitions revoked since their messages
+        were consumed skips them instead of ending consuming
+    """
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(
+        "store", commit_every=100, commit_interval_ms=60000
+    )
+    kafka_consumer = get_consumer(fake_broker, offset_committer)
+    kafka_consumer.subscribe(["input"], on_revoke=offset_committer.revoke_callback)
+    msgs = kafka_consumer.consume(num_messages=10, timeout=0)
+    assert len(msgs) == 10
+
+    # A second member joins the group and takes one of the partitions
+    other_consumer = get_consumer(fake_broker, None)
+    other_consumer.subscribe(["input"])
+    kafka_consumer.consume(num_messages=10, timeout=0)
+    (owned_partition,) = [
+        partition.partition for partition in kafka_consumer.assignment()
+    ]
+
+    offset_committer.commit_processed(kafka_consumer, [
+        msg for msg in msgs if msg.partition() != owned_partition
+    ])
+    offset_committer.commit_processed(kafka_consumer, [
+        msg for msg in msgs if msg.partition() == owned_partition
+    ])
+    kafka_consumer_helpers.close_consumer(kafka_consumer, offset_committer)
+
+    committed_offsets = get_committed_offsets(fake_broker)
+    assert committed_offsets[owned_partition] == 5
+    assert committed_offsets[1 - owned_partition] == -1001
+
+
+def test_auto_commit_keeps_librdkafka_commits(fake_broker):
+    """
+    Purpose:
+        Test that the auto strategy leaves commits to the consumer
+    """
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter("auto")
+    kafka_consumer = get_consumer(fake_broker, offset_committer)
+
+    consume_batches(kafka_consumer, offset_committer, num_batches=5)
+
+    assert get_committed_offsets(fake_broker) == [5, 5]
+    assert offset_committer.get_commit_summary()["pending_messages"] == 0
+
+
+def test_commit_failures_are_reported():
+    """
+    Purpose:
+        Test that failed commits are counted and do not raise
+    """
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(
+        "async", commit_every=1
+    )
+    kafka_consumer = mock.Mock()
+    kafka_consumer.commit.side_effect = KafkaException(
+        KafkaError(KafkaError.REBALANCE_IN_PROGRESS)
+    )
+    msg = mock.Mock()
+    msg.topic.return_value = "input"
+    msg.partition.return_value = 0
+    msg.offset.return_value = 7
+
+    offset_committer.commit_processed(kafka_consumer, [msg])
+    offset_committer.commit_callback(
+        KafkaError(KafkaError.REQUEST_TIMED_OUT), [TopicPartition("input", 0, 8)]
+    )
+    offset_committer.commit_callback(KafkaError(KafkaError._NO_OFFSET), [])
+
+    commit_summary = offset_committer.get_commit_summary()
+    assert commit_summary["commits"] == 0
+    assert commit_summary["commit_failures"] == 2
+    assert "REQUEST_TIMED_OUT" in commit_summary["last_error"]
+    assert len(offset_committer.commit_send_times) == 0
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_partition_helpers.py
+"""
+
+# Python Library Imports
+import pytest
+
+# Import File to Test
+from kafka_helpers import (
+    kafka_admin_helpers,
+    kafka_partition_helpers,
+    kafka_producer_helpers,
+    kafka_topic_helpers,
+)
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Fake cluster of three brokers with a replicated topic
+    """
+
+    fake_broker = FakeKafkaBroker(num_brokers=3)
+    fake_broker.create_topic("test-topic", num_partitions=6, replication_factor=3)
+
+    return fake_broker
+
+
+@pytest.fixture
+def kafka_admin_client(fake_broker):
+    """
+    Purpose:
+        Admin client of the fake broker
+    """
+
+    return kafka_admin_helpers.get_kafka_admin_client(
+        ["localhost:9092"], admin_client_class=fake_broker.AdminClient
+    )
+
+
+###
+# Mocked Functions
+###
+
+
+# None at the Moment
+
+
+###
+# Test Payload
+###
+
+
+def test_analyze_balanced_topic(kafka_admin_client):
+    """
+    Purpose:
+        A balanced, fully replicated topic has no warnings
+    """
+
+    partition_analysis = kafka_partition_helpers.analyze_topic_partitions(
+        kafka_admin_client
+    )
+
+    topic_analysis = partition_analysis["topics"]["test-topic"]
+    assert topic_analysis["partitions"] == 6
+    assert topic_analysis["replication_factor"] == 3
+    assert topic_analysis["leaders"] == {1: 2, 2: 2, 3: 2}
+    assert topic_analysis["leader_skew"] == 1.0
+    assert topic_analysis["under_replicated"] == []
+    assert topic_analysis["offline"] == []
+    assert topic_analysis["throughput"] is None
+    assert topic_analysis["recommended_partitions"] == 6
+    assert topic_analysis["warnings"] == []
+    assert partition_analysis["brokers"] == {
+        1: {"leaders": 2, "replicas": 6},
+        2: {"leaders": 2, "replicas": 6},
+        3: {"leaders": 2, "replicas": 6},
+    }
+    assert partition_analysis["leader_skew"] == 1.0
+
+
+def test_analyze_skewed_topic(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Leader skew, shrunk ISRs, offline partitions, hot partitions and idle
+        consumers are reported
+    """
+
+    partitions = fake_broker.topics["test-topic"]["partitions"]
+    for partition_state in partitions[:4]:
+        partition_state["leader"] = 1
+    partitions[4]["isrs"] = partitions[4]["isrs"][:1]
+    partitions[5]["leader"] = -1
+    partition_rates = {("test-topic", partition_id): 10 for partition_id in range(6)}
+    partition_rates[("test-topic", 0)] = 100
+
+    partition_analysis = kafka_partition_helpers.analyze_topic_partitions(
+        kafka_admin_client,
+        kafka_topics=["test-topic", "missing-topic"],
+        partition_rates=partition_rates,
+        consumer_count=8,
+    )
+
+    topic_analysis = partition_analysis["topics"]["test-topic"]
+    assert list(partition_analysis["topics"]) == ["test-topic"]
+    assert topic_analysis["leaders"] == {1: 4, 2: 1, 3: 0}
+    assert topic_analysis["leader_skew"] == 2.0
+    assert topic_analysis["under_replicated"] == [4]
+    assert topic_analysis["offline"] == [5]
+    assert topic_analysis["throughput"] == 150
+    assert topic_analysis["rate_skew"] == 4.0
+    assert topic_analysis["recommended_partitions"] == 8
+    assert len(topic_analysis["warnings"]) == 6
+
+
+def test_get_recommended_partitions():
+    """
+    Purpose:
+        Partitions cover the throughput and consumers, spread evenly over the
+        consumers and never shrink
+    """
+
+    get_recommended_partitions = kafka_partition_helpers.get_recommended_partitions
+
+    assert get_recommended_partitions() == 1
+    assert get_recommended_partitions(
+        target_throughput=1000, partition_throughput=100
+    ) == 10
+    assert get_recommended_partitions(
+        target_throughput=1000, partition_throughput=100, consumer_count=4
+    ) == 12
+    assert get_recommended_partitions(consumer_count=3, current_partitions=5) == 5
+    with pytest.raises(ValueError):
+        get_recommended_partitions(target_throughput=1000, partition_throughput=0)
+
+
+def test_recommendations_feed_reconcile(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Recommended partition counts can be applied with reconcile_topics
+    """
+
+    partition_analysis = kafka_partition_helpers.analyze_topic_partitions(
+        kafka_admin_client,
+        target_throughputs={"test-topic": 2000},
+        partition_throughput=100,
+        consumer_count=4,
+    )
+    topic_specs = kafka_partition_helpers.get_recommended_topic_specs(
+        partition_analysis
+    )
+    assert topic_specs == {"test-topic": {"partitions": 20}}
+
+    kafka_topic_helpers.reconcile_topics(kafka_admin_client, topic_specs)
+    assert fake_broker.get_partition_count("test-topic") == 20
+
+
+def test_measure_partition_rates(fake_broker, kafka_admin_client, monkeypatch):
+    """
+    Purpose:
+        Rates are measured from the growth of the high watermarks
+    """
+
+    kafka_producer = kafka_producer_helpers.get_kafka_producer(
+        ["localhost:9092"], producer_class=fake_broker.Producer
+    )
+
+    def produce_during_sample(seconds):
+        for _ in range(20):
+            kafka_producer.produce("test-topic", b"msg", partition=1)
+        kafka_producer.flush()
+
+    monkeypatch.setattr(
+        kafka_partition_helpers.time, "sleep", produce_during_sample
+    )
+    monotonic_times = iter([100.0, 102.0])
+    monkeypatch.setattr(
+        kafka_partition_helpers.time, "monotonic", lambda: next(monotonic_times)
+    )
+
+    partition_rates = kafka_partition_helpers.measure_partition_rates(
+        kafka_admin_client, ["test-topic"]
+    )
+
+    assert partition_rates[("test-topic", 1)] == 10
+    assert sum(partition_rates.values()) == 10
+    assert kafka_partition_helpers.get_partition_rates({}, {("t", 0): (0, 5)}, 0) == {
+        ("t", 0): 0
+    }
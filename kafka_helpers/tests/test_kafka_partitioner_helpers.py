@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_partitioner_helpers.py
+"""
+
+# Python Library Imports
+import pytest
+
+# Import File to Test
+from kafka_helpers import kafka_partitioner_helpers
+from kafka_helpers.kafka_exceptions import InvalidPartitioner
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Fake broker with a topic of four partitions
+    """
+
+    fake_broker = FakeKafkaBroker(auto_create_topics=False)
+    fake_broker.create_topic("test-topic", num_partitions=4)
+
+    return fake_broker
+
+
+@pytest.fixture
+def kafka_producer(fake_broker):
+    """
+    Purpose:
+        Producer of the fake broker that records its metadata requests
+    """
+
+    kafka_producer = fake_broker.Producer({"bootstrap.servers": "localhost:9092"})
+    kafka_producer.list_topics_calls = 0
+    list_topics = kafka_producer.list_topics
+
+    def counting_list_topics(*args, **kwargs):
+        kafka_producer.list_topics_calls += 1
+        return list_topics(*args, **kwargs)
+
+    kafka_producer.list_topics = counting_list_topics
+
+    return kafka_producer
+
+
+###
+# Mocked Functions
+###
+
+
+# None at the Moment
+
+
+###
+# Test Payload
+###
+
+
+@pytest.mark.parametrize("key,partition", [
+    (b"", 681),
+    (b"a", 524),
+    (b"ab", 434),
+    (b"abc", 107),
+    (b"123456789", 566),
+    (b"\x00 ", 742),
+])
+def test_murmur2_java_compatibility(key, partition):
+    """
+    Purpose:
+        Keys map to the partitions the Java client's default partitioner picks
+        (1000 partitions)
+    """
+
+    assert kafka_partitioner_helpers.get_murmur2_partition(key, 1000) == partition
+
+
+def test_murmur2_partitioner_caches_keys(fake_broker, kafka_producer):
+    """
+    Purpose:
+        Each key is hashed once and metadata fetched once per TTL; adding
+        partitions re-partitions keys when the metadata is refreshed
+    """
+
+    partitioner = kafka_partitioner_helpers.Murmur2Partitioner(metadata_ttl=60)
+    hashed_keys = []
+    partition_key = partitioner.partition_key
+
+    def counting_partition_key(kafka_topic, key, num_partitions):
+        hashed_keys.append(key)
+        return partition_key(kafka_topic, key, num_partitions)
+
+    partitioner.partition_key = counting_partition_key
+
+    for _ in range(3):
+        assert partitioner.partition(kafka_producer, "test-topic", b"abc") == (
+            kafka_partitioner_helpers.get_murmur2_partition(b"abc", 4)
+        )
+    assert partitioner.partition(kafka_producer, "test-topic", None) is None
+    assert partitioner.partition(kafka_producer, "missing-topic", b"abc") is None
+    assert hashed_keys == [b"abc"]
+    assert kafka_producer.list_topics_calls == 2
+
+    fake_broker.add_partitions("test-topic", 1000)
+    partitioner.partition_counts.clear()
+    assert partitioner.partition(kafka_producer, "test-topic", b"abc") == 107
+    assert hashed_keys == [b"abc", b"abc"]
+
+
+def test_sticky_partitioner(kafka_producer):
+    """
+    Purpose:
+        Keyless messages stick to a partition for a batch, keyed messages use
+        murmur2
+    """
+
+    partitioner = kafka_partitioner_helpers.get_partitioner(
+        "sticky", sticky_messages=3
+    )
+
+    partitions = [
+        partitioner.partition(kafka_producer, "test-topic", None) for _ in range(6)
+    ]
+    assert len(set(partitions[:3])) == 1
+    assert len(set(partitions[3:])) == 1
+    assert partitions[0] != partitions[3]
+    assert partitioner.partition(kafka_producer, "test-topic", "key") == (
+        kafka_partitioner_helpers.get_murmur2_partition("key", 4)
+    )
+
+
+def test_round_robin_and_custom_partitioners(kafka_producer):
+    """
+    Purpose:
+        Round-robin cycles through partitions and custom functions are called
+        with the key and partition count
+    """
+
+    round_robin = kafka_partitioner_helpers.create_partitioner("round_robin")
+    assert [
+        round_robin.partition(kafka_producer, "test-topic", "key") for _ in range(6)
+    ] == [0, 1, 2, 3, 0, 1]
+
+    def last_partition(key, num_partitions):
+        return num_partitions - 1
+
+    custom = kafka_partitioner_helpers.get_partitioner(last_partition)
+    assert custom is kafka_partitioner_helpers.get_partitioner(last_partition)
+    assert custom.partition(kafka_producer, "test-topic", "key") == 3
+    assert custom.partition(kafka_producer, "test-topic", None) == 3
+
+    with pytest.raises(InvalidPartitioner):
+        kafka_partitioner_helpers.get_partitioner("hash")
+    with pytest.raises(InvalidPartitioner):
+        kafka_partitioner_helpers.validate_native_partitioner("round_robin")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_pipeline_helpers.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import pytest
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_pipeline_helpers
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def kafka_messages():
+    """
+    Purpose:
+        List of Mocked Kafka Messages with integer values
+    """
+
+    return [
+        get_mock_message(offset=offset, key=b"key", value=offset.to_bytes(2, "big"))
+        for offset in range(5)
+    ]
+
+
+###
+# Mocked Functions
+###
+
+
+def get_mock_message(topic="test-topic", partition=0, offset=0, key=None, value=b""):
+    """
+    Purpose:
+        Build a Mocked Kafka Message
+    """
+
+    msg = mock.Mock()
+    msg.topic.return_value = topic
+    msg.partition.return_value = partition
+    msg.offset.return_value = offset
+    msg.key.return_value = key
+    msg.value.return_value = value
+    msg.error.return_value = None
+
+    return msg
+
+
+###
+# Test Payload
+###
+
+
+def test_build_message_pipeline(kafka_messages):
+    """
+    Purpose:
+        Test that stages are chained in order and run lazily
+    """
+
+    sunk_records = []
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_pipeline_helpers.get_deserializer_stage(
+            value_deserializer=kafka_pipeline_helpers.int_deserializer,
+            key_deserializer=kafka_pipeline_helpers.utf8_deserializer,
+        ),
+        kafka_pipeline_helpers.get_filter_stage(lambda record: record.value % 2 == 0),
+        kafka_pipeline_helpers.get_sink_stage(sunk_records.append),
+    )
+
+    records = message_pipeline(kafka_messages)
+    assert sunk_records == []
+
+    records = list(records)
+    assert [record.value for record in records] == [0, 2, 4]
+    assert [record.offset for record in sunk_records] == [0, 2, 4]
+    assert {record.key for record in records} == {"key"}
+
+
+def test_run_message_pipeline(kafka_messages):
+    """
+    Purpose:
+        Test that running a pipeline consumes every message
+    """
+
+    message_pipeline = kafka_pipeline_helpers.build_message_pipeline(
+        kafka_pipeline_helpers.get_deserializer_stage(),
+        kafka_pipeline_helpers.get_logging_stage(),
+    )
+
+    assert kafka_pipeline_helpers.run_message_pipeline(
+        message_pipeline, kafka_messages
+    ) == 5
+
+
+def test_kafka_record_repr():
+    """
+    Purpose:
+        Test the KafkaRecord representation
+    """
+
+    record = kafka_pipeline_helpers.KafkaRecord("test-topic", 1, 2, None, 3)
+
+    assert repr(record) == (
+        "KafkaRecord(topic='test-topic', partition=1, offset=2, key=None, value=3)"
+    )
@@ -5,13 +5,24 @@
 """
 
 # Python Library Imports
+import logging
 import os
 import sys
 import pytest
 from unittest import mock
 
 # Import File to Test
-from kafka_helpers import kafka_producer_helpers
+from kafka_helpers import (
+    kafka_partitioner_helpers,
+    kafka_producer_helpers,
+    kafka_serde_helpers,
+)
+from kafka_helpers.kafka_exceptions import (
+    InvalidCompressionType,
+    InvalidPartitioner,
+    InvalidProducerProfile,
+)
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
 
 
 ###
@@ -19,7 +30,18 @@ from kafka_helpers import kafka_producer_helpers
 ###
 
 
-# None at the Moment (Empty Test Suite)
+@pytest.fixture(autouse=True)
+def delivery_report_state():
+    """
+    Purpose:
+        Reset the module level delivery report state around each test
+    """
+
+    kafka_producer_helpers.reset_delivery_report_counts()
+    kafka_producer_helpers.set_delivery_log_sample_rate(0)
+    yield
+    kafka_producer_helpers.reset_delivery_report_counts()
+    kafka_producer_helpers.set_delivery_log_sample_rate(0)
 
 
 ###
@@ -27,7 +49,55 @@ from kafka_helpers import kafka_producer_helpers
 ###
 
 
-# None at the Moment (Empty Test Suite)
+def get_mock_message(topic="test-topic", partition=0, offset=0):
+    """
+    Purpose:
+        Build a Mocked Kafka Delivery Report Message
+    """
+
+    msg = mock.Mock()
+    msg.topic.return_value = topic
+    msg.partition.return_value = partition
+    msg.offset.return_value = offset
+
+    return msg
+
+
+class MockProducer(object):
+    """
+    Purpose:
+        Mocked Kafka Producer with a bounded queue that serves delivery
+        reports on poll() and flush()
+    """
+
+    def __init__(self, queue_size=2, failed_msgs=()):
+        self.queue_size = queue_size
+        self.failed_msgs = failed_msgs
+        self.queue = []
+        self.produced = []
+        self.buffer_errors = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def produce(self, topic, value, key=None, callback=None):
+        if len(self.queue) >= self.queue_size:
+            self.buffer_errors += 1
+            raise BufferError("Local: Queue full")
+        self.queue.append((topic, value, callback))
+
+    def poll(self, timeout=None):
+        served = len(self.queue)
+        while self.queue:
+            topic, value, callback = self.queue.pop(0)
+            self.produced.append(value)
+            err = "Broker: Timed out" if value in self.failed_msgs else None
+            callback(err, get_mock_message(topic=topic, offset=len(self.produced)))
+        return served
+
+    def flush(self, timeout=None):
+        self.poll()
+        return 0
 
 
 ###
@@ -35,4 +105,420 @@ from kafka_helpers import kafka_producer_helpers
 ###
 
 
-# None at the Moment (Empty Test Suite)
+@mock.patch.object(kafka_producer_helpers, "Producer")
+def test_get_kafka_producer_profile(mock_producer):
+    """
+    Purpose:
+        Test that a profile is applied and overrides are passed through
+    """
+
+    kafka_producer_helpers.get_kafka_producer(
+        ["broker-1:9092", "broker-2:9092"],
+        profile="throughput",
+        config_overrides={"linger.ms": 100, "client.id": "test-client"},
+    )
+
+    producer_configuration = mock_producer.call_args[0][0]
+    assert producer_configuration["bootstrap.servers"] == "broker-1:9092,broker-2:9092"
+    assert producer_configuration["compression.type"] == "lz4"
+    assert producer_configuration["linger.ms"] == 100
+    assert producer_configuration["client.id"] == "test-client"
+    assert producer_configuration["stats_cb"] == (
+        kafka_producer_helpers.producer_statistic_callback
+    )
+
+
+def test_get_producer_configuration_default():
+    """
+    Purpose:
+        Test that the default profile only sets the brokers
+    """
+
+    assert kafka_producer_helpers.get_producer_configuration(["broker:9092"]) == {
+        "bootstrap.servers": "broker:9092"
+    }
+
+
+def test_get_producer_configuration_invalid_profile():
+    """
+    Purpose:
+        Test that an unknown profile raises InvalidProducerProfile
+    """
+
+    with pytest.raises(InvalidProducerProfile):
+        kafka_producer_helpers.get_producer_configuration(
+            ["broker:9092"], profile="fastest"
+        )
+
+
+def test_get_producer_configuration_compression():
+    """
+    Purpose:
+        Test that the compression codec is applied on top of the profile
+    """
+
+    producer_configuration = kafka_producer_helpers.get_producer_configuration(
+        ["broker:9092"], profile="throughput", compression_type="zstd",
+        compression_level=6,
+    )
+    assert producer_configuration["compression.type"] == "zstd"
+    assert producer_configuration["compression.level"] == 6
+
+    with pytest.raises(InvalidCompressionType):
+        kafka_producer_helpers.get_producer_configuration(
+            ["broker:9092"], compression_type="brotli"
+        )
+
+
+def test_get_producer_configuration_partitioner():
+    """
+    Purpose:
+        Test that a librdkafka partitioner is validated and applied
+    """
+
+    producer_configuration = kafka_producer_helpers.get_producer_configuration(
+        ["broker:9092"], partitioner="murmur2_random"
+    )
+    assert producer_configuration["partitioner"] == "murmur2_random"
+
+    with pytest.raises(InvalidPartitioner):
+        kafka_producer_helpers.get_producer_configuration(
+            ["broker:9092"], partitioner="round_robin"
+        )
+
+
+def test_topic_compression_producer():
+    """
+    Purpose:
+        Test that each topic is produced with the producer of its codec
+    """
+
+    fake_broker = FakeKafkaBroker()
+    kafka_producer = kafka_producer_helpers.get_topic_compression_producer(
+        ["fake-broker:9092"],
+        {"orders": "zstd", "clicks": "lz4"},
+        default_compression_type="none",
+        compression_levels={"zstd": 9},
+        get_stats=False,
+        producer_class=fake_broker.Producer,
+    )
+
+    assert set(kafka_producer.kafka_producers) == {"none", "lz4", "zstd"}
+    assert kafka_producer.get_producer("orders").config["compression.level"] == 9
+    assert kafka_producer.get_producer("logs").config["compression.type"] == "none"
+
+    for kafka_topic in ("orders", "clicks", "logs"):
+        produce_summary = kafka_producer_helpers.produce_messages(
+            kafka_producer, kafka_topic, [b"a", b"b"]
+        )
+        assert produce_summary["delivered"] == 2
+        assert len(fake_broker.get_messages(kafka_topic, 0)) == 2
+    assert len(kafka_producer) == 0
+
+    with pytest.raises(InvalidCompressionType):
+        kafka_producer_helpers.get_topic_compression_producer(
+            ["fake-broker:9092"], {"orders": "zstd"}, compression_levels={"zstd": 30},
+            producer_class=fake_broker.Producer,
+        )
+
+
+def test_topic_compression_producer_with_partitioner():
+    """
+    Purpose:
+        Test that a Python partitioner places the messages of a producer
+        compressing per topic
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("orders", num_partitions=4)
+    kafka_producer = kafka_producer_helpers.get_topic_compression_producer(
+        ["fake-broker:9092"],
+        {"orders": "zstd"},
+        get_stats=False,
+        producer_class=fake_broker.Producer,
+    )
+    keys = [f"user-{user_id}" for user_id in range(8)]
+
+    kafka_producer_helpers.produce_message(
+        kafka_producer, "orders", b"keyed", key=keys[0], partitioner="murmur2"
+    )
+    produce_summary = kafka_producer_helpers.produce_messages(
+        kafka_producer,
+        "orders",
+        [key.encode() for key in keys[1:]],
+        key_function=lambda msg: msg.decode(),
+        partitioner="murmur2",
+    )
+
+    assert produce_summary["delivered"] == 7
+    for partition_id in range(4):
+        for msg in fake_broker.get_messages("orders", partition_id):
+            assert partition_id == kafka_partitioner_helpers.get_murmur2_partition(
+                msg.key().decode(), 4
+            )
+    assert kafka_producer.list_topics().topics.keys() >= {"orders"}
+
+
+def test_produce_message_raises_serializer_and_partitioner_errors():
+    """
+    Purpose:
+        Test that messages failing to serialize or partition are not dropped
+        silently
+    """
+
+    # The mocked producer has no list_topics for the partition count
+    kafka_producer = MockProducer()
+
+    def failing_serializer(msg):
+        raise ValueError(f"Cannot serialize {msg}")
+
+    with pytest.raises(AttributeError):
+        kafka_producer_helpers.produce_message(
+            kafka_producer, "uncached-topic", "msg", key="key", partitioner="murmur2"
+        )
+    with pytest.raises(ValueError):
+        kafka_producer_helpers.produce_message(
+            kafka_producer, "test-topic", "msg", serializer=failing_serializer
+        )
+    assert kafka_producer.queue == []
+
+
+def test_produce_message_retries_when_queue_full():
+    """
+    Purpose:
+        Test that a full queue causes a retry rather than a dropped message
+    """
+
+    kafka_producer = MockProducer(queue_size=1)
+    kafka_producer.produce = mock.Mock(
+        side_effect=[BufferError("Local: Queue full"), None]
+    )
+
+    kafka_producer_helpers.produce_message(kafka_producer, "test-topic", "msg")
+
+    assert kafka_producer.produce.call_count == 2
+
+
+def test_produce_messages():
+    """
+    Purpose:
+        Test that every message is produced under backpressure and reported
+    """
+
+    kafka_producer = MockProducer(queue_size=3, failed_msgs=(b"4",))
+    msgs = (str(number).encode() for number in range(10))
+
+    produce_summary = kafka_producer_helpers.produce_messages(
+        kafka_producer, "test-topic", msgs, poll_interval=5, buffer_full_timeout=0
+    )
+
+    assert produce_summary == {
+        "produced": 10, "delivered": 9, "failed": 1, "pending": 0
+    }
+    assert kafka_producer.produced == [str(number).encode() for number in range(10)]
+    assert kafka_producer.buffer_errors > 0
+    assert kafka_producer_helpers.get_delivery_report_counts() == {
+        "test-topic": {0: {"delivered": 9, "failed": 1}}
+    }
+
+
+def test_produce_messages_poll_interval_zero():
+    """
+    Purpose:
+        Test that a poll_interval of 0 only serves delivery reports when the
+        queue is full and when flushing, and that negative intervals fail
+    """
+
+    kafka_producer = MockProducer(queue_size=4)
+    kafka_producer.poll = mock.Mock(wraps=kafka_producer.poll)
+
+    produce_summary = kafka_producer_helpers.produce_messages(
+        kafka_producer,
+        "test-topic",
+        [str(number).encode() for number in range(10)],
+        poll_interval=0,
+        buffer_full_timeout=0,
+    )
+
+    assert produce_summary["delivered"] == 10
+    assert kafka_producer.poll.call_count == kafka_producer.buffer_errors + 1
+
+    with pytest.raises(ValueError):
+        kafka_producer_helpers.produce_messages(
+            kafka_producer, "test-topic", [b"0"], poll_interval=-1
+        )
+
+
+def test_produce_with_backpressure():
+    """
+    Purpose:
+        Test that delivery reports are served until the full queue has room
+    """
+
+    kafka_producer = MockProducer(queue_size=1)
+    delivered = []
+
+    for value in (b"0", b"1"):
+        kafka_producer_helpers.produce_with_backpressure(
+            kafka_producer,
+            "test-topic",
+            value,
+            lambda err, msg: delivered.append(err),
+            buffer_full_timeout=0,
+        )
+
+    assert kafka_producer.buffer_errors == 1
+    assert kafka_producer.produced == [b"0"]
+    assert delivered == [None]
+    assert len(kafka_producer) == 1
+
+
+def test_produce_messages_with_serializer():
+    """
+    Purpose:
+        Test that messages are encoded with the serializer before producing
+    """
+
+    kafka_producer = MockProducer(queue_size=10)
+
+    kafka_producer_helpers.produce_message(
+        kafka_producer, "test-topic", {"id": 0},
+        serializer=kafka_serde_helpers.json_serializer,
+    )
+    kafka_producer_helpers.produce_messages(
+        kafka_producer, "test-topic", [{"id": 1}, {"id": 2}],
+        serializer=kafka_serde_helpers.json_serializer,
+    )
+
+    assert [
+        kafka_serde_helpers.json_deserializer(value)
+        for value in kafka_producer.produced
+    ] == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+
+def test_produce_messages_with_keys_and_partitioner():
+    """
+    Purpose:
+        Test that keys are produced and partitions chosen by the partitioner
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("test-topic", num_partitions=4)
+    kafka_producer = kafka_producer_helpers.get_kafka_producer(
+        ["localhost:9092"], producer_class=fake_broker.Producer
+    )
+
+    kafka_producer_helpers.produce_message(
+        kafka_producer, "test-topic", "keyed", key="user-1", partitioner="murmur2"
+    )
+    produce_summary = kafka_producer_helpers.produce_messages(
+        kafka_producer,
+        "test-topic",
+        [{"user": f"user-{user_id % 3}"} for user_id in range(9)],
+        serializer=kafka_serde_helpers.json_serializer,
+        key_function=lambda msg: msg["user"],
+        partitioner="murmur2",
+    )
+    assert produce_summary["delivered"] == 9
+
+    for partition_id in range(4):
+        for msg in fake_broker.get_messages("test-topic", partition_id):
+            key = msg.key().decode("utf-8")
+            assert partition_id == (
+                kafka_partitioner_helpers.get_murmur2_partition(key, 4)
+            )
+            if key != "user-1":
+                value = kafka_serde_helpers.json_deserializer(msg.value())
+                assert value["user"] == key
+
+    partition_sizes = [
+        len(fake_broker.get_messages("test-topic", partition_id))
+        for partition_id in range(4)
+    ]
+    round_robin = kafka_partitioner_helpers.create_partitioner("round_robin")
+    kafka_producer_helpers.produce_messages(
+        kafka_producer, "test-topic", ["msg"] * 8, partitioner=round_robin
+    )
+    assert [
+        len(fake_broker.get_messages("test-topic", partition_id)) - partition_size
+        for partition_id, partition_size in enumerate(partition_sizes)
+    ] == [2, 2, 2, 2]
+
+
+def test_produce_messages_without_flush():
+    """
+    Purpose:
+        Test that messages still queued are reported as pending
+    """
+
+    kafka_producer = MockProducer(queue_size=10)
+    kafka_producer.poll = mock.Mock(return_value=0)
+
+    produce_summary = kafka_producer_helpers.produce_messages(
+        kafka_producer, "test-topic", [b"1", b"2"], flush=False
+    )
+
+    assert produce_summary == {
+        "produced": 2, "delivered": 0, "failed": 0, "pending": 2
+    }
+
+
+def test_produce_results_callback_counts():
+    """
+    Purpose:
+        Test that delivery reports are counted by topic and partition
+    """
+
+    kafka_producer_helpers.produce_results_callback(None, get_mock_message())
+    kafka_producer_helpers.produce_results_callback(None, get_mock_message())
+    kafka_producer_helpers.produce_results_callback(
+        "Broker: Timed out", get_mock_message(partition=1)
+    )
+    kafka_producer_helpers.produce_results_callback(
+        None, get_mock_message(topic="other-topic")
+    )
+
+    assert kafka_producer_helpers.get_delivery_report_counts() == {
+        "test-topic": {
+            0: {"delivered": 2, "failed": 0},
+            1: {"delivered": 0, "failed": 1},
+        },
+        "other-topic": {0: {"delivered": 1, "failed": 0}},
+    }
+
+    kafka_producer_helpers.reset_delivery_report_counts()
+    assert kafka_producer_helpers.get_delivery_report_counts() == {}
+
+
+def test_produce_results_callback_sampled_logging(caplog):
+    """
+    Purpose:
+        Test that only a sample of successful deliveries are logged, and that
+        failures are always logged without shifting the sample
+    """
+
+    kafka_producer_helpers.set_delivery_log_sample_rate(3)
+
+    with caplog.at_level(logging.INFO):
+        for offset in range(9):
+            kafka_producer_helpers.produce_results_callback(
+                None, get_mock_message(offset=offset)
+            )
+            if offset % 3 == 1:
+                kafka_producer_helpers.produce_results_callback(
+                    "Broker: Timed out", get_mock_message(offset=offset)
+                )
+
+    assert [record.levelno for record in caplog.records] == [
+        logging.ERROR, logging.INFO
+    ] * 3
+
+
+def test_set_delivery_log_sample_rate_invalid():
+    """
+    Purpose:
+        Test that a negative sample rate is rejected
+    """
+
+    with pytest.raises(ValueError):
+        kafka_producer_helpers.set_delivery_log_sample_rate(-1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_serde_helpers.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import pytest
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_serde_helpers
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture(params=kafka_serde_helpers.JSON_BACKENDS)
+def json_backend(request):
+    """
+    Purpose:
+        Select each installed JSON backend, restoring the default afterwards
+    """
+
+    pytest.importorskip(request.param)
+    yield kafka_serde_helpers.set_json_backend(request.param)
+    kafka_serde_helpers.set_json_backend()
+
+
+###
+# Mocked Functions
+###
+
+
+def get_mock_message(value):
+    """
+    Purpose:
+        Build a Mocked Kafka Message with a value
+    """
+
+    msg = mock.Mock()
+    msg.value.return_value = value
+
+    return msg
+
+
+###
+# Test Payload
+###
+
+
+def test_default_backend_is_fastest_installed():
+    """
+    Purpose:
+        Test that the first installed backend in order of preference is used
+    """
+
+    for backend_name in kafka_serde_helpers.JSON_BACKENDS:
+        try:
+            __import__(backend_name)
+            break
+        except ImportError:
+            continue
+
+    assert kafka_serde_helpers.get_json_backend() == backend_name
+
+
+def test_set_json_backend_invalid():
+    """
+    Purpose:
+        Test that unsupported backends are rejected
+    """
+
+    with pytest.raises(ValueError):
+        kafka_serde_helpers.set_json_backend("pickle")
+
+
+def test_json_round_trip(json_backend):
+    """
+    Purpose:
+        Test that every backend encodes to compact bytes and decodes them
+    """
+
+    data = kafka_serde_helpers.json_serializer({"id": 1, "name": "test"})
+
+    assert isinstance(data, bytes)
+    assert data.replace(b" ", b"") == b'{"id":1,"name":"test"}'
+    assert kafka_serde_helpers.json_deserializer(data) == {"id": 1, "name": "test"}
+
+
+def test_decode_message_batch(json_backend):
+    """
+    Purpose:
+        Test that a batch of messages is decoded in order, with tombstones
+        decoded to None
+    """
+
+    msg_batch = [
+        get_mock_message(b'{"id": 1}'),
+        get_mock_message(None),
+        get_mock_message(b"[1, 2]"),
+        get_mock_message(b'"text"'),
+    ]
+
+    assert kafka_serde_helpers.decode_message_batch(msg_batch) == [
+        {"id": 1}, None, [1, 2], "text"
+    ]
+    assert kafka_serde_helpers.decode_message_batch([]) == []
+
+
+def test_decode_json_batch_invalid_document(json_backend):
+    """
+    Purpose:
+        Test that invalid documents raise instead of shifting the batch
+    """
+
+    with pytest.raises(ValueError):
+        kafka_serde_helpers.decode_json_batch([b"1", b"2, 3"])
+    with pytest.raises(ValueError):
+        kafka_serde_helpers.decode_json_batch([b'{"id": 1}', b"{"])
+
+
+def test_decode_json_batch_invalid_documents_valid_when_joined(json_backend):
+    """
+    Purpose:
+        Test that documents which are only valid JSON once joined together
+        still raise
+    """
+
+    with pytest.raises(ValueError):
+        kafka_serde_helpers.decode_json_batch([b"[1", b"2]", b"3,4"])
+    with pytest.raises(ValueError):
+        kafka_serde_helpers.decode_json_batch([b'{"id": 1', b'"x": 2}'])
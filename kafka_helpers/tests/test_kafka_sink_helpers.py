@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_sink_helpers.py
+"""
+
+# Python Library Imports
+import threading
+import pytest
+from confluent_kafka import TopicPartition
+
+# Import File to Test
+from kafka_helpers import (
+    kafka_consumer_helpers,
+    kafka_offset_helpers,
+    kafka_sink_helpers,
+)
+from kafka_helpers.kafka_exceptions import InvalidCommitStrategy, SinkFlushError
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Fake broker with 10 messages in the "input" topic
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("input", num_partitions=2)
+    for index in range(10):
+        fake_broker.append_message("input", index % 2, None, f"value-{index}".encode())
+
+    return fake_broker
+
+
+@pytest.fixture
+def offset_committer():
+    """
+    Purpose:
+        Offset committer that turns off auto commit
+    """
+
+    return kafka_offset_helpers.KafkaOffsetCommitter("sync")
+
+
+@pytest.fixture
+def kafka_consumer(fake_broker, offset_committer):
+    """
+    Purpose:
+        Consumer on the fake broker that does not auto commit
+    """
+
+    return get_consumer(fake_broker, offset_committer)
+
+
+###
+# Mocked Functions
+###
+
+
+def get_consumer(fake_broker, offset_committer):
+    """
+    Purpose:
+        Consumer on the fake broker configured by an offset committer
+    """
+
+    return kafka_consumer_helpers.get_kafka_consumer(
+        ["fake-broker:9092"],
+        consumer_group="sink-group",
+        offset_start="earliest",
+        get_stats=False,
+        consumer_class=fake_broker.Consumer,
+        offset_committer=offset_committer,
+    )
+
+
+def get_committed_offsets(kafka_consumer):
+    """
+    Purpose:
+        Get the committed offsets of both "input" partitions
+    """
+
+    return [
+        committed_partition.offset
+        for committed_partition in kafka_consumer.committed(
+            [TopicPartition("input", 0), TopicPartition("input", 1)]
+        )
+    ]
+
+
+def get_flaky_bulk_write(failures):
+    """
+    Purpose:
+        Bulk write that fails the first `failures` calls and then stores the
+        written batches
+    """
+
+    written_batches = []
+    attempts = []
+
+    def bulk_write(records):
+        attempts.append(len(records))
+        if len(attempts) <= failures:
+            raise ConnectionError("Sink unavailable")
+        written_batches.append(list(records))
+
+    return bulk_write, written_batches
+
+
+def consume_into_sink(kafka_consumer, batch_sink, num_messages=10):
+    """
+    Purpose:
+        Add messages to a sink, flushing whenever it is due
+    """
+
+    kafka_consumer.subscribe(["input"])
+    added_messages = 0
+    while added_messages < num_messages:
+        for msg in kafka_consumer.consume(num_messages=num_messages, timeout=1):
+            batch_sink.add(msg, msg.value())
+            added_messages += 1
+            if batch_sink.should_flush():
+                batch_sink.flush()
+
+
+###
+# Test Payload
+###
+
+
+def test_sink_flushes_on_record_count(kafka_consumer):
+    """
+    Purpose:
+        Test that full batches are written and committed
+    """
+
+    bulk_write, written_batches = get_flaky_bulk_write(failures=0)
+    batch_sink = kafka_sink_helpers.KafkaBatchSink(
+        kafka_consumer, bulk_write, max_records=4, max_latency_ms=60000
+    )
+
+    consume_into_sink(kafka_consumer, batch_sink)
+
+    assert [len(batch) for batch in written_batches] == [4, 4]
+    assert len(batch_sink) == 2
+    assert sum(get_committed_offsets(kafka_consumer)) == 8
+
+    assert batch_sink.flush() == 2
+    assert get_committed_offsets(kafka_consumer) == [5, 5]
+    assert batch_sink.sink_summary["flushes"] == 3
+    assert batch_sink.sink_summary["records"] == 10
+
+
+def test_sink_flushes_on_bytes_and_age(kafka_consumer):
+    """
+    Purpose:
+        Test the byte size and latency flush limits
+    """
+
+    bulk_write, written_batches = get_flaky_bulk_write(failures=0)
+    batch_sink = kafka_sink_helpers.KafkaBatchSink(
+        kafka_consumer, bulk_write, max_bytes=21, max_latency_ms=60000
+    )
+    consume_into_sink(kafka_consumer, batch_sink)
+
+    # Each value is 7 bytes, so every third message fills the buffer
+    assert [len(batch) for batch in written_batches] == [3, 3, 3]
+
+    batch_sink.max_latency_ms = 0
+    assert batch_sink.should_flush()
+    batch_sink.flush()
+    assert not batch_sink.should_flush()
+    assert batch_sink.get_time_until_flush() is None
+
+
+def test_sink_retries_with_backoff(kafka_consumer, monkeypatch):
+    """
+    Purpose:
+        Test that failed writes are retried with exponential backoff
+    """
+
+    backoffs = []
+    monkeypatch.setattr(kafka_sink_helpers.time, "sleep", backoffs.append)
+    bulk_write, written_batches = get_flaky_bulk_write(failures=3)
+    batch_sink = kafka_sink_helpers.KafkaBatchSink(
+        kafka_consumer,
+        bulk_write,
+        max_records=10,
+        retry_backoff_ms=100,
+        max_retry_backoff_ms=300,
+    )
+
+    consume_into_sink(kafka_consumer, batch_sink)
+
+    assert backoffs == [0.1, 0.2, 0.3]
+    assert [len(batch) for batch in written_batches] == [10]
+    assert batch_sink.sink_summary["retries"] == 3
+    assert get_committed_offsets(kafka_consumer) == [5, 5]
+
+
+def test_sink_does_not_commit_failed_flush(kafka_consumer, monkeypatch):
+    """
+    Purpose:
+        Test that offsets are not committed when every retry fails
+    """
+
+    monkeypatch.setattr(kafka_sink_helpers.time, "sleep", lambda seconds: None)
+    bulk_write, written_batches = get_flaky_bulk_write(failures=100)
+    batch_sink = kafka_sink_helpers.KafkaBatchSink(
+        kafka_consumer, bulk_write, max_records=20, max_retries=2
+    )
+    consume_into_sink(kafka_consumer, batch_sink)
+
+    with pytest.raises(SinkFlushError):
+        batch_sink.flush()
+
+    assert len(batch_sink) == 10
+    assert written_batches == []
+    assert get_committed_offsets(kafka_consumer) == [-1001, -1001]
+
+
+@pytest.mark.parametrize("commit_strategy", ["sync", "async", "store"])
+def test_sink_topic(fake_broker, commit_strategy):
+    """
+    Purpose:
+        Test that sink_topic decodes, writes and commits every message, skips
+        records the decoder drops and records each commit once with every
+        commit strategy
+    """
+
+    offset_committer = kafka_offset_helpers.KafkaOffsetCommitter(commit_strategy)
+    kafka_consumer = get_consumer(fake_broker, offset_committer)
+    stop_event = threading.Event()
+    written_records = []
+
+    def bulk_write(records):
+        written_records.extend(records)
+        if len(written_records) >= 5:
+            stop_event.set()
+
+    sink_summary = kafka_sink_helpers.sink_topic(
+        kafka_consumer,
+        ["input"],
+        bulk_write,
+        record_decoder=lambda msg: msg.value() if msg.offset() % 2 == 0 else None,
+        max_records=3,
+        max_latency_ms=50,
+        stop_event=stop_event,
+        offset_committer=offset_committer,
+    )
+
+    assert sorted(written_records) == [
+        b"value-0", b"value-1", b"value-4", b"value-5", b"value-8", b"value-9"
+    ]
+    assert sink_summary["messages"] == 10
+    assert sink_summary["records"] == 6
+    assert sink_summary["commit_failures"] == 0
+    assert kafka_consumer.closed
+    assert [
+        fake_broker.get_committed_offset("sink-group", "input", partition)
+        for partition in (0, 1)
+    ] == [5, 5]
+
+    commit_summary = offset_committer.get_commit_summary()
+    assert commit_summary["commits"] == sink_summary["flushes"]
+    assert commit_summary["committed_messages"] == 10
+    assert commit_summary["commit_failures"] == 0
+
+
+def test_sink_requires_manual_commits():
+    """
+    Purpose:
+        Test that a sink refuses an offset committer that auto commits
+    """
+
+    with pytest.raises(InvalidCommitStrategy):
+        kafka_sink_helpers.KafkaBatchSink(
+            None,
+            lambda records: None,
+            offset_committer=kafka_offset_helpers.KafkaOffsetCommitter("auto"),
+        )
+
+
+@pytest.mark.parametrize("commit_strategy", [None, "auto"])
+def test_sink_topic_requires_manual_commits(kafka_consumer, commit_strategy):
+    """
+    Purpose:
+        Test that sink_topic refuses consumers that may auto commit
+    """
+
+    with pytest.raises(InvalidCommitStrategy):
+        kafka_sink_helpers.sink_topic(
+            kafka_consumer,
+            ["input"],
+            lambda records: None,
+            offset_committer=(
+                kafka_offset_helpers.KafkaOffsetCommitter(commit_strategy)
+                if commit_strategy else None
+            ),
+        )
+
+
+def test_sink_topic_does_not_retry_during_rebalance(
+    fake_broker, kafka_consumer, offset_committer, monkeypatch
+):
+    """
+    Purpose:
+        Test that a write failing in the revoke callback is not retried with
+        backoff and that its offsets are not committed
+    """
+
+    backoffs = []
+    monkeypatch.setattr(kafka_sink_helpers.time, "sleep", backoffs.append)
+    bulk_write, written_batches = get_flaky_bulk_write(failures=100)
+    other_consumer = get_consumer(fake_broker, offset_committer)
+
+    def record_decoder(msg):
+        # Join a second member, revoking partitions on the next consume
+        if not other_consumer.subscription:
+            other_consumer.subscribe(["input"])
+        return msg.value()
+
+    with pytest.raises(SinkFlushError):
+        kafka_sink_helpers.sink_topic(
+            kafka_consumer,
+            ["input"],
+            bulk_write,
+            record_decoder=record_decoder,
+            max_records=100,
+            max_latency_ms=60000,
+            offset_committer=offset_committer,
+        )
+
+    assert backoffs == []
+    assert written_batches == []
+    assert get_committed_offsets(other_consumer) == [-1001, -1001]
+    assert kafka_consumer.closed
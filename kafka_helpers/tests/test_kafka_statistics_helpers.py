@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_statistics_helpers.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import pytest
+import simplejson as json
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_statistics_helpers
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def statistics_registry():
+    """
+    Purpose:
+        Empty Statistics Registry
+    """
+
+    return kafka_statistics_helpers.KafkaStatisticsRegistry(history_size=5)
+
+
+###
+# Mocked Functions
+###
+
+
+def get_mock_statistics(ts_seconds=1, rxmsgs=0, rxmsg_bytes=0, consumer_lag=10):
+    """
+    Purpose:
+        Build a trimmed librdkafka consumer statistics dict
+    """
+
+    return {
+        "name": "rdkafka#consumer-1",
+        "type": "consumer",
+        "ts": ts_seconds * 1000000,
+        "msg_cnt": 0,
+        "msg_size": 0,
+        "replyq": 0,
+        "txmsgs": 0,
+        "txmsg_bytes": 0,
+        "rxmsgs": rxmsgs,
+        "rxmsg_bytes": rxmsg_bytes,
+        "brokers": {
+            "localhost:9092/1": {
+                "nodeid": 1,
+                "outbuf_cnt": 2,
+                "waitresp_cnt": 1,
+                "rtt": {"avg": 1500, "p99": 4000},
+            },
+            "GroupCoordinator": {"nodeid": -1},
+        },
+        "topics": {
+            "test-topic": {
+                "partitions": {
+                    "0": {"consumer_lag": consumer_lag, "fetchq_cnt": 5},
+                    "1": {"consumer_lag": -1, "fetchq_cnt": 0},
+                    "-1": {"consumer_lag": -1},
+                }
+            }
+        },
+    }
+
+
+###
+# Test Payload
+###
+
+
+def test_parse_statistics():
+    """
+    Purpose:
+        Test that statistics are reduced to a compact snapshot
+    """
+
+    snapshot = kafka_statistics_helpers.parse_statistics(get_mock_statistics())
+
+    assert snapshot["client_name"] == "rdkafka#consumer-1"
+    assert snapshot["brokers"] == {
+        "localhost:9092/1": {
+            "rtt_avg_ms": 1.5,
+            "rtt_p99_ms": 4.0,
+            "outbuf_count": 2,
+            "waitresp_count": 1,
+        }
+    }
+    assert set(snapshot["partitions"]) == {("test-topic", 0), ("test-topic", 1)}
+    assert snapshot["partitions"][("test-topic", 0)]["fetchq_count"] == 5
+    assert snapshot["consumer_lag"] == 10
+
+
+def test_record_statistics(statistics_registry):
+    """
+    Purpose:
+        Test that snapshots are recorded from JSON and history is bounded
+    """
+
+    for ts_seconds in range(10):
+        statistics_registry.record_statistics(
+            json.dumps(get_mock_statistics(ts_seconds=ts_seconds))
+        )
+
+    assert statistics_registry.get_client_names() == ["rdkafka#consumer-1"]
+    assert len(statistics_registry.snapshots["rdkafka#consumer-1"]) == 5
+    assert statistics_registry.get_snapshot("rdkafka#consumer-1")["timestamp"] == 9
+    assert list(statistics_registry.get_snapshots()) == ["rdkafka#consumer-1"]
+    assert statistics_registry.get_snapshot("rdkafka#consumer-2") is None
+
+    statistics_registry.clear()
+    assert statistics_registry.get_client_names() == []
+
+
+def test_get_rates(statistics_registry):
+    """
+    Purpose:
+        Test that rates are computed over the rolling window
+    """
+
+    assert statistics_registry.get_rates("rdkafka#consumer-1") is None
+
+    for ts_seconds in range(5):
+        statistics_registry.record_statistics(
+            get_mock_statistics(
+                ts_seconds=ts_seconds,
+                rxmsgs=ts_seconds * ts_seconds * 100,
+                rxmsg_bytes=ts_seconds * 1000,
+            )
+        )
+
+    rates = statistics_registry.get_rates("rdkafka#consumer-1", window=2)
+    assert rates["rx_msgs"] == (1600 - 400) / 2
+    assert rates["rx_bytes"] == 1000
+    assert rates["tx_msgs"] == 0
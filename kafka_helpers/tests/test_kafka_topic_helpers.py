@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_topic_helpers.py
+"""
+
+# Python Library Imports
+import pytest
+from concurrent.futures import Future
+from confluent_kafka import KafkaError, KafkaException
+
+# Import File to Test
+from kafka_helpers import kafka_admin_helpers, kafka_exceptions, kafka_topic_helpers
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Fake broker with a user topic and a system topic. Topics are not auto
+        created by metadata lookups
+    """
+
+    fake_broker = FakeKafkaBroker(auto_create_topics=False)
+    fake_broker.create_topic("test-topic", num_partitions=2)
+    fake_broker.create_topic("__consumer_offsets")
+
+    return fake_broker
+
+
+@pytest.fixture
+def kafka_admin_client(fake_broker):
+    """
+    Purpose:
+        Admin client of the fake broker that records its metadata requests
+    """
+
+    return CountingAdminClient(
+        kafka_admin_helpers.get_kafka_admin_client(
+            ["localhost:9092"], admin_client_class=fake_broker.AdminClient
+        )
+    )
+
+
+###
+# Mocked Functions
+###
+
+
+class CountingAdminClient(object):
+    """
+    Purpose:
+        Admin client wrapper recording the topic of each list_topics call
+        (None for a full listing)
+    """
+
+    def __init__(self, kafka_admin_client):
+        self.kafka_admin_client = kafka_admin_client
+        self.list_topics_calls = []
+
+    def list_topics(self, topic=None, timeout=-1):
+        self.list_topics_calls.append(topic)
+        return self.kafka_admin_client.list_topics(topic=topic, timeout=timeout)
+
+    def __getattr__(self, name):
+        return getattr(self.kafka_admin_client, name)
+
+
+def get_failed_future(err):
+    """
+    Purpose:
+        Future that raises err
+    """
+
+    failed_future = Future()
+    failed_future.set_exception(err)
+
+    return failed_future
+
+
+###
+# Test Payload
+###
+
+
+def test_get_topics_filters_system_topics(kafka_admin_client):
+    """
+    Purpose:
+        System topics are only returned when asked for
+    """
+
+    assert set(kafka_topic_helpers.get_topics(kafka_admin_client)) == {"test-topic"}
+    assert set(
+        kafka_topic_helpers.get_topics(kafka_admin_client, return_system_topics=True)
+    ) == {"test-topic", "__consumer_offsets"}
+
+
+def test_topic_exists_looks_up_single_topic(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Existence checks fetch only the topic asked about and do not create it
+    """
+
+    assert kafka_topic_helpers.topic_exists(kafka_admin_client, "test-topic")
+    assert not kafka_topic_helpers.topic_exists(kafka_admin_client, "missing-topic")
+    assert kafka_admin_client.list_topics_calls == ["test-topic", "missing-topic"]
+    assert "missing-topic" not in fake_broker.topics
+
+    metadata = kafka_topic_helpers.get_topic_metadata(kafka_admin_client, "test-topic")
+    assert len(metadata.partitions) == 2
+
+
+def test_metadata_cache_reuses_results(kafka_admin_client):
+    """
+    Purpose:
+        Cached listings and lookups (including missing topics) are not fetched
+        again until they expire
+    """
+
+    metadata_cache = kafka_topic_helpers.KafkaTopicMetadataCache(
+        kafka_admin_client, ttl=60
+    )
+
+    for _ in range(3):
+        assert metadata_cache.topic_exists("test-topic")
+        assert not metadata_cache.topic_exists("missing-topic")
+    assert kafka_admin_client.list_topics_calls == ["test-topic", "missing-topic"]
+
+    for _ in range(3):
+        assert set(
+            kafka_topic_helpers.get_topics(
+                kafka_admin_client, metadata_cache=metadata_cache
+            )
+        ) == {"test-topic"}
+    assert set(metadata_cache.get_topics(return_system_topics=True)) == {
+        "test-topic", "__consumer_offsets"
+    }
+    assert kafka_admin_client.list_topics_calls[2:] == [None]
+
+    # The full listing also answers single topic lookups
+    metadata_cache.invalidate("other-topic")
+    metadata_cache.get_topics()
+    assert metadata_cache.topic_exists("test-topic")
+    assert not metadata_cache.topic_exists("other-topic")
+    assert kafka_admin_client.list_topics_calls[3:] == [None]
+
+
+def test_metadata_cache_expires(kafka_admin_client):
+    """
+    Purpose:
+        Expired entries are fetched again
+    """
+
+    metadata_cache = kafka_topic_helpers.KafkaTopicMetadataCache(
+        kafka_admin_client, ttl=0
+    )
+
+    metadata_cache.get_topics()
+    metadata_cache.get_topics()
+    assert metadata_cache.topic_exists("test-topic")
+    assert metadata_cache.topic_exists("test-topic")
+    assert kafka_admin_client.list_topics_calls == [
+        None, None, "test-topic", "test-topic"
+    ]
+
+
+def test_create_and_delete_invalidate_cache(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Creating and deleting topics through the helpers invalidates them in
+        the cache, so the change is seen before the TTL expires
+    """
+
+    metadata_cache = kafka_topic_helpers.KafkaTopicMetadataCache(
+        kafka_admin_client, ttl=60
+    )
+    assert not metadata_cache.topic_exists("new-topic")
+    assert set(metadata_cache.get_topics()) == {"test-topic"}
+
+    topic_futures = kafka_topic_helpers.create_kafka_topic(
+        kafka_admin_client, "new-topic", topic_partitions=3,
+        metadata_cache=metadata_cache,
+    )
+    topic_futures["new-topic"].result()
+    assert fake_broker.get_partition_count("new-topic") == 3
+    assert metadata_cache.topic_exists("new-topic")
+    assert set(metadata_cache.get_topics()) == {"test-topic", "new-topic"}
+
+    topic_futures = kafka_topic_helpers.delete_kafka_topic(
+        kafka_admin_client, "new-topic", metadata_cache=metadata_cache
+    )
+    topic_futures["new-topic"].result()
+    assert "new-topic" not in fake_broker.topics
+    assert not metadata_cache.topic_exists("new-topic")
+    assert set(metadata_cache.get_topics()) == {"test-topic"}
+
+
+def test_create_kafka_topic_sizes_partitions(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        The partition count and replication factor reach the new topic (and are
+        not swapped)
+    """
+
+    fake_broker.num_brokers = 3
+    topic_futures = kafka_topic_helpers.create_kafka_topic(
+        kafka_admin_client, "sized-topic", topic_replication=3, topic_partitions=12
+    )
+    topic_futures["sized-topic"].result()
+
+    assert fake_broker.get_partition_count("sized-topic") == 12
+    topic_metadata = kafka_topic_helpers.get_topic_metadata(
+        kafka_admin_client, "sized-topic"
+    )
+    assert len(topic_metadata.partitions[0].replicas) == 3
+
+
+def test_create_kafka_topics(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Bulk creation reports an outcome per topic and skips existing topics,
+        so a rerun succeeds
+    """
+
+    topic_names = ["new-topic-1", "new-topic-2", "test-topic"]
+    metadata_cache = kafka_topic_helpers.KafkaTopicMetadataCache(
+        kafka_admin_client, ttl=60
+    )
+    assert not metadata_cache.topic_exists("new-topic-1")
+
+    topic_outcomes = kafka_topic_helpers.create_kafka_topics(
+        kafka_admin_client,
+        topic_names,
+        topic_partitions=3,
+        topic_config={"retention.ms": 1000},
+        metadata_cache=metadata_cache,
+    )
+    assert {
+        topic_name: topic_outcome["status"]
+        for topic_name, topic_outcome in topic_outcomes.items()
+    } == {
+        "new-topic-1": "created",
+        "new-topic-2": "created",
+        "test-topic": "exists",
+    }
+    assert fake_broker.get_partition_count("new-topic-1") == 3
+    assert fake_broker.topics["new-topic-2"]["config"] == {"retention.ms": "1000"}
+    assert fake_broker.get_partition_count("test-topic") == 2
+    assert metadata_cache.topic_exists("new-topic-1")
+
+    topic_outcomes = kafka_topic_helpers.create_kafka_topics(
+        kafka_admin_client, topic_names
+    )
+    assert {
+        topic_outcome["status"] for topic_outcome in topic_outcomes.values()
+    } == {"exists"}
+
+
+def test_create_kafka_topics_failure(fake_broker, kafka_admin_client, monkeypatch):
+    """
+    Purpose:
+        A topic that cannot be created fails without stopping the others
+    """
+
+    create_topic = fake_broker.create_topic
+
+    def create_or_reject_topic(topic, **kwargs):
+        if topic == "rejected-topic":
+            raise KafkaException(KafkaError(KafkaError.INVALID_REPLICATION_FACTOR))
+        create_topic(topic, **kwargs)
+
+    monkeypatch.setattr(fake_broker, "create_topic", create_or_reject_topic)
+
+    topic_outcomes = kafka_topic_helpers.create_kafka_topics(
+        kafka_admin_client, ["rejected-topic", "new-topic"]
+    )
+
+    assert topic_outcomes["rejected-topic"]["status"] == "failed"
+    assert "INVALID_REPLICATION_FACTOR" in topic_outcomes["rejected-topic"]["errors"][0]
+    assert topic_outcomes["new-topic"] == {"status": "created", "errors": []}
+    assert "rejected-topic" not in fake_broker.topics
+
+
+def test_delete_kafka_topics(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Bulk deletion reports an outcome per topic and skips missing topics,
+        so a rerun succeeds
+    """
+
+    fake_broker.create_topic("old-topic-1")
+    fake_broker.create_topic("old-topic-2")
+    topic_names = ["old-topic-1", "old-topic-2", "never-created"]
+
+    topic_outcomes = kafka_topic_helpers.delete_kafka_topics(
+        kafka_admin_client, topic_names
+    )
+    assert {
+        topic_name: topic_outcome["status"]
+        for topic_name, topic_outcome in topic_outcomes.items()
+    } == {
+        "old-topic-1": "deleted",
+        "old-topic-2": "deleted",
+        "never-created": "missing",
+    }
+    assert set(fake_broker.topics) == {"test-topic", "__consumer_offsets"}
+
+    topic_outcomes = kafka_topic_helpers.delete_kafka_topics(
+        kafka_admin_client, topic_names
+    )
+    assert {
+        topic_outcome["status"] for topic_outcome in topic_outcomes.values()
+    } == {"missing"}
+
+
+def test_reconcile_topics(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Reconciling creates missing topics, adds partitions and sets differing
+        configs in one pass, skipping topics that already match
+    """
+
+    fake_broker.create_topic("matching-topic", num_partitions=3, config={
+        "retention.ms": "1000"
+    })
+    topic_specs = {
+        "test-topic": {"partitions": 4, "config": {"cleanup.policy": "compact"}},
+        "matching-topic": {"partitions": 3, "config": {"retention.ms": 1000}},
+        "new-topic": {"partitions": 6, "config": {"compression.type": "zstd"}},
+    }
+    metadata_cache = kafka_topic_helpers.KafkaTopicMetadataCache(
+        kafka_admin_client, ttl=60
+    )
+    assert not metadata_cache.topic_exists("new-topic")
+
+    topic_outcomes = kafka_topic_helpers.reconcile_topics(
+        kafka_admin_client, topic_specs, metadata_cache=metadata_cache
+    )
+
+    assert topic_outcomes == {
+        "test-topic": {
+            "status": "updated",
+            "actions": ["add_partitions", "alter_config"],
+            "errors": [],
+        },
+        "matching-topic": {"status": "unchanged", "actions": [], "errors": []},
+        "new-topic": {"status": "created", "actions": ["create"], "errors": []},
+    }
+    assert fake_broker.get_partition_count("test-topic") == 4
+    assert fake_broker.topics["test-topic"]["config"] == {"cleanup.policy": "compact"}
+    assert fake_broker.get_partition_count("new-topic") == 6
+    assert fake_broker.topics["new-topic"]["config"] == {"compression.type": "zstd"}
+    assert metadata_cache.topic_exists("new-topic")
+    # Only the specified topics are looked up, never the whole cluster
+    assert None not in kafka_admin_client.list_topics_calls
+    assert set(kafka_admin_client.list_topics_calls) == set(topic_specs)
+
+    # Applying the same spec again changes nothing
+    topic_outcomes = kafka_topic_helpers.reconcile_topics(
+        kafka_admin_client, topic_specs
+    )
+    assert {
+        topic_outcome["status"] for topic_outcome in topic_outcomes.values()
+    } == {"unchanged"}
+
+
+def test_reconcile_topics_dry_run_and_errors(fake_broker, kafka_admin_client):
+    """
+    Purpose:
+        Dry runs only validate the changes, and changes that cannot be applied
+        fail their own topic without stopping the others
+    """
+
+    topic_specs = [
+        {"name": "test-topic", "partitions": 1},
+        {"name": "replicated-topic", "replication_factor": 1},
+        {"name": "new-topic", "partitions": 2},
+    ]
+    fake_broker.create_topic("replicated-topic", replication_factor=1)
+    fake_broker.topics["replicated-topic"]["partitions"][0]["replicas"] = [1, 2]
+
+    topic_outcomes = kafka_topic_helpers.reconcile_topics(
+        kafka_admin_client, topic_specs, dry_run=True
+    )
+
+    assert topic_outcomes["new-topic"] == {
+        "status": "validated", "actions": ["create"], "errors": []
+    }
+    assert "new-topic" not in fake_broker.topics
+    assert topic_outcomes["test-topic"]["status"] == "failed"
+    assert "Cannot reduce partitions" in topic_outcomes["test-topic"]["errors"][0]
+    assert topic_outcomes["replicated-topic"]["status"] == "failed"
+    assert fake_broker.get_partition_count("test-topic") == 2
+
+
+def test_reconcile_topics_describe_errors(fake_broker, kafka_admin_client, monkeypatch):
+    """
+    Purpose:
+        A topic whose configs cannot be described fails on its own, and the
+        other topics are still reconciled
+    """
+
+    fake_broker.create_topic("other-topic")
+    describe_configs = kafka_admin_client.describe_configs
+
+    def describe_or_fail_configs(resources, **kwargs):
+        config_futures = describe_configs(resources, **kwargs)
+        for config_resource in config_futures:
+            if config_resource.name == "test-topic":
+                config_futures[config_resource] = get_failed_future(
+                    KafkaException(KafkaError(KafkaError.REQUEST_TIMED_OUT))
+                )
+        return config_futures
+
+    monkeypatch.setattr(
+        kafka_admin_client, "describe_configs", describe_or_fail_configs
+    )
+    topic_specs = {
+        "test-topic": {"config": {"cleanup.policy": "compact"}},
+        "other-topic": {"config": {"cleanup.policy": "compact"}},
+    }
+
+    topic_outcomes = kafka_topic_helpers.reconcile_topics(
+        kafka_admin_client, topic_specs
+    )
+
+    assert topic_outcomes["test-topic"]["status"] == "failed"
+    assert "Failed to describe configs" in topic_outcomes["test-topic"]["errors"][0]
+    assert topic_outcomes["test-topic"]["actions"] == []
+    assert fake_broker.topics["test-topic"]["config"] == {}
+    assert topic_outcomes["other-topic"] == {
+        "status": "updated", "actions": ["alter_config"], "errors": []
+    }
+
+
+def test_load_topic_specs(tmpdir):
+    """
+    Purpose:
+        Specs are loaded from JSON and YAML files and malformed specs rejected
+    """
+
+    json_filename = str(tmpdir.join("topics.json"))
+    with open(json_filename, "w") as json_file:
+        json_file.write(
+            '{"topics": {"orders": {"partitions": 3, '
+            '"config": {"retention.ms": 1000, "preallocate": true}}}}'
+        )
+    expected_specs = {
+        "orders": {
+            "partitions": 3,
+            "replication_factor": None,
+            "config": {"retention.ms": "1000", "preallocate": "true"},
+        }
+    }
+    assert kafka_topic_helpers.load_topic_specs(json_filename) == expected_specs
+
+    pytest.importorskip("yaml")
+    yaml_filename = str(tmpdir.join("topics.yaml"))
+    with open(yaml_filename, "w") as yaml_file:
+        yaml_file.write(
+            "topics:\n"
+            "  - name: orders\n"
+            "    partitions: 3\n"
+            "    config:\n"
+            "      retention.ms: 1000\n"
+            "      preallocate: true\n"
+        )
+    assert kafka_topic_helpers.load_topic_specs(yaml_filename) == expected_specs
+
+    for raw_specs in (
+        [{"partitions": 3}],
+        {"orders": {"partitions": 0}},
+        {"orders": {"replication_factor": "3"}},
+        {"orders": {"config": ["retention.ms"]}},
+        "orders",
+    ):
+        with pytest.raises(kafka_exceptions.InvalidTopicSpec):
+            kafka_topic_helpers.get_topic_specs(raw_specs)
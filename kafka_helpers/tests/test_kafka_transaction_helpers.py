@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+    Purpose:
+        Test File for kafka_transaction_helpers.py
+"""
+
+# Python Library Imports
+import os
+import sys
+import threading
+import pytest
+from confluent_kafka import KafkaError, KafkaException
+from unittest import mock
+
+# Import File to Test
+from kafka_helpers import kafka_transaction_helpers
+from kafka_helpers.kafka_fake_broker import FakeKafkaBroker
+
+
+###
+# Fixtures
+###
+
+
+@pytest.fixture
+def fake_broker():
+    """
+    Purpose:
+        Fake broker with 10 keyed messages in the "input" topic
+    """
+
+    fake_broker = FakeKafkaBroker()
+    fake_broker.create_topic("input", num_partitions=2)
+    for index in range(10):
+        fake_broker.append_message(
+            "input", index % 2, f"key-{index}".encode(), f"value-{index}".encode()
+        )
+
+    return fake_broker
+
+
+@pytest.fixture
+def kafka_consumer(fake_broker):
+    """
+    Purpose:
+        Transactional consumer on the fake broker
+    """
+
+    return kafka_transaction_helpers.get_transactional_consumer(
+        ["fake-broker:9092"],
+        "transform-group",
+        get_stats=False,
+        consumer_class=fake_broker.Consumer,
+    )
+
+
+@pytest.fixture
+def kafka_producer(fake_broker):
+    """
+    Purpose:
+        Transactional producer on the fake broker
+    """
+
+    return kafka_transaction_helpers.get_transactional_producer(
+        ["fake-broker:9092"],
+        "transform-1",
+        get_stats=False,
+        producer_class=fake_broker.Producer,
+    )
+
+
+###
+# Mocked Functions
+###
+
+
+def get_upper_transform(stop_event, num_messages=10, fail_at=None):
+    """
+    Purpose:
+        Transform that upper cases values and sets the stop event once
+        num_messages were transformed (raising at fail_at, if passed)
+    """
+
+    transformed = []
+
+    def upper_transform(msg):
+        if msg.value() == fail_at:
+            raise ValueError(f"Cannot transform {fail_at}")
+        transformed.append(msg.value())
+        if len(transformed) >= num_messages:
+            stop_event.set()
+        return msg.value().upper()
+
+    return upper_transform
+
+
+def get_committed_offsets(fake_broker):
+    """
+    Purpose:
+        Get the committed offsets of the transform group per input partition
+    """
+
+    return [
+        fake_broker.get_committed_offset("transform-group", "input", partition)
+        for partition in range(2)
+    ]
+
+
+###
+# Test Payload
+###
+
+
+def test_get_transactional_clients(kafka_consumer, kafka_producer):
+    """
+    Purpose:
+        Test that the clients are configured for transactions
+    """
+
+    assert kafka_producer.config["transactional.id"] == "transform-1"
+    assert kafka_producer.config["enable.idempotence"] is True
+    assert kafka_producer.transactions_initialized
+    assert kafka_consumer.config["enable.auto.commit"] is False
+    assert kafka_consumer.config["isolation.level"] == "read_committed"
+
+
+def test_transform_topic_transactionally(fake_broker, kafka_consumer, kafka_producer):
+    """
+    Purpose:
+        Test that output and offsets are committed together per batch
+    """
+
+    stop_event = threading.Event()
+    transaction_summary = kafka_transaction_helpers.transform_topic_transactionally(
+        kafka_consumer,
+        kafka_producer,
+        ["input"],
+        "output",
+        get_upper_transform(stop_event),
+        batch_size=4,
+        batch_timeout=10,
+        stop_event=stop_event,
+    )
+
+    assert transaction_summary == {
+        "transactions": 3, "aborted": 0, "consumed": 10, "produced": 10
+    }
+    output_msgs = fake_broker.get_messages("output")
+    assert sorted(msg.value() for msg in output_msgs) == sorted(
+        f"VALUE-{index}".encode() for index in range(10)
+    )
+    assert all(
+        msg.key() == msg.value().lower().replace(b"value", b"key")
+        for msg in output_msgs
+    )
+    assert get_committed_offsets(fake_broker) == [5, 5]
+
+
+def test_transform_topic_transactionally_transform_error(
+    fake_broker, kafka_consumer, kafka_producer
+):
+    """
+    Purpose:
+        Test that a failing transform aborts its transaction, so neither its
+        output nor its offsets are committed
+    """
+
+    stop_event = threading.Event()
+    with pytest.raises(ValueError):
+        kafka_transaction_helpers.transform_topic_transactionally(
+            kafka_consumer,
+            kafka_producer,
+            ["input"],
+            "output",
+            get_upper_transform(stop_event, fail_at=b"value-9"),
+            batch_size=4,
+            batch_timeout=10,
+            stop_event=stop_event,
+        )
+
+    committed_offsets = get_committed_offsets(fake_broker)
+    assert len(fake_broker.get_messages("output")) == sum(committed_offsets)
+    assert sum(committed_offsets) < 10
+    assert not kafka_producer.in_transaction
+
+
+def test_transform_topic_transactionally_abortable_error(
+    fake_broker, kafka_consumer, kafka_producer
+):
+    """
+    Purpose:
+        Test that an abortable commit error rewinds the consumer and the batch
+        is produced again exactly once
+    """
+
+    abortable_error = KafkaException(KafkaError(
+        KafkaError._STATE, "Abortable", txn_requires_abort=True
+    ))
+    commit_errors = [abortable_error]
+    commit_transaction = kafka_producer.commit_transaction
+
+    def commit_transaction_once_aborted(timeout=None):
+        if commit_errors:
+            raise commit_errors.pop()
+        commit_transaction()
+
+    kafka_producer.commit_transaction = commit_transaction_once_aborted
+
+    stop_event = threading.Event()
+    transaction_summary = kafka_transaction_helpers.transform_topic_transactionally(
+        kafka_consumer,
+        kafka_producer,
+        ["input"],
+        "output",
+        get_upper_transform(stop_event, num_messages=14),
+        batch_size=4,
+        batch_timeout=10,
+        stop_event=stop_event,
+    )
+
+    assert transaction_summary["aborted"] == 1
+    assert transaction_summary["produced"] == 10
+    assert len(fake_broker.get_messages("output")) == 10
+    assert get_committed_offsets(fake_broker) == [5, 5]
+
+
+def test_commit_transaction_retries():
+    """
+    Purpose:
+        Test that retriable commit errors are retried and others are raised
+    """
+
+    retriable_error = KafkaException(KafkaError(
+        KafkaError._TIMED_OUT, "Timed out", retriable=True
+    ))
+    kafka_producer = mock.Mock()
+    kafka_producer.commit_transaction.side_effect = [retriable_error, None]
+    kafka_transaction_helpers.commit_transaction(kafka_producer, commit_retries=3)
+    assert kafka_producer.commit_transaction.call_count == 2
+
+    kafka_producer.commit_transaction.side_effect = retriable_error
+    with pytest.raises(KafkaException):
+        kafka_transaction_helpers.commit_transaction(kafka_producer, commit_retries=2)
+    assert kafka_producer.commit_transaction.call_count == 5
+
+
+def test_produce_transaction_fatal_error(fake_broker, kafka_consumer, kafka_producer):
+    """
+    Purpose:
+        Test that fatal errors are raised without aborting
+    """
+
+    fenced_error = KafkaException(KafkaError(
+        KafkaError._FENCED, "Fenced", fatal=True
+    ))
+    kafka_producer.commit_transaction = mock.Mock(side_effect=fenced_error)
+    kafka_producer.abort_transaction = mock.Mock()
+
+    with pytest.raises(KafkaException):
+        kafka_transaction_helpers.produce_transaction(
+            kafka_consumer,
+            kafka_producer,
+            fake_broker.get_messages("input"),
+            "output",
+            lambda msg: msg.value(),
+        )
+    kafka_producer.abort_transaction.assert_not_called()
+
+
+def test_get_next_offsets(fake_broker):
+    """
+    Purpose:
+        Test that the offset after the last message of each partition is used
+    """
+
+    next_offsets = kafka_transaction_helpers.get_next_offsets(
+        fake_broker.get_messages("input")
+    )
+
+    assert sorted(
+        (offset.topic, offset.partition, offset.offset) for offset in next_offsets
+    ) == [("input", 0, 5), ("input", 1, 5)]